@@ -0,0 +1,106 @@
+"""Store embedding vectors as packed float32 (SQLite) / pgvector (PostgreSQL)
+
+Existing JSON vectors are converted in keyset-paginated chunks so the
+migration never holds more than one chunk of rows in memory.
+
+Revision ID: 0007_vector_storage
+Revises: 0006_v05
+Create Date: 2026-10-17
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+revision: str = "0007_vector_storage"
+down_revision: Union[str, None] = "0006_v05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHUNK_SIZE = 1000
+DIMENSIONS = 384
+
+
+def _iter_chunks(conn, column: str):
+    """Yield ``[(id, value), ...]`` chunks of non-null *column* values, ordered by id."""
+    last_id = None
+    while True:
+        where = f"{column} IS NOT NULL"
+        params = {"limit": CHUNK_SIZE}
+        if last_id is not None:
+            where += " AND id > :last_id"
+            params["last_id"] = last_id
+        rows = conn.execute(
+            sa.text(f"SELECT id, {column} FROM embeddings WHERE {where} ORDER BY id LIMIT :limit"),
+            params,
+        ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _to_list(value) -> list[float]:
+    if isinstance(value, str):
+        return json.loads(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return np.frombuffer(value, dtype="<f4").tolist()
+    return [float(x) for x in value]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    is_pg = conn.dialect.name == "postgresql"
+
+    if is_pg:
+        op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        op.execute(f"ALTER TABLE embeddings ADD COLUMN vector_packed vector({DIMENSIONS})")
+        update_sql = sa.text(
+            "UPDATE embeddings SET vector_packed = CAST(:v AS vector) WHERE id = :id"
+        )
+    else:
+        op.add_column("embeddings", sa.Column("vector_packed", sa.LargeBinary))
+        update_sql = sa.text("UPDATE embeddings SET vector_packed = :v WHERE id = :id")
+
+    for rows in _iter_chunks(conn, "vector"):
+        params = []
+        for row_id, raw in rows:
+            vector = _to_list(raw)
+            if not vector:
+                continue
+            if is_pg:
+                value = "[" + ",".join(repr(float(x)) for x in vector) + "]"
+            else:
+                value = np.asarray(vector, dtype="<f4").tobytes()
+            params.append({"id": row_id, "v": value})
+        if params:
+            conn.execute(update_sql, params)
+
+    with op.batch_alter_table("embeddings") as batch_op:
+        batch_op.drop_column("vector")
+        batch_op.alter_column("vector_packed", new_column_name="vector")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    is_pg = conn.dialect.name == "postgresql"
+
+    op.add_column("embeddings", sa.Column("vector_json", sa.Text))
+    for rows in _iter_chunks(conn, "vector"):
+        params = [
+            {"id": row_id, "v": json.dumps(_to_list(raw))}
+            for row_id, raw in rows
+        ]
+        conn.execute(
+            sa.text("UPDATE embeddings SET vector_json = :v WHERE id = :id"), params
+        )
+
+    with op.batch_alter_table("embeddings") as batch_op:
+        batch_op.drop_column("vector")
+        batch_op.alter_column("vector_json", new_column_name="vector")
+
+    if is_pg:
+        op.execute("ALTER TABLE embeddings ALTER COLUMN vector TYPE jsonb USING vector::jsonb")
@@ -0,0 +1,35 @@
+"""Add embedding lookup index and pgvector HNSW index for similarity search
+
+Revision ID: 0008_embedding_indexes
+Revises: 0007_vector_storage
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0008_embedding_indexes"
+down_revision: Union[str, None] = "0007_vector_storage"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_embeddings_org_entity",
+        "embeddings",
+        ["org_id", "entity_type", "entity_id"],
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embeddings_vector_hnsw ON embeddings "
+            "USING hnsw (vector vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_embeddings_vector_hnsw")
+    op.drop_index("ix_embeddings_org_entity", table_name="embeddings")
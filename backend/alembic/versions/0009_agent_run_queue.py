@@ -0,0 +1,34 @@
+"""Add job-queue lease columns to agent_runs
+
+Revision ID: 0009_agent_run_queue
+Revises: 0008_embedding_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0009_agent_run_queue"
+down_revision: Union[str, None] = "0008_embedding_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("agent_runs") as batch_op:
+        batch_op.add_column(sa.Column("worker_id", sa.String(255)))
+        batch_op.add_column(sa.Column("attempts", sa.Integer, server_default="0"))
+        batch_op.add_column(sa.Column("heartbeat_at", sa.DateTime(timezone=True)))
+        batch_op.add_column(sa.Column("lease_expires_at", sa.DateTime(timezone=True)))
+    op.create_index("ix_agent_runs_status_created", "agent_runs", ["status", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_agent_runs_status_created", table_name="agent_runs")
+    with op.batch_alter_table("agent_runs") as batch_op:
+        batch_op.drop_column("lease_expires_at")
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("attempts")
+        batch_op.drop_column("worker_id")
@@ -0,0 +1,183 @@
+"""Move Prowler findings out of collection_jobs.result_data into prowler_findings
+
+Existing Prowler jobs are backfilled one job at a time: their findings are
+inserted as rows and ``result_data`` keeps only the summary stats (extended
+with the per-service/per-framework counts the posture endpoint now reads).
+
+Revision ID: 0010_prowler_findings
+Revises: 0009_agent_run_queue
+Create Date: 2026-10-17
+
+"""
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0010_prowler_findings"
+down_revision: Union[str, None] = "0009_agent_run_queue"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FIELDS = (
+    "check_id", "check_title", "status", "severity", "service", "region", "resource_id",
+    "resource_arn", "status_extended", "risk", "remediation",
+)
+
+
+def _iter_prowler_jobs(conn):
+    last_id = None
+    while True:
+        where = "collector_type LIKE 'prowler_%' AND result_data IS NOT NULL"
+        params = {}
+        if last_id is not None:
+            where += " AND id > :last_id"
+            params["last_id"] = last_id
+        row = conn.execute(
+            sa.text(f"SELECT id, org_id, result_data FROM collection_jobs WHERE {where} ORDER BY id LIMIT 1"),
+            params,
+        ).fetchone()
+        if row is None:
+            return
+        yield row
+        last_id = row[0]
+
+
+def _load(value):
+    return (json.loads(value), True) if isinstance(value, str) else (value, False)
+
+
+def _summary(findings: list[dict]) -> dict:
+    total = passed = failed = 0
+    by_severity: dict = {}
+    by_service: dict = {}
+    services: dict = {}
+    frameworks: dict = {}
+    for f in findings:
+        is_pass = f["status"] == "PASS"
+        svc = f["service"] or "unknown"
+        total += 1
+        passed += is_pass
+        if f["status"] == "FAIL":
+            failed += 1
+            by_severity[f["severity"] or "unknown"] = by_severity.get(f["severity"] or "unknown", 0) + 1
+            by_service[svc] = by_service.get(svc, 0) + 1
+        counts = services.setdefault(svc, {"total": 0, "passed": 0})
+        counts["total"] += 1
+        counts["passed"] += is_pass
+        for fw in f["compliance"]:
+            counts = frameworks.setdefault(fw, {"total": 0, "passed": 0})
+            counts["total"] += 1
+            counts["passed"] += is_pass
+    return {
+        "total": total,
+        "passed": passed,
+        "failed": failed,
+        "pass_rate": round(passed / total * 100, 1) if total else 0.0,
+        "by_severity": by_severity,
+        "by_service": by_service,
+        "services": services,
+        "frameworks": frameworks,
+    }
+
+
+def upgrade() -> None:
+    op.create_table(
+        "prowler_findings",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("org_id", sa.String(36), sa.ForeignKey("organizations.id"), nullable=False),
+        sa.Column(
+            "job_id", sa.String(36),
+            sa.ForeignKey("collection_jobs.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column("seq", sa.Integer, nullable=False),
+        sa.Column("check_id", sa.String(255), server_default=""),
+        sa.Column("check_title", sa.String(1000), server_default=""),
+        sa.Column("status", sa.String(20), server_default=""),
+        sa.Column("severity", sa.String(20), server_default=""),
+        sa.Column("service", sa.String(100), server_default=""),
+        sa.Column("region", sa.String(50), server_default=""),
+        sa.Column("resource_id", sa.String(1000), server_default=""),
+        sa.Column("resource_arn", sa.String(2048), server_default=""),
+        sa.Column("status_extended", sa.Text),
+        sa.Column("risk", sa.Text),
+        sa.Column("remediation", sa.Text),
+        sa.Column("compliance", sa.Text),  # JSON
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_prowler_findings_job_seq", "prowler_findings", ["job_id", "seq"], unique=True)
+    op.create_index(
+        "ix_prowler_findings_job_status_severity", "prowler_findings", ["job_id", "status", "severity"]
+    )
+    op.create_index("ix_prowler_findings_job_service", "prowler_findings", ["job_id", "service"])
+
+    conn = op.get_bind()
+    insert_sql = sa.text(
+        "INSERT INTO prowler_findings (id, org_id, job_id, seq, compliance, created_at, "
+        + ", ".join(FIELDS) + ") VALUES (:id, :org_id, :job_id, :seq, :compliance, :created_at, "
+        + ", ".join(f":{f}" for f in FIELDS) + ")"
+    )
+    now = datetime.now(timezone.utc)
+    for job_id, org_id, raw in _iter_prowler_jobs(conn):
+        result_data, as_text = _load(raw)
+        data = (result_data or {}).get("data") or {}
+        if "findings" not in data:
+            continue
+        findings = []
+        for f in data.pop("findings") or []:
+            finding = {field: str(f.get(field) or "") for field in FIELDS}
+            finding["status"] = finding["status"].upper()
+            finding["severity"] = finding["severity"].lower()
+            finding["compliance"] = f.get("compliance") if isinstance(f.get("compliance"), dict) else {}
+            findings.append(finding)
+        if findings:
+            conn.execute(insert_sql, [
+                {
+                    **f,
+                    "id": str(uuid.uuid4()),
+                    "org_id": org_id,
+                    "job_id": job_id,
+                    "seq": seq,
+                    "compliance": json.dumps(f["compliance"]),
+                    "created_at": now,
+                }
+                for seq, f in enumerate(findings)
+            ])
+        data["summary_stats"] = _summary(findings)
+        conn.execute(
+            sa.text("UPDATE collection_jobs SET result_data = :rd WHERE id = :id"),
+            {"id": job_id, "rd": json.dumps(result_data) if as_text else result_data},
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for job_id, _, raw in _iter_prowler_jobs(conn):
+        result_data, as_text = _load(raw)
+        rows = conn.execute(
+            sa.text(
+                "SELECT " + ", ".join(FIELDS) + ", compliance FROM prowler_findings "
+                "WHERE job_id = :job_id ORDER BY seq"
+            ),
+            {"job_id": job_id},
+        ).mappings().all()
+        if not rows:
+            continue
+        findings = [
+            {**{f: row[f] or "" for f in FIELDS}, "compliance": json.loads(row["compliance"] or "{}")}
+            for row in rows
+        ]
+        result_data.setdefault("data", {})["findings"] = findings
+        conn.execute(
+            sa.text("UPDATE collection_jobs SET result_data = :rd WHERE id = :id"),
+            {"id": job_id, "rd": json.dumps(result_data) if as_text else result_data},
+        )
+
+    op.drop_index("ix_prowler_findings_job_service", table_name="prowler_findings")
+    op.drop_index("ix_prowler_findings_job_status_severity", table_name="prowler_findings")
+    op.drop_index("ix_prowler_findings_job_seq", table_name="prowler_findings")
+    op.drop_table("prowler_findings")
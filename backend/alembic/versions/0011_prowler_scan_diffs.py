@@ -0,0 +1,193 @@
+"""Fingerprint Prowler findings and record scan-to-scan diffs
+
+Existing findings get their fingerprint (sha256 of account, check_id,
+resource and region) and existing completed scans get a diff against the
+previous scan of the same integration and collector type, oldest first.
+Stored findings have no account column, so the backfill takes the account
+from the resource ARN, as ``finding_fingerprint`` does when a finding has
+no account ID.
+
+Revision ID: 0011_prowler_scan_diffs
+Revises: 0010_prowler_findings
+Create Date: 2026-10-17
+
+"""
+import hashlib
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0011_prowler_scan_diffs"
+down_revision: Union[str, None] = "0010_prowler_findings"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGE_FIELDS = (
+    "check_id", "check_title", "severity", "service", "region", "resource_id", "resource_arn",
+)
+
+
+def _fingerprint(check_id, resource_arn, resource_id, region) -> str:
+    parts = (resource_arn or "").split(":", 5)
+    account = parts[4] if len(parts) > 5 else ""
+    key = "\0".join((account, check_id or "", resource_arn or resource_id or "", region or ""))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _by_severity(changes) -> dict:
+    counts: dict = {}
+    for c in changes:
+        counts[c["severity"] or "unknown"] = counts.get(c["severity"] or "unknown", 0) + 1
+    return counts
+
+
+def _backfill_fingerprints(conn) -> None:
+    while True:
+        rows = conn.execute(sa.text(
+            "SELECT id, check_id, resource_arn, resource_id, region FROM prowler_findings "
+            "WHERE fingerprint IS NULL LIMIT 1000"
+        )).fetchall()
+        if not rows:
+            return
+        conn.execute(
+            sa.text("UPDATE prowler_findings SET fingerprint = :fp WHERE id = :id"),
+            [{"id": r[0], "fp": _fingerprint(r[1], r[2], r[3], r[4])} for r in rows],
+        )
+
+
+def _backfill_diffs(conn) -> None:
+    jobs = conn.execute(sa.text(
+        "SELECT id, org_id, integration_id, collector_type FROM collection_jobs "
+        "WHERE collector_type LIKE 'prowler_%' AND status = 'completed' ORDER BY created_at"
+    )).fetchall()
+    previous: dict = {}  # (integration_id, collector_type) -> (job_id, {fingerprint: change})
+    now = datetime.now(timezone.utc)
+    for job_id, org_id, integration_id, collector_type in jobs:
+        rows = conn.execute(
+            sa.text(
+                "SELECT fingerprint, " + ", ".join(CHANGE_FIELDS) + " FROM prowler_findings "
+                "WHERE job_id = :job_id AND status = 'FAIL'"
+            ),
+            {"job_id": job_id},
+        ).mappings().all()
+        current = {r["fingerprint"]: dict(r) for r in rows}
+        previous_id, before = previous.get((integration_id, collector_type), (None, {}))
+        new = [c for fp, c in current.items() if fp not in before]
+        resolved = [c for fp, c in before.items() if fp not in current]
+        failing: dict = {}
+        for r in rows:
+            failing[r["severity"] or "unknown"] = failing.get(r["severity"] or "unknown", 0) + 1
+        conn.execute(
+            sa.text(
+                "INSERT INTO prowler_scan_diffs (id, org_id, job_id, previous_job_id, integration_id, "
+                "collector_type, new_count, resolved_count, persisting_count, new_by_severity, "
+                "resolved_by_severity, failing_by_severity, created_at) VALUES (:id, :org_id, :job_id, "
+                ":previous_job_id, :integration_id, :collector_type, :new_count, :resolved_count, "
+                ":persisting_count, :new_by_severity, :resolved_by_severity, :failing_by_severity, :created_at)"
+            ),
+            {
+                "id": str(uuid.uuid4()),
+                "org_id": org_id,
+                "job_id": job_id,
+                "previous_job_id": previous_id,
+                "integration_id": integration_id,
+                "collector_type": collector_type,
+                "new_count": len(new),
+                "resolved_count": len(resolved),
+                "persisting_count": len(rows) - len(new),
+                "new_by_severity": json.dumps(_by_severity(new)),
+                "resolved_by_severity": json.dumps(_by_severity(resolved)),
+                "failing_by_severity": json.dumps(failing),
+                "created_at": now,
+            },
+        )
+        changes = [("new", c) for c in new] + [("resolved", c) for c in resolved]
+        if changes:
+            conn.execute(
+                sa.text(
+                    "INSERT INTO prowler_finding_changes (id, org_id, job_id, change, fingerprint, created_at, "
+                    + ", ".join(CHANGE_FIELDS) + ") VALUES (:id, :org_id, :job_id, :change, :fingerprint, "
+                    ":created_at, " + ", ".join(f":{f}" for f in CHANGE_FIELDS) + ")"
+                ),
+                [
+                    {**c, "id": str(uuid.uuid4()), "org_id": org_id, "job_id": job_id,
+                     "change": change, "created_at": now}
+                    for change, c in changes
+                ],
+            )
+        previous[(integration_id, collector_type)] = (job_id, current)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("prowler_findings") as batch_op:
+        batch_op.add_column(sa.Column("fingerprint", sa.String(64)))
+    op.create_index(
+        "ix_prowler_findings_job_fingerprint", "prowler_findings", ["job_id", "fingerprint"]
+    )
+
+    op.create_table(
+        "prowler_scan_diffs",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("org_id", sa.String(36), sa.ForeignKey("organizations.id"), nullable=False),
+        sa.Column(
+            "job_id", sa.String(36),
+            sa.ForeignKey("collection_jobs.id", ondelete="CASCADE"), nullable=False, unique=True,
+        ),
+        sa.Column(
+            "previous_job_id", sa.String(36), sa.ForeignKey("collection_jobs.id", ondelete="SET NULL")
+        ),
+        sa.Column("integration_id", sa.String(36), nullable=False),
+        sa.Column("collector_type", sa.String(100), nullable=False),
+        sa.Column("new_count", sa.Integer, server_default="0"),
+        sa.Column("resolved_count", sa.Integer, server_default="0"),
+        sa.Column("persisting_count", sa.Integer, server_default="0"),
+        sa.Column("new_by_severity", sa.Text),  # JSON
+        sa.Column("resolved_by_severity", sa.Text),  # JSON
+        sa.Column("failing_by_severity", sa.Text),  # JSON
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_prowler_scan_diffs_org_id", "prowler_scan_diffs", ["org_id"])
+
+    op.create_table(
+        "prowler_finding_changes",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("org_id", sa.String(36), sa.ForeignKey("organizations.id"), nullable=False),
+        sa.Column(
+            "job_id", sa.String(36),
+            sa.ForeignKey("collection_jobs.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column("change", sa.String(20), nullable=False),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("check_id", sa.String(255), server_default=""),
+        sa.Column("check_title", sa.String(1000), server_default=""),
+        sa.Column("severity", sa.String(20), server_default=""),
+        sa.Column("service", sa.String(100), server_default=""),
+        sa.Column("region", sa.String(50), server_default=""),
+        sa.Column("resource_id", sa.String(1000), server_default=""),
+        sa.Column("resource_arn", sa.String(2048), server_default=""),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index(
+        "ix_prowler_finding_changes_job_change_severity",
+        "prowler_finding_changes", ["job_id", "change", "severity"],
+    )
+
+    conn = op.get_bind()
+    _backfill_fingerprints(conn)
+    _backfill_diffs(conn)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prowler_finding_changes_job_change_severity", table_name="prowler_finding_changes")
+    op.drop_table("prowler_finding_changes")
+    op.drop_index("ix_prowler_scan_diffs_org_id", table_name="prowler_scan_diffs")
+    op.drop_table("prowler_scan_diffs")
+    op.drop_index("ix_prowler_findings_job_fingerprint", table_name="prowler_findings")
+    with op.batch_alter_table("prowler_findings") as batch_op:
+        batch_op.drop_column("fingerprint")
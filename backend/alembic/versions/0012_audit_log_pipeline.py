@@ -0,0 +1,78 @@
+"""Audit log daily counts, archive table and timestamp column
+
+``audit_logs`` gains the ``timestamp`` column the model has always used
+(backfilled from ``created_at``) plus indexes for listing and archiving.
+``audit_log_daily_counts`` is backfilled from the existing entries.
+
+Revision ID: 0012_audit_log_pipeline
+Revises: 0011_prowler_scan_diffs
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0012_audit_log_pipeline"
+down_revision: Union[str, None] = "0011_prowler_scan_diffs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _audit_log_columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("org_id", sa.String(36), nullable=False),
+        sa.Column("actor_type", sa.String(50), server_default="user"),
+        sa.Column("actor_id", sa.String(255)),
+        sa.Column("action", sa.String(100), nullable=False),
+        sa.Column("entity_type", sa.String(100)),
+        sa.Column("entity_id", sa.String(255)),
+        sa.Column("changes", sa.Text),  # JSON
+        sa.Column("ip_address", sa.String(45)),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+    ]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    existing = {c["name"] for c in sa.inspect(conn).get_columns("audit_logs")}
+    if "timestamp" not in existing:
+        with op.batch_alter_table("audit_logs") as batch_op:
+            batch_op.add_column(sa.Column("timestamp", sa.DateTime(timezone=True)))
+        op.execute(
+            "UPDATE audit_logs SET timestamp = COALESCE(created_at, CURRENT_TIMESTAMP) "
+            "WHERE timestamp IS NULL"
+        )
+    op.create_index("ix_audit_logs_org_timestamp", "audit_logs", ["org_id", "timestamp"])
+    op.create_index("ix_audit_logs_timestamp", "audit_logs", ["timestamp"])
+
+    op.create_table("audit_logs_archive", *_audit_log_columns())
+    op.create_index(
+        "ix_audit_logs_archive_org_timestamp", "audit_logs_archive", ["org_id", "timestamp"]
+    )
+
+    op.create_table(
+        "audit_log_daily_counts",
+        sa.Column("org_id", sa.String(36), primary_key=True),
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("action", sa.String(100), primary_key=True),
+        sa.Column("entity_type", sa.String(100), primary_key=True),
+        sa.Column("count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.execute(
+        "INSERT INTO audit_log_daily_counts (org_id, day, action, entity_type, count) "
+        "SELECT org_id, date(timestamp), action, COALESCE(entity_type, ''), COUNT(*) "
+        "FROM audit_logs WHERE org_id IS NOT NULL "
+        "GROUP BY org_id, date(timestamp), action, COALESCE(entity_type, '')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("audit_log_daily_counts")
+    op.drop_index("ix_audit_logs_archive_org_timestamp", table_name="audit_logs_archive")
+    op.drop_table("audit_logs_archive")
+    op.drop_index("ix_audit_logs_timestamp", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_org_timestamp", table_name="audit_logs")
+    # audit_logs.timestamp stays: the model relied on it before this revision
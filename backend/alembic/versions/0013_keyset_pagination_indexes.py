@@ -0,0 +1,28 @@
+"""Index for keyset pagination of monitor alerts
+
+Alerts are listed newest first on (created_at, id) within an org. Audit log
+entries already have (org_id, timestamp) from 0012.
+
+Revision ID: 0013_keyset_pagination_indexes
+Revises: 0012_audit_log_pipeline
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0013_keyset_pagination_indexes"
+down_revision: Union[str, None] = "0012_audit_log_pipeline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_monitor_alerts_org_created_id", "monitor_alerts", ["org_id", "created_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_monitor_alerts_org_created_id", table_name="monitor_alerts")
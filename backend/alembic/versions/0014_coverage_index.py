@@ -0,0 +1,73 @@
+"""Per-org framework coverage index
+
+Tables behind gap analysis and the cross-framework matrix. They start empty:
+each org's index is built on its first gap analysis request and maintained
+incrementally after that.
+
+Revision ID: 0014_coverage_index
+Revises: 0013_keyset_pagination_indexes
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0014_coverage_index"
+down_revision: Union[str, None] = "0013_keyset_pagination_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "control_coverage",
+        sa.Column("control_id", sa.String(36), primary_key=True),
+        sa.Column("org_id", sa.String(36), nullable=False),
+        sa.Column("framework_ids", sa.Text),  # JSON
+        sa.Column("framework_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_control_coverage_org_count", "control_coverage",
+        ["org_id", "framework_count", "control_id"],
+    )
+
+    op.create_table(
+        "requirement_coverage",
+        sa.Column("org_id", sa.String(36), primary_key=True),
+        sa.Column("requirement_id", sa.String(36), primary_key=True),
+        sa.Column("framework_id", sa.String(36), nullable=False),
+        sa.Column("control_ids", sa.Text),  # JSON
+        sa.Column("control_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("implemented_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_requirement_coverage_org_framework", "requirement_coverage",
+        ["org_id", "framework_id"],
+    )
+
+    op.create_table(
+        "framework_coverage",
+        sa.Column("org_id", sa.String(36), primary_key=True),
+        sa.Column("framework_id", sa.String(36), primary_key=True),
+        sa.Column("mapped_controls", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("implemented_controls", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("covered_requirements", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("partial_requirements", sa.Integer, nullable=False, server_default="0"),
+    )
+
+    op.create_table(
+        "coverage_index_state",
+        sa.Column("org_id", sa.String(36), primary_key=True),
+        sa.Column("built_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("coverage_index_state")
+    op.drop_table("framework_coverage")
+    op.drop_index("ix_requirement_coverage_org_framework", table_name="requirement_coverage")
+    op.drop_table("requirement_coverage")
+    op.drop_index("ix_control_coverage_org_count", table_name="control_coverage")
+    op.drop_table("control_coverage")
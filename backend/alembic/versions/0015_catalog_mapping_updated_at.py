@@ -0,0 +1,35 @@
+"""Track updates to control template framework mappings
+
+The catalog's change stamp reads ``max(updated_at)`` of every catalog table;
+the mapping table had no such column, so an edited requirement code went
+unnoticed until a row was added or removed.
+
+Revision ID: 0015_catalog_mapping_updated_at
+Revises: 0014_coverage_index
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0015_catalog_mapping_updated_at"
+down_revision: Union[str, None] = "0014_coverage_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite cannot ALTER TABLE ADD a column with a non-constant default;
+    # copying into a new table fills existing rows with the default too
+    recreate = "always" if op.get_bind().dialect.name == "sqlite" else "auto"
+    with op.batch_alter_table("control_template_framework_mappings", recreate=recreate) as batch_op:
+        batch_op.add_column(sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")
+        ))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("control_template_framework_mappings") as batch_op:
+        batch_op.drop_column("updated_at")
@@ -1,9 +1,8 @@
 """Node functions for the controls generation LangGraph."""
 import json
+from uuid import UUID
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.agents.common.llm import call_llm_json
 from app.agents.controls_generation.prompts import (
@@ -14,33 +13,21 @@ from app.agents.controls_generation.prompts import (
 from app.agents.controls_generation.state import ControlsGenerationState
 from app.models.control import Control
 from app.models.control_framework_mapping import ControlFrameworkMapping
-from app.models.control_template import ControlTemplate
-from app.models.control_template_framework_mapping import ControlTemplateFrameworkMapping
-from app.models.framework import Framework
-from app.models.framework_domain import FrameworkDomain
-from app.models.framework_requirement import FrameworkRequirement
+from app.services import catalog_service
 
 
 async def load_framework_requirements(
     state: ControlsGenerationState, db: AsyncSession
 ) -> dict:
     """Load all requirements for the selected framework. No LLM needed."""
-    framework_id = state["framework_id"]
-    result = await db.execute(
-        select(Framework)
-        .options(
-            selectinload(Framework.domains)
-            .selectinload(FrameworkDomain.requirements)
-        )
-        .where(Framework.id == framework_id)
-    )
-    framework = result.scalar_one_or_none()
-    if not framework:
+    framework_id = UUID(state["framework_id"])
+    catalog = await catalog_service.get_catalog(db)
+    if not catalog.framework(framework_id):
         return {"error": f"Framework {framework_id} not found"}
 
     requirements = []
-    for domain in framework.domains:
-        for req in domain.requirements:
+    for domain in catalog.domains.get(framework_id, ()):
+        for req in catalog.domain_requirements.get(domain.id, ()):
             requirements.append({
                 "id": str(req.id),
                 "code": req.code,
@@ -61,20 +48,13 @@ async def match_templates_to_requirements(
     requirements = state["requirements"]
     req_codes = {r["code"] for r in requirements}
 
-    # Get all templates with their framework mappings
-    result = await db.execute(
-        select(ControlTemplate)
-        .options(selectinload(ControlTemplate.framework_mappings))
-    )
-    all_templates = result.scalars().all()
+    # Templates and their requirement codes for this framework, from the catalog
+    catalog = await catalog_service.get_catalog(db)
+    codes_by_template = catalog.template_requirement_codes.get(UUID(framework_id), {})
 
     matched = []
-    for template in all_templates:
-        template_req_codes = {
-            m.requirement_code
-            for m in template.framework_mappings
-            if str(m.framework_id) == framework_id
-        }
+    for template in catalog.control_templates:
+        template_req_codes = codes_by_template.get(template.id, frozenset())
         overlap = template_req_codes & req_codes
         if overlap:
             matched.append({
@@ -231,6 +211,9 @@ async def finalize_output(
     agent_run_id = state["agent_run_id"]
     framework_id = state["framework_id"]
 
+    catalog = await catalog_service.get_catalog(db)
+    requirement_ids = catalog.requirement_ids.get(UUID(framework_id), {})
+
     created_controls = []
     for ctrl_data in controls:
         control = Control(
@@ -248,15 +231,12 @@ async def finalize_output(
 
         # Create framework mapping
         for req_code in ctrl_data.get("requirement_codes", []):
-            req_result = await db.execute(
-                select(FrameworkRequirement).where(FrameworkRequirement.code == req_code)
-            )
-            req = req_result.scalar_one_or_none()
-            if req:
+            requirement_id = requirement_ids.get(req_code)
+            if requirement_id:
                 mapping = ControlFrameworkMapping(
                     control_id=control.id,
                     framework_id=framework_id,
-                    requirement_id=req.id,
+                    requirement_id=requirement_id,
                 )
                 db.add(mapping)
 
@@ -46,34 +46,39 @@ async def load_active_rules(
 async def run_all_checks(
     state: MonitoringDaemonState, db: AsyncSession
 ) -> dict:
-    """Call monitoring_service.run_checks() for each active rule."""
+    """Evaluate all active rules in one batch via monitoring_service.run_org_checks()."""
     rules = state["rules"]
     org_id = state["org_id"]
-    check_results = []
 
-    for rule in rules:
-        rule_id = rule["id"]
-        try:
-            alerts = await monitoring_service.run_checks(db, org_id, rule_id)
-            check_results.append({
-                "rule_id": rule_id,
-                "rule_title": rule["title"],
-                "check_type": rule["check_type"],
-                "status": "fail" if alerts else "pass",
-                "alerts_count": len(alerts),
-                "alert_ids": [str(a.id) for a in alerts],
-            })
-        except Exception as e:
-            check_results.append({
-                "rule_id": rule_id,
+    try:
+        report = await monitoring_service.run_org_checks(db, org_id)
+    except Exception as e:
+        return {"check_results": [
+            {
+                "rule_id": rule["id"],
                 "rule_title": rule["title"],
                 "check_type": rule["check_type"],
                 "status": "error",
                 "alerts_count": 0,
                 "alert_ids": [],
                 "error": str(e),
-            })
-
+            }
+            for rule in rules
+        ]}
+
+    titles = {rule["id"]: rule["title"] for rule in rules}
+    check_results = [
+        {
+            "rule_id": str(ev.rule_id),
+            "rule_title": titles.get(str(ev.rule_id), ""),
+            "check_type": ev.check_type,
+            "status": ev.result,
+            "alerts_count": 1 if ev.alert_id else 0,
+            "alert_ids": [str(ev.alert_id)] if ev.alert_id else [],
+            "elapsed_ms": ev.elapsed_ms,
+        }
+        for ev in report.evaluations
+    ]
     return {"check_results": check_results}
 
 
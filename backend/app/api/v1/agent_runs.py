@@ -1,447 +1,124 @@
-import asyncio
 from uuid import UUID
-from datetime import datetime, timezone
 
 from fastapi import APIRouter, Query
 from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import DB, CurrentUser, AnyInternalUser, ComplianceUser, VerifiedOrgId
 from app.core.exceptions import NotFoundError
 from app.models.agent_run import AgentRun
 from app.schemas.agent_run import AgentRunResponse, AgentRunTrigger, AgentRunTriggerGeneric
 from app.schemas.common import PaginatedResponse
+from app.services import agent_queue
 
 router = APIRouter(prefix="/organizations/{org_id}/agents", tags=["agents"])
 
+# Triggers only enqueue a pending AgentRun; an AgentWorker (see
+# app.services.agent_queue) claims and executes it.
+
 
 @router.post("/controls-generation/run", response_model=AgentRunResponse, status_code=201)
 async def trigger_controls_generation(
     org_id: VerifiedOrgId, data: AgentRunTrigger, db: DB, current_user: ComplianceUser
 ):
-    agent_run = AgentRun(
-        org_id=org_id,
-        agent_type="controls_generation",
-        trigger="manual",
-        status="pending",
+    return await agent_queue.enqueue(
+        db, org_id, "controls_generation",
         input_data={
             "framework_id": str(data.framework_id),
             "company_context": data.company_context or {},
         },
     )
-    db.add(agent_run)
-    await db.commit()
-    await db.refresh(agent_run)
-
-    # Launch the agent graph as a background task
-    asyncio.create_task(_run_agent(str(agent_run.id), str(org_id)))
-
-    return agent_run
-
-
-async def _run_agent(agent_run_id: str, org_id: str):
-    """Background task that runs the controls generation agent."""
-    from app.core.database import async_session
-    from app.agents.controls_generation.graph import run_controls_generation
-
-    async with async_session() as db:
-        run = await db.get(AgentRun, agent_run_id)
-        if not run:
-            return
-
-        run.status = "running"
-        run.started_at = datetime.now(timezone.utc)
-        await db.commit()
-
-        try:
-            result = await run_controls_generation(
-                db=db,
-                org_id=org_id,
-                agent_run_id=agent_run_id,
-                framework_id=run.input_data["framework_id"],
-                company_context=run.input_data.get("company_context", {}),
-            )
-            run.status = "completed"
-            run.output_data = result
-            run.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.now(timezone.utc)
-
-        await db.commit()
 
 
 @router.post("/policy-generation/run", response_model=AgentRunResponse, status_code=201)
 async def trigger_policy_generation(
     org_id: VerifiedOrgId, data: AgentRunTrigger, db: DB, current_user: ComplianceUser
 ):
-    agent_run = AgentRun(
-        org_id=org_id,
-        agent_type="policy_generation",
-        trigger="manual",
-        status="pending",
+    return await agent_queue.enqueue(
+        db, org_id, "policy_generation",
         input_data={
             "framework_id": str(data.framework_id),
             "company_context": data.company_context or {},
         },
     )
-    db.add(agent_run)
-    await db.commit()
-    await db.refresh(agent_run)
-
-    asyncio.create_task(_run_policy_agent(str(agent_run.id), str(org_id)))
-
-    return agent_run
-
-
-async def _run_policy_agent(agent_run_id: str, org_id: str):
-    """Background task that runs the policy generation agent."""
-    from app.core.database import async_session
-    from app.agents.policy_generation.graph import run_policy_generation
-
-    async with async_session() as db:
-        run = await db.get(AgentRun, agent_run_id)
-        if not run:
-            return
-
-        run.status = "running"
-        run.started_at = datetime.now(timezone.utc)
-        await db.commit()
-
-        try:
-            result = await run_policy_generation(
-                db=db,
-                org_id=org_id,
-                agent_run_id=agent_run_id,
-                framework_id=run.input_data["framework_id"],
-                company_context=run.input_data.get("company_context", {}),
-            )
-            run.status = "completed"
-            run.output_data = result
-            run.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.now(timezone.utc)
-
-        await db.commit()
 
 
 @router.post("/evidence-generation/run", response_model=AgentRunResponse, status_code=201)
 async def trigger_evidence_generation(
     org_id: VerifiedOrgId, data: AgentRunTrigger, db: DB, current_user: ComplianceUser
 ):
-    agent_run = AgentRun(
-        org_id=org_id,
-        agent_type="evidence_generation",
-        trigger="manual",
-        status="pending",
+    return await agent_queue.enqueue(
+        db, org_id, "evidence_generation",
         input_data={
             "framework_id": str(data.framework_id),
             "company_context": data.company_context or {},
         },
     )
-    db.add(agent_run)
-    await db.commit()
-    await db.refresh(agent_run)
-
-    asyncio.create_task(_run_evidence_agent(str(agent_run.id), str(org_id)))
-
-    return agent_run
-
-
-async def _run_evidence_agent(agent_run_id: str, org_id: str):
-    """Background task that runs the evidence generation agent."""
-    from app.core.database import async_session
-    from app.agents.evidence_generation.graph import run_evidence_generation
-
-    async with async_session() as db:
-        run = await db.get(AgentRun, agent_run_id)
-        if not run:
-            return
-
-        run.status = "running"
-        run.started_at = datetime.now(timezone.utc)
-        await db.commit()
-
-        try:
-            result = await run_evidence_generation(
-                db=db,
-                org_id=org_id,
-                agent_run_id=agent_run_id,
-                company_context=run.input_data.get("company_context", {}),
-            )
-            run.status = "completed"
-            run.output_data = result
-            run.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.now(timezone.utc)
-
-        await db.commit()
 
 
 @router.post("/risk-assessment/run", response_model=AgentRunResponse, status_code=201)
 async def trigger_risk_assessment(
     org_id: VerifiedOrgId, data: AgentRunTriggerGeneric, db: DB, current_user: ComplianceUser
 ):
-    agent_run = AgentRun(
-        org_id=org_id,
-        agent_type="risk_assessment",
-        trigger="manual",
-        status="pending",
+    return await agent_queue.enqueue(
+        db, org_id, "risk_assessment",
         input_data={
             "framework_id": str(data.framework_id) if data.framework_id else None,
         },
     )
-    db.add(agent_run)
-    await db.commit()
-    await db.refresh(agent_run)
-    asyncio.create_task(_run_risk_assessment_agent(str(agent_run.id), str(org_id)))
-    return agent_run
-
-
-async def _run_risk_assessment_agent(agent_run_id: str, org_id: str):
-    from app.core.database import async_session
-    from app.agents.risk_assessment.graph import run_risk_assessment
-
-    async with async_session() as db:
-        run = await db.get(AgentRun, agent_run_id)
-        if not run:
-            return
-        run.status = "running"
-        run.started_at = datetime.now(timezone.utc)
-        await db.commit()
-        try:
-            result = await run_risk_assessment(
-                db=db, org_id=org_id, agent_run_id=agent_run_id,
-                framework_id=run.input_data.get("framework_id"),
-            )
-            run.status = "completed"
-            run.output_data = result
-            run.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.now(timezone.utc)
-        await db.commit()
 
 
 @router.post("/remediation/run", response_model=AgentRunResponse, status_code=201)
 async def trigger_remediation(
     org_id: VerifiedOrgId, data: AgentRunTriggerGeneric, db: DB, current_user: ComplianceUser
 ):
-    agent_run = AgentRun(
-        org_id=org_id,
-        agent_type="remediation",
-        trigger="manual",
-        status="pending",
-        input_data={},
-    )
-    db.add(agent_run)
-    await db.commit()
-    await db.refresh(agent_run)
-    asyncio.create_task(_run_remediation_agent(str(agent_run.id), str(org_id)))
-    return agent_run
-
-
-async def _run_remediation_agent(agent_run_id: str, org_id: str):
-    from app.core.database import async_session
-    from app.agents.remediation.graph import run_remediation
-
-    async with async_session() as db:
-        run = await db.get(AgentRun, agent_run_id)
-        if not run:
-            return
-        run.status = "running"
-        run.started_at = datetime.now(timezone.utc)
-        await db.commit()
-        try:
-            result = await run_remediation(db=db, org_id=org_id, agent_run_id=agent_run_id)
-            run.status = "completed"
-            run.output_data = result
-            run.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.now(timezone.utc)
-        await db.commit()
+    return await agent_queue.enqueue(db, org_id, "remediation")
 
 
 @router.post("/audit-preparation/run", response_model=AgentRunResponse, status_code=201)
 async def trigger_audit_preparation(
     org_id: VerifiedOrgId, data: AgentRunTriggerGeneric, db: DB, current_user: ComplianceUser
 ):
-    agent_run = AgentRun(
-        org_id=org_id,
-        agent_type="audit_preparation",
-        trigger="manual",
-        status="pending",
+    return await agent_queue.enqueue(
+        db, org_id, "audit_preparation",
         input_data={
             "audit_id": str(data.audit_id) if data.audit_id else None,
         },
     )
-    db.add(agent_run)
-    await db.commit()
-    await db.refresh(agent_run)
-    asyncio.create_task(_run_audit_prep_agent(str(agent_run.id), str(org_id)))
-    return agent_run
-
-
-async def _run_audit_prep_agent(agent_run_id: str, org_id: str):
-    from app.core.database import async_session
-    from app.agents.audit_preparation.graph import run_audit_preparation
-
-    async with async_session() as db:
-        run = await db.get(AgentRun, agent_run_id)
-        if not run:
-            return
-        run.status = "running"
-        run.started_at = datetime.now(timezone.utc)
-        await db.commit()
-        try:
-            result = await run_audit_preparation(
-                db=db, org_id=org_id, agent_run_id=agent_run_id,
-                audit_id=run.input_data.get("audit_id"),
-            )
-            run.status = "completed"
-            run.output_data = result
-            run.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.now(timezone.utc)
-        await db.commit()
 
 
 @router.post("/vendor-risk-assessment/run", response_model=AgentRunResponse, status_code=201)
 async def trigger_vendor_risk_assessment(
     org_id: VerifiedOrgId, data: AgentRunTriggerGeneric, db: DB, current_user: ComplianceUser
 ):
-    agent_run = AgentRun(
-        org_id=org_id,
-        agent_type="vendor_risk_assessment",
-        trigger="manual",
-        status="pending",
+    return await agent_queue.enqueue(
+        db, org_id, "vendor_risk_assessment",
         input_data={
             "vendor_id": str(data.vendor_id) if data.vendor_id else None,
         },
     )
-    db.add(agent_run)
-    await db.commit()
-    await db.refresh(agent_run)
-    asyncio.create_task(_run_vendor_risk_agent(str(agent_run.id), str(org_id)))
-    return agent_run
-
-
-async def _run_vendor_risk_agent(agent_run_id: str, org_id: str):
-    from app.core.database import async_session
-    from app.agents.vendor_risk_assessment.graph import run_vendor_risk_assessment
-
-    async with async_session() as db:
-        run = await db.get(AgentRun, agent_run_id)
-        if not run:
-            return
-        run.status = "running"
-        run.started_at = datetime.now(timezone.utc)
-        await db.commit()
-        try:
-            result = await run_vendor_risk_assessment(
-                db=db, org_id=org_id, agent_run_id=agent_run_id,
-                vendor_id=run.input_data.get("vendor_id"),
-            )
-            run.status = "completed"
-            run.output_data = result
-            run.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.now(timezone.utc)
-        await db.commit()
 
 
 @router.post("/pentest-orchestrator/run", response_model=AgentRunResponse, status_code=201)
 async def trigger_pentest_orchestrator(
     org_id: VerifiedOrgId, data: AgentRunTriggerGeneric, db: DB, current_user: ComplianceUser
 ):
-    agent_run = AgentRun(
-        org_id=org_id,
-        agent_type="pentest_orchestrator",
-        trigger="manual",
-        status="pending",
-        input_data={},
-    )
-    db.add(agent_run)
-    await db.commit()
-    await db.refresh(agent_run)
-    asyncio.create_task(_run_pentest_agent(str(agent_run.id), str(org_id)))
-    return agent_run
-
-
-async def _run_pentest_agent(agent_run_id: str, org_id: str):
-    from app.core.database import async_session
-    from app.agents.pentest_orchestrator.graph import run_pentest_orchestrator
-
-    async with async_session() as db:
-        run = await db.get(AgentRun, agent_run_id)
-        if not run:
-            return
-        run.status = "running"
-        run.started_at = datetime.now(timezone.utc)
-        await db.commit()
-        try:
-            result = await run_pentest_orchestrator(db=db, org_id=org_id, agent_run_id=agent_run_id)
-            run.status = "completed"
-            run.output_data = result
-            run.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.now(timezone.utc)
-        await db.commit()
+    return await agent_queue.enqueue(db, org_id, "pentest_orchestrator")
 
 
 @router.post("/monitoring-daemon/run", response_model=AgentRunResponse, status_code=201)
 async def trigger_monitoring_daemon(
     org_id: VerifiedOrgId, data: AgentRunTriggerGeneric, db: DB, current_user: ComplianceUser
 ):
-    agent_run = AgentRun(
-        org_id=org_id,
-        agent_type="monitoring_daemon",
-        trigger="manual",
-        status="pending",
-        input_data={},
-    )
-    db.add(agent_run)
-    await db.commit()
-    await db.refresh(agent_run)
-    asyncio.create_task(_run_monitoring_daemon_agent(str(agent_run.id), str(org_id)))
-    return agent_run
-
+    return await agent_queue.enqueue(db, org_id, "monitoring_daemon")
 
-async def _run_monitoring_daemon_agent(agent_run_id: str, org_id: str):
-    from app.core.database import async_session
-    from app.agents.monitoring_daemon.graph import run_monitoring_daemon
 
-    async with async_session() as db:
-        run = await db.get(AgentRun, agent_run_id)
-        if not run:
-            return
-        run.status = "running"
-        run.started_at = datetime.now(timezone.utc)
-        await db.commit()
-        try:
-            result = await run_monitoring_daemon(db=db, org_id=org_id, agent_run_id=agent_run_id)
-            run.status = "completed"
-            run.output_data = result
-            run.completed_at = datetime.now(timezone.utc)
-        except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.now(timezone.utc)
-        await db.commit()
+@router.get("/queue")
+async def get_queue_metrics(org_id: VerifiedOrgId, db: DB, current_user: AnyInternalUser):
+    """Queue depth and oldest pending wait for this organization and overall."""
+    return {
+        "org": await agent_queue.queue_metrics(db, org_id),
+        "global": await agent_queue.queue_metrics(db),
+    }
 
 
 @router.get("/runs", response_model=PaginatedResponse)
@@ -3,6 +3,7 @@ from uuid import UUID
 from fastapi import APIRouter, Query
 
 from app.core.dependencies import DB, AnyInternalUser, AdminUser, VerifiedOrgId
+from app.core.pagination import CountMode
 from app.schemas.common import PaginatedResponse
 from app.schemas.audit_log import AuditLogResponse, AuditLogStatsResponse
 from app.services import audit_log_service
@@ -22,24 +23,28 @@ async def list_audit_logs(
     entity_id: str | None = None,
     actor_id: str | None = None,
     action: str | None = None,
+    archived: bool = Query(False, description="List entries moved out of the hot table"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    count: CountMode | None = Query(None, description="exact | estimate | none"),
 ):
-    items, total = await audit_log_service.list_audit_logs(
+    result = await audit_log_service.list_audit_logs(
         db, org_id,
         entity_type=entity_type, entity_id=entity_id,
         actor_id=actor_id, action=action,
-        page=page, page_size=page_size,
+        page=page, page_size=page_size, archived=archived, cursor=cursor, count=count,
     )
-    return PaginatedResponse(
-        items=[AuditLogResponse.model_validate(log) for log in items],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
+    return PaginatedResponse.from_page(
+        result, [AuditLogResponse.model_validate(log) for log in result.items]
     )
 
 
 @router.get("/stats", response_model=AuditLogStatsResponse)
-async def get_stats(org_id: VerifiedOrgId, db: DB, current_user: AdminUser):
-    return await audit_log_service.get_audit_log_stats(db, org_id)
+async def get_stats(
+    org_id: VerifiedOrgId,
+    db: DB,
+    current_user: AdminUser,
+    days: int | None = Query(None, ge=1, description="Only count the last N days"),
+):
+    return await audit_log_service.get_audit_log_stats(db, org_id, days=days)
@@ -1,7 +1,8 @@
 """Read-only auditor portal — authenticated via X-Auditor-Token header."""
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,7 +13,9 @@ from app.models.evidence import Evidence
 from app.models.policy import Policy
 from app.models.risk import Risk
 from app.services.auditor_access_service import validate_token
-from app.services.audit_service import compute_readiness_score, generate_evidence_package
+from app.services.audit_service import (
+    compute_readiness_score, generate_evidence_package, stream_evidence_package,
+)
 
 router = APIRouter(prefix="/auditor/portal", tags=["auditor-portal"])
 
@@ -139,6 +142,15 @@ async def portal_risks(ctx: AuditorContext):
 
 
 @router.get("/evidence-package")
-async def portal_evidence_package(ctx: AuditorContext):
+async def portal_evidence_package(
+    ctx: AuditorContext,
+    format: str = Query("json", pattern="^(json|json-stream|ndjson)$"),
+):
+    """Evidence grouped by control. ``ndjson``/``json-stream`` stream the package as it is read."""
     db, audit = ctx
-    return await generate_evidence_package(db, audit.org_id)
+    if format == "json":
+        return await generate_evidence_package(db, audit.org_id)
+    return StreamingResponse(
+        stream_evidence_package(db, audit.org_id, format),
+        media_type="application/x-ndjson" if format == "ndjson" else "application/json",
+    )
@@ -1,6 +1,7 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
 
 from app.core.dependencies import DB, CurrentUser, AnyInternalUser, ComplianceUser, VerifiedOrgId
 from app.schemas.common import PaginatedResponse
@@ -115,7 +116,14 @@ async def revoke_token(
 # --- Evidence Package ---
 @router.get("/{audit_id}/evidence-package")
 async def get_evidence_package(
-    org_id: VerifiedOrgId, audit_id: UUID, db: DB, current_user: AnyInternalUser
+    org_id: VerifiedOrgId, audit_id: UUID, db: DB, current_user: AnyInternalUser,
+    format: str = Query("json", pattern="^(json|json-stream|ndjson)$"),
 ):
+    """Evidence grouped by control. ``ndjson``/``json-stream`` stream the package as it is read."""
     await audit_service.get_audit(db, org_id, audit_id)  # verify exists
-    return await audit_service.generate_evidence_package(db, org_id)
+    if format == "json":
+        return await audit_service.generate_evidence_package(db, org_id)
+    return StreamingResponse(
+        audit_service.stream_evidence_package(db, org_id, format),
+        media_type="application/x-ndjson" if format == "ndjson" else "application/json",
+    )
@@ -1,36 +1,40 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Query
-from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Query, Request, Response
+from sqlalchemy import select
 
 from app.core.dependencies import DB
+from app.core.etag import not_modified
 from app.core.exceptions import NotFoundError
 from app.models.control_template import ControlTemplate
 from app.schemas.common import PaginatedResponse
 from app.schemas.control_template import ControlTemplateBriefResponse, ControlTemplateResponse
+from app.services import catalog_service
 
 router = APIRouter(prefix="/control-templates", tags=["control-templates"])
 
 
 @router.get("", response_model=PaginatedResponse)
 async def list_control_templates(
+    request: Request,
+    response: Response,
     db: DB,
     domain: str | None = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
 ):
-    base_q = select(ControlTemplate)
-    count_q = select(func.count()).select_from(ControlTemplate)
-
-    if domain:
-        base_q = base_q.where(ControlTemplate.domain == domain)
-        count_q = count_q.where(ControlTemplate.domain == domain)
-
-    total = (await db.execute(count_q)).scalar() or 0
-    q = base_q.offset((page - 1) * page_size).limit(page_size).order_by(ControlTemplate.domain)
-    result = await db.execute(q)
-    items = [ControlTemplateBriefResponse.model_validate(t) for t in result.scalars().all()]
+    catalog = await catalog_service.get_catalog(db)
+    if cached := not_modified(
+        request, response, catalog.etag("control_templates", domain, page, page_size)
+    ):
+        return cached
+
+    templates = [t for t in catalog.control_templates if not domain or t.domain == domain]
+    total = len(templates)
+    start = (page - 1) * page_size
+    items = [
+        ControlTemplateBriefResponse.model_validate(t) for t in templates[start:start + page_size]
+    ]
 
     return PaginatedResponse(
         items=items,
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Query
 
 from app.core.audit_middleware import log_audit
 from app.core.dependencies import DB, CurrentUser, AnyInternalUser, ComplianceUser, VerifiedOrgId
+from app.core.pagination import CountMode
 from app.schemas.common import PaginatedResponse, MessageResponse
 from app.schemas.control import (
     BulkApproveRequest,
@@ -38,17 +39,14 @@ async def list_controls(
     framework_id: UUID | None = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    count: CountMode | None = Query(None, description="exact | estimate | none"),
 ):
-    controls, total = await control_service.list_controls(
-        db, org_id, status=status, framework_id=framework_id, page=page, page_size=page_size
-    )
-    return PaginatedResponse(
-        items=[_serialize_control(c) for c in controls],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
+    result = await control_service.list_controls(
+        db, org_id, status=status, framework_id=framework_id, page=page, page_size=page_size,
+        cursor=cursor, count=count,
     )
+    return PaginatedResponse.from_page(result, [_serialize_control(c) for c in result.items])
 
 
 @router.post("", response_model=ControlResponse, status_code=201)
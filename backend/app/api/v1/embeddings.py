@@ -4,7 +4,6 @@ from fastapi import APIRouter, Query
 from pydantic import BaseModel
 
 from app.core.dependencies import DB, AnyInternalUser, ComplianceUser, VerifiedOrgId
-from app.schemas.common import MessageResponse
 from app.services import embedding_service
 
 router = APIRouter(
@@ -20,6 +19,18 @@ class SearchRequest(BaseModel):
     min_score: float = 0.3
 
 
+class IndexResponse(BaseModel):
+    message: str
+    total: int
+    indexed: int
+    skipped: int
+    written: int
+    entities_per_second: float
+    encode_ms: float
+    write_ms: float
+    elapsed_ms: float
+
+
 @router.post("/search")
 async def search_similar(
     org_id: VerifiedOrgId, data: SearchRequest, db: DB, current_user: AnyInternalUser,
@@ -33,10 +44,20 @@ async def search_similar(
     )
 
 
-@router.post("/index/{entity_type}", response_model=MessageResponse)
+@router.post("/index/{entity_type}", response_model=IndexResponse)
 async def index_entities(
     org_id: VerifiedOrgId, entity_type: str, db: DB, current_user: ComplianceUser,
 ):
     """Bulk-index all entities of a given type for semantic search."""
-    count = await embedding_service.index_entities(db, org_id, entity_type)
-    return MessageResponse(message=f"Indexed {count} {entity_type} entities")
+    stats = await embedding_service.index_entities(db, org_id, entity_type)
+    return IndexResponse(
+        message=f"Indexed {stats.indexed} {entity_type} entities",
+        total=stats.total,
+        indexed=stats.indexed,
+        skipped=stats.skipped,
+        written=stats.written,
+        entities_per_second=stats.entities_per_second,
+        encode_ms=stats.encode_ms,
+        write_ms=stats.write_ms,
+        elapsed_ms=stats.elapsed_ms,
+    )
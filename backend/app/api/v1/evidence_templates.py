@@ -1,35 +1,43 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Query, Request, Response
+from sqlalchemy import select
 
 from app.core.dependencies import DB
+from app.core.etag import not_modified
 from app.core.exceptions import NotFoundError
 from app.models.evidence_template import EvidenceTemplate
 from app.schemas.common import PaginatedResponse
 from app.schemas.evidence_template import EvidenceTemplateBriefResponse, EvidenceTemplateResponse
+from app.services import catalog_service
 
 router = APIRouter(prefix="/evidence-templates", tags=["evidence-templates"])
 
 
 @router.get("", response_model=PaginatedResponse)
 async def list_evidence_templates(
+    request: Request,
+    response: Response,
     db: DB,
     evidence_type: str | None = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
 ):
-    base_q = select(EvidenceTemplate)
-    count_q = select(func.count()).select_from(EvidenceTemplate)
-
-    if evidence_type:
-        base_q = base_q.where(EvidenceTemplate.evidence_type == evidence_type)
-        count_q = count_q.where(EvidenceTemplate.evidence_type == evidence_type)
-
-    total = (await db.execute(count_q)).scalar() or 0
-    q = base_q.offset((page - 1) * page_size).limit(page_size).order_by(EvidenceTemplate.template_code)
-    result = await db.execute(q)
-    items = [EvidenceTemplateBriefResponse.model_validate(t) for t in result.scalars().all()]
+    catalog = await catalog_service.get_catalog(db)
+    if cached := not_modified(
+        request, response, catalog.etag("evidence_templates", evidence_type, page, page_size)
+    ):
+        return cached
+
+    templates = [
+        t for t in catalog.evidence_templates
+        if not evidence_type or t.evidence_type == evidence_type
+    ]
+    total = len(templates)
+    start = (page - 1) * page_size
+    items = [
+        EvidenceTemplateBriefResponse.model_validate(t) for t in templates[start:start + page_size]
+    ]
 
     return PaginatedResponse(
         items=items,
@@ -1,8 +1,9 @@
 from uuid import UUID
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, Response, status
 
 from app.core.dependencies import DB, AnyInternalUser, AdminUser
+from app.core.etag import not_modified
 from app.schemas.framework import (
     DomainCreate,
     DomainDetailResponse,
@@ -15,7 +16,7 @@ from app.schemas.framework import (
     RequirementCreate,
     RequirementDetailResponse,
 )
-from app.services import framework_service
+from app.services import catalog_service, framework_service
 
 router = APIRouter(prefix="/frameworks", tags=["frameworks"])
 
@@ -26,7 +27,10 @@ router = APIRouter(prefix="/frameworks", tags=["frameworks"])
 
 
 @router.get("", response_model=list[FrameworkResponse])
-async def list_frameworks(db: DB, current_user: AnyInternalUser):
+async def list_frameworks(request: Request, response: Response, db: DB, current_user: AnyInternalUser):
+    catalog = await catalog_service.get_catalog(db)
+    if cached := not_modified(request, response, catalog.etag("frameworks")):
+        return cached
     return await framework_service.list_frameworks(db)
 
 
@@ -36,7 +40,12 @@ async def get_framework(framework_id: UUID, db: DB, current_user: AnyInternalUse
 
 
 @router.get("/{framework_id}/domains", response_model=list[FrameworkDomainResponse])
-async def get_domains(framework_id: UUID, db: DB, current_user: AnyInternalUser):
+async def get_domains(
+    framework_id: UUID, request: Request, response: Response, db: DB, current_user: AnyInternalUser
+):
+    catalog = await catalog_service.get_catalog(db)
+    if cached := not_modified(request, response, catalog.etag("domains", framework_id)):
+        return cached
     return await framework_service.get_framework_domains(db, framework_id)
 
 
@@ -46,7 +55,12 @@ async def get_domain(framework_id: UUID, domain_id: UUID, db: DB, current_user:
 
 
 @router.get("/{framework_id}/requirements", response_model=list[FrameworkRequirementResponse])
-async def get_requirements(framework_id: UUID, db: DB, current_user: AnyInternalUser):
+async def get_requirements(
+    framework_id: UUID, request: Request, response: Response, db: DB, current_user: AnyInternalUser
+):
+    catalog = await catalog_service.get_catalog(db)
+    if cached := not_modified(request, response, catalog.etag("requirements", framework_id)):
+        return cached
     return await framework_service.get_requirements(db, framework_id)
 
 
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
 from app.core.dependencies import DB, AnyInternalUser, VerifiedOrgId
 from app.services import gap_analysis_service
@@ -22,6 +22,11 @@ async def get_gap_analysis(
 @router.get("/cross-framework")
 async def get_cross_framework_matrix(
     org_id: VerifiedOrgId, db: DB, current_user: AnyInternalUser,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
 ):
     """Get cross-framework control mapping matrix with deduplication opportunities."""
-    return await gap_analysis_service.get_cross_framework_matrix(db, org_id)
+    return await gap_analysis_service.get_cross_framework_matrix(
+        db, org_id, page=page, page_size=page_size, cursor=cursor
+    )
@@ -10,6 +10,7 @@ from app.schemas.integration import (
     IntegrationUpdate,
     IntegrationResponse,
     CollectionTrigger,
+    CollectionBatchTrigger,
     CollectionJobResponse,
     ProviderInfo,
 )
@@ -53,6 +54,17 @@ async def list_providers(org_id: VerifiedOrgId, db: DB, current_user: AnyInterna
     return PROVIDERS
 
 
+@router.post("/collect", response_model=list[CollectionJobResponse], status_code=202)
+async def trigger_collections(
+    org_id: VerifiedOrgId, data: CollectionBatchTrigger, db: DB, current_user: ComplianceUser,
+):
+    """Queue collectors for many integrations at once; poll the returned jobs for results."""
+    jobs = await collection_service.trigger_collections(db, org_id, data.items)
+    for integration_id in {str(job.integration_id) for job in jobs}:
+        await log_audit(db, current_user, "trigger_collection", "integration", integration_id, org_id)
+    return jobs
+
+
 @router.get("", response_model=PaginatedResponse)
 async def list_integrations(
     org_id: VerifiedOrgId, db: DB, current_user: AnyInternalUser,
@@ -131,3 +143,11 @@ async def list_collection_jobs(
         total=total, page=page, page_size=page_size,
         total_pages=(total + page_size - 1) // page_size,
     )
+
+
+@router.get("/{integration_id}/jobs/{job_id}", response_model=CollectionJobResponse)
+async def get_collection_job(
+    org_id: VerifiedOrgId, integration_id: UUID, job_id: UUID,
+    db: DB, current_user: AnyInternalUser,
+):
+    return await collection_service.get_collection_job(db, org_id, integration_id, job_id)
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Query
 
 from app.core.audit_middleware import log_audit
 from app.core.dependencies import DB, CurrentUser, AnyInternalUser, ComplianceUser, VerifiedOrgId
+from app.core.pagination import CountMode
 from app.schemas.common import PaginatedResponse
 from app.schemas.monitoring import (
     MonitorRuleCreate,
@@ -11,6 +12,7 @@ from app.schemas.monitoring import (
     MonitorRuleResponse,
     MonitorAlertResponse,
     MonitorAlertUpdate,
+    MonitorEvaluationReport,
     MonitoringStatsResponse,
 )
 from app.services import monitoring_service
@@ -72,6 +74,15 @@ async def delete_rule(org_id: VerifiedOrgId, rule_id: UUID, db: DB, current_user
     await log_audit(db, current_user, "delete", "monitor_rule", str(rule_id), org_id)
 
 
+@router.post("/run", response_model=MonitorEvaluationReport)
+async def run_all_rules(
+    org_id: VerifiedOrgId, db: DB, current_user: ComplianceUser,
+    schedule: str | None = Query(None, pattern="^(hourly|daily|weekly)$"),
+):
+    """Evaluate all active rules in one batch and report per-rule timing."""
+    return await monitoring_service.run_org_checks(db, org_id, schedule=schedule)
+
+
 @router.post("/rules/{rule_id}/run", response_model=list[MonitorAlertResponse])
 async def run_rule(org_id: VerifiedOrgId, rule_id: UUID, db: DB, current_user: ComplianceUser):
     return await monitoring_service.run_checks(db, org_id, rule_id)
@@ -94,17 +105,15 @@ async def list_alerts(
     rule_id: UUID | None = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    count: CountMode | None = Query(None, description="exact | estimate | none"),
 ):
-    items, total = await monitoring_service.list_alerts(
+    result = await monitoring_service.list_alerts(
         db, org_id, status=status, severity=severity, rule_id=rule_id,
-        page=page, page_size=page_size,
+        page=page, page_size=page_size, cursor=cursor, count=count,
     )
-    return PaginatedResponse(
-        items=[MonitorAlertResponse.model_validate(i) for i in items],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
+    return PaginatedResponse.from_page(
+        result, [MonitorAlertResponse.model_validate(i) for i in result.items]
     )
 
 
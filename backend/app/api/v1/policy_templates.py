@@ -1,27 +1,36 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request, Response
 
 from app.core.dependencies import DB
+from app.core.etag import not_modified
 from app.schemas.common import PaginatedResponse
 from app.schemas.policy import PolicyTemplateResponse
-from app.services import policy_service
+from app.services import catalog_service, policy_service
 
 router = APIRouter(prefix="/policy-templates", tags=["policy-templates"])
 
 
 @router.get("", response_model=PaginatedResponse)
 async def list_policy_templates(
+    request: Request,
+    response: Response,
     db: DB,
     category: str | None = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
 ):
-    templates, total = await policy_service.list_policy_templates(
-        db, category=category, page=page, page_size=page_size
-    )
+    catalog = await catalog_service.get_catalog(db)
+    if cached := not_modified(
+        request, response, catalog.etag("policy_templates", category, page, page_size)
+    ):
+        return cached
+
+    templates = [t for t in catalog.policy_templates if not category or t.category == category]
+    total = len(templates)
+    start = (page - 1) * page_size
     return PaginatedResponse(
-        items=[PolicyTemplateResponse.model_validate(t) for t in templates],
+        items=templates[start:start + page_size],
         total=total,
         page=page,
         page_size=page_size,
@@ -7,6 +7,9 @@ from app.core.audit_middleware import log_audit
 from app.core.dependencies import DB, ComplianceUser, AnyInternalUser, VerifiedOrgId
 from app.schemas.prowler import (
     ProwlerScanTrigger,
+    ProwlerFindingCounts,
+    ProwlerFindingPage,
+    ProwlerScanDiffResponse,
     ProwlerScanResultResponse,
     ProwlerCompliancePosture,
     ProwlerFindingSummary,
@@ -33,19 +36,34 @@ async def trigger_scan(
     }
 
 
+@router.post("/scan/{job_id}/cancel", response_model=dict)
+async def cancel_scan(
+    org_id: VerifiedOrgId, job_id: UUID, db: DB, current_user: ComplianceUser
+):
+    """Cancel a pending or running Prowler scan."""
+    job = await prowler_service.cancel_scan(db, org_id, job_id)
+    await log_audit(db, current_user, "cancel_prowler_scan", "prowler", str(job.id), org_id)
+    return {
+        "job_id": str(job.id),
+        "status": job.status,
+        "collector_type": job.collector_type,
+    }
+
+
 @router.get("/results", response_model=dict)
 async def list_scan_results(
     org_id: VerifiedOrgId, db: DB, current_user: AnyInternalUser,
     severity: str | None = Query(None),
     status: str | None = Query(None),
     service: str | None = Query(None),
+    include_findings: bool = Query(False, description="Attach each scan's findings (filtered by severity/status/service)"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
 ):
-    """List Prowler scan results with optional filters."""
+    """List Prowler scan summaries, optionally with their findings."""
     items, total = await prowler_service.list_scan_results(
         db, org_id, severity=severity, status=status, service=service,
-        page=page, page_size=page_size,
+        page=page, page_size=page_size, include_findings=include_findings,
     )
     return {
         "items": [item.model_dump() for item in items],
@@ -58,16 +76,84 @@ async def list_scan_results(
 
 @router.get("/results/{job_id}", response_model=ProwlerScanResultResponse)
 async def get_scan_detail(
-    org_id: VerifiedOrgId, job_id: UUID, db: DB, current_user: AnyInternalUser
+    org_id: VerifiedOrgId, job_id: UUID, db: DB, current_user: AnyInternalUser,
+    severity: str | None = Query(None),
+    status: str | None = Query(None),
+    service: str | None = Query(None),
+    region: str | None = Query(None),
+    cursor: int | None = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
 ):
-    """Get detailed results for a specific Prowler scan."""
-    result = await prowler_service.get_scan_detail(db, org_id, job_id)
+    """Get a Prowler scan's summary and the first page of its findings."""
+    result = await prowler_service.get_scan_detail(
+        db, org_id, job_id, cursor=cursor, limit=limit,
+        severity=severity, status=status, service=service, region=region,
+    )
     if not result:
         from app.core.exceptions import NotFoundError
         raise NotFoundError(f"Prowler scan {job_id} not found")
     return result
 
 
+@router.get("/results/{job_id}/findings", response_model=ProwlerFindingPage)
+async def list_scan_findings(
+    org_id: VerifiedOrgId, job_id: UUID, db: DB, current_user: AnyInternalUser,
+    severity: str | None = Query(None),
+    status: str | None = Query(None),
+    service: str | None = Query(None),
+    region: str | None = Query(None),
+    cursor: int | None = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Cursor-paginate a scan's findings; pass the returned next_cursor to continue."""
+    return await prowler_service.list_findings(
+        db, org_id, job_id, cursor=cursor, limit=limit,
+        severity=severity, status=status, service=service, region=region,
+    )
+
+
+@router.get("/results/{job_id}/counts", response_model=ProwlerFindingCounts)
+async def count_scan_findings(
+    org_id: VerifiedOrgId, job_id: UUID, db: DB, current_user: AnyInternalUser,
+    group_by: str = Query("severity", pattern="^(severity|status|service|region)$"),
+    severity: str | None = Query(None),
+    status: str | None = Query(None),
+    service: str | None = Query(None),
+    region: str | None = Query(None),
+):
+    """Count a scan's findings grouped by severity, status, service or region."""
+    return await prowler_service.count_findings(
+        db, org_id, job_id, group_by,
+        severity=severity, status=status, service=service, region=region,
+    )
+
+
+@router.get("/results/{job_id}/diff", response_model=ProwlerScanDiffResponse)
+async def get_scan_diff(
+    org_id: VerifiedOrgId, job_id: UUID, db: DB, current_user: AnyInternalUser,
+    change: str | None = Query(None, pattern="^(new|resolved)$"),
+    severity: str | None = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+):
+    """Failing findings that are new or resolved since the previous scan."""
+    return await prowler_service.get_scan_diff(
+        db, org_id, job_id, change=change, severity=severity, limit=limit
+    )
+
+
+@router.get("/trends", response_model=list[ProwlerScanDiffResponse])
+async def list_scan_trends(
+    org_id: VerifiedOrgId, db: DB, current_user: AnyInternalUser,
+    integration_id: UUID | None = Query(None),
+    collector_type: str | None = Query(None),
+    limit: int = Query(30, ge=1, le=365),
+):
+    """New/resolved/persisting failing-finding counts per scan, newest first."""
+    return await prowler_service.list_scan_trends(
+        db, org_id, integration_id=integration_id, collector_type=collector_type, limit=limit
+    )
+
+
 @router.get("/compliance-posture", response_model=ProwlerCompliancePosture)
 async def get_compliance_posture(
     org_id: VerifiedOrgId, db: DB, current_user: AnyInternalUser
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Query
 
 from app.core.audit_middleware import log_audit
 from app.core.dependencies import DB, CurrentUser, AnyInternalUser, ComplianceUser, VerifiedOrgId
+from app.core.pagination import CountMode
 from app.schemas.common import PaginatedResponse
 from app.schemas.risk import (
     RiskCreate,
@@ -32,18 +33,14 @@ async def list_risks(
     category: str | None = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    count: CountMode | None = Query(None, description="exact | estimate | none"),
 ):
-    items, total = await risk_service.list_risks(
+    result = await risk_service.list_risks(
         db, org_id, status=status, risk_level=risk_level,
-        category=category, page=page, page_size=page_size,
-    )
-    return PaginatedResponse(
-        items=[RiskResponse.model_validate(i) for i in items],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
+        category=category, page=page, page_size=page_size, cursor=cursor, count=count,
     )
+    return PaginatedResponse.from_page(result, [RiskResponse.model_validate(i) for i in result.items])
 
 
 @router.post("", response_model=RiskResponse, status_code=201)
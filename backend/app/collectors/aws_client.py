@@ -0,0 +1,169 @@
+"""Async wrapper around boto3 for the AWS collectors.
+
+boto3 is synchronous, so every call is run in a dedicated, bounded thread
+pool instead of on the event loop. Clients are expensive to build (endpoint
+resolution, credential chain) but thread-safe once built, so they are cached
+per ``(credentials fingerprint, region, service)``. Per-operation latency is
+recorded for ``/health/metrics``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from app.config import get_settings
+from app.core.cache import LRUCache
+
+settings = get_settings()
+
+_pool: ThreadPoolExecutor | None = None
+_clients = LRUCache(
+    maxsize=settings.AWS_CLIENT_CACHE_SIZE, ttl=settings.AWS_CLIENT_CACHE_TTL_SECONDS
+)
+_stats: dict[str, dict[str, float]] = {}
+_stats_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=settings.AWS_CLIENT_MAX_WORKERS, thread_name_prefix="aws"
+        )
+    return _pool
+
+
+def _fingerprint(credentials: dict) -> str:
+    """Hash the secret material so raw keys are never used as cache keys."""
+    material = "\0".join(
+        credentials.get(k) or ""
+        for k in ("aws_access_key_id", "aws_secret_access_key", "aws_session_token")
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _record(operation: str, elapsed_ms: float, error: bool) -> None:
+    with _stats_lock:
+        entry = _stats.setdefault(
+            operation, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        entry["calls"] += 1
+        entry["errors"] += error
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+
+async def _run(operation: str, fn, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    error = False
+    try:
+        return await loop.run_in_executor(_get_pool(), functools.partial(fn, *args, **kwargs))
+    except Exception:
+        error = True
+        raise
+    finally:
+        _record(operation, (time.perf_counter() - started) * 1000, error)
+
+
+class AsyncAwsClient:
+    """Awaitable facade over a cached boto3 client."""
+
+    def __init__(self, client: Any, service: str):
+        self._client = client
+        self.service = service
+
+    @property
+    def exceptions(self):
+        return self._client.exceptions
+
+    async def call(self, method: str, **kwargs) -> dict:
+        return await _run(
+            f"{self.service}.{method}", getattr(self._client, method), **kwargs
+        )
+
+    async def paginate(self, method: str, **kwargs) -> list[dict]:
+        """Fetch every page of *method* in one worker-thread hop."""
+        paginator = self._client.get_paginator(method)
+        return await _run(
+            f"{self.service}.{method}", lambda: list(paginator.paginate(**kwargs))
+        )
+
+    async def fan_out(
+        self, method: str, calls: Iterable[dict]
+    ) -> list[dict | Exception]:
+        """Issue one *method* call per kwargs dict concurrently.
+
+        Results are returned in input order; a failed call yields its
+        exception instead of aborting the others.
+        """
+        return await asyncio.gather(
+            *(self.call(method, **kwargs) for kwargs in calls), return_exceptions=True
+        )
+
+
+def _build_client(service: str, credentials: dict, region: str):
+    import boto3  # boto3 is in pyproject.toml dependencies
+    from botocore.config import Config
+
+    # A fresh Session per client: sessions are not thread-safe, clients are.
+    session = boto3.session.Session(
+        aws_access_key_id=credentials.get("aws_access_key_id"),
+        aws_secret_access_key=credentials.get("aws_secret_access_key"),
+        aws_session_token=credentials.get("aws_session_token"),
+        region_name=region,
+    )
+    return session.client(
+        service, config=Config(max_pool_connections=settings.AWS_CLIENT_MAX_WORKERS)
+    )
+
+
+async def get_client(service: str, credentials: dict | None) -> AsyncAwsClient:
+    """Return a cached async client for *service* using *credentials*.
+
+    Expected keys in *credentials*:
+      - aws_access_key_id
+      - aws_secret_access_key
+      - aws_region  (optional, defaults to us-east-1)
+      - aws_session_token  (optional)
+    """
+    if not credentials:
+        raise ValueError("No credentials provided")
+
+    region = credentials.get("aws_region", "us-east-1")
+    key = (_fingerprint(credentials), region, service)
+    client = _clients.get(key)
+    if client is None:
+        raw = await _run(f"{service}.<create_client>", _build_client, service, credentials, region)
+        client = AsyncAwsClient(raw, service)
+        _clients.set(key, client)
+    return client
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        calls = {
+            op: {
+                "calls": int(s["calls"]),
+                "errors": int(s["errors"]),
+                "avg_ms": round(s["total_ms"] / s["calls"], 1) if s["calls"] else 0.0,
+                "max_ms": round(s["max_ms"], 1),
+            }
+            for op, s in sorted(_stats.items())
+        }
+    return {"clients": _clients.stats(), "calls": calls}
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    _clients.clear()
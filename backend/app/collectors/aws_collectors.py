@@ -1,41 +1,23 @@
 """AWS collectors for evidence auto-collection.
 
-Each collector attempts real AWS API calls using boto3. If credentials are
-missing or the call fails, the collector falls back to mock data so that
-the application works without live AWS connectivity.
+Each collector attempts real AWS API calls using boto3 (through the pooled,
+off-event-loop clients in ``aws_client``). If credentials are missing or the
+call fails, the collector falls back to mock data so that the application
+works without live AWS connectivity.
 """
+import asyncio
+import csv
+import io
 import logging
 from datetime import datetime, timezone
 from typing import Any
 
+from app.collectors import aws_client
 from app.collectors.base import BaseCollector, register_collector
 
 logger = logging.getLogger(__name__)
 
 
-def _get_boto3_client(service: str, credentials: dict | None):
-    """Create a boto3 client from the supplied credentials dict.
-
-    Expected keys in *credentials*:
-      - aws_access_key_id
-      - aws_secret_access_key
-      - aws_region  (optional, defaults to us-east-1)
-      - aws_session_token  (optional)
-    """
-    import boto3  # boto3 is in pyproject.toml dependencies
-
-    if not credentials:
-        raise ValueError("No credentials provided")
-
-    return boto3.client(
-        service,
-        aws_access_key_id=credentials.get("aws_access_key_id"),
-        aws_secret_access_key=credentials.get("aws_secret_access_key"),
-        aws_session_token=credentials.get("aws_session_token"),
-        region_name=credentials.get("aws_region", "us-east-1"),
-    )
-
-
 # ---------------------------------------------------------------------------
 # IAM MFA Report
 # ---------------------------------------------------------------------------
@@ -44,25 +26,20 @@ def _get_boto3_client(service: str, credentials: dict | None):
 class AwsIamMfaReport(BaseCollector):
     async def collect(self, config: dict, credentials: dict | None = None) -> dict[str, Any]:
         try:
-            iam_client = _get_boto3_client("iam", credentials)
-
-            # Generate credential report if needed, then fetch it
-            import csv
-            import io
+            iam_client = await aws_client.get_client("iam", credentials)
 
             # generate_credential_report may need to be called first
-            iam_client.generate_credential_report()
+            await iam_client.call("generate_credential_report")
 
-            import asyncio
             # Wait briefly for report to be ready (AWS is async for this)
             for _ in range(5):
                 try:
-                    report_response = iam_client.get_credential_report()
+                    report_response = await iam_client.call("get_credential_report")
                     break
                 except iam_client.exceptions.CredentialReportNotReadyException:
                     await asyncio.sleep(1)
             else:
-                report_response = iam_client.get_credential_report()
+                report_response = await iam_client.call("get_credential_report")
 
             csv_content = report_response["Content"].decode("utf-8")
             reader = csv.DictReader(io.StringIO(csv_content))
@@ -123,20 +100,23 @@ class AwsIamMfaReport(BaseCollector):
 class AwsCloudTrailStatus(BaseCollector):
     async def collect(self, config: dict, credentials: dict | None = None) -> dict[str, Any]:
         try:
-            ct_client = _get_boto3_client("cloudtrail", credentials)
+            ct_client = await aws_client.get_client("cloudtrail", credentials)
 
-            response = ct_client.describe_trails()
+            response = await ct_client.call("describe_trails")
             trails_raw = response.get("trailList", [])
 
+            # Get every trail's status concurrently
+            statuses = await ct_client.fan_out("get_trail_status", [
+                {"Name": t.get("TrailARN", t.get("Name", "unknown"))} for t in trails_raw
+            ])
+
             trails = []
-            for t in trails_raw:
+            for t, status_resp in zip(trails_raw, statuses):
                 trail_name = t.get("Name", "unknown")
-                # Get trail status
-                try:
-                    status_resp = ct_client.get_trail_status(Name=t.get("TrailARN", trail_name))
-                    is_logging = status_resp.get("IsLogging", False)
-                except Exception:
+                if isinstance(status_resp, Exception):
                     is_logging = None
+                else:
+                    is_logging = status_resp.get("IsLogging", False)
 
                 trails.append({
                     "name": trail_name,
@@ -196,45 +176,40 @@ class AwsCloudTrailStatus(BaseCollector):
 class AwsEncryptionAtRest(BaseCollector):
     async def collect(self, config: dict, credentials: dict | None = None) -> dict[str, Any]:
         try:
-            kms_client = _get_boto3_client("kms", credentials)
+            kms_client = await aws_client.get_client("kms", credentials)
 
             # List KMS keys
-            paginator = kms_client.get_paginator("list_keys")
             all_keys = []
-            for page in paginator.paginate():
+            for page in await kms_client.paginate("list_keys"):
                 all_keys.extend(page.get("Keys", []))
 
             # Classify keys
             customer_keys = 0
             aws_managed_keys = 0
-            for key_meta in all_keys:
-                try:
-                    desc = kms_client.describe_key(KeyId=key_meta["KeyId"])
-                    manager = desc["KeyMetadata"].get("KeyManager", "")
-                    if manager == "CUSTOMER":
-                        customer_keys += 1
-                    else:
-                        aws_managed_keys += 1
-                except Exception:
+            descriptions = await kms_client.fan_out(
+                "describe_key", [{"KeyId": k["KeyId"]} for k in all_keys]
+            )
+            for desc in descriptions:
+                if isinstance(desc, Exception):
                     aws_managed_keys += 1  # count unknown as AWS-managed
+                elif desc["KeyMetadata"].get("KeyManager", "") == "CUSTOMER":
+                    customer_keys += 1
+                else:
+                    aws_managed_keys += 1
 
             total_keys = len(all_keys)
 
             # Also check S3 default encryption if possible
             s3_info = {"encrypted_buckets": 0, "total_buckets": 0, "compliant": True}
             try:
-                s3_client = _get_boto3_client("s3", credentials)
-                buckets = s3_client.list_buckets().get("Buckets", [])
+                s3_client = await aws_client.get_client("s3", credentials)
+                buckets = (await s3_client.call("list_buckets")).get("Buckets", [])
                 s3_info["total_buckets"] = len(buckets)
-                encrypted = 0
-                for bucket in buckets:
-                    try:
-                        s3_client.get_bucket_encryption(Bucket=bucket["Name"])
-                        encrypted += 1
-                    except s3_client.exceptions.ClientError:
-                        pass
-                    except Exception:
-                        pass
+                # A bucket without default encryption raises ClientError
+                results = await s3_client.fan_out(
+                    "get_bucket_encryption", [{"Bucket": b["Name"]} for b in buckets]
+                )
+                encrypted = sum(1 for r in results if not isinstance(r, Exception))
                 s3_info["encrypted_buckets"] = encrypted
                 s3_info["compliant"] = encrypted == len(buckets) if buckets else True
             except Exception:
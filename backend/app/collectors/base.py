@@ -27,3 +27,12 @@ class BaseCollector(ABC):
           - summary: human-readable summary
         """
         ...
+
+    async def persist(self, db, job, result: dict[str, Any]) -> dict[str, Any]:
+        """Move bulky parts of *result* out of the job before it is stored.
+
+        Called with the job's session after a successful ``collect``; the
+        returned dict becomes the job's ``result_data`` and the evidence
+        payload. The default keeps the result as is.
+        """
+        return result
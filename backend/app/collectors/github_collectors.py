@@ -1,15 +1,16 @@
 """GitHub collectors for evidence auto-collection.
 
-Each collector attempts real GitHub API calls using httpx. If credentials are
-missing or the call fails, the collector falls back to mock data so that
-the application works without live GitHub connectivity.
+Each collector attempts real GitHub API calls through the shared pooled
+client in ``http_client`` (ETag revalidation, pagination, rate-limit backoff),
+checking repositories concurrently. If credentials are missing or the call
+fails, the collector falls back to mock data so that the application works
+without live GitHub connectivity.
 """
 import logging
 from datetime import datetime, timezone
 from typing import Any
 
-import httpx
-
+from app.collectors import http_client
 from app.collectors.base import BaseCollector, register_collector
 
 logger = logging.getLogger(__name__)
@@ -54,52 +55,56 @@ class GitHubBranchProtection(BaseCollector):
             if not repos:
                 raise ValueError("No repositories configured for branch protection check")
 
-            results = []
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                for repo_cfg in repos:
-                    owner = repo_cfg.get("owner", "")
-                    repo = repo_cfg.get("repo", "")
-                    branch = repo_cfg.get("branch", "main")
+            async def check(repo_cfg: dict) -> dict | None:
+                owner = repo_cfg.get("owner", "")
+                repo = repo_cfg.get("repo", "")
+                branch = repo_cfg.get("branch", "main")
 
-                    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/branches/{branch}/protection"
-                    resp = await client.get(url, headers=headers)
+                url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/branches/{branch}/protection"
+                resp = await http_client.get_json("github", url, headers=headers)
 
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        pr_reviews = data.get("required_pull_request_reviews", {})
-                        results.append({
-                            "name": f"{owner}/{repo}",
-                            "default_branch": branch,
-                            "protection_enabled": True,
-                            "required_reviews": pr_reviews.get(
-                                "required_approving_review_count", 0
-                            ),
-                            "dismiss_stale_reviews": pr_reviews.get(
-                                "dismiss_stale_reviews", False
-                            ),
-                            "require_code_owner_reviews": pr_reviews.get(
-                                "require_code_owner_reviews", False
-                            ),
-                            "enforce_admins": data.get("enforce_admins", {}).get(
-                                "enabled", False
-                            ),
-                        })
-                    elif resp.status_code == 404:
-                        # No protection rules configured
-                        results.append({
-                            "name": f"{owner}/{repo}",
-                            "default_branch": branch,
-                            "protection_enabled": False,
-                            "required_reviews": 0,
-                            "dismiss_stale_reviews": False,
-                            "require_code_owner_reviews": False,
-                            "enforce_admins": False,
-                        })
-                    else:
-                        logger.warning(
-                            "GitHub branch protection API returned %d for %s/%s",
-                            resp.status_code, owner, repo,
-                        )
+                if resp.status_code == 200:
+                    data = resp.data
+                    pr_reviews = data.get("required_pull_request_reviews", {})
+                    return {
+                        "name": f"{owner}/{repo}",
+                        "default_branch": branch,
+                        "protection_enabled": True,
+                        "required_reviews": pr_reviews.get(
+                            "required_approving_review_count", 0
+                        ),
+                        "dismiss_stale_reviews": pr_reviews.get(
+                            "dismiss_stale_reviews", False
+                        ),
+                        "require_code_owner_reviews": pr_reviews.get(
+                            "require_code_owner_reviews", False
+                        ),
+                        "enforce_admins": data.get("enforce_admins", {}).get(
+                            "enabled", False
+                        ),
+                    }
+                if resp.status_code == 404:
+                    # No protection rules configured
+                    return {
+                        "name": f"{owner}/{repo}",
+                        "default_branch": branch,
+                        "protection_enabled": False,
+                        "required_reviews": 0,
+                        "dismiss_stale_reviews": False,
+                        "require_code_owner_reviews": False,
+                        "enforce_admins": False,
+                    }
+                logger.warning(
+                    "GitHub branch protection API returned %d for %s/%s",
+                    resp.status_code, owner, repo,
+                )
+                return None
+
+            checked = await http_client.fan_out(repos, check)
+            for outcome in checked:
+                if isinstance(outcome, Exception):
+                    raise outcome
+            results = [r for r in checked if r is not None]
 
             compliant_repos = sum(1 for r in results if r["protection_enabled"])
             logger.info(
@@ -173,50 +178,56 @@ class GitHubDependabotAlerts(BaseCollector):
             if not repos:
                 raise ValueError("No repositories configured for Dependabot check")
 
+            async def fetch(repo_cfg: dict) -> tuple[str, http_client.HttpResult]:
+                owner = repo_cfg.get("owner", "")
+                repo = repo_cfg.get("repo", "")
+                url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/dependabot/alerts"
+                params = {"state": "open", "per_page": 100}
+                return f"{owner}/{repo}", await http_client.get_paginated(
+                    "github", url, headers=headers, params=params
+                )
+
             all_alerts: list[dict] = []
             severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+            truncated: list[str] = []
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                for repo_cfg in repos:
-                    owner = repo_cfg.get("owner", "")
-                    repo = repo_cfg.get("repo", "")
-                    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/dependabot/alerts"
-                    params = {"state": "open", "per_page": 100}
-
-                    resp = await client.get(url, headers=headers, params=params)
-
-                    if resp.status_code == 200:
-                        alerts_data = resp.json()
-                        for alert in alerts_data:
-                            severity = (
-                                alert.get("security_vulnerability", {})
-                                .get("severity", "unknown")
-                                .lower()
-                            )
-                            pkg = (
-                                alert.get("security_vulnerability", {})
-                                .get("package", {})
-                                .get("name", "unknown")
-                            )
-                            all_alerts.append({
-                                "package": pkg,
-                                "severity": severity,
-                                "repository": f"{owner}/{repo}",
-                                "created_at": alert.get("created_at", ""),
-                                "state": alert.get("state", "open"),
-                            })
-                            if severity in severity_counts:
-                                severity_counts[severity] += 1
-                    elif resp.status_code == 403:
-                        logger.warning(
-                            "Dependabot alerts not enabled or insufficient permissions for %s/%s",
-                            owner, repo,
+            for outcome in await http_client.fan_out(repos, fetch):
+                if isinstance(outcome, Exception):
+                    raise outcome
+                full_name, resp = outcome
+                if resp.status_code == 200:
+                    if resp.truncated:
+                        truncated.append(full_name)
+                    for alert in resp.data:
+                        severity = (
+                            alert.get("security_vulnerability", {})
+                            .get("severity", "unknown")
+                            .lower()
                         )
-                    else:
-                        logger.warning(
-                            "GitHub Dependabot API returned %d for %s/%s",
-                            resp.status_code, owner, repo,
+                        pkg = (
+                            alert.get("security_vulnerability", {})
+                            .get("package", {})
+                            .get("name", "unknown")
                         )
+                        all_alerts.append({
+                            "package": pkg,
+                            "severity": severity,
+                            "repository": full_name,
+                            "created_at": alert.get("created_at", ""),
+                            "state": alert.get("state", "open"),
+                        })
+                        if severity in severity_counts:
+                            severity_counts[severity] += 1
+                elif resp.status_code == 403:
+                    logger.warning(
+                        "Dependabot alerts not enabled or insufficient permissions for %s",
+                        full_name,
+                    )
+                else:
+                    logger.warning(
+                        "GitHub Dependabot API returned %d for %s",
+                        resp.status_code, full_name,
+                    )
 
             logger.info(
                 "GitHub Dependabot alerts collected via live API (%d total alerts)",
@@ -230,6 +241,7 @@ class GitHubDependabotAlerts(BaseCollector):
                     "total_alerts": len(all_alerts),
                     **severity_counts,
                     "alerts": all_alerts[:50],  # limit payload
+                    "truncated_repositories": truncated,
                 },
             }
         except Exception as exc:
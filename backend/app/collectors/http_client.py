@@ -0,0 +1,217 @@
+"""Shared HTTP plumbing for the SaaS collectors (GitHub, Okta).
+
+- One pooled ``httpx.AsyncClient`` per provider, reused across collect
+  calls (HTTP/2 when ``h2`` is installed).
+- ``get_json`` makes conditional requests with cached ETags. A 304 is
+  served from the cache and does not count against GitHub's rate limit.
+- ``get_paginated`` follows ``Link: <...>; rel="next"`` headers.
+- Requests back off until the reset time when the provider reports that
+  the remaining rate-limit budget is nearly exhausted, and retry once the
+  window reopens after a 429/403 rate-limit response.
+- ``fan_out`` runs per-resource coroutines under a concurrency limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+import httpx
+
+from app.config import get_settings
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_clients: dict[str, httpx.AsyncClient] = {}
+_etags = LRUCache(maxsize=settings.COLLECTOR_ETAG_CACHE_SIZE)
+_rate_limits: dict[str, tuple[int, float]] = {}
+_stats = {"requests": 0, "not_modified": 0, "rate_limit_waits": 0, "retries": 0}
+
+
+@dataclass
+class HttpResult:
+    status_code: int
+    data: Any = None
+    headers: dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+    truncated: bool = False  # get_paginated stopped at COLLECTOR_MAX_PAGES
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """Return the shared client for provider *name*, creating it on first use."""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=settings.COLLECTOR_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.COLLECTOR_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+        _clients[name] = client
+    return client
+
+
+def _auth_key(name: str, headers: dict[str, str]) -> str:
+    """Scope cache and rate-limit state to the credential, never the raw token."""
+    token = headers.get("Authorization", "")
+    return f"{name}:{hashlib.sha256(token.encode()).hexdigest()[:16]}"
+
+
+def _rate_limit_headers(resp: httpx.Response) -> tuple[int, float] | None:
+    # GitHub: X-RateLimit-*, Okta: X-Rate-Limit-*; both report reset as epoch seconds
+    for prefix in ("X-RateLimit", "X-Rate-Limit"):
+        remaining = resp.headers.get(f"{prefix}-Remaining")
+        reset = resp.headers.get(f"{prefix}-Reset")
+        if remaining is not None and reset is not None:
+            try:
+                return int(remaining), float(reset)
+            except ValueError:
+                return None
+    return None
+
+
+async def _respect_rate_limit(key: str) -> None:
+    state = _rate_limits.get(key)
+    if state is None:
+        return
+    remaining, reset_at = state
+    if remaining > settings.COLLECTOR_RATE_LIMIT_MIN_REMAINING:
+        return
+    wait = reset_at - time.time()
+    if wait <= 0:
+        return
+    wait = min(wait, settings.COLLECTOR_RATE_LIMIT_MAX_WAIT_SECONDS)
+    _stats["rate_limit_waits"] += 1
+    logger.info("Rate limit nearly exhausted for %s, backing off %.1fs", key, wait)
+    await asyncio.sleep(wait)
+    _rate_limits.pop(key, None)
+
+
+def _is_rate_limited(resp: httpx.Response) -> bool:
+    if resp.status_code == 429:
+        return True
+    state = _rate_limit_headers(resp)
+    return resp.status_code == 403 and state is not None and state[0] == 0
+
+
+async def get_json(
+    name: str, url: str, *, headers: dict[str, str], params: dict | None = None
+) -> HttpResult:
+    """GET *url* with the shared client, ETag revalidation and rate-limit backoff.
+
+    Non-2xx responses are returned, not raised, so callers can keep their
+    per-status handling (e.g. 404 meaning "no branch protection").
+    """
+    client = get_client(name)
+    key = _auth_key(name, headers)
+    cache_key = (key, url, tuple(sorted((params or {}).items())))
+    cached = _etags.get(cache_key)
+
+    request_headers = dict(headers)
+    if cached is not None:
+        request_headers["If-None-Match"] = cached[0]
+
+    for attempt in range(settings.COLLECTOR_RATE_LIMIT_RETRIES + 1):
+        await _respect_rate_limit(key)
+        _stats["requests"] += 1
+        resp = await client.get(url, headers=request_headers, params=params)
+        state = _rate_limit_headers(resp)
+        if state is not None:
+            _rate_limits[key] = state
+        if not _is_rate_limited(resp) or attempt == settings.COLLECTOR_RATE_LIMIT_RETRIES:
+            break
+        _stats["retries"] += 1
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            await asyncio.sleep(
+                min(float(retry_after), settings.COLLECTOR_RATE_LIMIT_MAX_WAIT_SECONDS)
+            )
+        elif state is None:
+            await asyncio.sleep(1.0)
+
+    if resp.status_code == 304 and cached is not None:
+        _stats["not_modified"] += 1
+        _, data, cached_headers = cached
+        return HttpResult(200, data, cached_headers, from_cache=True)
+
+    result_headers = {k: v for k, v in resp.headers.items() if k.lower() == "link"}
+    data = resp.json() if resp.content and resp.status_code < 300 else None
+    etag = resp.headers.get("ETag")
+    if resp.status_code == 200 and etag:
+        _etags.set(cache_key, (etag, data, result_headers))
+    return HttpResult(resp.status_code, data, result_headers)
+
+
+def next_link(headers: dict[str, str]) -> str | None:
+    """Return the ``rel="next"`` URL from a ``Link`` header, if any."""
+    link_header = headers.get("link") or headers.get("Link") or ""
+    for part in link_header.split(","):
+        if 'rel="next"' in part:
+            return part.split(";")[0].strip().strip("<>")
+    return None
+
+
+async def get_paginated(
+    name: str, url: str, *, headers: dict[str, str], params: dict | None = None
+) -> HttpResult:
+    """Fetch every page of a list endpoint, concatenating the JSON arrays.
+
+    Stops at the first non-200 page and returns its status code, so a
+    403/404 on page one behaves like a single request would.
+    ``COLLECTOR_MAX_PAGES`` only guards against a runaway next link; a result
+    cut short by it is marked ``truncated``.
+    """
+    items: list = []
+    pages = 0
+    next_url: str | None = url
+    while next_url and pages < settings.COLLECTOR_MAX_PAGES:
+        result = await get_json(name, next_url, headers=headers, params=params)
+        if result.status_code != 200:
+            return HttpResult(result.status_code, items or None)
+        items.extend(result.data or [])
+        pages += 1
+        next_url = next_link(result.headers)
+        params = None  # the next link already carries the query string
+    if next_url:
+        logger.error("Stopped paginating %s after %d pages; result is truncated", url, pages)
+        return HttpResult(200, items, truncated=True)
+    return HttpResult(200, items)
+
+
+async def fan_out(
+    items: Iterable[T], fn: Callable[[T], Awaitable[Any]], limit: int | None = None
+) -> list[Any]:
+    """Run ``fn(item)`` for every item with at most *limit* in flight.
+
+    Results keep input order; exceptions are returned in place.
+    """
+    semaphore = asyncio.Semaphore(limit or settings.COLLECTOR_FAN_OUT_CONCURRENCY)
+
+    async def run(item: T) -> Any:
+        async with semaphore:
+            return await fn(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+
+def get_stats() -> dict:
+    return {**_stats, "http2": _HTTP2, "etag_cache": _etags.stats()}
+
+
+async def aclose_all() -> None:
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
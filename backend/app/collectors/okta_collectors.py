@@ -1,15 +1,16 @@
 """Okta collectors for evidence auto-collection.
 
-Each collector attempts real Okta API calls using httpx. If credentials are
-missing or the call fails, the collector falls back to mock data so that
-the application works without live Okta connectivity.
+Each collector attempts real Okta API calls through the shared pooled client
+in ``http_client`` (Link pagination, rate-limit backoff), fetching per-user
+factors concurrently. If credentials are missing or the call fails, the
+collector falls back to mock data so that the application works without live
+Okta connectivity.
 """
 import logging
 from datetime import datetime, timezone
 from typing import Any
 
-import httpx
-
+from app.collectors import http_client
 from app.collectors.base import BaseCollector, register_collector
 
 logger = logging.getLogger(__name__)
@@ -48,62 +49,48 @@ class OktaMfaEnrollment(BaseCollector):
         try:
             base_url, headers = _okta_headers(credentials)
 
-            # Fetch active users with pagination
-            all_users: list[dict] = []
-            url = f"{base_url}/api/v1/users"
-            params: dict[str, Any] = {
-                "filter": 'status eq "ACTIVE"',
-                "limit": 200,
-            }
-
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                while url:
-                    resp = await client.get(url, headers=headers, params=params)
-                    resp.raise_for_status()
-                    all_users.extend(resp.json())
-
-                    # Okta uses Link headers for pagination
-                    url = None
-                    params = {}  # params already in the link
-                    link_header = resp.headers.get("Link", "")
-                    for part in link_header.split(","):
-                        if 'rel="next"' in part:
-                            url = part.split(";")[0].strip().strip("<>")
-                            break
+            # Fetch active users with pagination (Okta uses Link headers)
+            users_resp = await http_client.get_paginated(
+                "okta",
+                f"{base_url}/api/v1/users",
+                headers=headers,
+                params={"filter": 'status eq "ACTIVE"', "limit": 200},
+            )
+            if users_resp.status_code != 200:
+                raise ValueError(f"Okta users API returned {users_resp.status_code}")
+            all_users: list[dict] = users_resp.data
 
             # For each user, fetch enrolled factors
+            async def fetch_factors(user: dict) -> list[dict]:
+                factors_url = f"{base_url}/api/v1/users/{user.get('id')}/factors"
+                factors_resp = await http_client.get_json("okta", factors_url, headers=headers)
+                return factors_resp.data if factors_resp.status_code == 200 else []
+
             mfa_enrolled = 0
             mfa_not_enrolled = 0
             factor_counts: dict[str, int] = {}
             non_enrolled_users: list[dict] = []
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                for user in all_users:
-                    user_id = user.get("id")
-                    email = user.get("profile", {}).get("email", "unknown")
-
-                    factors_url = f"{base_url}/api/v1/users/{user_id}/factors"
-                    try:
-                        factors_resp = await client.get(factors_url, headers=headers)
-                        factors_resp.raise_for_status()
-                        factors = factors_resp.json()
-                    except Exception:
-                        factors = []
-
-                    active_factors = [
-                        f for f in factors if f.get("status") == "ACTIVE"
-                    ]
-                    if active_factors:
-                        mfa_enrolled += 1
-                        for f in active_factors:
-                            provider = f.get("provider", "unknown").lower()
-                            factor_counts[provider] = factor_counts.get(provider, 0) + 1
-                    else:
-                        mfa_not_enrolled += 1
-                        non_enrolled_users.append({
-                            "email": email,
-                            "status": user.get("status", "ACTIVE"),
-                        })
+            all_factors = await http_client.fan_out(all_users, fetch_factors)
+            for user, factors in zip(all_users, all_factors):
+                if isinstance(factors, Exception):
+                    factors = []
+                email = user.get("profile", {}).get("email", "unknown")
+
+                active_factors = [
+                    f for f in factors if f.get("status") == "ACTIVE"
+                ]
+                if active_factors:
+                    mfa_enrolled += 1
+                    for f in active_factors:
+                        provider = f.get("provider", "unknown").lower()
+                        factor_counts[provider] = factor_counts.get(provider, 0) + 1
+                else:
+                    mfa_not_enrolled += 1
+                    non_enrolled_users.append({
+                        "email": email,
+                        "status": user.get("status", "ACTIVE"),
+                    })
 
             total_users = len(all_users)
             enrollment_rate = round(
@@ -125,6 +112,7 @@ class OktaMfaEnrollment(BaseCollector):
                     "enrollment_rate": enrollment_rate,
                     "mfa_factors": factor_counts,
                     "non_enrolled_users": non_enrolled_users[:20],  # limit payload
+                    "truncated": users_resp.truncated,
                 },
             }
         except Exception as exc:
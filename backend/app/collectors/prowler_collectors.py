@@ -2,143 +2,270 @@
 
 Each collector attempts to run the Prowler CLI tool. If Prowler is not
 installed or the scan fails, the collector falls back to mock data so that
-the application works without live cloud connectivity.
+the application works without live cloud connectivity. Live scans are sharded
+by account/region/service and run by ``prowler_orchestrator``. Findings are
+not kept in the job's ``result_data``: ``ProwlerCollector.persist`` merges the
+shard outputs into the ``prowler_findings`` table and keeps only summary
+statistics.
 """
-import asyncio
+import hashlib
 import json
 import logging
-import os
-import tempfile
+import shutil
 from datetime import datetime, timezone
+from collections.abc import Iterable, Iterator
+from itertools import groupby
 from typing import Any
 
+from app.collectors import prowler_orchestrator
 from app.collectors.base import BaseCollector, register_collector
-from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
-async def _run_prowler_scan(
-    cloud_provider: str,
-    credentials: dict | None,
-    scan_scope: dict | None = None,
-    output_dir: str | None = None,
-) -> list[dict]:
-    """Run the prowler CLI as an async subprocess and parse JSON output."""
-    settings = get_settings()
-    output_dir = output_dir or settings.PROWLER_OUTPUT_DIR
-    os.makedirs(output_dir, exist_ok=True)
-
-    cmd = ["prowler", cloud_provider, "-M", "json", "-o", output_dir, "-F", "prowler-output"]
-
-    if scan_scope:
-        if scan_scope.get("services"):
-            cmd.extend(["-s", ",".join(scan_scope["services"])])
-        if scan_scope.get("compliance_framework"):
-            cmd.extend(["--compliance", scan_scope["compliance_framework"]])
-
-    env = os.environ.copy()
-    if credentials:
-        if credentials.get("aws_access_key_id"):
-            env["AWS_ACCESS_KEY_ID"] = credentials["aws_access_key_id"]
-        if credentials.get("aws_secret_access_key"):
-            env["AWS_SECRET_ACCESS_KEY"] = credentials["aws_secret_access_key"]
-        if credentials.get("aws_session_token"):
-            env["AWS_SESSION_TOKEN"] = credentials["aws_session_token"]
-        if credentials.get("aws_region"):
-            env["AWS_DEFAULT_REGION"] = credentials["aws_region"]
-
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        env=env,
-    )
-    _, stderr = await asyncio.wait_for(
-        proc.communicate(), timeout=settings.PROWLER_TIMEOUT_SECONDS
-    )
-
-    if proc.returncode not in (0, 3):  # 3 = findings found (non-zero but expected)
-        raise RuntimeError(f"Prowler exited with code {proc.returncode}: {stderr.decode()[:500]}")
-
-    output_file = os.path.join(output_dir, "prowler-output.json")
-    if not os.path.exists(output_file):
-        raise FileNotFoundError(f"Prowler output not found at {output_file}")
-
-    with open(output_file) as f:
-        return json.load(f)
-
-
-def _normalize_findings(raw_findings: list[dict]) -> list[dict]:
-    """Normalize Prowler JSON output keys to a consistent format."""
-    normalized = []
-    for finding in raw_findings:
-        normalized.append({
-            "check_id": finding.get("CheckID") or finding.get("check_id", ""),
-            "check_title": finding.get("CheckTitle") or finding.get("check_title", ""),
-            "status": finding.get("Status") or finding.get("status", ""),
-            "severity": finding.get("Severity") or finding.get("severity", ""),
-            "service": finding.get("ServiceName") or finding.get("service", ""),
-            "region": finding.get("Region") or finding.get("region", ""),
-            "resource_id": finding.get("ResourceId") or finding.get("resource_id", ""),
-            "resource_arn": finding.get("ResourceArn") or finding.get("resource_arn", ""),
-            "status_extended": finding.get("StatusExtended") or finding.get("status_extended", ""),
-            "risk": finding.get("Risk") or finding.get("risk", ""),
-            "remediation": finding.get("Remediation", {}).get("Recommendation", {}).get("Text", "")
-            if isinstance(finding.get("Remediation"), dict)
-            else finding.get("remediation", ""),
-            "compliance": finding.get("Compliance", {}) if isinstance(finding.get("Compliance"), dict) else {},
-        })
-    return normalized
-
-
-def _compute_summary_stats(findings: list[dict]) -> dict:
-    """Aggregate summary statistics from normalized findings."""
-    total = len(findings)
-    passed = sum(1 for f in findings if f["status"].upper() == "PASS")
-    failed = sum(1 for f in findings if f["status"].upper() == "FAIL")
-    pass_rate = round((passed / total * 100), 1) if total > 0 else 0.0
+def iter_json_objects(path: str, chunk_size: int = 1 << 20) -> Iterator[dict]:
+    """Yield the objects of a JSON array or NDJSON file without loading it whole.
+
+    Reads *chunk_size* characters at a time and decodes one object at a
+    time with ``raw_decode``, so memory stays bounded by the largest single
+    finding rather than the file.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    with open(path, encoding="utf-8") as f:
+        while True:
+            # Skip whitespace, the array brackets and separators between objects
+            while pos < len(buf) and buf[pos] in " \t\r\n,[]":
+                pos += 1
+            if pos >= len(buf):
+                if eof:
+                    return
+                buf, pos = f.read(chunk_size), 0
+                eof = not buf
+                continue
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more = f.read(chunk_size)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+            pos = end
+            if isinstance(obj, dict):
+                yield obj
+
+
+def _first(finding: dict, *paths: str) -> Any:
+    """Return the first non-empty value among dotted *paths* in *finding*."""
+    for path in paths:
+        value: Any = finding
+        for part in path.split("."):
+            if isinstance(value, list):
+                value = value[0] if value else None
+            if not isinstance(value, dict):
+                value = None
+                break
+            value = value.get(part)
+        if value not in (None, ""):
+            return value
+    return ""
 
-    by_severity: dict[str, int] = {}
-    by_service: dict[str, int] = {}
-    for f in findings:
-        sev = f.get("severity", "unknown").lower()
-        svc = f.get("service", "unknown")
-        if f["status"].upper() == "FAIL":
-            by_severity[sev] = by_severity.get(sev, 0) + 1
-            by_service[svc] = by_service.get(svc, 0) + 1
 
+def _normalize_finding(finding: dict) -> dict:
+    """Normalize one Prowler finding (v3 JSON, OCSF or already normalized)."""
+    remediation = finding.get("Remediation")
+    if isinstance(remediation, dict):
+        remediation_text = remediation.get("Recommendation", {}).get("Text", "")
+    else:
+        remediation_text = _first(finding, "remediation.desc", "remediation")
+    compliance = finding.get("Compliance")
+    if not isinstance(compliance, dict):
+        compliance = _first(finding, "unmapped.compliance", "compliance") or {}
     return {
-        "total": total,
-        "passed": passed,
-        "failed": failed,
-        "pass_rate": pass_rate,
-        "by_severity": by_severity,
-        "by_service": by_service,
+        "account_id": str(_first(finding, "AccountId", "cloud.account.uid", "account_id")),
+        "check_id": _first(finding, "CheckID", "metadata.event_code", "check_id"),
+        "check_title": _first(finding, "CheckTitle", "finding_info.title", "check_title"),
+        "status": str(_first(finding, "Status", "status_code", "status")).upper(),
+        "severity": str(_first(finding, "Severity", "severity")).lower(),
+        "service": _first(finding, "ServiceName", "resources.group.name", "service"),
+        "region": _first(finding, "Region", "cloud.region", "resources.region", "region"),
+        "resource_id": _first(finding, "ResourceId", "resources.name", "resource_id"),
+        "resource_arn": _first(finding, "ResourceArn", "resources.uid", "resource_arn"),
+        "status_extended": _first(finding, "StatusExtended", "status_detail", "status_extended"),
+        "risk": _first(finding, "Risk", "risk_details", "risk"),
+        "remediation": remediation_text if isinstance(remediation_text, str) else "",
+        "compliance": compliance if isinstance(compliance, dict) else {},
     }
 
 
+def _arn_account(arn: str) -> str:
+    """The account field of an ARN (empty for e.g. S3 bucket ARNs)."""
+    parts = arn.split(":", 5)
+    return parts[4] if len(parts) > 5 else ""
+
+
+def finding_fingerprint(finding: dict) -> str:
+    """Identify a normalized finding across scans: account, check, resource and region.
+
+    The resource is its ARN, or its ID for account-level checks that have
+    no ARN (e.g. the password policy), so without the account such findings
+    of different accounts in one scan would collide. The account comes from
+    the finding, else from the ARN.
+    """
+    account = finding.get("account_id") or _arn_account(finding["resource_arn"])
+    key = "\0".join((
+        account, finding["check_id"], finding["resource_arn"] or finding["resource_id"],
+        finding["region"],
+    ))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class SummaryStats:
+    """Incrementally aggregate summary statistics over normalized findings."""
+
+    def __init__(self):
+        self.total = 0
+        self.passed = 0
+        self.failed = 0
+        self.by_severity: dict[str, int] = {}
+        self.by_service: dict[str, int] = {}
+        self.services: dict[str, dict[str, int]] = {}
+        self.frameworks: dict[str, dict[str, int]] = {}
+
+    def add(self, f: dict) -> None:
+        status = f["status"].upper()
+        is_pass = status == "PASS"
+        svc = f.get("service") or "unknown"
+        self.total += 1
+        self.passed += is_pass
+        if status == "FAIL":
+            self.failed += 1
+            sev = (f.get("severity") or "unknown").lower()
+            self.by_severity[sev] = self.by_severity.get(sev, 0) + 1
+            self.by_service[svc] = self.by_service.get(svc, 0) + 1
+        # Posture counts every non-PASS result against the service/framework
+        counts = self.services.setdefault(svc, {"total": 0, "passed": 0})
+        counts["total"] += 1
+        counts["passed"] += is_pass
+        for fw in f.get("compliance") or {}:
+            counts = self.frameworks.setdefault(fw, {"total": 0, "passed": 0})
+            counts["total"] += 1
+            counts["passed"] += is_pass
+
+    def as_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "passed": self.passed,
+            "failed": self.failed,
+            "pass_rate": round((self.passed / self.total * 100), 1) if self.total > 0 else 0.0,
+            "by_severity": self.by_severity,
+            "by_service": self.by_service,
+            "services": self.services,
+            "frameworks": self.frameworks,
+        }
+
+
+def _compute_summary_stats(findings: Iterable[dict]) -> dict:
+    """Aggregate summary statistics from normalized findings."""
+    stats = SummaryStats()
+    for f in findings:
+        stats.add(f)
+    return stats.as_dict()
+
+
+def _merge_shard_findings(shards: list[dict]) -> Iterator[dict]:
+    """Yield the normalized findings of every shard output, once each.
+
+    Global services (IAM, CloudTrail) are reported by every regional shard
+    of an account, so findings are de-duplicated per account on their
+    fingerprint. Shards are merged one account at a time and the set of
+    seen fingerprints is reset in between, so it grows with the findings of
+    the largest account (~100 bytes each), not with the whole scan.
+    """
+    for _, account_shards in groupby(
+        sorted(shards, key=lambda s: s["account_id"]), key=lambda s: s["account_id"]
+    ):
+        seen: set[str] = set()
+        for shard in account_shards:
+            for raw in iter_json_objects(shard["findings_path"]):
+                finding = _normalize_finding(raw)
+                fingerprint = finding_fingerprint(finding)
+                if fingerprint not in seen:
+                    seen.add(fingerprint)
+                    yield finding
+
+
+class ProwlerCollector(BaseCollector):
+    """Shared scan and ``persist`` logic for the Prowler collectors.
+
+    ``collect`` returns either ``shard_outputs`` (a live scan's per-shard
+    output files) or an in-memory ``findings`` list (mock data). ``persist``
+    streams them into ``prowler_findings``, diffs the failing findings against
+    the previous scan, removes the shard directories and leaves only summary
+    stats, diff counts and per-shard status in the result.
+    """
+
+    async def _scan(self, config: dict, credentials: dict | None, scan_scope: dict | None = None) -> dict:
+        shards = prowler_orchestrator.plan_shards(config, credentials, scan_scope)
+        results = await prowler_orchestrator.run_shards(
+            "aws", shards, timeout=config.get("shard_timeout_seconds")
+        )
+        return {
+            "shards": [r.describe() for r in results],
+            "shard_outputs": [
+                {"account_id": r.shard.account_id, "findings_path": r.findings_path, "output_dir": r.output_dir}
+                for r in results
+            ],
+        }
+
+    async def persist(self, db, job, result: dict) -> dict:
+        from app.services.prowler_service import ingest_findings, record_diff, start_diff
+
+        data = result.get("data", {})
+        outputs = data.pop("shard_outputs", None)
+        try:
+            if outputs is not None:
+                raw = _merge_shard_findings([o for o in outputs if o["findings_path"]])
+            else:
+                raw = (_normalize_finding(f) for f in data.pop("findings", []))
+            diff = await start_diff(db, job)
+            stats = await ingest_findings(db, job, raw, diff)
+        finally:
+            for output in outputs or []:
+                shutil.rmtree(output["output_dir"], ignore_errors=True)
+        data["summary_stats"] = stats
+        data["diff"] = await record_diff(db, job, diff)
+        if outputs is not None:
+            summary = f"{result['summary']}: {stats['total']} checks, {stats['pass_rate']}% pass rate"
+            failed = sum(1 for s in data.get("shards", []) if s["status"] != "completed")
+            if failed:
+                summary += f" ({failed} of {len(outputs)} shards failed)"
+            result["summary"] = summary
+        return result
+
+
 # ---------------------------------------------------------------------------
 # Full AWS Scan
 # ---------------------------------------------------------------------------
 
 @register_collector("prowler_aws_full_scan")
-class ProwlerAwsFullScan(BaseCollector):
+class ProwlerAwsFullScan(ProwlerCollector):
     async def collect(self, config: dict, credentials: dict | None = None) -> dict[str, Any]:
         try:
-            raw = await _run_prowler_scan("aws", credentials)
-            findings = _normalize_findings(raw)
-            summary = _compute_summary_stats(findings)
-            logger.info("Prowler full AWS scan completed (%d findings)", len(findings))
+            scan = await self._scan(config, credentials)
+            logger.info("Prowler full AWS scan completed (%d shards)", len(scan["shards"]))
             return {
                 "status": "success",
-                "summary": f"Prowler full AWS scan: {summary['total']} checks, {summary['pass_rate']}% pass rate",
+                "summary": "Prowler full AWS scan",
                 "data": {
                     "collected_at": datetime.now(timezone.utc).isoformat(),
                     "scan_type": "full",
                     "cloud_provider": "aws",
-                    "findings": findings,
-                    "summary_stats": summary,
+                    **scan,
                 },
             }
         except Exception as exc:
@@ -183,24 +310,21 @@ class ProwlerAwsFullScan(BaseCollector):
 # ---------------------------------------------------------------------------
 
 @register_collector("prowler_aws_service_scan")
-class ProwlerAwsServiceScan(BaseCollector):
+class ProwlerAwsServiceScan(ProwlerCollector):
     async def collect(self, config: dict, credentials: dict | None = None) -> dict[str, Any]:
         services = config.get("services", ["iam", "s3"])
         try:
-            raw = await _run_prowler_scan("aws", credentials, scan_scope={"services": services})
-            findings = _normalize_findings(raw)
-            summary = _compute_summary_stats(findings)
-            logger.info("Prowler service scan (%s) completed (%d findings)", services, len(findings))
+            scan = await self._scan(config, credentials, scan_scope={"services": services})
+            logger.info("Prowler service scan (%s) completed (%d shards)", services, len(scan["shards"]))
             return {
                 "status": "success",
-                "summary": f"Prowler service scan ({', '.join(services)}): {summary['total']} checks, {summary['pass_rate']}% pass rate",
+                "summary": f"Prowler service scan ({', '.join(services)})",
                 "data": {
                     "collected_at": datetime.now(timezone.utc).isoformat(),
                     "scan_type": "service",
                     "cloud_provider": "aws",
                     "services_scanned": services,
-                    "findings": findings,
-                    "summary_stats": summary,
+                    **scan,
                 },
             }
         except Exception as exc:
@@ -240,24 +364,23 @@ class ProwlerAwsServiceScan(BaseCollector):
 # ---------------------------------------------------------------------------
 
 @register_collector("prowler_aws_compliance_scan")
-class ProwlerAwsComplianceScan(BaseCollector):
+class ProwlerAwsComplianceScan(ProwlerCollector):
     async def collect(self, config: dict, credentials: dict | None = None) -> dict[str, Any]:
         framework = config.get("compliance_framework", "cis_1.5_aws")
         try:
-            raw = await _run_prowler_scan("aws", credentials, scan_scope={"compliance_framework": framework})
-            findings = _normalize_findings(raw)
-            summary = _compute_summary_stats(findings)
-            logger.info("Prowler compliance scan (%s) completed (%d findings)", framework, len(findings))
+            scan = await self._scan(
+                config, credentials, scan_scope={"compliance_framework": framework}
+            )
+            logger.info("Prowler compliance scan (%s) completed (%d shards)", framework, len(scan["shards"]))
             return {
                 "status": "success",
-                "summary": f"Prowler compliance scan ({framework}): {summary['total']} checks, {summary['pass_rate']}% pass rate",
+                "summary": f"Prowler compliance scan ({framework})",
                 "data": {
                     "collected_at": datetime.now(timezone.utc).isoformat(),
                     "scan_type": "compliance",
                     "cloud_provider": "aws",
                     "compliance_framework": framework,
-                    "findings": findings,
-                    "summary_stats": summary,
+                    **scan,
                 },
             }
         except Exception as exc:
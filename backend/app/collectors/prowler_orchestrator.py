@@ -0,0 +1,290 @@
+"""Sharded Prowler scans.
+
+A logical scan is split into shards by account, region and (optionally)
+service, and each shard runs as its own Prowler subprocess writing into a
+private temp directory under ``PROWLER_OUTPUT_DIR``. Shards from every scan
+in the process share one pool of slots sized from the CPU count and the
+memory a Prowler process needs, so concurrent scans neither clobber each
+other's output nor oversubscribe the host.
+
+Each shard has its own timeout. A failed or timed-out shard is reported in
+the scan result instead of failing the whole scan; cancelling the scan kills
+every running subprocess and removes the shard directories.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_slots: tuple[asyncio.AbstractEventLoop, asyncio.Semaphore] | None = None
+_slot_count = 0
+_stats = {
+    "shards_started": 0,
+    "shards_completed": 0,
+    "shards_failed": 0,
+    "shards_timed_out": 0,
+    "running": 0,
+}
+
+
+@dataclass
+class ScanShard:
+    account_id: str
+    region: str | None = None
+    services: list[str] = field(default_factory=list)
+    compliance_framework: str | None = None
+    credentials: dict | None = None
+    role_arn: str | None = None
+
+    def describe(self) -> dict:
+        return {
+            "account_id": self.account_id,
+            "region": self.region or "all",
+            "services": self.services,
+        }
+
+
+@dataclass
+class ShardResult:
+    shard: ScanShard
+    output_dir: str
+    findings_path: str | None = None
+    status: str = "completed"
+    error: str | None = None
+    duration_seconds: float = 0.0
+
+    def describe(self) -> dict:
+        return {
+            **self.shard.describe(),
+            "status": self.status,
+            "error": self.error,
+            "duration_seconds": self.duration_seconds,
+        }
+
+
+def plan_shards(
+    config: dict, credentials: dict | None, scan_scope: dict | None = None
+) -> list[ScanShard]:
+    """Split a scan into one shard per account x region (x service).
+
+    ``config["accounts"]`` lists ``{"account_id", "role_arn"?, ...credential
+    keys}`` entries; account-level keys override the integration credentials.
+    Without it the integration credentials form a single account. Regions
+    come from ``config["regions"]`` (default: one all-region shard) and
+    services are split one per shard only when ``config["shard_by_service"]``
+    is set.
+    """
+    scan_scope = scan_scope or {}
+    base = dict(credentials or {})
+    accounts = config.get("accounts") or [{"account_id": base.get("aws_account_id") or "default"}]
+    regions = config.get("regions") or [None]
+    services = list(scan_scope.get("services") or [])
+    if services and config.get("shard_by_service"):
+        service_groups = [[s] for s in services]
+    else:
+        service_groups = [services]
+
+    shards = []
+    for account in accounts:
+        account = dict(account)
+        account_id = str(account.pop("account_id", None) or "default")
+        role_arn = account.pop("role_arn", None)
+        shard_credentials = {**base, **account} or None
+        for region in regions:
+            for group in service_groups:
+                shards.append(ScanShard(
+                    account_id=account_id,
+                    region=region,
+                    services=group,
+                    compliance_framework=scan_scope.get("compliance_framework"),
+                    credentials=shard_credentials,
+                    role_arn=role_arn,
+                ))
+    return shards
+
+
+def _available_memory_mb() -> int | None:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def max_concurrent_shards() -> int:
+    """Shard slots: the configured cap, bounded by CPUs and available memory."""
+    settings = get_settings()
+    limit = min(settings.PROWLER_MAX_CONCURRENT_SHARDS, os.cpu_count() or 1)
+    memory = _available_memory_mb()
+    if memory is not None and settings.PROWLER_SHARD_MEMORY_MB > 0:
+        limit = min(limit, memory // settings.PROWLER_SHARD_MEMORY_MB)
+    return max(1, limit)
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots, _slot_count
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots[0] is not loop:
+        _slot_count = max_concurrent_shards()
+        _slots = (loop, asyncio.Semaphore(_slot_count))
+    return _slots[1]
+
+
+async def _run_prowler_scan(
+    cloud_provider: str,
+    credentials: dict | None,
+    scan_scope: dict | None = None,
+    output_dir: str | None = None,
+    timeout: float | None = None,
+) -> str:
+    """Run the prowler CLI as an async subprocess and return its JSON output path.
+
+    The subprocess is killed if the timeout expires or the caller is
+    cancelled. The output is not loaded here; ``persist`` streams it into
+    the ``prowler_findings`` table.
+    """
+    settings = get_settings()
+    output_dir = output_dir or settings.PROWLER_OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+
+    cmd = ["prowler", cloud_provider, "-M", "json", "-o", output_dir, "-F", "prowler-output"]
+
+    if scan_scope:
+        if scan_scope.get("services"):
+            cmd.extend(["-s", ",".join(scan_scope["services"])])
+        if scan_scope.get("compliance_framework"):
+            cmd.extend(["--compliance", scan_scope["compliance_framework"]])
+        if scan_scope.get("region"):
+            cmd.extend(["-f", scan_scope["region"]])
+        if scan_scope.get("role_arn"):
+            cmd.extend(["-R", scan_scope["role_arn"]])
+
+    env = os.environ.copy()
+    if credentials:
+        if credentials.get("aws_access_key_id"):
+            env["AWS_ACCESS_KEY_ID"] = credentials["aws_access_key_id"]
+        if credentials.get("aws_secret_access_key"):
+            env["AWS_SECRET_ACCESS_KEY"] = credentials["aws_secret_access_key"]
+        if credentials.get("aws_session_token"):
+            env["AWS_SESSION_TOKEN"] = credentials["aws_session_token"]
+        if credentials.get("aws_region"):
+            env["AWS_DEFAULT_REGION"] = credentials["aws_region"]
+
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+    )
+    try:
+        _, stderr = await asyncio.wait_for(
+            proc.communicate(), timeout=timeout or settings.PROWLER_TIMEOUT_SECONDS
+        )
+    except BaseException:  # timeout or cancellation: don't leave prowler running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+
+    if proc.returncode not in (0, 3):  # 3 = findings found (non-zero but expected)
+        raise RuntimeError(f"Prowler exited with code {proc.returncode}: {stderr.decode()[:500]}")
+
+    # Prowler v3 writes .json; v4 writes OCSF as .ocsf.json
+    for name in ("prowler-output.json", "prowler-output.ocsf.json"):
+        output_file = os.path.join(output_dir, name)
+        if os.path.exists(output_file):
+            return output_file
+    raise FileNotFoundError(f"Prowler output not found in {output_dir}")
+
+
+async def _run_shard(cloud_provider: str, shard: ScanShard, timeout: float) -> ShardResult:
+    settings = get_settings()
+    scope = {
+        "services": shard.services,
+        "compliance_framework": shard.compliance_framework,
+        "region": shard.region,
+        "role_arn": shard.role_arn,
+    }
+    async with _get_slots():
+        os.makedirs(settings.PROWLER_OUTPUT_DIR, exist_ok=True)
+        output_dir = tempfile.mkdtemp(prefix="shard-", dir=settings.PROWLER_OUTPUT_DIR)
+        result = ShardResult(shard=shard, output_dir=output_dir)
+        _stats["shards_started"] += 1
+        _stats["running"] += 1
+        started = time.monotonic()
+        try:
+            result.findings_path = await _run_prowler_scan(
+                cloud_provider, shard.credentials, scope,
+                output_dir=result.output_dir, timeout=timeout,
+            )
+            _stats["shards_completed"] += 1
+        except asyncio.TimeoutError:
+            result.status, result.error = "timeout", f"Shard exceeded {timeout:g}s"
+            _stats["shards_timed_out"] += 1
+        except asyncio.CancelledError:
+            shutil.rmtree(result.output_dir, ignore_errors=True)
+            raise
+        except Exception as exc:
+            result.status, result.error = "failed", str(exc)[:500]
+            _stats["shards_failed"] += 1
+        finally:
+            _stats["running"] -= 1
+            result.duration_seconds = round(time.monotonic() - started, 1)
+    if result.findings_path is None:
+        logger.warning("Prowler shard %s %s: %s", shard.describe(), result.status, result.error)
+    return result
+
+
+async def run_shards(
+    cloud_provider: str, shards: list[ScanShard], timeout: float | None = None
+) -> list[ShardResult]:
+    """Run *shards* concurrently and return their results in input order.
+
+    Raises ``RuntimeError`` when no shard produced output. Cancelling the
+    caller cancels (and kills) every shard and removes all shard directories.
+    """
+    timeout = timeout or get_settings().PROWLER_TIMEOUT_SECONDS
+    tasks = [asyncio.ensure_future(_run_shard(cloud_provider, s, timeout)) for s in shards]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        # Cancelled shards remove their own directories; finished ones don't
+        done = await asyncio.gather(*tasks, return_exceptions=True)
+        cleanup([r for r in done if isinstance(r, ShardResult)])
+        raise
+
+    if not any(r.findings_path for r in results):
+        cleanup(results)
+        errors = "; ".join(
+            f"{r.shard.account_id}/{r.shard.region or 'all'}: {r.error}" for r in results
+        )
+        raise RuntimeError(f"All {len(results)} Prowler shards failed: {errors}")
+    return results
+
+
+def cleanup(results: list[ShardResult]) -> None:
+    """Remove the shard output directories."""
+    for result in results:
+        shutil.rmtree(result.output_dir, ignore_errors=True)
+
+
+def get_stats() -> dict:
+    return {**_stats, "slots": _slot_count or max_concurrent_shards()}
@@ -32,9 +32,107 @@ class Settings(BaseSettings):
     LITELLM_MODEL: str = "gpt-4o-mini"
     OPENAI_API_KEY: str = ""
 
-    # Prowler
+    # Agent job queue — "embedded" runs a worker inside each API process,
+    # "external" leaves execution to `python -m app.worker`
+    AGENT_QUEUE_MODE: str = "embedded"
+    AGENT_WORKER_CONCURRENCY: int = 4
+    AGENT_QUEUE_GLOBAL_CONCURRENCY: int = 16
+    AGENT_QUEUE_PER_ORG_CONCURRENCY: int = 2
+    AGENT_QUEUE_LEASE_SECONDS: int = 120
+    AGENT_QUEUE_POLL_SECONDS: float = 2.0
+    AGENT_QUEUE_MAX_ATTEMPTS: int = 3
+
+    # Scheduler — "elected" runs the monitoring scheduler in whichever process
+    # holds the leader lock (Redis, else Postgres advisory lock, else a local
+    # file); "disabled" never schedules in this process. The job store defaults
+    # to the app database through its sync driver, psycopg on Postgres
+    # ("memory" to opt out).
+    SCHEDULER_MODE: str = "elected"
+    SCHEDULER_LOCK_BACKEND: str = "auto"  # auto, redis, postgres, file
+    SCHEDULER_LOCK_TTL_SECONDS: float = 30.0
+    SCHEDULER_LOCK_RENEW_SECONDS: float = 10.0
+    SCHEDULER_LOCK_FILE: str = ""
+    SCHEDULER_JOBSTORE_URL: str = ""
+    SCHEDULER_JITTER_SECONDS: int = 300
+    SCHEDULER_MAX_CONCURRENT_JOBS: int = 4
+
+    # Auth — verified token claims are cached by token hash until exp (capped
+    # by the TTL); the JWKS is refetched after its TTL, or on an unknown kid at
+    # most once per min-refresh interval
+    AUTH_TOKEN_CACHE_SIZE: int = 4096
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 300
+    AUTH_JWKS_TTL_SECONDS: int = 3600
+    AUTH_JWKS_MIN_REFRESH_SECONDS: int = 30
+    # Resolved users (keycloak_id -> id, org, role, active) are cached in
+    # process and, when available, in Redis; invalidated on user updates
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 4096
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    AUTH_PRINCIPAL_REDIS: bool = True
+
+    # Audit log — "transactional" writes entries in the caller's transaction;
+    # "buffered" (opt-in) writes them behind the request in bulk inserts (every
+    # FLUSH_INTERVAL_MS or BATCH_SIZE entries) and loses queued entries on a
+    # crash. Entries older than AUDIT_LOG_HOT_DAYS are moved to
+    # audit_logs_archive daily (0 = keep everything hot). A buffered entry that
+    # fails to insert on its own MAX_ATTEMPTS times goes to the dead-letter log.
+    AUDIT_LOG_MODE: str = "transactional"
+    AUDIT_LOG_BATCH_SIZE: int = 500
+    AUDIT_LOG_FLUSH_INTERVAL_MS: int = 200
+    AUDIT_LOG_MAX_PENDING: int = 10000
+    AUDIT_LOG_MAX_ATTEMPTS: int = 3
+    AUDIT_LOG_HOT_DAYS: int = 90
+    AUDIT_LOG_ARCHIVE_BATCH_SIZE: int = 5000
+
+    # List endpoints — count=estimate counts exactly up to this many rows
+    PAGINATION_COUNT_CAP: int = 10000
+
+    # Framework/template catalog — each process holds a snapshot and checks the
+    # shared version (bumped on framework changes) at most this often
+    CATALOG_VERSION_CHECK_SECONDS: float = 5.0
+
+    # Embeddings
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_INFERENCE_WORKERS: int = 1
+    EMBEDDING_INDEX_CHUNK_SIZE: int = 1000
+    EMBEDDING_INDEX_MAX_MB: int = 512  # in-process indexes of all orgs (non-Postgres)
+    EMBEDDING_HNSW_EF_SEARCH: int = 100
+    EMBEDDING_WARMUP_ON_STARTUP: bool = False
+    EMBEDDING_QUERY_CACHE_SIZE: int = 1024
+    EMBEDDING_QUERY_CACHE_TTL_SECONDS: int = 3600
+
+    # Evidence collection — global and per-provider concurrency for batch runs,
+    # plus a minimum spacing between collector starts against the same provider.
+    # Unfinished jobs older than the stale age are failed at startup; keep it
+    # above the longest collection (a full Prowler scan).
+    COLLECTION_CONCURRENCY: int = 8
+    COLLECTION_PROVIDER_CONCURRENCY: dict[str, int] = {"aws": 4, "github": 2, "okta": 2, "prowler": 1}
+    COLLECTION_PROVIDER_MIN_INTERVAL_SECONDS: dict[str, float] = {"github": 0.5, "okta": 0.5}
+    COLLECTION_STALE_JOB_SECONDS: int = 12 * 3600
+
+    # AWS collectors — boto3 calls run in this many worker threads; clients are
+    # cached per credentials/region/service (TTL bounds stale session tokens)
+    AWS_CLIENT_MAX_WORKERS: int = 16
+    AWS_CLIENT_CACHE_SIZE: int = 64
+    AWS_CLIENT_CACHE_TTL_SECONDS: int = 900
+
+    # GitHub/Okta collectors — shared HTTP client, ETag cache and rate-limit backoff
+    COLLECTOR_HTTP_MAX_CONNECTIONS: int = 20
+    COLLECTOR_FAN_OUT_CONCURRENCY: int = 8
+    COLLECTOR_MAX_PAGES: int = 2000  # runaway guard; hitting it marks evidence truncated
+    COLLECTOR_ETAG_CACHE_SIZE: int = 2048
+    COLLECTOR_RATE_LIMIT_MIN_REMAINING: int = 5
+    COLLECTOR_RATE_LIMIT_MAX_WAIT_SECONDS: float = 60.0
+    COLLECTOR_RATE_LIMIT_RETRIES: int = 2
+
+    # Prowler — scans are sharded by account/region/service; each shard gets a
+    # private dir under PROWLER_OUTPUT_DIR and its own timeout. Concurrent
+    # shards are capped by this limit, the CPU count and available memory.
     PROWLER_OUTPUT_DIR: str = "/tmp/prowler-output"
     PROWLER_TIMEOUT_SECONDS: int = 3600
+    PROWLER_MAX_CONCURRENT_SHARDS: int = 4
+    PROWLER_SHARD_MEMORY_MB: int = 1024
+    PROWLER_INGEST_BATCH_SIZE: int = 1000
 
     # SMTP email
     SMTP_HOST: str = ""
@@ -35,10 +35,14 @@ async def log_audit(
     """Fire-and-forget audit log entry.
 
     Does not raise — errors are logged and swallowed so that audit
-    logging failures never break business logic.
+    logging failures never break business logic. Routes call this after the
+    service has committed, so in ``transactional`` mode the entry is
+    committed here.
     """
     import logging
 
+    from app.config import get_settings
+
     try:
         await log_action(
             db=db,
@@ -51,6 +55,8 @@ async def log_audit(
             changes=changes,
             ip_address=ip_address,
         )
+        if get_settings().AUDIT_LOG_MODE == "transactional":
+            await db.commit()
     except Exception as exc:
         logging.getLogger(__name__).warning(
             "Failed to write audit log for %s %s: %s", action, entity_type, exc
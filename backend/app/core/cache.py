@@ -3,12 +3,18 @@
 When the Redis server is unreachable every public function silently
 becomes a no-op so callers never need to guard against ``None`` or
 exceptions from the cache layer.
+
+Also provides ``LRUCache``, a bounded in-process cache with per-entry TTL
+and hit/miss counters, for hot values that should not cost a network hop.
 """
 
 from __future__ import annotations
 
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
 import redis.asyncio as aioredis
@@ -124,3 +130,70 @@ async def cache_invalidate_pattern(pattern: str) -> int:
         logger.warning("cache_invalidate_pattern(%s) failed: %s", pattern, exc)
 
     return deleted
+
+
+# ---------------------------------------------------------------------------
+# In-process LRU
+# ---------------------------------------------------------------------------
+
+class LRUCache:
+    """Bounded, thread-safe LRU cache with a per-entry TTL in seconds.
+
+    ``get`` returns ``None`` on a miss, so ``None`` itself should not be cached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Any, value: Any, ttl: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,133 @@
+"""Event-driven invalidation of org-scoped cache keys.
+
+Services register which cache keys depend on which models::
+
+    invalidate_on_change(Control, Evidence, keys=lambda org_id: [f"org:{org_id}:readiness"])
+
+Whenever a session flushes inserts, updates or deletes of a registered
+model, the affected ``org_id``'s keys are collected and deleted from the
+cache once the transaction commits (and discarded on rollback). This
+covers every writer — API services, agents and background jobs — without
+each call site having to remember which caches to clear.
+
+Bulk ``insert()`` / ``update()`` / ``delete()`` statements on a registered
+model are covered too: the org comes from the inserted rows, or from an
+``org_id == ...`` condition in the WHERE clause.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Iterable
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+from app.core.cache import cache_delete
+
+logger = logging.getLogger(__name__)
+
+KeyFn = Callable[[UUID], Iterable[str]]
+
+_watchers: dict[type, list[KeyFn]] = {}
+_background: set[asyncio.Task] = set()
+_PENDING = "pending_cache_invalidations"
+
+
+def invalidate_on_change(*models: type, keys: KeyFn) -> None:
+    """Delete ``keys(org_id)`` whenever rows of *models* change for that org."""
+    for model in models:
+        _watchers.setdefault(model, []).append(keys)
+
+
+def _collect(session: Session, flush_context) -> None:
+    if not _watchers:
+        return
+    pending: set[str] = session.info.setdefault(_PENDING, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        key_fns = _watchers.get(type(obj))
+        if not key_fns:
+            continue
+        org_id = getattr(obj, "org_id", None)
+        if org_id is None:
+            continue
+        for key_fn in key_fns:
+            pending.update(key_fn(org_id))
+
+
+def _where_org_ids(statement, table) -> set:
+    org_ids = set()
+    if statement.whereclause is None:
+        return org_ids
+    for node in visitors.iterate(statement.whereclause):
+        if (
+            isinstance(node, BinaryExpression)
+            and node.operator is operators.eq
+            and getattr(node.left, "table", None) is table
+            and getattr(node.left, "name", None) == "org_id"
+            and isinstance(node.right, BindParameter)
+        ):
+            org_ids.add(node.right.effective_value)
+    return org_ids
+
+
+def _collect_statement(state: ORMExecuteState) -> None:
+    if not _watchers or not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    key_fns = _watchers.get(mapper.class_) if mapper is not None else None
+    if not key_fns:
+        return
+    if state.is_insert:
+        params = state.parameters or []
+        rows = params if isinstance(params, list) else [params]
+        org_ids = {row.get("org_id") for row in rows} - {None}
+    else:
+        org_ids = _where_org_ids(state.statement, mapper.local_table)
+    if not org_ids:
+        logger.debug("Cannot tell which orgs a bulk %s statement touched", mapper.class_.__name__)
+        return
+    pending: set[str] = state.session.info.setdefault(_PENDING, set())
+    for org_id in org_ids:
+        for key_fn in key_fns:
+            pending.update(key_fn(org_id))
+
+
+async def _delete_all(keys: Iterable[str]) -> None:
+    for key in keys:
+        await cache_delete(key)
+
+
+def _flush_invalidations(session: Session) -> None:
+    keys = session.info.pop(_PENDING, None)
+    if not keys:
+        return
+    if in_greenlet():
+        # Inside AsyncSession.commit() we run in SQLAlchemy's greenlet, so the
+        # deletes can complete before commit() returns to the caller.
+        await_only(_delete_all(keys))
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning("No event loop to invalidate cache keys: %s", sorted(keys))
+        return
+    task = loop.create_task(_delete_all(keys))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def _discard(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+event.listen(Session, "after_flush", _collect)
+event.listen(Session, "do_orm_execute", _collect_statement)
+event.listen(Session, "after_commit", _flush_invalidations)
+event.listen(Session, "after_rollback", _discard)
@@ -6,6 +6,7 @@ from fastapi import Depends, Header
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import principals
 from app.core.database import async_session
 from app.core.exceptions import ForbiddenError, NotFoundError, UnauthorizedError
 from app.core.security import decode_token
@@ -34,11 +35,14 @@ async def get_current_user(
     if not keycloak_id:
         raise UnauthorizedError("Invalid token payload")
 
-    result = await db.execute(select(User).where(User.keycloak_id == keycloak_id))
-    user = result.scalar_one_or_none()
-
+    user = await principals.get(keycloak_id)
     if user is None:
-        raise NotFoundError("User not found. Please complete registration.")
+        result = await db.execute(select(User).where(User.keycloak_id == keycloak_id))
+        user = result.scalar_one_or_none()
+
+        if user is None:
+            raise NotFoundError("User not found. Please complete registration.")
+        await principals.put(user)
 
     if not user.is_active:
         raise ForbiddenError("User account is deactivated")
@@ -0,0 +1,19 @@
+"""Conditional GET support for endpoints that can compute an ETag up front."""
+
+from fastapi import Request, Response
+
+# Clients may keep the body but must revalidate; responses are per-user
+_CACHE_CONTROL = "private, no-cache"
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """Tag *response* with *etag*; return a 304 if the client already holds it."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL})
+    return None
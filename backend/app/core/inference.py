@@ -0,0 +1,126 @@
+"""Off-event-loop executor for blocking model inference.
+
+``BatchingExecutor`` runs a synchronous batch function (e.g.
+``SentenceTransformer.encode``) in a dedicated thread pool so it never blocks
+the event loop. Requests arriving within a short window are coalesced into
+a single micro-batch, which is both cheaper per item and keeps the pool
+from being flooded by many tiny calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingExecutor:
+    """Coalesce concurrent ``submit`` calls into batched calls of *fn*.
+
+    *fn* receives a flat list of items and must return a list of results of
+    the same length (or ``None``, which is propagated to every caller).
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[list[Any]], Sequence[Any] | None],
+        *,
+        max_workers: int = 1,
+        window_ms: float = 5.0,
+        max_batch: int = 64,
+        name: str = "inference",
+    ):
+        self._fn = fn
+        self._name = name
+        self._max_workers = max_workers
+        self._pool: ThreadPoolExecutor | None = None
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._pending: list[tuple[list[Any], asyncio.Future]] = []
+        self._pending_items = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+        self.items = 0
+        self.busy_ms = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix=self._name
+            )
+        return self._pool
+
+    async def submit(self, items: list[Any]) -> list[Any] | None:
+        """Queue *items* for the next micro-batch and await their results."""
+        if not items:
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(items), future))
+        self._pending_items += len(items)
+        self.requests += 1
+
+        if self._pending_items >= self._max_batch:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush, loop)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_items = self._pending, [], 0
+        if not batch:
+            return
+        task = loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[list[Any], asyncio.Future]]) -> None:
+        flat = [item for items, _ in batch for item in items]
+        started = time.perf_counter()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), self._fn, flat
+            )
+        except Exception as exc:
+            logger.exception("%s batch of %d items failed", self._name, len(flat))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            self.busy_ms += (time.perf_counter() - started) * 1000
+            self.batches += 1
+            self.items += len(flat)
+
+        offset = 0
+        for items, future in batch:
+            if not future.done():
+                future.set_result(
+                    None if results is None else list(results[offset:offset + len(items)])
+                )
+            offset += len(items)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "busy_ms": round(self.busy_ms, 1),
+            "pending": self._pending_items,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
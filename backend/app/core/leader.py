@@ -0,0 +1,159 @@
+"""Leader election for work that must run in exactly one process.
+
+``create_lock(name)`` returns a lease-style lock backed by, in order of
+preference (or as forced by ``SCHEDULER_LOCK_BACKEND``):
+
+- Redis: ``SET NX PX`` with a per-process token, renewed with a
+  compare-and-expire script so a stale holder can't extend someone else's
+  lease.
+- Postgres: a session-level ``pg_try_advisory_lock`` held on a dedicated
+  connection; the lock disappears with the connection.
+- A local file locked with ``flock`` — only coordinates processes on one
+  host, which is enough for single-node and SQLite deployments.
+
+All locks share the same interface: ``acquire()`` and ``renew()`` return
+whether this process holds the lock, ``release()`` gives it up.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import uuid
+
+from sqlalchemy import text
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisLock:
+    backend = "redis"
+
+    _RENEW = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+    )
+    _RELEASE = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, redis, name: str, ttl_seconds: float):
+        self._redis = redis
+        self.key = f"quicktrust:leader:{name}"
+        self._token = uuid.uuid4().hex
+        self._ttl_ms = int(ttl_seconds * 1000)
+
+    async def acquire(self) -> bool:
+        return bool(await self._redis.set(self.key, self._token, nx=True, px=self._ttl_ms))
+
+    async def renew(self) -> bool:
+        return bool(await self._redis.eval(self._RENEW, 1, self.key, self._token, self._ttl_ms))
+
+    async def release(self) -> None:
+        await self._redis.eval(self._RELEASE, 1, self.key, self._token)
+
+
+class PostgresAdvisoryLock:
+    backend = "postgres"
+
+    def __init__(self, engine, name: str):
+        self._engine = engine
+        # Advisory lock keys are signed 64-bit integers
+        self._key = int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+        self._conn = None
+
+    async def acquire(self) -> bool:
+        if self._conn is None:
+            self._conn = await self._engine.connect()
+        got = (await self._conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": self._key}
+        )).scalar()
+        await self._conn.commit()
+        return bool(got)
+
+    async def renew(self) -> bool:
+        # The lock lives as long as the session; make sure it is still alive
+        try:
+            await self._conn.execute(text("SELECT 1"))
+            await self._conn.commit()
+            return True
+        except Exception:
+            logger.warning("Lost the connection holding advisory lock %s", self._key)
+            await self._close()
+            return False
+
+    async def release(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            await self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self._key})
+            await self._conn.commit()
+        finally:
+            await self._close()
+
+    async def _close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+
+class FileLock:
+    backend = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: int | None = None
+
+    async def acquire(self) -> bool:
+        import fcntl
+
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    async def renew(self) -> bool:
+        return self._fd is not None
+
+    async def release(self) -> None:
+        import fcntl
+
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+async def create_lock(name: str):
+    """Return a lock for *name* using the configured (or best available) backend."""
+    from app.core.cache import _get_redis
+
+    settings = get_settings()
+    backend = settings.SCHEDULER_LOCK_BACKEND
+    if backend in ("auto", "redis"):
+        redis = await _get_redis()
+        if redis is not None:
+            return RedisLock(redis, name, settings.SCHEDULER_LOCK_TTL_SECONDS)
+        if backend == "redis":
+            logger.warning("Redis unavailable for leader lock %s, falling back", name)
+    if backend in ("auto", "redis", "postgres") and settings.DATABASE_URL.startswith("postgresql"):
+        from app.core.database import engine
+
+        return PostgresAdvisoryLock(engine, name)
+    path = settings.SCHEDULER_LOCK_FILE or os.path.join("/tmp", f"quicktrust-{name}.lock")
+    return FileLock(path)
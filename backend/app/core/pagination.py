@@ -0,0 +1,153 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+``paginate`` orders a query newest first on ``(sort column, id)`` and returns
+one page plus an opaque ``next_cursor`` encoding the last row's key. Passing
+that cursor back continues with ``WHERE (sort, id) < (last sort, last id)``,
+which an index on the sort column answers directly no matter how deep the
+page is. Page-number (OFFSET) requests still work and return a cursor too,
+so a client can switch to cursors at any point.
+
+Totals are a separate query and can be skipped or estimated:
+
+- ``exact``: ``COUNT(*)`` over the filtered query;
+- ``estimate``: an exact count up to ``PAGINATION_COUNT_CAP`` rows, beyond
+  that the planner's row estimate (Postgres) or the cap itself;
+- ``none``: no count. This is the default once a cursor is passed.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal
+
+from sqlalchemy import DateTime, String, and_, func, literal, or_, select, text, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.config import get_settings
+from app.core.exceptions import BadRequestError
+
+logger = logging.getLogger(__name__)
+
+CountMode = Literal["exact", "estimate", "none"]
+
+
+@dataclass
+class Page:
+    items: list[Any]
+    total: int | None
+    next_cursor: str | None
+    page: int | None
+    page_size: int
+    total_is_estimate: bool = False
+
+    @property
+    def total_pages(self) -> int | None:
+        if self.total is None:
+            return None
+        return (self.total + self.page_size - 1) // self.page_size
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return sort_value, str(uuid.UUID(row_id))
+    except (ValueError, TypeError):
+        raise BadRequestError("Invalid cursor")
+
+
+async def _count(db: AsyncSession, query: Select, mode: CountMode) -> tuple[int | None, bool]:
+    if mode == "none":
+        return None, False
+    base = query.order_by(None)
+    if mode == "exact":
+        return (await db.execute(select(func.count()).select_from(base.subquery()))).scalar() or 0, False
+
+    cap = get_settings().PAGINATION_COUNT_CAP
+    capped = (await db.execute(
+        select(func.count()).select_from(base.limit(cap + 1).subquery())
+    )).scalar() or 0
+    if capped <= cap:
+        return capped, False
+    if db.get_bind().dialect.name == "postgresql":
+        try:
+            compiled = base.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+            plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return max(int(plan[0]["Plan"]["Plan Rows"]), cap), True
+        except Exception:
+            logger.debug("Row estimate unavailable, reporting the count cap", exc_info=True)
+    return cap, True
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    *,
+    sort_column,
+    id_column,
+    page: int = 1,
+    page_size: int = 50,
+    cursor: str | None = None,
+    count: CountMode | None = None,
+) -> Page:
+    """Return one page of *query* (a ``select(Model)`` with filters applied).
+
+    With *cursor*, *page* is ignored. *count* defaults to ``exact`` for
+    page-number requests and ``none`` for cursor requests.
+    """
+    # SQLite keeps datetimes as text; compare against the stored text so the
+    # boundary row matches exactly regardless of how it was written
+    as_text = db.get_bind().dialect.name == "sqlite" and isinstance(sort_column.type, DateTime)
+    key = type_coerce(sort_column, String) if as_text else sort_column
+    total, estimated = await _count(db, query, count or ("none" if cursor else "exact"))
+
+    q = query.add_columns(key.label("_sort_key"))
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if as_text:
+            bound = literal(sort_value, String)
+        else:
+            python_type = sort_column.type.python_type
+            try:
+                if python_type is datetime:
+                    sort_value = datetime.fromisoformat(sort_value)
+                elif not isinstance(sort_value, python_type):
+                    raise TypeError(sort_value)
+            except (ValueError, TypeError):
+                raise BadRequestError("Invalid cursor")
+            bound = literal(sort_value, sort_column.type)
+        last_id = literal(uuid.UUID(row_id), id_column.type)
+        q = q.where(and_(sort_column <= bound, or_(sort_column < bound, id_column < last_id)))
+    else:
+        q = q.offset((page - 1) * page_size)
+    q = q.order_by(sort_column.desc(), id_column.desc()).limit(page_size + 1)
+
+    rows = (await db.execute(q)).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last, last_key = rows[-1]
+        next_cursor = encode_cursor(last_key, getattr(last, id_column.key))
+    return Page(
+        items=[row[0] for row in rows],
+        total=total,
+        next_cursor=next_cursor,
+        page=None if cursor else page,
+        page_size=page_size,
+        total_is_estimate=estimated,
+    )
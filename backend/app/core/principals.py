@@ -0,0 +1,85 @@
+"""Short-lived cache of authenticated principals, keyed by Keycloak subject.
+
+``get_current_user`` would otherwise look the user up by ``keycloak_id`` on
+every request. The cache has two tiers:
+
+- an in-process ``LRUCache`` (no I/O at all on a hit);
+- Redis, shared by all workers, when available (``AUTH_PRINCIPAL_REDIS``).
+
+Entries hold only what authorization and ``/auth/me`` need, and are rebuilt
+into a transient ``User`` that is never attached to a session.
+``user_service`` calls ``invalidate`` when a user is updated or deactivated;
+that clears this process and Redis, and other processes' in-process entries
+expire after ``AUTH_PRINCIPAL_CACHE_TTL_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from app.config import get_settings
+from app.core.cache import LRUCache, cache_delete, cache_get, cache_set
+from app.models.user import User
+
+settings = get_settings()
+
+_FIELDS = ("id", "org_id", "keycloak_id", "email", "full_name", "role", "department", "is_active")
+
+_local = LRUCache(
+    maxsize=settings.AUTH_PRINCIPAL_CACHE_SIZE, ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+)
+_stats = {"redis_hits": 0, "redis_misses": 0, "invalidations": 0}
+
+
+def _redis_key(keycloak_id: str) -> str:
+    return f"principal:{keycloak_id}"
+
+
+def _to_entry(user: User) -> dict:
+    return {
+        name: str(value) if isinstance(value, uuid.UUID) else value
+        for name in _FIELDS
+        for value in (getattr(user, name),)
+    }
+
+
+def _to_user(entry: dict) -> User:
+    return User(**{**entry, "id": uuid.UUID(entry["id"]), "org_id": uuid.UUID(entry["org_id"])})
+
+
+async def get(keycloak_id: str) -> User | None:
+    """Return the cached principal for *keycloak_id*, or ``None`` on a miss."""
+    entry = _local.get(keycloak_id)
+    if entry is None and settings.AUTH_PRINCIPAL_REDIS:
+        entry = await cache_get(_redis_key(keycloak_id))
+        if isinstance(entry, dict):
+            _stats["redis_hits"] += 1
+            _local.set(keycloak_id, entry)
+        else:
+            _stats["redis_misses"] += 1
+            entry = None
+    return _to_user(entry) if entry is not None else None
+
+
+async def put(user: User) -> None:
+    entry = _to_entry(user)
+    _local.set(user.keycloak_id, entry)
+    if settings.AUTH_PRINCIPAL_REDIS:
+        await cache_set(
+            _redis_key(user.keycloak_id), entry, ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+        )
+
+
+async def invalidate(keycloak_id: str) -> None:
+    _stats["invalidations"] += 1
+    _local.delete(keycloak_id)
+    if settings.AUTH_PRINCIPAL_REDIS:
+        await cache_delete(_redis_key(keycloak_id))
+
+
+def clear() -> None:
+    _local.clear()
+
+
+def get_stats() -> dict:
+    return {**_stats, "local": _local.stats()}
@@ -1,110 +1,348 @@
 """APScheduler integration for periodic monitoring checks.
 
-The scheduler reads all active ``MonitorRule`` rows from the database and
-creates APScheduler jobs that invoke ``monitoring_service.run_checks`` on the
-configured schedule (hourly / daily / weekly).
+There is one APScheduler job per (organization, schedule) pair with active
+``MonitorRule`` rows. Each job invokes ``monitoring_service.run_org_checks``,
+which evaluates all of that org's rules on that schedule (hourly / daily /
+weekly) in one batch and one session.
+
+Every API process runs a small election loop (``app.core.leader``), but only
+the process holding the lock runs the scheduler, so each job fires once per
+interval no matter how many workers and pods are up. Jobs live in a
+persistent job store (the application database by default), so a restart or
+a leadership change keeps their next run times instead of re-syncing from
+scratch. The leader applies rule changes incrementally: immediately for
+changes made in its own process (``rules_changed``), and for changes made
+elsewhere by polling for rules updated since its last sync.
+
+First runs are spread across the interval by a per-org offset, each run gets
+up to ``SCHEDULER_JITTER_SECONDS`` of jitter, and at most
+``SCHEDULER_MAX_CONCURRENT_JOBS`` evaluations run at once.
+
+The leader also runs a daily job that archives cold audit log entries.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import hashlib
 import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
-scheduler = AsyncIOScheduler()
+scheduler: AsyncIOScheduler | None = None
+is_leader = False
+_lock = None
+_loop_task: asyncio.Task | None = None
+_job_slots: asyncio.Semaphore | None = None
+_watermark = None  # max(MonitorRule.updated_at) seen by the last sync
+_tasks: set[asyncio.Task] = set()
 
-# Mapping from MonitorRule.schedule values to APScheduler trigger kwargs
-_SCHEDULE_MAP: dict[str, dict] = {
-    "hourly": {"trigger": "interval", "hours": 1},
-    "daily": {"trigger": "interval", "hours": 24},
-    "weekly": {"trigger": "interval", "weeks": 1},
+# Interval in seconds for each MonitorRule.schedule value
+_SCHEDULE_SECONDS: dict[str, int] = {
+    "hourly": 3600,
+    "daily": 24 * 3600,
+    "weekly": 7 * 24 * 3600,
 }
 
+_JOB_PREFIX = "monitor_org_"
+_ARCHIVE_JOB = "audit_log_archive"
 
-async def start_scheduler() -> None:
-    """Start the scheduler and load all active monitoring rules as jobs."""
+
+def _jobstore_url() -> str:
+    """Job store URL: the configured one, else the app DB on its sync driver."""
+    settings = get_settings()
+    if settings.SCHEDULER_JOBSTORE_URL:
+        return settings.SCHEDULER_JOBSTORE_URL
+    url = make_url(settings.DATABASE_URL)
+    backend = url.get_backend_name()
+    drivername = {"sqlite": "sqlite", "postgresql": "postgresql+psycopg"}.get(backend, backend)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def _jobstore():
+    """SQLAlchemy job store for ``_jobstore_url()``, or in-memory when set to "memory".
+
+    An explicitly configured URL that cannot be opened is an error. When the
+    default (app database) store is unavailable the scheduler still runs on
+    in-memory jobs, but that is logged as an error since next run times are
+    then lost on restart and on every leadership change.
+    """
+    url = _jobstore_url()
+    if url == "memory":
+        return MemoryJobStore()
     try:
-        from app.core.database import async_session
+        from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 
-        async with async_session() as db:
-            await sync_monitoring_rules(db)
+        return SQLAlchemyJobStore(url=url, tablename="apscheduler_jobs")
+    except Exception:
+        if get_settings().SCHEDULER_JOBSTORE_URL:
+            raise
+        logger.exception("Persistent job store unavailable; falling back to in-memory jobs")
+        return MemoryJobStore()
 
-        scheduler.start()
-        logger.info("APScheduler started with monitoring jobs.")
-    except Exception as exc:
-        logger.warning("Failed to start scheduler: %s. Monitoring jobs will be disabled.", exc)
+
+def _build_scheduler() -> AsyncIOScheduler:
+    return AsyncIOScheduler(
+        jobstores={"default": _jobstore()},
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 300},
+        timezone=timezone.utc,
+    )
+
+
+def get_scheduler() -> AsyncIOScheduler:
+    global scheduler
+    if scheduler is None:
+        scheduler = _build_scheduler()
+    return scheduler
+
+
+async def start_scheduler() -> None:
+    """Start competing for scheduler leadership in the background."""
+    global _loop_task
+    if get_settings().SCHEDULER_MODE == "disabled":
+        logger.info("Scheduler disabled in this process.")
+        return
+    _loop_task = asyncio.create_task(_leader_loop())
 
 
 async def stop_scheduler() -> None:
-    """Gracefully shut down the scheduler."""
-    if scheduler.running:
+    """Stop the election loop, the scheduler and give up leadership."""
+    global _loop_task
+    if _loop_task is not None:
+        _loop_task.cancel()
+        await asyncio.gather(_loop_task, return_exceptions=True)
+        _loop_task = None
+    await _step_down()
+
+
+async def _leader_loop() -> None:
+    global _lock
+    from app.core.leader import create_lock
+
+    settings = get_settings()
+    while True:
+        try:
+            if _lock is None:
+                _lock = await create_lock("scheduler")
+            if not is_leader:
+                if await _lock.acquire():
+                    await _become_leader()
+            elif not await _renew():
+                logger.warning("Lost scheduler leadership")
+                await _step_down(release=False)
+            else:
+                await _sync_changed_rules()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Scheduler election loop error")
+        await asyncio.sleep(settings.SCHEDULER_LOCK_RENEW_SECONDS)
+
+
+async def _renew() -> bool:
+    """Renew the leader lease; an error counts as losing it.
+
+    Keeping the scheduler running after a failed renewal would let it fire
+    jobs alongside whichever process takes the lock once the lease expires.
+    """
+    try:
+        return await _lock.renew()
+    except Exception:
+        logger.exception("Could not renew scheduler lock")
+        return False
+
+
+async def _become_leader() -> None:
+    global is_leader, _job_slots
+    from app.core.database import async_session
+
+    is_leader = True
+    _job_slots = asyncio.Semaphore(get_settings().SCHEDULER_MAX_CONCURRENT_JOBS)
+    sched = get_scheduler()
+    sched.start()
+    # The job store persists across restarts; reconcile it against the rules
+    # once, then only follow changes
+    async with async_session() as db:
+        await sync_monitoring_rules(db)
+    if get_settings().AUDIT_LOG_HOT_DAYS > 0 and sched.get_job(_ARCHIVE_JOB) is None:
+        sched.add_job(
+            "app.core.scheduler:_archive_audit_logs",
+            trigger="interval",
+            seconds=_SCHEDULE_SECONDS["daily"],
+            next_run_time=_first_run(_ARCHIVE_JOB, _SCHEDULE_SECONDS["daily"]),
+            id=_ARCHIVE_JOB,
+        )
+    logger.info("Acquired scheduler leadership (%s lock)", _lock.backend)
+
+
+async def _step_down(release: bool = True) -> None:
+    global is_leader, scheduler, _watermark
+    if scheduler is not None and scheduler.running:
         scheduler.shutdown(wait=False)
         logger.info("APScheduler stopped.")
+    scheduler = None
+    _watermark = None
+    was_leader, is_leader = is_leader, False
+    if release and was_leader and _lock is not None:
+        try:
+            await _lock.release()
+        except Exception:
+            logger.exception("Could not release scheduler lock")
 
 
-async def sync_monitoring_rules(db) -> None:
-    """Read all active monitoring rules and create/update APScheduler jobs.
+def _job_id(org_id, schedule: str) -> str:
+    return f"{_JOB_PREFIX}{org_id}_{schedule}"
 
-    Existing jobs whose rule has been deactivated or deleted are removed.
+
+def _first_run(job_id: str, interval: int) -> datetime:
+    """Spread jobs of the same schedule over the interval, stably per job."""
+    offset = int.from_bytes(hashlib.sha256(job_id.encode()).digest()[:4], "big") % interval
+    return datetime.now(timezone.utc) + timedelta(seconds=offset)
+
+
+async def sync_monitoring_rules(db, org_ids: Iterable[UUID] | None = None) -> None:
+    """Make the scheduled jobs match the active rules.
+
+    With *org_ids*, only those orgs' jobs are reconciled; otherwise all of
+    them (and per-rule jobs from before batching are dropped). Existing jobs
+    keep their next run time.
     """
+    global _watermark
     from app.models.monitoring import MonitorRule
 
-    result = await db.execute(
-        select(MonitorRule).where(MonitorRule.is_active.is_(True))
-    )
-    active_rules = list(result.scalars().all())
-
-    active_job_ids: set[str] = set()
-
-    for rule in active_rules:
-        job_id = f"monitor_rule_{rule.id}"
-        active_job_ids.add(job_id)
-
-        schedule_kwargs = _SCHEDULE_MAP.get(rule.schedule, _SCHEDULE_MAP["daily"]).copy()
-        trigger = schedule_kwargs.pop("trigger")
-
-        existing_job = scheduler.get_job(job_id)
-        if existing_job:
-            # Reschedule in case the interval changed
-            existing_job.reschedule(trigger=trigger, **schedule_kwargs)
-            logger.debug("Rescheduled job %s", job_id)
-        else:
-            scheduler.add_job(
-                _run_monitoring_check,
-                trigger=trigger,
-                id=job_id,
-                args=[str(rule.org_id), str(rule.id)],
-                replace_existing=True,
-                **schedule_kwargs,
-            )
-            logger.info("Added monitoring job %s (schedule=%s)", job_id, rule.schedule)
+    sched = get_scheduler()
+    settings = get_settings()
+    orgs = {str(o) for o in org_ids} if org_ids is not None else None
+
+    q = select(MonitorRule.org_id, MonitorRule.schedule).where(MonitorRule.is_active.is_(True))
+    if orgs is not None:
+        q = q.where(MonitorRule.org_id.in_([UUID(o) for o in orgs]))
+    else:
+        _watermark = (await db.execute(select(func.max(MonitorRule.updated_at)))).scalar()
+    desired = {
+        _job_id(org_id, schedule): (str(org_id), schedule)
+        for org_id, schedule in (await db.execute(q.distinct())).all()
+    }
+
+    existing = set()
+    for job in sched.get_jobs():
+        if job.id.startswith(_JOB_PREFIX):
+            if orgs is None or job.args[0] in orgs:
+                existing.add(job.id)
+        elif job.id.startswith("monitor_rule_") and orgs is None:
+            existing.add(job.id)
+
+    for job_id in desired.keys() - existing:
+        org_id, schedule = desired[job_id]
+        interval = _SCHEDULE_SECONDS.get(schedule, _SCHEDULE_SECONDS["daily"])
+        sched.add_job(
+            "app.core.scheduler:_run_monitoring_checks",
+            trigger="interval",
+            seconds=interval,
+            jitter=min(settings.SCHEDULER_JITTER_SECONDS, interval // 10) or None,
+            next_run_time=_first_run(job_id, interval),
+            id=job_id,
+            args=[org_id, schedule],
+            replace_existing=True,
+        )
+        logger.info("Added monitoring job %s", job_id)
 
-    # Remove jobs for rules that are no longer active
-    for job in scheduler.get_jobs():
-        if job.id.startswith("monitor_rule_") and job.id not in active_job_ids:
-            scheduler.remove_job(job.id)
-            logger.info("Removed stale monitoring job %s", job.id)
+    for job_id in existing - desired.keys():
+        sched.remove_job(job_id)
+        logger.info("Removed stale monitoring job %s", job_id)
 
 
-async def _run_monitoring_check(org_id: str, rule_id: str) -> None:
-    """Callback executed by APScheduler: opens a DB session and runs checks."""
+async def _sync_changed_rules() -> None:
+    """Reconcile only the orgs whose rules changed since the last sync."""
+    global _watermark
+    from app.core.database import async_session
+    from app.models.monitoring import MonitorRule
+
+    async with async_session() as db:
+        latest = (await db.execute(select(func.max(MonitorRule.updated_at)))).scalar()
+        q = select(MonitorRule.org_id).distinct()
+        if _watermark is not None:
+            # >= so changes in the same second as the watermark aren't missed;
+            # re-syncing an unchanged org is a no-op
+            q = q.where(MonitorRule.updated_at >= _watermark)
+        org_ids = list((await db.execute(q)).scalars().all())
+        if org_ids:
+            await sync_monitoring_rules(db, org_ids)
+        _watermark = latest
+
+
+def rules_changed(org_id: UUID) -> None:
+    """Apply an org's rule changes right away if this process is the leader.
+
+    Other processes rely on the leader's polling of ``updated_at``.
+    """
+    if not is_leader:
+        return
+
+    async def _sync() -> None:
+        from app.core.database import async_session
+
+        try:
+            async with async_session() as db:
+                await sync_monitoring_rules(db, [org_id])
+        except Exception:
+            logger.exception("Could not sync monitoring jobs for org %s", org_id)
+
+    task = asyncio.get_running_loop().create_task(_sync())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _run_monitoring_checks(org_id: str, schedule: str) -> None:
+    """Callback executed by APScheduler: evaluates an org's rules for one schedule."""
     from app.core.database import async_session
     from app.services import monitoring_service
 
     try:
-        async with async_session() as db:
-            alerts = await monitoring_service.run_checks(
-                db, UUID(org_id), UUID(rule_id)
-            )
-            if alerts:
-                logger.info(
-                    "Monitoring rule %s generated %d alert(s)", rule_id, len(alerts)
+        async with _job_slots or contextlib.nullcontext():
+            async with async_session() as db:
+                report = await monitoring_service.run_org_checks(
+                    db, UUID(org_id), schedule=schedule
                 )
-            else:
-                logger.debug("Monitoring rule %s passed.", rule_id)
+        if report.rules_evaluated == 0 and scheduler is not None:
+            # Last rule on this schedule was deleted or moved
+            scheduler.remove_job(_job_id(org_id, schedule))
+        elif report.alerts_created:
+            logger.info(
+                "Monitoring for org %s (%s) generated %d alert(s)",
+                org_id, schedule, report.alerts_created,
+            )
     except Exception as exc:
-        logger.error("Error running monitoring check for rule %s: %s", rule_id, exc)
+        logger.error("Error running %s monitoring checks for org %s: %s", schedule, org_id, exc)
+
+
+async def _archive_audit_logs() -> None:
+    """Callback executed by APScheduler: moves cold audit entries to the archive."""
+    from app.core.database import async_session
+    from app.services import audit_log_service
+
+    try:
+        async with async_session() as db:
+            await audit_log_service.archive_audit_logs(db)
+    except Exception as exc:
+        logger.error("Error archiving audit logs: %s", exc)
+
+
+def get_stats() -> dict:
+    return {
+        "mode": get_settings().SCHEDULER_MODE,
+        "is_leader": is_leader,
+        "lock_backend": getattr(_lock, "backend", None),
+        "jobs": len(scheduler.get_jobs()) if scheduler is not None and is_leader else 0,
+    }
@@ -1,61 +1,138 @@
+"""Keycloak access-token verification.
+
+- Verified claims are cached in a bounded LRU keyed by the SHA-256 of the
+  token, until the token's ``exp`` (capped at ``AUTH_TOKEN_CACHE_TTL_SECONDS``),
+  so repeat requests with the same bearer token skip RS256 verification.
+- Signing keys are parsed once per JWKS fetch and indexed by ``kid``.
+- The JWKS is refetched after ``AUTH_JWKS_TTL_SECONDS``, or on an unknown
+  ``kid`` at most once per ``AUTH_JWKS_MIN_REFRESH_SECONDS``. Concurrent
+  callers share a single in-flight fetch over a pooled HTTP client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+
 import httpx
-from jose import JWTError, jwt
-from functools import lru_cache
+from jose import JWTError, jwk, jwt
 
 from app.config import get_settings
+from app.core.cache import LRUCache
 from app.core.exceptions import UnauthorizedError
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 _jwks_cache: dict | None = None
+_keys_by_kid: dict[str | None, object] = {}
+_fetched_at = 0.0  # time.monotonic() of the last successful fetch
+_refresh: asyncio.Future | None = None
+_client: httpx.AsyncClient | None = None
+_claims = LRUCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE)
+_stats = {"jwks_fetches": 0, "jwks_errors": 0, "kid_misses": 0, "verifications": 0}
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=10.0)
+    return _client
+
+
+def _index_keys(jwks: dict) -> dict[str | None, object]:
+    keys = {}
+    for key in jwks.get("keys", []):
+        if key.get("use", "sig") != "sig" or key.get("kty") != "RSA":
+            continue
+        try:
+            keys[key.get("kid")] = jwk.construct(key, algorithm="RS256")
+        except Exception as exc:
+            logger.warning("Skipping unusable JWKS key %s: %s", key.get("kid"), exc)
+    return keys
+
+
+async def _fetch_jwks() -> dict:
+    global _jwks_cache, _keys_by_kid, _fetched_at
+    jwks_url = f"{settings.KEYCLOAK_URL}/realms/{settings.KEYCLOAK_REALM}/protocol/openid-connect/certs"
+    _stats["jwks_fetches"] += 1
+    try:
+        resp = await _get_client().get(jwks_url)
+        resp.raise_for_status()
+        jwks = resp.json()
+    except httpx.HTTPError:
+        _stats["jwks_errors"] += 1
+        raise
+    _keys_by_kid = _index_keys(jwks)
+    _jwks_cache = jwks
+    _fetched_at = time.monotonic()
+    return jwks
+
+
+async def _refresh_jwks() -> dict:
+    """Fetch the JWKS, joining the fetch already in flight if there is one."""
+    global _refresh
+    loop = asyncio.get_running_loop()
+    if _refresh is None or _refresh.done() or _refresh.get_loop() is not loop:
+        _refresh = loop.create_task(_fetch_jwks())
+    # shield: a cancelled waiter must not cancel the fetch for everyone else
+    return await asyncio.shield(_refresh)
 
 
 async def get_jwks() -> dict:
-    global _jwks_cache
-    if _jwks_cache is not None:
+    if _jwks_cache is not None and time.monotonic() - _fetched_at < settings.AUTH_JWKS_TTL_SECONDS:
         return _jwks_cache
-
-    jwks_url = f"{settings.KEYCLOAK_URL}/realms/{settings.KEYCLOAK_REALM}/protocol/openid-connect/certs"
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(jwks_url)
-        resp.raise_for_status()
-        _jwks_cache = resp.json()
+    try:
+        return await _refresh_jwks()
+    except httpx.HTTPError:
+        if _jwks_cache is None:
+            raise
+        # Keep verifying with the keys we have rather than locking everyone out
+        logger.warning("JWKS refresh failed; using keys fetched %.0fs ago", time.monotonic() - _fetched_at)
         return _jwks_cache
 
 
+async def _signing_key(kid: str | None):
+    await get_jwks()
+    key = _keys_by_kid.get(kid)
+    if key is None:
+        _stats["kid_misses"] += 1
+        # Possibly a key rotation; don't let tokens with bogus kids hammer Keycloak
+        if time.monotonic() - _fetched_at >= settings.AUTH_JWKS_MIN_REFRESH_SECONDS:
+            await _refresh_jwks()
+            key = _keys_by_kid.get(kid)
+    return key
+
+
 def clear_jwks_cache():
-    global _jwks_cache
+    """Forget the signing keys and every claim verified with them."""
+    global _jwks_cache, _keys_by_kid, _fetched_at
     _jwks_cache = None
+    _keys_by_kid = {}
+    _fetched_at = 0.0
+    _claims.clear()
 
 
 async def decode_token(token: str) -> dict:
+    token_hash = hashlib.sha256(token.encode()).digest()
+    claims = _claims.get(token_hash)
+    if claims is not None:
+        if claims.get("exp") is None or claims["exp"] > time.time():
+            return dict(claims)
+        _claims.delete(token_hash)
+
     try:
-        jwks = await get_jwks()
         # Get the header to find the key id
         unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get("kid")
-
-        # Find the matching key
-        rsa_key = None
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                rsa_key = key
-                break
-
-        if rsa_key is None:
-            # Try refreshing JWKS cache
-            clear_jwks_cache()
-            jwks = await get_jwks()
-            for key in jwks.get("keys", []):
-                if key.get("kid") == kid:
-                    rsa_key = key
-                    break
-
+        rsa_key = await _signing_key(unverified_header.get("kid"))
         if rsa_key is None:
             raise UnauthorizedError("Unable to find signing key")
 
         issuer = f"{settings.KEYCLOAK_URL}/realms/{settings.KEYCLOAK_REALM}"
 
+        _stats["verifications"] += 1
         payload = jwt.decode(
             token,
             rsa_key,
@@ -64,9 +141,31 @@ async def decode_token(token: str) -> dict:
             issuer=issuer,
             options={"verify_aud": False},
         )
-        return payload
 
     except JWTError as e:
         raise UnauthorizedError(f"Invalid token: {str(e)}")
     except httpx.HTTPError:
         raise UnauthorizedError("Could not validate credentials (Keycloak unreachable)")
+
+    ttl = float(settings.AUTH_TOKEN_CACHE_TTL_SECONDS)
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        _claims.set(token_hash, dict(payload), ttl=ttl)
+    return payload
+
+
+def get_stats() -> dict:
+    return {
+        **_stats,
+        "jwks_keys": len(_keys_by_kid),
+        "jwks_age_seconds": round(time.monotonic() - _fetched_at, 1) if _jwks_cache is not None else None,
+        "token_cache": _claims.stats(),
+    }
+
+
+async def aclose() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
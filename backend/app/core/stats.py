@@ -0,0 +1,182 @@
+"""Declarative org-scoped stats compiled to one aggregate query per entity.
+
+A ``StatsQuery`` names the model, the breakdowns (``group_by``) and the
+filtered counts / sums / averages a ``*_stats`` endpoint reports::
+
+    _STATS = (
+        StatsQuery(Incident, "incident_stats")
+        .group_by(by_status=Incident.status, by_severity=Incident.severity)
+        .count("open_p1_count", Incident.severity == "P1", Incident.status.in_(OPEN))
+    )
+    stats = await _STATS.run(db, org_id)
+
+``run`` issues a single ``SELECT dims..., COUNT(*), COUNT(*) FILTER (...)
+... GROUP BY dims`` and folds the (small) grouped result into
+``{"total": ..., "by_status": {...}, "open_p1_count": ...}``. Filters may be
+callables, evaluated per run, for values like "now + 90 days".
+
+Results are cached under ``org:{org_id}:{name}`` and deleted through
+``cache_events`` whenever rows of the model change for that org and the
+transaction commits, so every writer invalidates consistently.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Float, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.core import cache
+from app.core.cache_events import invalidate_on_change
+
+
+class hours_between(FunctionElement):
+    """``end - start`` in hours, portable across Postgres and SQLite."""
+
+    type = Float()
+    inherit_cache = True
+    name = "hours_between"
+
+
+@compiles(hours_between)
+def _hours_between_default(element, compiler, **kw):
+    end, start = list(element.clauses)
+    return f"EXTRACT(EPOCH FROM ({compiler.process(end, **kw)} - {compiler.process(start, **kw)})) / 3600.0"
+
+
+@compiles(hours_between, "sqlite")
+def _hours_between_sqlite(element, compiler, **kw):
+    end, start = list(element.clauses)
+    return f"(julianday({compiler.process(end, **kw)}) - julianday({compiler.process(start, **kw)})) * 24.0"
+
+
+def _resolve(filters) -> list:
+    return [f() if callable(f) else f for f in filters]
+
+
+class StatsQuery:
+    """Stats for one model, compiled to a single grouped aggregate query.
+
+    *where* narrows the rows counted (e.g. only open alerts). *weight* sums a
+    column instead of counting rows, for pre-aggregated tables. ``ttl=0``
+    disables caching.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        name: str,
+        *,
+        where: tuple = (),
+        weight=None,
+        ttl: int = 120,
+        unknown: str = "unknown",
+    ):
+        self.model = model
+        self.name = name
+        self.ttl = ttl
+        self._where = where
+        self._weight = weight
+        self._unknown = unknown
+        self._dimensions: dict[str, Any] = {}
+        self._metrics: dict[str, tuple[str, Any, tuple]] = {}
+        if ttl:
+            invalidate_on_change(model, keys=lambda org_id: [self.cache_key(org_id)])
+
+    def group_by(self, **dimensions) -> StatsQuery:
+        self._dimensions.update(dimensions)
+        return self
+
+    def count(self, name: str, *where) -> StatsQuery:
+        self._metrics[name] = ("count", None, where)
+        return self
+
+    def sum(self, name: str, expr, *where) -> StatsQuery:
+        self._metrics[name] = ("sum", expr, where)
+        return self
+
+    def avg(self, name: str, expr, *where) -> StatsQuery:
+        """Average of the non-null values of *expr*, rounded to one decimal."""
+        self._metrics[name] = ("avg", expr, where)
+        return self
+
+    def cache_key(self, org_id: UUID) -> str:
+        return f"org:{org_id}:{self.name}"
+
+    def _columns(self) -> list:
+        columns = [col.label(f"_d_{name}") for name, col in self._dimensions.items()]
+        weight = func.coalesce(func.sum(self._weight), 0) if self._weight is not None else func.count()
+        columns.append(weight.label("_total"))
+        for name, (kind, expr, where) in self._metrics.items():
+            where = _resolve(where)
+            if kind == "count":
+                agg = func.sum(self._weight) if self._weight is not None else func.count()
+                columns.append((agg.filter(*where) if where else agg).label(name))
+                continue
+            total = func.sum(expr)
+            columns.append((total.filter(*where) if where else total).label(f"_s_{name}"))
+            if kind == "avg":
+                n = func.count(expr)
+                columns.append((n.filter(*where) if where else n).label(f"_n_{name}"))
+        return columns
+
+    def statement(self, org_id: UUID, *where):
+        dims = list(self._dimensions.values())
+        q = (
+            select(*self._columns())
+            .select_from(self.model)
+            .where(self.model.org_id == org_id, *_resolve(self._where), *_resolve(where))
+        )
+        return q.group_by(*dims) if dims else q
+
+    def _fold(self, rows) -> dict:
+        result: dict[str, Any] = {"total": 0}
+        result.update({name: {} for name in self._dimensions})
+        sums: dict[str, float] = {}
+        counts: dict[str, int] = {}
+        for row in rows:
+            m = row._mapping
+            n = int(m["_total"] or 0)
+            result["total"] += n
+            for name in self._dimensions:
+                key = m[f"_d_{name}"]
+                key = self._unknown if key is None else str(key)
+                result[name][key] = result[name].get(key, 0) + n
+            for name, (kind, _, _) in self._metrics.items():
+                if kind == "count":
+                    counts[name] = counts.get(name, 0) + int(m[name] or 0)
+                else:
+                    sums[name] = sums.get(name, 0.0) + float(m[f"_s_{name}"] or 0)
+                    if kind == "avg":
+                        counts[name] = counts.get(name, 0) + int(m[f"_n_{name}"] or 0)
+        for name, (kind, _, _) in self._metrics.items():
+            if kind == "count":
+                result[name] = counts.get(name, 0)
+            elif kind == "sum":
+                result[name] = sums.get(name, 0.0)
+            else:
+                n = counts.get(name, 0)
+                result[name] = round(sums[name] / n, 1) if n else 0.0
+        return result
+
+    async def run(self, db: AsyncSession, org_id: UUID, *where) -> dict:
+        """Compute (or fetch cached) stats for *org_id*.
+
+        Extra *where* filters narrow this one call; such results are not
+        cached, since the cache key covers the whole org.
+        """
+        cacheable = self.ttl and not where
+        if cacheable:
+            cached = await cache.cache_get(self.cache_key(org_id))
+            if isinstance(cached, dict):
+                return cached
+        rows = (await db.execute(self.statement(org_id, *where))).all()
+        result = self._fold(rows)
+        if cacheable:
+            await cache.cache_set(self.cache_key(org_id), result, ttl=self.ttl)
+        return result
+
@@ -1,22 +1,43 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
 from app.api.v1.router import api_router
 from app.core.database import engine
+from app.core.dependencies import SUPER_ADMIN, RoleChecker
 
 settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from app.collectors import aws_client, http_client
+    from app.core import security
     from app.core.scheduler import start_scheduler, stop_scheduler
+    from app.services import agent_queue, audit_log_service, collection_service, embedding_service
 
+    if settings.EMBEDDING_WARMUP_ON_STARTUP:
+        await asyncio.to_thread(embedding_service.warm_up)
+
+    await collection_service.recover_stale_jobs()
     await start_scheduler()
+    worker = None
+    if settings.AGENT_QUEUE_MODE == "embedded":
+        worker = agent_queue.AgentWorker()
+        await worker.start()
     yield
+    if worker is not None:
+        await worker.stop()
+    await collection_service.shutdown()
+    await audit_log_service.shutdown()
     await stop_scheduler()
+    embedding_service.shutdown()
+    aws_client.shutdown()
+    await http_client.aclose_all()
+    await security.aclose()
     await engine.dispose()
 
 
@@ -54,3 +75,28 @@ async def health_ready():
         return {"status": "ready", "database": "ok"}
     except Exception as e:
         return {"status": "not_ready", "database": str(e)}
+
+
+# Process-wide counters across all orgs: super admins only
+@app.get("/health/metrics", dependencies=[Depends(RoleChecker(SUPER_ADMIN))])
+async def health_metrics():
+    from app.collectors import aws_client, http_client, prowler_orchestrator
+    from app.core import principals, scheduler, security
+    from app.services import (
+        agent_queue, audit_log_service, catalog_service, collection_service, embedding_service,
+    )
+
+    return {
+        "embedding_query_cache": embedding_service.get_query_cache_stats(),
+        "embedding_inference": embedding_service.get_inference_stats(),
+        "agent_worker": agent_queue.local_worker_stats(),
+        "collection_runner": collection_service.runner_stats(),
+        "aws_client": aws_client.get_stats(),
+        "collector_http": http_client.get_stats(),
+        "prowler_shards": prowler_orchestrator.get_stats(),
+        "scheduler": scheduler.get_stats(),
+        "auth": security.get_stats(),
+        "principals": principals.get_stats(),
+        "audit_log": audit_log_service.get_buffer_stats(),
+        "catalog": catalog_service.get_stats(),
+    }
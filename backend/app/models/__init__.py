@@ -11,15 +11,19 @@ from app.models.evidence_template import EvidenceTemplate
 from app.models.control_template_evidence_template import control_template_evidence_templates
 from app.models.control import Control
 from app.models.control_framework_mapping import ControlFrameworkMapping
+from app.models.coverage_index import (
+    ControlCoverage, CoverageIndexState, FrameworkCoverage, RequirementCoverage,
+)
 from app.models.evidence import Evidence
 from app.models.agent_run import AgentRun
-from app.models.audit_log import AuditLog
+from app.models.audit_log import AuditLog, AuditLogArchive, AuditLogDailyCount
 from app.models.policy_template import PolicyTemplate
 from app.models.policy import Policy
 from app.models.risk import Risk
 from app.models.risk_control_mapping import RiskControlMapping
 from app.models.integration import Integration
 from app.models.collection_job import CollectionJob
+from app.models.prowler_finding import ProwlerFindingChange, ProwlerFindingRecord, ProwlerScanDiff
 from app.models.audit import Audit
 from app.models.audit_finding import AuditFinding
 from app.models.auditor_access_token import AuditorAccessToken
@@ -47,15 +51,24 @@ __all__ = [
     "control_template_evidence_templates",
     "Control",
     "ControlFrameworkMapping",
+    "ControlCoverage",
+    "RequirementCoverage",
+    "FrameworkCoverage",
+    "CoverageIndexState",
     "Evidence",
     "AgentRun",
     "AuditLog",
+    "AuditLogArchive",
+    "AuditLogDailyCount",
     "PolicyTemplate",
     "Policy",
     "Risk",
     "RiskControlMapping",
     "Integration",
     "CollectionJob",
+    "ProwlerFindingChange",
+    "ProwlerFindingRecord",
+    "ProwlerScanDiff",
     "Audit",
     "AuditFinding",
     "AuditorAccessToken",
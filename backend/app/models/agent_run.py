@@ -22,6 +22,11 @@ class AgentRun(BaseModel):
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     tokens_used: Mapped[int | None] = mapped_column(Integer)
+    # Job-queue bookkeeping (see app.services.agent_queue)
+    worker_id: Mapped[str | None] = mapped_column(String(255))
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
 
     organization = relationship("Organization", back_populates="agent_runs")
     controls = relationship("Control", back_populates="agent_run", lazy="selectin")
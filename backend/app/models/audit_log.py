@@ -1,18 +1,14 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import DateTime, String, func
+from sqlalchemy import Date, DateTime, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
 from app.models.base import GUID, JSONType
 
 
-class AuditLog(Base):
-    """Append-only audit log table. No updates or deletes."""
-
-    __tablename__ = "audit_logs"
-
+class _AuditLogColumns:
     id: Mapped[uuid.UUID] = mapped_column(
         GUID(), primary_key=True, default=uuid.uuid4
     )
@@ -27,3 +23,40 @@ class AuditLog(Base):
     timestamp: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+
+class AuditLog(_AuditLogColumns, Base):
+    """Append-only audit log table. No updates or deletes.
+
+    Holds the hot window only; older entries are moved to
+    ``audit_logs_archive`` (see ``audit_log_service.archive_audit_logs``).
+    """
+
+    __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_org_timestamp", "org_id", "timestamp"),
+        Index("ix_audit_logs_timestamp", "timestamp"),
+    )
+
+
+class AuditLogArchive(_AuditLogColumns, Base):
+    """Cold audit log entries, moved here unchanged from ``audit_logs``."""
+
+    __tablename__ = "audit_logs_archive"
+    __table_args__ = (
+        Index("ix_audit_logs_archive_org_timestamp", "org_id", "timestamp"),
+    )
+
+
+class AuditLogDailyCount(Base):
+    """Entries per org, day, action and entity type, maintained as entries are
+    written. Stats read this instead of scanning the log, and it survives
+    archiving."""
+
+    __tablename__ = "audit_log_daily_counts"
+
+    org_id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    action: Mapped[str] = mapped_column(String(100), primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(100), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
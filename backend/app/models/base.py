@@ -2,7 +2,8 @@ import json
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, String, Text, func
+import numpy as np
+from sqlalchemy import DateTime, LargeBinary, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.types import TypeDecorator, CHAR
 
@@ -67,6 +68,44 @@ class JSONType(TypeDecorator):
         return value
 
 
+class VectorType(TypeDecorator):
+    """Platform-independent float vector type. Uses pgvector's ``vector(n)`` on PostgreSQL,
+    packed little-endian float32 (or float16) bytes on SQLite. Values are plain ``list[float]``."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, dimensions: int | None = None, dtype: str = "float32"):
+        super().__init__()
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.dimensions = dimensions
+        self.dtype = dtype
+        self._np_dtype = np.dtype("<f4" if dtype == "float32" else "<f2")
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from pgvector.sqlalchemy import Vector
+            return dialect.type_descriptor(Vector(self.dimensions))
+        else:
+            return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        if dialect.name == "postgresql":
+            return value
+        return np.asarray(value, dtype=self._np_dtype).tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return np.frombuffer(value, dtype=self._np_dtype).astype(np.float32).tolist()
+        if isinstance(value, str):
+            return json.loads(value)
+        return np.asarray(value, dtype=np.float32).tolist()
+
+
 class BaseModel(Base):
     __abstract__ = True
 
@@ -0,0 +1,63 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.base import GUID, JSONType
+
+
+class ControlCoverage(Base):
+    """Control → frameworks adjacency of an org's coverage index.
+
+    Maintained by ``coverage_index_service``; one row per control.
+    """
+
+    __tablename__ = "control_coverage"
+    __table_args__ = (
+        Index("ix_control_coverage_org_count", "org_id", "framework_count", "control_id"),
+    )
+
+    control_id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True)
+    org_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    framework_ids: Mapped[list] = mapped_column(JSONType(), default=list)
+    framework_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class RequirementCoverage(Base):
+    """Requirement → controls adjacency: the org's controls mapped to a requirement."""
+
+    __tablename__ = "requirement_coverage"
+    __table_args__ = (
+        Index("ix_requirement_coverage_org_framework", "org_id", "framework_id"),
+    )
+
+    org_id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True)
+    requirement_id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True)
+    framework_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    control_ids: Mapped[list] = mapped_column(JSONType(), default=list)
+    control_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    implemented_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class FrameworkCoverage(Base):
+    """Per-framework counters of an org's coverage index."""
+
+    __tablename__ = "framework_coverage"
+
+    org_id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True)
+    framework_id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True)
+    mapped_controls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    implemented_controls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    covered_requirements: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    partial_requirements: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class CoverageIndexState(Base):
+    """Marks an org's coverage index as built; it is kept current from then on."""
+
+    __tablename__ = "coverage_index_state"
+
+    org_id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True)
+    built_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
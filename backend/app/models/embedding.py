@@ -1,7 +1,7 @@
 """Vector embeddings model for semantic search in agent memory.
 
-Uses a JSON-serialized float array for SQLite compatibility.
-On PostgreSQL with pgvector, swap JSONType for Vector(dimensions).
+Vectors use ``VectorType``: packed float32 bytes on SQLite and a native
+pgvector ``vector(384)`` column on PostgreSQL.
 """
 
 import uuid
@@ -9,7 +9,7 @@ import uuid
 from sqlalchemy import ForeignKey, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.models.base import BaseModel, GUID, JSONType
+from app.models.base import BaseModel, GUID, VectorType
 
 
 class Embedding(BaseModel):
@@ -25,8 +25,8 @@ class Embedding(BaseModel):
     content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     text_content: Mapped[str] = mapped_column(Text, nullable=False)
     vector: Mapped[list | None] = mapped_column(
-        JSONType(), default=list
-    )  # float[] stored as JSON; use pgvector in prod
+        VectorType(384), default=list
+    )  # float32 bytes on SQLite, pgvector on PostgreSQL
     dimensions: Mapped[int] = mapped_column(Integer, default=384)
     model_name: Mapped[str] = mapped_column(
         String(100), default="all-MiniLM-L6-v2"
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel, GUID, JSONType
@@ -35,6 +35,10 @@ class MonitorRule(BaseModel):
 
 class MonitorAlert(BaseModel):
     __tablename__ = "monitor_alerts"
+    __table_args__ = (
+        # Keyset pagination: newest first on (created_at, id) within an org
+        Index("ix_monitor_alerts_org_created_id", "org_id", "created_at", "id"),
+    )
 
     org_id: Mapped[uuid.UUID] = mapped_column(
         GUID(), ForeignKey("organizations.id"), nullable=False
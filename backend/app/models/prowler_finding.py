@@ -0,0 +1,96 @@
+import uuid
+
+from sqlalchemy import ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel, GUID, JSONType
+
+
+class ProwlerFindingRecord(BaseModel):
+    """One normalized Prowler check result, streamed in from a scan's output.
+
+    ``seq`` is the finding's position within its scan, giving a stable order
+    for paging. ``status`` is stored upper-case and ``severity`` lower-case
+    so filters can compare them directly. ``fingerprint`` identifies the same
+    check on the same resource across scans (see ``finding_fingerprint``).
+    """
+    __tablename__ = "prowler_findings"
+    __table_args__ = (
+        Index("ix_prowler_findings_job_seq", "job_id", "seq", unique=True),
+        Index("ix_prowler_findings_job_status_severity", "job_id", "status", "severity"),
+        Index("ix_prowler_findings_job_service", "job_id", "service"),
+        Index("ix_prowler_findings_job_fingerprint", "job_id", "fingerprint"),
+    )
+
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("organizations.id"), nullable=False
+    )
+    job_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("collection_jobs.id", ondelete="CASCADE"), nullable=False
+    )
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    fingerprint: Mapped[str] = mapped_column(String(64), default="")
+    check_id: Mapped[str] = mapped_column(String(255), default="")
+    check_title: Mapped[str] = mapped_column(String(1000), default="")
+    status: Mapped[str] = mapped_column(String(20), default="")  # PASS, FAIL, MANUAL
+    severity: Mapped[str] = mapped_column(String(20), default="")  # critical, high, medium, low, informational
+    service: Mapped[str] = mapped_column(String(100), default="")
+    region: Mapped[str] = mapped_column(String(50), default="")
+    resource_id: Mapped[str] = mapped_column(String(1000), default="")
+    resource_arn: Mapped[str] = mapped_column(String(2048), default="")
+    status_extended: Mapped[str] = mapped_column(Text, default="")
+    risk: Mapped[str] = mapped_column(Text, default="")
+    remediation: Mapped[str] = mapped_column(Text, default="")
+    compliance: Mapped[dict | None] = mapped_column(JSONType(), default=dict)
+
+
+class ProwlerScanDiff(BaseModel):
+    """Failing-finding delta between a scan and the previous scan of the same kind.
+
+    "Previous" is the latest earlier completed job with the same integration
+    and collector type. Counts are kept per severity for trend queries; the
+    individual new and resolved findings are in ``ProwlerFindingChange``.
+    """
+    __tablename__ = "prowler_scan_diffs"
+
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("organizations.id"), nullable=False, index=True
+    )
+    job_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("collection_jobs.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    previous_job_id: Mapped[uuid.UUID | None] = mapped_column(
+        GUID(), ForeignKey("collection_jobs.id", ondelete="SET NULL")
+    )
+    integration_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    collector_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    new_count: Mapped[int] = mapped_column(Integer, default=0)
+    resolved_count: Mapped[int] = mapped_column(Integer, default=0)
+    persisting_count: Mapped[int] = mapped_column(Integer, default=0)
+    new_by_severity: Mapped[dict | None] = mapped_column(JSONType(), default=dict)
+    resolved_by_severity: Mapped[dict | None] = mapped_column(JSONType(), default=dict)
+    failing_by_severity: Mapped[dict | None] = mapped_column(JSONType(), default=dict)
+
+
+class ProwlerFindingChange(BaseModel):
+    """A failing finding that appeared (``new``) or went away (``resolved``) in a scan."""
+    __tablename__ = "prowler_finding_changes"
+    __table_args__ = (
+        Index("ix_prowler_finding_changes_job_change_severity", "job_id", "change", "severity"),
+    )
+
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("organizations.id"), nullable=False
+    )
+    job_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("collection_jobs.id", ondelete="CASCADE"), nullable=False
+    )
+    change: Mapped[str] = mapped_column(String(20), nullable=False)  # new, resolved
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    check_id: Mapped[str] = mapped_column(String(255), default="")
+    check_title: Mapped[str] = mapped_column(String(1000), default="")
+    severity: Mapped[str] = mapped_column(String(20), default="")
+    service: Mapped[str] = mapped_column(String(100), default="")
+    region: Mapped[str] = mapped_column(String(50), default="")
+    resource_id: Mapped[str] = mapped_column(String(1000), default="")
+    resource_arn: Mapped[str] = mapped_column(String(2048), default="")
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PaginationParams(BaseModel):
@@ -14,10 +14,27 @@ class PaginationParams(BaseModel):
 
 class PaginatedResponse(BaseModel):
     items: list
-    total: int
-    page: int
+    total: int | None = None
+    page: int | None = None
     page_size: int
-    total_pages: int
+    total_pages: int | None = None
+    next_cursor: str | None = Field(
+        default=None, description="Pass as ?cursor= to fetch the next page; null on the last page"
+    )
+    total_is_estimate: bool = False
+
+    @classmethod
+    def from_page(cls, page, items: list) -> "PaginatedResponse":
+        """Build from a ``app.core.pagination.Page`` with already-serialized *items*."""
+        return cls(
+            items=items,
+            total=page.total,
+            page=page.page,
+            page_size=page.page_size,
+            total_pages=page.total_pages,
+            next_cursor=page.next_cursor,
+            total_is_estimate=page.total_is_estimate,
+        )
 
 
 class ErrorResponse(BaseModel):
@@ -39,6 +39,14 @@ class CollectionTrigger(BaseModel):
     control_id: UUID | None = None
 
 
+class CollectionBatchItem(CollectionTrigger):
+    integration_id: UUID
+
+
+class CollectionBatchTrigger(BaseModel):
+    items: list[CollectionBatchItem] = Field(..., min_length=1, max_length=100)
+
+
 class CollectionJobResponse(BaseModel):
     id: UUID
     org_id: UUID
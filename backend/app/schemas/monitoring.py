@@ -62,6 +62,23 @@ class MonitorAlertUpdate(BaseModel):
     status: str | None = None  # acknowledged, resolved
 
 
+class MonitorRuleEvaluation(BaseModel):
+    rule_id: UUID
+    check_type: str
+    result: str
+    alert_id: UUID | None = None
+    elapsed_ms: float = 0.0
+    batch_size: int = 1
+
+
+class MonitorEvaluationReport(BaseModel):
+    rules_evaluated: int = 0
+    alerts_created: int = 0
+    elapsed_ms: float = 0.0
+    evaluations: list[MonitorRuleEvaluation] = []
+    alerts: list[MonitorAlertResponse] = []
+
+
 class MonitoringStatsResponse(BaseModel):
     total_rules: int = 0
     active_rules: int = 0
@@ -7,6 +7,7 @@ class ProwlerScanTrigger(BaseModel):
     scan_type: str = Field(default="full", description="full | service | compliance")
     services: list[str] | None = Field(default=None, description="Services to scan (for service scan type)")
     compliance_framework: str | None = Field(default=None, description="Framework ID (for compliance scan type)")
+    regions: list[str] | None = Field(default=None, description="Regions to scan, one shard each (default: all regions)")
 
 
 class ProwlerFinding(BaseModel):
@@ -35,6 +36,49 @@ class ProwlerScanResultResponse(BaseModel):
     pass_rate: float = 0.0
     created_at: str | None = None
     findings: list[ProwlerFinding] = Field(default_factory=list)
+    next_cursor: int | None = Field(default=None, description="Pass as ?cursor= to fetch the next page of findings")
+
+
+class ProwlerFindingPage(BaseModel):
+    items: list[ProwlerFinding] = Field(default_factory=list)
+    next_cursor: int | None = None
+
+
+class ProwlerFindingCount(BaseModel):
+    key: str
+    count: int
+
+
+class ProwlerFindingCounts(BaseModel):
+    group_by: str
+    total: int = 0
+    counts: list[ProwlerFindingCount] = Field(default_factory=list)
+
+
+class ProwlerFindingChangeItem(BaseModel):
+    change: str
+    fingerprint: str
+    check_id: str = ""
+    check_title: str = ""
+    severity: str = ""
+    service: str = ""
+    region: str = ""
+    resource_id: str = ""
+    resource_arn: str = ""
+
+
+class ProwlerScanDiffResponse(BaseModel):
+    job_id: str
+    previous_job_id: str | None = None
+    collector_type: str
+    new_count: int = 0
+    resolved_count: int = 0
+    persisting_count: int = 0
+    new_by_severity: dict[str, int] = Field(default_factory=dict)
+    resolved_by_severity: dict[str, int] = Field(default_factory=dict)
+    failing_by_severity: dict[str, int] = Field(default_factory=dict)
+    created_at: str | None = None
+    changes: list[ProwlerFindingChangeItem] = Field(default_factory=list)
 
 
 class ComplianceFrameworkPosture(BaseModel):
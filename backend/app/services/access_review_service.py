@@ -5,6 +5,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundError
+from app.core.stats import StatsQuery
 from app.models.access_review import AccessReviewCampaign, AccessReviewEntry
 from app.schemas.access_review import (
     AccessReviewCampaignCreate, AccessReviewCampaignUpdate,
@@ -169,22 +170,25 @@ async def update_entry(
 
 # === Stats ===
 
-async def get_access_review_stats(db: AsyncSession, org_id: UUID) -> dict:
-    campaigns_result = await db.execute(
-        select(AccessReviewCampaign).where(AccessReviewCampaign.org_id == org_id)
-    )
-    campaigns = list(campaigns_result.scalars().all())
+_CAMPAIGN_STATS = StatsQuery(AccessReviewCampaign, "access_review_campaign_stats").count(
+    "active", AccessReviewCampaign.status == "active"
+)
+_ENTRY_STATS = (
+    StatsQuery(AccessReviewEntry, "access_review_entry_stats")
+    .count("pending", AccessReviewEntry.decision.is_(None))
+    .count("approved", AccessReviewEntry.decision == "approved")
+    .count("revoked", AccessReviewEntry.decision == "revoked")
+)
 
-    entries_result = await db.execute(
-        select(AccessReviewEntry).where(AccessReviewEntry.org_id == org_id)
-    )
-    entries = list(entries_result.scalars().all())
 
+async def get_access_review_stats(db: AsyncSession, org_id: UUID) -> dict:
+    campaigns = await _CAMPAIGN_STATS.run(db, org_id)
+    entries = await _ENTRY_STATS.run(db, org_id)
     return {
-        "total_campaigns": len(campaigns),
-        "active_campaigns": sum(1 for c in campaigns if c.status == "active"),
-        "total_entries": len(entries),
-        "pending_decisions": sum(1 for e in entries if e.decision is None),
-        "approved": sum(1 for e in entries if e.decision == "approved"),
-        "revoked": sum(1 for e in entries if e.decision == "revoked"),
+        "total_campaigns": campaigns["total"],
+        "active_campaigns": campaigns["active"],
+        "total_entries": entries["total"],
+        "pending_decisions": entries["pending"],
+        "approved": entries["approved"],
+        "revoked": entries["revoked"],
     }
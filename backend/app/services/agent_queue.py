@@ -0,0 +1,477 @@
+"""Durable job queue for agent runs, backed by the ``agent_runs`` table.
+
+API handlers only ``enqueue`` a ``pending`` row. ``AgentWorker`` instances —
+embedded in the API process (``AGENT_QUEUE_MODE=embedded``) or started
+separately with ``python -m app.worker`` — claim pending rows, run the
+agent, and hold a lease on each row that they renew with a heartbeat.
+
+* Claims are conditional UPDATEs (``WHERE status = 'pending'``), so a row is
+  only ever owned by one worker.
+* Global and per-org limits are checked against the worker-claimed
+  ``running`` rows in the database at claim time, so they hold across
+  processes and pods. Workers
+  claiming at the same instant may overshoot by at most one claim cycle.
+* Rows left ``running`` by a dead worker stop heart-beating; once their
+  lease expires any worker puts them back to ``pending`` (or ``failed`` after
+  ``AGENT_QUEUE_MAX_ATTEMPTS``). Runs executed inline without a worker
+  (onboarding) are left alone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.models.agent_run import AgentRun
+
+logger = logging.getLogger(__name__)
+
+Runner = Callable[[AsyncSession, AgentRun], Awaitable[dict]]
+
+RUNNERS: dict[str, Runner] = {}
+
+
+def runner(agent_type: str) -> Callable[[Runner], Runner]:
+    """Register the coroutine that executes runs of *agent_type*."""
+    def decorator(fn: Runner) -> Runner:
+        RUNNERS[agent_type] = fn
+        return fn
+    return decorator
+
+
+@runner("controls_generation")
+async def _run_controls_generation(db: AsyncSession, run: AgentRun) -> dict:
+    from app.agents.controls_generation.graph import run_controls_generation
+
+    return await run_controls_generation(
+        db=db, org_id=str(run.org_id), agent_run_id=str(run.id),
+        framework_id=run.input_data["framework_id"],
+        company_context=run.input_data.get("company_context", {}),
+    )
+
+
+@runner("policy_generation")
+async def _run_policy_generation(db: AsyncSession, run: AgentRun) -> dict:
+    from app.agents.policy_generation.graph import run_policy_generation
+
+    return await run_policy_generation(
+        db=db, org_id=str(run.org_id), agent_run_id=str(run.id),
+        framework_id=run.input_data["framework_id"],
+        company_context=run.input_data.get("company_context", {}),
+    )
+
+
+@runner("evidence_generation")
+async def _run_evidence_generation(db: AsyncSession, run: AgentRun) -> dict:
+    from app.agents.evidence_generation.graph import run_evidence_generation
+
+    return await run_evidence_generation(
+        db=db, org_id=str(run.org_id), agent_run_id=str(run.id),
+        company_context=run.input_data.get("company_context", {}),
+    )
+
+
+@runner("risk_assessment")
+async def _run_risk_assessment(db: AsyncSession, run: AgentRun) -> dict:
+    from app.agents.risk_assessment.graph import run_risk_assessment
+
+    return await run_risk_assessment(
+        db=db, org_id=str(run.org_id), agent_run_id=str(run.id),
+        framework_id=run.input_data.get("framework_id"),
+    )
+
+
+@runner("remediation")
+async def _run_remediation(db: AsyncSession, run: AgentRun) -> dict:
+    from app.agents.remediation.graph import run_remediation
+
+    return await run_remediation(db=db, org_id=str(run.org_id), agent_run_id=str(run.id))
+
+
+@runner("audit_preparation")
+async def _run_audit_preparation(db: AsyncSession, run: AgentRun) -> dict:
+    from app.agents.audit_preparation.graph import run_audit_preparation
+
+    return await run_audit_preparation(
+        db=db, org_id=str(run.org_id), agent_run_id=str(run.id),
+        audit_id=run.input_data.get("audit_id"),
+    )
+
+
+@runner("vendor_risk_assessment")
+async def _run_vendor_risk_assessment(db: AsyncSession, run: AgentRun) -> dict:
+    from app.agents.vendor_risk_assessment.graph import run_vendor_risk_assessment
+
+    return await run_vendor_risk_assessment(
+        db=db, org_id=str(run.org_id), agent_run_id=str(run.id),
+        vendor_id=run.input_data.get("vendor_id"),
+    )
+
+
+@runner("pentest_orchestrator")
+async def _run_pentest_orchestrator(db: AsyncSession, run: AgentRun) -> dict:
+    from app.agents.pentest_orchestrator.graph import run_pentest_orchestrator
+
+    return await run_pentest_orchestrator(db=db, org_id=str(run.org_id), agent_run_id=str(run.id))
+
+
+@runner("monitoring_daemon")
+async def _run_monitoring_daemon(db: AsyncSession, run: AgentRun) -> dict:
+    from app.agents.monitoring_daemon.graph import run_monitoring_daemon
+
+    return await run_monitoring_daemon(db=db, org_id=str(run.org_id), agent_run_id=str(run.id))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+# Worker running in this process, if any; enqueue() wakes it up directly.
+_local_worker: AgentWorker | None = None
+
+
+async def enqueue(
+    db: AsyncSession,
+    org_id: UUID,
+    agent_type: str,
+    input_data: dict | None = None,
+    trigger: str = "manual",
+) -> AgentRun:
+    """Persist a ``pending`` agent run for a worker to pick up."""
+    run = AgentRun(
+        org_id=org_id,
+        agent_type=agent_type,
+        trigger=trigger,
+        status="pending",
+        input_data=input_data or {},
+    )
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+    if _local_worker is not None:
+        _local_worker.wake()
+    return run
+
+
+async def queue_metrics(db: AsyncSession, org_id: UUID | None = None) -> dict:
+    """Queue depth, running count and age of the oldest pending run."""
+    q = select(
+        func.count().filter(AgentRun.status == "pending").label("pending"),
+        func.count().filter(AgentRun.status == "running").label("running"),
+        func.min(AgentRun.created_at).filter(AgentRun.status == "pending").label("oldest"),
+    ).select_from(AgentRun)
+    if org_id is not None:
+        q = q.where(AgentRun.org_id == org_id)
+    row = (await db.execute(q)).one()
+    oldest = _as_utc(row.oldest)
+    return {
+        "pending": row.pending or 0,
+        "running": row.running or 0,
+        "oldest_pending_age_seconds": (
+            round((_now() - oldest).total_seconds(), 1) if oldest else 0.0
+        ),
+    }
+
+
+def local_worker_stats() -> dict | None:
+    return _local_worker.stats() if _local_worker is not None else None
+
+
+class AgentWorker:
+    """Claims and executes queued agent runs with bounded concurrency."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker | None = None,
+        *,
+        worker_id: str | None = None,
+        concurrency: int | None = None,
+        global_limit: int | None = None,
+        per_org_limit: int | None = None,
+        lease_seconds: int | None = None,
+        poll_seconds: float | None = None,
+        max_attempts: int | None = None,
+    ):
+        settings = get_settings()
+        if session_factory is None:
+            from app.core.database import async_session
+
+            session_factory = async_session
+        self.session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency or settings.AGENT_WORKER_CONCURRENCY
+        self.global_limit = global_limit or settings.AGENT_QUEUE_GLOBAL_CONCURRENCY
+        self.per_org_limit = per_org_limit or settings.AGENT_QUEUE_PER_ORG_CONCURRENCY
+        self.lease_seconds = lease_seconds or settings.AGENT_QUEUE_LEASE_SECONDS
+        self.poll_seconds = poll_seconds or settings.AGENT_QUEUE_POLL_SECONDS
+        self.max_attempts = max_attempts or settings.AGENT_QUEUE_MAX_ATTEMPTS
+
+        self._tasks: dict[UUID, asyncio.Task] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._loop_task: asyncio.Task | None = None
+        self.claimed = 0
+        self.completed = 0
+        self.failed = 0
+        self.recovered = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    # -- lifecycle -----------------------------------------------------------
+
+    async def start(self) -> None:
+        """Run the claim loop in the background of the current event loop."""
+        global _local_worker
+        _local_worker = self
+        self._loop_task = asyncio.create_task(self.run_forever())
+        logger.info("Agent worker %s started", self.worker_id)
+
+    async def stop(self) -> None:
+        """Stop claiming, cancel in-flight runs and hand them back to the queue."""
+        global _local_worker
+        if _local_worker is self:
+            _local_worker = None
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(AgentRun)
+                    .where(AgentRun.worker_id == self.worker_id, AgentRun.status == "running")
+                    .values(status="pending", worker_id=None, lease_expires_at=None)
+                )
+                await db.commit()
+        except Exception as exc:
+            logger.warning("Agent worker %s could not release its runs: %s", self.worker_id, exc)
+        logger.info("Agent worker %s stopped", self.worker_id)
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run_forever(self) -> None:
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("Agent worker %s poll failed: %s", self.worker_id, exc)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # -- queue operations ----------------------------------------------------
+
+    async def run_once(self) -> list[UUID]:
+        """Recover orphaned runs, claim what limits allow and launch them."""
+        async with self.session_factory() as db:
+            await self.recover_orphans(db)
+            claimed = await self.claim(db)
+        for run_id in claimed:
+            task = asyncio.create_task(self._execute(run_id))
+            self._tasks[run_id] = task
+            task.add_done_callback(lambda _t, rid=run_id: self._on_done(rid))
+        return claimed
+
+    def _on_done(self, run_id: UUID) -> None:
+        self._tasks.pop(run_id, None)
+        self.wake()
+
+    async def recover_orphans(self, db: AsyncSession) -> int:
+        """Requeue (or fail) worker-claimed ``running`` rows whose lease has expired.
+
+        Rows without a ``worker_id`` are executed inline by their creator
+        (e.g. the onboarding pipeline) and hold no lease; they are never
+        recovered, or a worker would run them a second time.
+        """
+        now = _now()
+        expired = and_(
+            AgentRun.worker_id.is_not(None),
+            or_(
+                AgentRun.lease_expires_at < now,
+                and_(
+                    AgentRun.lease_expires_at.is_(None),
+                    AgentRun.started_at < now - timedelta(seconds=self.lease_seconds),
+                ),
+            ),
+        )
+        failed = await db.execute(
+            update(AgentRun)
+            .where(AgentRun.status == "running", expired, AgentRun.attempts >= self.max_attempts)
+            .values(
+                status="failed",
+                worker_id=None,
+                lease_expires_at=None,
+                completed_at=now,
+                error_message="Worker lease expired too many times",
+            )
+        )
+        requeued = await db.execute(
+            update(AgentRun)
+            .where(AgentRun.status == "running", expired)
+            .values(status="pending", worker_id=None, lease_expires_at=None)
+        )
+        await db.commit()
+        count = (requeued.rowcount or 0) + (failed.rowcount or 0)
+        if count:
+            self.recovered += count
+            logger.warning(
+                "Recovered %d orphaned agent run(s) (%d requeued, %d failed)",
+                count, requeued.rowcount or 0, failed.rowcount or 0,
+            )
+        return count
+
+    async def claim(self, db: AsyncSession) -> list[UUID]:
+        slots = self.concurrency - len(self._tasks)
+        if slots <= 0:
+            return []
+
+        # Only worker-claimed runs hold a slot; an inline run orphaned by a
+        # crashed process would otherwise take one forever
+        running = dict(
+            (await db.execute(
+                select(AgentRun.org_id, func.count())
+                .where(AgentRun.status == "running", AgentRun.worker_id.is_not(None))
+                .group_by(AgentRun.org_id)
+            )).all()
+        )
+        slots = min(slots, self.global_limit - sum(running.values()))
+        if slots <= 0:
+            return []
+
+        candidates = (await db.execute(
+            select(AgentRun.id, AgentRun.org_id, AgentRun.created_at)
+            .where(AgentRun.status == "pending")
+            .order_by(AgentRun.created_at, AgentRun.id)
+            .limit(max(slots * 4, 50))
+        )).all()
+
+        now = _now()
+        claimed: list[UUID] = []
+        for run_id, org_id, created_at in candidates:
+            if len(claimed) >= slots:
+                break
+            if running.get(org_id, 0) >= self.per_org_limit:
+                continue
+            result = await db.execute(
+                update(AgentRun)
+                .where(AgentRun.id == run_id, AgentRun.status == "pending")
+                .values(
+                    status="running",
+                    worker_id=self.worker_id,
+                    started_at=now,
+                    heartbeat_at=now,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                    attempts=func.coalesce(AgentRun.attempts, 0) + 1,
+                )
+            )
+            if result.rowcount != 1:
+                continue  # another worker got there first
+            running[org_id] = running.get(org_id, 0) + 1
+            claimed.append(run_id)
+            wait = (now - _as_utc(created_at)).total_seconds() if created_at else 0.0
+            self.wait_seconds_total += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        await db.commit()
+        self.claimed += len(claimed)
+        return claimed
+
+    async def _heartbeat(self, run_id: UUID) -> None:
+        interval = max(self.lease_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self.session_factory() as db:
+                    now = _now()
+                    await db.execute(
+                        update(AgentRun)
+                        .where(
+                            AgentRun.id == run_id,
+                            AgentRun.worker_id == self.worker_id,
+                            AgentRun.status == "running",
+                        )
+                        .values(
+                            heartbeat_at=now,
+                            lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                        )
+                    )
+                    await db.commit()
+            except Exception as exc:
+                logger.warning("Heartbeat for agent run %s failed: %s", run_id, exc)
+
+    async def _execute(self, run_id: UUID) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(run_id))
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as db:
+                run = await db.get(AgentRun, run_id)
+                if run is None:
+                    return
+                agent_type = run.agent_type
+                values: dict
+                try:
+                    agent = RUNNERS.get(agent_type)
+                    if agent is None:
+                        raise ValueError(f"Unknown agent type: {agent_type}")
+                    result = await agent(db, run)
+                    values = {"status": "completed", "output_data": result}
+                    self.completed += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    await db.rollback()
+                    values = {"status": "failed", "error_message": str(e)}
+                    self.failed += 1
+                await db.execute(
+                    update(AgentRun)
+                    .where(AgentRun.id == run_id, AgentRun.worker_id == self.worker_id)
+                    .values(completed_at=_now(), lease_expires_at=None, **values)
+                )
+                await db.commit()
+                logger.info(
+                    "Agent run %s (%s) %s in %.1fs",
+                    run_id, agent_type, values["status"], time.perf_counter() - started,
+                )
+        finally:
+            heartbeat.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "in_flight": len(self._tasks),
+            "concurrency": self.concurrency,
+            "claimed": self.claimed,
+            "completed": self.completed,
+            "failed": self.failed,
+            "recovered": self.recovered,
+            "avg_wait_seconds": (
+                round(self.wait_seconds_total / self.claimed, 2) if self.claimed else 0.0
+            ),
+            "max_wait_seconds": round(self.max_wait_seconds, 2),
+        }
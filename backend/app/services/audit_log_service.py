@@ -2,18 +2,216 @@
 
 The AuditLog model already exists; this service provides the query and
 creation API, plus a helper that API routes can call after mutations.
+
+Writes go through one of two modes (``AUDIT_LOG_MODE``):
+
+- ``transactional`` (default): entries are added to the caller's session
+  and commit (or roll back) with the business transaction.
+- ``buffered`` (opt-in): entries are queued in process and written
+  behind the request in bulk inserts, every ``AUDIT_LOG_FLUSH_INTERVAL_MS``
+  or as soon as ``AUDIT_LOG_BATCH_SIZE`` entries are waiting. Entries still
+  queued when the process dies are lost, and entries are written even if the
+  business transaction rolls back. When a bulk insert fails, its entries are
+  retried one by one so a bad entry cannot hold back the rest; one that keeps
+  failing is written to the ``app.audit.dead_letter`` log.
+
+Either way ``audit_log_daily_counts`` is kept up to date alongside the
+entries, so stats are grouped sums over a small summary table. Entries older
+than ``AUDIT_LOG_HOT_DAYS`` are moved to ``audit_logs_archive`` by a daily
+scheduler job, keeping the hot table small.
 """
 
+import asyncio
+import json
 import logging
-from datetime import datetime, timezone
+import uuid
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from app.models.audit_log import AuditLog
+from app.config import get_settings
+from app.core.pagination import CountMode, Page, paginate
+from app.core.stats import StatsQuery
+from app.models.audit_log import AuditLog, AuditLogArchive, AuditLogDailyCount
 
 logger = logging.getLogger(__name__)
+dead_letter_logger = logging.getLogger("app.audit.dead_letter")
+settings = get_settings()
+
+# Cap on the retry delay, which doubles with each flush that writes nothing
+_MAX_RETRY_DELAY = 60.0
+
+_COLUMNS = (
+    "id", "org_id", "actor_type", "actor_id", "action", "entity_type", "entity_id",
+    "changes", "ip_address", "timestamp",
+)
+
+
+async def _add_daily_counts(db: AsyncSession, rows: list[dict]) -> None:
+    """Upsert the per-day counts for *rows* in *db*'s transaction."""
+    counts: dict[tuple, int] = {}
+    for row in rows:
+        key = (row["org_id"], row["timestamp"].date(), row["action"], row["entity_type"])
+        counts[key] = counts.get(key, 0) + 1
+
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    stmt = upsert(AuditLogDailyCount)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["org_id", "day", "action", "entity_type"],
+        set_={"count": AuditLogDailyCount.count + stmt.excluded["count"]},
+    )
+    await db.execute(stmt, [
+        {"org_id": org_id, "day": day, "action": action, "entity_type": entity_type, "count": n}
+        for (org_id, day, action, entity_type), n in counts.items()
+    ])
+
+
+async def _write_rows(engine: AsyncEngine, rows: list[dict]) -> None:
+    async with AsyncSession(engine) as session:
+        await session.execute(insert(AuditLog), rows)
+        await _add_daily_counts(session, rows)
+        await session.commit()
+
+
+class AuditLogBuffer:
+    """Write-behind queue of audit rows, flushed in bulk per database engine."""
+
+    def __init__(self, batch_size: int, interval_ms: float, max_pending: int, max_attempts: int):
+        self._batch_size = batch_size
+        self._interval = interval_ms / 1000
+        self._max_pending = max_pending
+        self._max_attempts = max_attempts
+        self._attempts: dict[UUID, int] = {}
+        self._backoff = 0  # consecutive flushes that wrote nothing
+        self._pending: dict[AsyncEngine, list[dict]] = {}
+        self._pending_rows = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.dropped = 0
+        self.dead_lettered = 0
+
+    async def add(self, engine: AsyncEngine, row: dict) -> None:
+        if self._pending_rows >= self._max_pending:
+            # Writes are falling behind (or failing): push back on the caller
+            await self.flush()
+        self._pending.setdefault(engine, []).append(row)
+        self._pending_rows += 1
+        self.enqueued += 1
+
+        loop = asyncio.get_running_loop()
+        if self._pending_rows >= self._batch_size:
+            self._schedule_flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._interval, self._schedule_flush, loop)
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        task = loop.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        """Write everything queued so far."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_rows = self._pending, {}, 0
+        for engine, rows in batch.items():
+            for start in range(0, len(rows), self._batch_size):
+                chunk = rows[start:start + self._batch_size]
+                try:
+                    await _write_rows(engine, chunk)
+                except Exception:
+                    self.errors += 1
+                    logger.exception("Failed to write %d audit log entries", len(chunk))
+                    await self._write_one_by_one(engine, chunk)
+                    continue
+                self._backoff = 0
+                self.written += len(chunk)
+                self.batches += 1
+
+    async def _write_one_by_one(self, engine: AsyncEngine, rows: list[dict]) -> None:
+        """Isolate the entries that broke a bulk insert; requeue or dead-letter them."""
+        retry: list[dict] = []
+        for i, row in enumerate(rows):
+            try:
+                await _write_rows(engine, [row])
+            except Exception as exc:
+                if i == 0:
+                    # Nothing goes through: back off, the database may be down
+                    self._backoff += 1
+                    if len(rows) > 1:
+                        # As likely the database as the entry: requeue them
+                        # all, this one last, without blame
+                        retry = [*rows[1:], row]
+                        break
+                # Entries before it were written, or it is alone: count it
+                attempts = self._attempts.pop(row["id"], 0) + 1
+                if attempts >= self._max_attempts:
+                    self._dead_letter(row, exc)
+                else:
+                    self._attempts[row["id"]] = attempts
+                    retry.append(row)
+                continue
+            self._attempts.pop(row["id"], None)
+            self._backoff = 0
+            self.written += 1
+            self.batches += 1
+        if retry:
+            self._requeue(engine, retry)
+
+    def _dead_letter(self, row: dict, exc: Exception) -> None:
+        self.dead_lettered += 1
+        dead_letter_logger.error(
+            "Audit log entry could not be written (%s): %s",
+            exc, json.dumps(row, default=str, sort_keys=True),
+        )
+
+    def _requeue(self, engine: AsyncEngine, rows: list[dict]) -> None:
+        room = self._max_pending - self._pending_rows
+        if room < len(rows):
+            self.dropped += len(rows) - max(room, 0)
+            logger.error("Audit log buffer full, dropping %d entries", len(rows) - max(room, 0))
+            for row in rows[max(room, 0):]:
+                self._attempts.pop(row["id"], None)
+            rows = rows[:max(room, 0)]
+        if not rows:
+            return
+        self._pending.setdefault(engine, []).extend(rows)
+        self._pending_rows += len(rows)
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            delay = min(self._interval * 2 ** self._backoff, _MAX_RETRY_DELAY)
+            self._flush_handle = loop.call_later(delay, self._schedule_flush, loop)
+
+    def stats(self) -> dict:
+        return {
+            "mode": settings.AUDIT_LOG_MODE,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "avg_batch_size": round(self.written / self.batches, 2) if self.batches else 0.0,
+            "pending": self._pending_rows,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+_buffer = AuditLogBuffer(
+    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+    interval_ms=settings.AUDIT_LOG_FLUSH_INTERVAL_MS,
+    max_pending=settings.AUDIT_LOG_MAX_PENDING,
+    max_attempts=settings.AUDIT_LOG_MAX_ATTEMPTS,
+)
 
 
 async def log_action(
@@ -28,22 +226,43 @@ async def log_action(
     ip_address: str | None = None,
 ) -> AuditLog:
     """Create an audit log entry. Called after every mutation."""
-    entry = AuditLog(
-        org_id=org_id,
-        actor_id=str(actor_id),
-        actor_type=actor_type,
-        action=action,
-        entity_type=entity_type,
-        entity_id=str(entity_id),
-        changes=changes,
-        ip_address=ip_address,
-        timestamp=datetime.now(timezone.utc),
-    )
-    db.add(entry)
-    # Don't commit here — let the caller's transaction handle it
+    row = {
+        "id": uuid.uuid4(),
+        "org_id": org_id,
+        "actor_id": str(actor_id),
+        "actor_type": actor_type,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": str(entity_id),
+        "changes": changes,
+        "ip_address": ip_address,
+        "timestamp": datetime.now(timezone.utc),
+    }
+    entry = AuditLog(**row)
+    if settings.AUDIT_LOG_MODE == "transactional":
+        db.add(entry)
+        await _add_daily_counts(db, [row])
+        # Don't commit here — let the caller's transaction handle it
+    else:
+        from app.core.database import engine
+
+        await _buffer.add(db.bind or engine, row)
     return entry
 
 
+async def flush() -> None:
+    """Write out buffered entries now (read-your-writes for this process)."""
+    await _buffer.flush()
+
+
+def get_buffer_stats() -> dict:
+    return _buffer.stats()
+
+
+async def shutdown() -> None:
+    await _buffer.flush()
+
+
 async def list_audit_logs(
     db: AsyncSession,
     org_id: UUID,
@@ -53,43 +272,73 @@ async def list_audit_logs(
     action: str | None = None,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[AuditLog], int]:
-    base_q = select(AuditLog).where(AuditLog.org_id == org_id)
-    count_q = select(func.count()).select_from(AuditLog).where(AuditLog.org_id == org_id)
+    archived: bool = False,
+    cursor: str | None = None,
+    count: CountMode | None = None,
+) -> Page:
+    await flush()
+    model = AuditLogArchive if archived else AuditLog
+    base_q = select(model).where(model.org_id == org_id)
 
     if entity_type:
-        base_q = base_q.where(AuditLog.entity_type == entity_type)
-        count_q = count_q.where(AuditLog.entity_type == entity_type)
+        base_q = base_q.where(model.entity_type == entity_type)
     if entity_id:
-        base_q = base_q.where(AuditLog.entity_id == entity_id)
-        count_q = count_q.where(AuditLog.entity_id == entity_id)
+        base_q = base_q.where(model.entity_id == entity_id)
     if actor_id:
-        base_q = base_q.where(AuditLog.actor_id == actor_id)
-        count_q = count_q.where(AuditLog.actor_id == actor_id)
+        base_q = base_q.where(model.actor_id == actor_id)
     if action:
-        base_q = base_q.where(AuditLog.action == action)
-        count_q = count_q.where(AuditLog.action == action)
+        base_q = base_q.where(model.action == action)
 
-    total = (await db.execute(count_q)).scalar() or 0
-    q = base_q.offset((page - 1) * page_size).limit(page_size).order_by(
-        AuditLog.timestamp.desc()
+    return await paginate(
+        db, base_q, sort_column=model.timestamp, id_column=model.id,
+        page=page, page_size=page_size, cursor=cursor, count=count,
     )
-    result = await db.execute(q)
-    return list(result.scalars().all()), total
 
 
-async def get_audit_log_stats(db: AsyncSession, org_id: UUID) -> dict:
-    result = await db.execute(select(AuditLog).where(AuditLog.org_id == org_id))
-    logs = list(result.scalars().all())
+_STATS = StatsQuery(
+    AuditLogDailyCount, "audit_log_stats", weight=AuditLogDailyCount.count, ttl=0
+).group_by(by_action=AuditLogDailyCount.action, by_entity_type=AuditLogDailyCount.entity_type)
 
-    by_action: dict[str, int] = {}
-    by_entity: dict[str, int] = {}
-    for log in logs:
-        by_action[log.action] = by_action.get(log.action, 0) + 1
-        by_entity[log.entity_type] = by_entity.get(log.entity_type, 0) + 1
 
-    return {
-        "total": len(logs),
-        "by_action": by_action,
-        "by_entity_type": by_entity,
-    }
+async def get_audit_log_stats(db: AsyncSession, org_id: UUID, days: int | None = None) -> dict:
+    """Entry counts by action and entity type, all time or over the last *days* days."""
+    await flush()
+    filters = []
+    if days:
+        since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        filters.append(AuditLogDailyCount.day >= since)
+    return await _STATS.run(db, org_id, *filters)
+
+
+async def archive_audit_logs(
+    db: AsyncSession, older_than_days: int | None = None, batch_size: int | None = None
+) -> int:
+    """Move entries older than the hot window to ``audit_logs_archive``.
+
+    Works in batches, committing after each, so it never holds a long
+    transaction on the hot table. Returns the number of entries moved.
+    """
+    days = settings.AUDIT_LOG_HOT_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.AUDIT_LOG_ARCHIVE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    columns = [getattr(AuditLog, name) for name in _COLUMNS]
+
+    moved = 0
+    while True:
+        ids = list((await db.execute(
+            select(AuditLog.id).where(AuditLog.timestamp < cutoff)
+            .order_by(AuditLog.timestamp).limit(batch_size)
+        )).scalars().all())
+        if not ids:
+            break
+        await db.execute(
+            insert(AuditLogArchive).from_select(
+                list(_COLUMNS), select(*columns).where(AuditLog.id.in_(ids))
+            )
+        )
+        await db.execute(delete(AuditLog).where(AuditLog.id.in_(ids)))
+        await db.commit()
+        moved += len(ids)
+    if moved:
+        logger.info("Archived %d audit log entries older than %s", moved, cutoff.date())
+    return moved
@@ -1,8 +1,11 @@
+import json
+from collections.abc import AsyncIterator
 from uuid import UUID
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache_events import invalidate_on_change
 from app.core.exceptions import NotFoundError
 from app.models.audit import Audit
 from app.models.audit_finding import AuditFinding
@@ -109,44 +112,82 @@ async def update_finding(
 
 # --- Readiness Score ---
 
+READINESS_CACHE_TTL = 300
+
+
+def _readiness_cache_key(org_id: UUID) -> str:
+    return f"org:{org_id}:readiness_score"
+
+
+invalidate_on_change(
+    Control, Evidence, Policy, Risk, keys=lambda org_id: [_readiness_cache_key(org_id)]
+)
+
+
 async def compute_readiness_score(db: AsyncSession, org_id: UUID) -> dict:
-    # Controls
-    controls_total = (await db.execute(
-        select(func.count()).select_from(Control).where(Control.org_id == org_id)
-    )).scalar() or 0
-    controls_implemented = (await db.execute(
-        select(func.count()).select_from(Control).where(
-            Control.org_id == org_id, Control.status == "implemented"
+    from app.core.cache import cache_get, cache_set
+
+    cache_key = _readiness_cache_key(org_id)
+    cached = await cache_get(cache_key)
+    if cached:
+        return cached
+
+    # One round trip: each subquery is a single row of filtered aggregates.
+    controls = (
+        select(
+            func.count().label("total"),
+            func.count().filter(Control.status == "implemented").label("implemented"),
         )
-    )).scalar() or 0
-
-    # Evidence
-    evidence_total = controls_total  # one evidence per control as target
-    evidence_collected = (await db.execute(
-        select(func.count()).select_from(Evidence).where(
-            Evidence.org_id == org_id, Evidence.status == "collected"
+        .select_from(Control)
+        .where(Control.org_id == org_id)
+        .subquery()
+    )
+    evidence = (
+        select(func.count().filter(Evidence.status == "collected").label("collected"))
+        .select_from(Evidence)
+        .where(Evidence.org_id == org_id)
+        .subquery()
+    )
+    policies = (
+        select(
+            func.count().label("total"),
+            func.count().filter(Policy.status == "published").label("published"),
         )
-    )).scalar() or 0
-
-    # Policies
-    policies_total = (await db.execute(
-        select(func.count()).select_from(Policy).where(Policy.org_id == org_id)
-    )).scalar() or 0
-    policies_published = (await db.execute(
-        select(func.count()).select_from(Policy).where(
-            Policy.org_id == org_id, Policy.status == "published"
+        .select_from(Policy)
+        .where(Policy.org_id == org_id)
+        .subquery()
+    )
+    risks = (
+        select(
+            func.count().label("total"),
+            func.count().filter(Risk.status.in_(["accepted", "closed"])).label("treated"),
         )
-    )).scalar() or 0
-
-    # Risks
-    risks_total = (await db.execute(
-        select(func.count()).select_from(Risk).where(Risk.org_id == org_id)
-    )).scalar() or 0
-    risks_treated = (await db.execute(
-        select(func.count()).select_from(Risk).where(
-            Risk.org_id == org_id, Risk.status.in_(["accepted", "closed"])
+        .select_from(Risk)
+        .where(Risk.org_id == org_id)
+        .subquery()
+    )
+    row = (await db.execute(
+        select(
+            controls.c.total.label("controls_total"),
+            controls.c.implemented.label("controls_implemented"),
+            evidence.c.collected.label("evidence_collected"),
+            policies.c.total.label("policies_total"),
+            policies.c.published.label("policies_published"),
+            risks.c.total.label("risks_total"),
+            risks.c.treated.label("risks_treated"),
+        ).select_from(
+            controls.join(evidence, true()).join(policies, true()).join(risks, true())
         )
-    )).scalar() or 0
+    )).one()
+
+    controls_total = row.controls_total or 0
+    controls_implemented = row.controls_implemented or 0
+    evidence_total = controls_total  # one evidence per control as target
+    evidence_collected = row.evidence_collected or 0
+    policies_total = row.policies_total or 0
+    policies_published = row.policies_published or 0
+    risks_total = row.risks_total or 0
+    risks_treated = row.risks_treated or 0
 
     # Compute scores
     controls_pct = (controls_implemented / controls_total * 100) if controls_total else 0
@@ -156,7 +197,7 @@ async def compute_readiness_score(db: AsyncSession, org_id: UUID) -> dict:
 
     overall = (controls_pct * 0.4 + evidence_pct * 0.3 + policies_pct * 0.2 + risks_pct * 0.1)
 
-    return {
+    score = {
         "overall_score": round(overall, 1),
         "controls_score": round(controls_pct, 1),
         "evidence_score": round(evidence_pct, 1),
@@ -171,39 +212,90 @@ async def compute_readiness_score(db: AsyncSession, org_id: UUID) -> dict:
         "risks_treated": risks_treated,
         "risks_total": risks_total,
     }
+    await cache_set(cache_key, score, ttl=READINESS_CACHE_TTL)
+    return score
 
 
 # --- Evidence Package ---
 
+EVIDENCE_PACKAGE_BATCH_SIZE = 500
+
+
+async def iter_evidence_package(db: AsyncSession, org_id: UUID) -> AsyncIterator[dict]:
+    """Yield one evidence-package entry per control, in title order.
+
+    Controls and their evidence come from a single LEFT JOIN streamed from the
+    database in batches, so memory stays flat regardless of package size.
+    """
+    q = (
+        select(
+            Control.id.label("control_id"),
+            Control.title.label("control_title"),
+            Control.status.label("control_status"),
+            Evidence.id.label("evidence_id"),
+            Evidence.title.label("evidence_title"),
+            Evidence.status.label("evidence_status"),
+            Evidence.collected_at,
+            Evidence.collection_method,
+        )
+        .outerjoin(
+            Evidence,
+            (Evidence.control_id == Control.id) & (Evidence.org_id == org_id),
+        )
+        .where(Control.org_id == org_id)
+        .order_by(Control.title, Control.id, Evidence.created_at, Evidence.id)
+        .execution_options(yield_per=EVIDENCE_PACKAGE_BATCH_SIZE)
+    )
+
+    entry: dict | None = None
+    result = await db.stream(q)
+    async for row in result:
+        if entry is None or entry["control_id"] != str(row.control_id):
+            if entry is not None:
+                yield entry
+            entry = {
+                "control_id": str(row.control_id),
+                "control_title": row.control_title,
+                "control_status": row.control_status,
+                "evidence": [],
+            }
+        if row.evidence_id is not None:
+            entry["evidence"].append({
+                "id": str(row.evidence_id),
+                "title": row.evidence_title,
+                "status": row.evidence_status,
+                "collected_at": row.collected_at.isoformat() if row.collected_at else None,
+                "collection_method": row.collection_method,
+            })
+    if entry is not None:
+        yield entry
+
+
 async def generate_evidence_package(db: AsyncSession, org_id: UUID) -> dict:
     """Generate a structured evidence package grouped by control."""
-    controls_result = await db.execute(
-        select(Control).where(Control.org_id == org_id).order_by(Control.title)
-    )
-    controls = list(controls_result.scalars().all())
-
-    package = []
-    for control in controls:
-        evidence_result = await db.execute(
-            select(Evidence).where(
-                Evidence.org_id == org_id, Evidence.control_id == control.id
-            )
-        )
-        evidence_list = list(evidence_result.scalars().all())
-        package.append({
-            "control_id": str(control.id),
-            "control_title": control.title,
-            "control_status": control.status,
-            "evidence": [
-                {
-                    "id": str(e.id),
-                    "title": e.title,
-                    "status": e.status,
-                    "collected_at": e.collected_at.isoformat() if e.collected_at else None,
-                    "collection_method": e.collection_method,
-                }
-                for e in evidence_list
-            ],
-        })
-
-    return {"controls_count": len(controls), "evidence_package": package}
+    package = [entry async for entry in iter_evidence_package(db, org_id)]
+    return {"controls_count": len(package), "evidence_package": package}
+
+
+async def stream_evidence_package(
+    db: AsyncSession, org_id: UUID, fmt: str = "ndjson"
+) -> AsyncIterator[str]:
+    """Serialize the evidence package incrementally.
+
+    ``ndjson`` emits one control entry per line followed by a
+    ``{"controls_count": N}`` trailer line. ``json`` emits the same document
+    as ``generate_evidence_package``, written out piece by piece.
+    """
+    count = 0
+    if fmt == "ndjson":
+        async for entry in iter_evidence_package(db, org_id):
+            count += 1
+            yield json.dumps(entry) + "\n"
+        yield json.dumps({"controls_count": count}) + "\n"
+        return
+
+    yield '{"evidence_package": ['
+    async for entry in iter_evidence_package(db, org_id):
+        yield ("," if count else "") + json.dumps(entry)
+        count += 1
+    yield f'], "controls_count": {count}}}'
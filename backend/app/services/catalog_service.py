@@ -0,0 +1,286 @@
+"""Read-only snapshot of the global catalog: frameworks, domains, requirements and templates.
+
+This data is seeded and almost never changes. Each process therefore loads
+it once into an immutable ``Catalog`` with compact indexes:
+
+- requirement code → requirement id, per framework;
+- control template → requirement codes, per framework.
+
+The framework and template list endpoints answer from the snapshot. Each
+response carries an ``ETag`` derived from the catalog's content, so any
+process with the same data produces the same tag. Clients that revalidate
+with ``If-None-Match`` get a 304.
+
+``bump()`` marks the catalog as changed; ``framework_service`` calls it after
+every mutation, as does the seed runner. The new version is published through
+the shared cache. Other processes see it within
+``CATALOG_VERSION_CHECK_SECONDS`` and reload.
+
+The shared cache is optional, so every check also reads a cheap stamp of the
+catalog tables (row counts and latest ``updated_at``). Changes are therefore
+picked up without Redis too, and so are writes that never called ``bump()``.
+A write does not always move ``max(updated_at)`` (see ``_table_stamp``), so
+for ``_SETTLE_SECONDS`` after the latest write every check reloads.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Mapping
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import lazyload
+
+from app.config import get_settings
+from app.core import cache
+from app.models.control_template import ControlTemplate
+from app.models.control_template_framework_mapping import ControlTemplateFrameworkMapping
+from app.models.evidence_template import EvidenceTemplate
+from app.models.framework import Framework
+from app.models.framework_domain import FrameworkDomain
+from app.models.framework_requirement import FrameworkRequirement
+from app.models.policy_template import PolicyTemplate
+from app.schemas.control_template import ControlTemplateResponse
+from app.schemas.evidence_template import EvidenceTemplateResponse
+from app.schemas.framework import (
+    FrameworkDomainResponse,
+    FrameworkRequirementResponse,
+    FrameworkResponse,
+)
+from app.schemas.policy import PolicyTemplateResponse
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_VERSION_KEY = "catalog:version"
+_VERSION_TTL = 30 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class Catalog:
+    version: str
+    digest: str
+    frameworks: tuple[FrameworkResponse, ...]  # all frameworks, by name
+    domains: Mapping[UUID, tuple[FrameworkDomainResponse, ...]]  # by framework
+    requirements: Mapping[UUID, tuple[FrameworkRequirementResponse, ...]]  # by framework
+    domain_requirements: Mapping[UUID, tuple[FrameworkRequirementResponse, ...]]  # by domain
+    requirement_ids: Mapping[UUID, Mapping[str, UUID]]  # framework -> code -> id
+    control_templates: tuple[ControlTemplateResponse, ...]  # by domain, code
+    # framework -> control template -> requirement codes
+    template_requirement_codes: Mapping[UUID, Mapping[UUID, frozenset[str]]]
+    evidence_templates: tuple[EvidenceTemplateResponse, ...]  # by code
+    policy_templates: tuple[PolicyTemplateResponse, ...]  # newest first
+
+    @property
+    def active_frameworks(self) -> list[FrameworkResponse]:
+        return [f for f in self.frameworks if f.is_active]
+
+    def framework(self, framework_id: UUID) -> FrameworkResponse | None:
+        return next((f for f in self.frameworks if f.id == framework_id), None)
+
+    def etag(self, *parts) -> str:
+        """Strong validator for a response built from this snapshot and *parts*."""
+        key = ":".join([self.digest, *(str(p) for p in parts)])
+        return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+# Tables the snapshot is built from
+_STAMPED = (
+    Framework, FrameworkDomain, FrameworkRequirement, ControlTemplate,
+    ControlTemplateFrameworkMapping, EvidenceTemplate, PolicyTemplate,
+)
+# How long after the latest catalog write the table stamp is not trusted
+_SETTLE_SECONDS = 60
+
+_catalog: Catalog | None = None
+_bumped: str | None = None  # last bump seen, local or through the shared cache
+_stamp: str | None = None  # stamp of the catalog tables at the last check
+_checked_at = 0.0
+_lock = asyncio.Lock()
+_stats = {"loads": 0, "bumps": 0}
+
+
+def _freeze(groups: dict) -> Mapping:
+    return MappingProxyType({k: tuple(v) for k, v in groups.items()})
+
+
+async def _load(db: AsyncSession, version: str) -> Catalog:
+    frameworks = [
+        FrameworkResponse.model_validate(f)
+        for f in (await db.execute(
+            select(Framework).options(lazyload("*")).order_by(Framework.name, Framework.id)
+        )).scalars()
+    ]
+    domains_by_framework: dict[UUID, list] = defaultdict(list)
+    for d in (await db.execute(
+        select(FrameworkDomain).options(lazyload("*"))
+        .order_by(FrameworkDomain.sort_order, FrameworkDomain.id)
+    )).scalars():
+        domains_by_framework[d.framework_id].append(FrameworkDomainResponse.model_validate(d))
+
+    requirements: dict[UUID, list] = defaultdict(list)
+    domain_requirements: dict[UUID, list] = defaultdict(list)
+    requirement_ids: dict[UUID, dict[str, UUID]] = defaultdict(dict)
+    for req, framework_id in (await db.execute(
+        select(FrameworkRequirement, FrameworkDomain.framework_id)
+        .join(FrameworkDomain)
+        .options(lazyload("*"))
+        .order_by(
+            FrameworkRequirement.sort_order, FrameworkDomain.sort_order, FrameworkRequirement.id
+        )
+    )).all():
+        item = FrameworkRequirementResponse.model_validate(req)
+        requirements[framework_id].append(item)
+        domain_requirements[req.domain_id].append(item)
+        requirement_ids[framework_id].setdefault(req.code, req.id)
+
+    control_templates = [
+        ControlTemplateResponse.model_validate(t)
+        for t in (await db.execute(
+            select(ControlTemplate).options(lazyload("*"))
+            .order_by(ControlTemplate.domain, ControlTemplate.template_code, ControlTemplate.id)
+        )).scalars()
+    ]
+    template_codes: dict[UUID, dict[UUID, set[str]]] = defaultdict(lambda: defaultdict(set))
+    for template_id, framework_id, code in (await db.execute(
+        select(
+            ControlTemplateFrameworkMapping.control_template_id,
+            ControlTemplateFrameworkMapping.framework_id,
+            ControlTemplateFrameworkMapping.requirement_code,
+        )
+    )).all():
+        template_codes[framework_id][template_id].add(code)
+
+    evidence_templates = [
+        EvidenceTemplateResponse.model_validate(t)
+        for t in (await db.execute(
+            select(EvidenceTemplate).options(lazyload("*"))
+            .order_by(EvidenceTemplate.template_code, EvidenceTemplate.id)
+        )).scalars()
+    ]
+    policy_templates = [
+        PolicyTemplateResponse.model_validate(t)
+        for t in (await db.execute(
+            select(PolicyTemplate).options(lazyload("*"))
+            .order_by(PolicyTemplate.created_at.desc(), PolicyTemplate.id)
+        )).scalars()
+    ]
+
+    content = {
+        "frameworks": frameworks,
+        "domains": [d for group in domains_by_framework.values() for d in group],
+        "requirements": [r for group in requirements.values() for r in group],
+        "control_templates": control_templates,
+        "template_codes": sorted(
+            (str(f), str(t), sorted(codes))
+            for f, by_template in template_codes.items() for t, codes in by_template.items()
+        ),
+        "evidence_templates": evidence_templates,
+        "policy_templates": policy_templates,
+    }
+    digest = hashlib.sha256(json.dumps(
+        content, sort_keys=True, default=lambda m: m.model_dump(mode="json")
+    ).encode()).hexdigest()
+
+    return Catalog(
+        version=version,
+        digest=digest,
+        frameworks=tuple(frameworks),
+        domains=_freeze(domains_by_framework),
+        requirements=_freeze(requirements),
+        domain_requirements=_freeze(domain_requirements),
+        requirement_ids=MappingProxyType({
+            f: MappingProxyType(codes) for f, codes in requirement_ids.items()
+        }),
+        control_templates=tuple(control_templates),
+        template_requirement_codes=MappingProxyType({
+            f: MappingProxyType({t: frozenset(codes) for t, codes in by_template.items()})
+            for f, by_template in template_codes.items()
+        }),
+        evidence_templates=tuple(evidence_templates),
+        policy_templates=tuple(policy_templates),
+    )
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def _table_stamp(db: AsyncSession) -> str:
+    """Changes whenever a catalog row is inserted, updated or deleted.
+
+    ``updated_at`` has one-second resolution on SQLite and is the writing
+    transaction's start time on Postgres, so an update can land without
+    moving ``max(updated_at)``. While the latest write is less than
+    ``_SETTLE_SECONDS`` old, each call therefore returns a new stamp.
+    """
+    columns = [func.now()]
+    for model in _STAMPED:
+        columns.append(select(func.count()).select_from(model).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).scalar_subquery())
+    db_now, *stamp = (await db.execute(select(*columns))).one()
+    latest = max((_utc(ts) for ts in stamp[1::2] if ts is not None), default=None)
+    if latest is not None and _utc(db_now) - latest < timedelta(seconds=_SETTLE_SECONDS):
+        stamp.append(uuid.uuid4().hex)
+    return hashlib.sha256(repr(stamp).encode()).hexdigest()[:16]
+
+
+def _version() -> str:
+    return f"{_bumped}:{_stamp}"
+
+
+async def _sync_version(db: AsyncSession) -> None:
+    global _bumped, _stamp, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < settings.CATALOG_VERSION_CHECK_SECONDS:
+        return
+    _checked_at = now
+    shared = await cache.cache_get(_VERSION_KEY)
+    if shared:
+        _bumped = shared
+    _stamp = await _table_stamp(db)
+
+
+async def get_catalog(db: AsyncSession) -> Catalog:
+    """The current snapshot, loading it with *db* if missing or outdated."""
+    global _catalog
+    await _sync_version(db)
+    catalog = _catalog
+    if catalog is not None and catalog.version == _version():
+        return catalog
+    async with _lock:
+        version = _version()
+        if _catalog is None or _catalog.version != version:
+            _catalog = await _load(db, version)
+            _stats["loads"] += 1
+            logger.info("Loaded catalog version %s (%s)", version, _catalog.digest[:12])
+        return _catalog
+
+
+async def bump() -> None:
+    """Mark the catalog changed, here and (through the shared cache) in other processes."""
+    global _bumped, _checked_at
+    _bumped = uuid.uuid4().hex
+    # Re-stamp on the next read, so this process reloads once, not twice
+    _checked_at = 0.0
+    _stats["bumps"] += 1
+    await cache.cache_set(_VERSION_KEY, _bumped, ttl=_VERSION_TTL)
+
+
+def get_stats() -> dict:
+    return {
+        **_stats,
+        "version": _version(),
+        "digest": _catalog.digest[:12] if _catalog else None,
+        "frameworks": len(_catalog.frameworks) if _catalog else 0,
+        "control_templates": len(_catalog.control_templates) if _catalog else 0,
+    }
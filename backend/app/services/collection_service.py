@@ -1,15 +1,337 @@
+"""Evidence collection jobs.
+
+A single ``trigger_collection`` runs its collector inline and returns the
+finished job. ``trigger_collections`` accepts a batch of
+``(integration, collector_type)`` pairs, commits them as ``pending`` jobs and
+hands them to the process-wide ``CollectionRunner``, which executes them
+concurrently in the background and commits each result as it finishes.
+
+Both paths share the runner's limits: a global semaphore, a per-provider
+semaphore and an optional minimum spacing between collector starts against
+the same provider. No DB transaction is held open while a collector talks
+to the external service.
+
+Jobs live only in the memory of the process that runs them, so a crash or
+restart would leave them ``pending`` / ``running`` forever. On startup,
+``recover_stale_jobs`` marks jobs that have not changed for
+``COLLECTION_STALE_JOB_SECONDS`` as failed; a job may have produced partial
+results, so it is left to the user to trigger it again.
+
+``cancel_job`` marks an unfinished job ``cancelled`` and cancels its
+collector call if this process is running it (for Prowler this kills the
+scan's subprocesses). A job running in another process is only marked; its
+results are discarded when its collector returns.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
-from datetime import datetime, timezone
 
-from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import lazyload
 
-from app.core.exceptions import NotFoundError
+from app.config import get_settings
+from app.core.exceptions import ConflictError, NotFoundError
 from app.models.collection_job import CollectionJob
 from app.models.evidence import Evidence
 from app.models.integration import Integration
 from app.collectors.base import COLLECTOR_REGISTRY
-from app.schemas.integration import CollectionTrigger
+from app.schemas.integration import CollectionBatchItem, CollectionTrigger
+
+logger = logging.getLogger(__name__)
+
+
+def _credentials(integration: Integration) -> dict | None:
+    """Build a credentials dict from the integration's stored reference."""
+    if not integration.credentials_ref:
+        return None
+    # credentials_ref can be a JSON string or a vault reference
+    try:
+        return json.loads(integration.credentials_ref)
+    except (json.JSONDecodeError, TypeError):
+        return {"ref": integration.credentials_ref}
+
+
+class CollectionRunner:
+    """Run collection jobs concurrently under global and per-provider limits."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker | None = None,
+        *,
+        concurrency: int | None = None,
+        provider_limits: dict[str, int] | None = None,
+        provider_min_interval: dict[str, float] | None = None,
+    ):
+        settings = get_settings()
+        if session_factory is None:
+            from app.core.database import async_session
+
+            session_factory = async_session
+        self.session_factory = session_factory
+        self._global = asyncio.Semaphore(concurrency or settings.COLLECTION_CONCURRENCY)
+        limits = (
+            settings.COLLECTION_PROVIDER_CONCURRENCY if provider_limits is None else provider_limits
+        )
+        self._provider_sems = {p: asyncio.Semaphore(n) for p, n in limits.items()}
+        self._min_interval = (
+            settings.COLLECTION_PROVIDER_MIN_INTERVAL_SECONDS
+            if provider_min_interval is None else provider_min_interval
+        )
+        self._pace_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._next_start: dict[str, float] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._collecting: dict[UUID, asyncio.Task] = {}
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.cancelled = 0
+        self.recovered = 0
+
+    @asynccontextmanager
+    async def limit(self, provider: str):
+        """Hold a global and a per-provider slot for the duration of a collector call."""
+        provider_sem = self._provider_sems.get(provider)
+        async with self._global:
+            if provider_sem is None:
+                await self._pace(provider)
+                yield
+                return
+            async with provider_sem:
+                await self._pace(provider)
+                yield
+
+    async def _pace(self, provider: str) -> None:
+        interval = self._min_interval.get(provider)
+        if not interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._pace_locks[provider]:
+            wait = self._next_start.get(provider, 0.0) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start[provider] = loop.time() + interval
+
+    def submit(self, job_ids: list[UUID]) -> None:
+        """Schedule committed ``pending`` jobs for background execution."""
+        loop = asyncio.get_running_loop()
+        for job_id in job_ids:
+            task = loop.create_task(self._run_job(job_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        self.submitted += len(job_ids)
+
+    def cancel(self, job_id: UUID) -> bool:
+        """Cancel *job_id*'s collector call if it is in progress in this process."""
+        task = self._collecting.get(job_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def _run_job(self, job_id: UUID) -> None:
+        try:
+            async with self.session_factory() as db:
+                job = await db.get(CollectionJob, job_id)
+                if job is None or job.status != "pending":
+                    return
+                integration = (await db.execute(
+                    select(Integration)
+                    .options(lazyload(Integration.collection_jobs))
+                    .where(Integration.id == job.integration_id)
+                )).scalar_one()
+                await execute_job(db, job, integration, self)
+        except asyncio.CancelledError:
+            await self._mark_failed(job_id, "Collection interrupted by shutdown")
+            raise
+        except Exception:
+            logger.exception("Collection job %s crashed", job_id)
+            await self._mark_failed(job_id, "Collection crashed unexpectedly")
+
+    async def _mark_failed(self, job_id: UUID, message: str) -> None:
+        try:
+            async with self.session_factory() as db:
+                job = await db.get(CollectionJob, job_id)
+                if job is not None and job.status in ("pending", "running"):
+                    job.status = "failed"
+                    job.error_message = message
+                    await db.commit()
+        except Exception:
+            logger.exception("Could not mark collection job %s as failed", job_id)
+
+    async def recover_stale_jobs(self) -> int:
+        """Fail ``pending``/``running`` jobs untouched for ``COLLECTION_STALE_JOB_SECONDS``.
+
+        Runs at startup; jobs of live processes in the same deployment are
+        protected by the age threshold, which must exceed the longest
+        collection (e.g. a full Prowler scan).
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=get_settings().COLLECTION_STALE_JOB_SECONDS
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(CollectionJob)
+                .where(
+                    CollectionJob.status.in_(("pending", "running")),
+                    CollectionJob.updated_at < cutoff,
+                )
+                .values(
+                    status="failed",
+                    error_message="Collection interrupted: the process running it stopped",
+                )
+            )
+            await db.commit()
+        count = result.rowcount or 0
+        if count:
+            self.recovered += count
+            logger.warning("Marked %d stale collection job(s) as failed", count)
+        return count
+
+    async def drain(self) -> None:
+        """Wait until every submitted job has finished."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await self.drain()
+
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "running": self.running,
+            "queued": len(self._tasks) - self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "recovered": self.recovered,
+        }
+
+
+_runner: CollectionRunner | None = None
+
+
+def get_runner() -> CollectionRunner:
+    global _runner
+    if _runner is None:
+        _runner = CollectionRunner()
+    return _runner
+
+
+def runner_stats() -> dict | None:
+    return _runner.stats() if _runner is not None else None
+
+
+async def recover_stale_jobs() -> int:
+    return await get_runner().recover_stale_jobs()
+
+
+async def shutdown() -> None:
+    if _runner is not None:
+        await _runner.shutdown()
+
+
+async def execute_job(
+    db: AsyncSession, job: CollectionJob, integration: Integration, runner: CollectionRunner
+) -> CollectionJob:
+    """Run *job*'s collector and record the outcome, committing before and after.
+
+    The job is committed as ``running`` before the external call, so no
+    transaction is held open while the collector waits on the provider.
+    """
+    collector = COLLECTOR_REGISTRY.get(job.collector_type)
+    if not collector:
+        job.status = "failed"
+        job.error_message = f"Unknown collector type: {job.collector_type}"
+        runner.failed += 1
+        await db.commit()
+        return job
+
+    job.status = "running"
+    await db.commit()
+    config = integration.config or {}
+    credentials = _credentials(integration)
+
+    async def collect() -> dict:
+        async with runner.limit(integration.provider):
+            return await collector.collect(config=config, credentials=credentials)
+
+    # The collector runs in its own task so that cancel_job can stop it
+    # without cancelling the caller (an API request or a runner task)
+    collecting = asyncio.ensure_future(collect())
+    runner._collecting[job.id] = collecting
+    runner.running += 1
+    try:
+        result_data = await collecting
+    except asyncio.CancelledError:
+        if asyncio.current_task().cancelling():
+            raise
+        # Cancelled by cancel_job, which has already recorded the status
+        runner.cancelled += 1
+        await db.refresh(job)
+        return job
+    except Exception as e:
+        job.status = "failed"
+        job.error_message = str(e)
+        runner.failed += 1
+        await db.commit()
+        return job
+    finally:
+        runner.running -= 1
+        runner._collecting.pop(job.id, None)
+
+    await db.refresh(job, ["status"])
+    if job.status == "cancelled":  # by a request served in another process
+        runner.cancelled += 1
+        return job
+
+    try:
+        # Let the collector move bulky payloads (e.g. Prowler findings) into
+        # their own tables before the result is stored on the job
+        result_data = await collector.persist(db, job, result_data)
+
+        # Evidence belongs to a control; jobs without one (e.g. ad-hoc
+        # Prowler scans) keep their results on the job only
+        evidence = None
+        if job.control_id is not None:
+            evidence = Evidence(
+                org_id=job.org_id,
+                control_id=job.control_id,
+                template_id=job.evidence_template_id,
+                title=f"Auto-collected: {result_data.get('summary', job.collector_type)}",
+                status="collected",
+                collected_at=datetime.now(timezone.utc),
+                data=result_data.get("data", {}),
+                collection_method="automated",
+                collector=job.collector_type,
+            )
+            db.add(evidence)
+            await db.flush()
+    except Exception as e:
+        await db.rollback()
+        job.status = "failed"
+        job.error_message = f"Could not record collection results: {e}"
+        runner.failed += 1
+        await db.commit()
+        return job
+
+    job.result_data = result_data
+    job.status = "completed"
+    if evidence is not None:
+        job.evidence_id = evidence.id
+    # Update integration last_sync
+    integration.last_sync_at = datetime.now(timezone.utc)
+    runner.completed += 1
+    await db.commit()
+    return job
 
 
 async def trigger_collection(
@@ -26,70 +348,80 @@ async def trigger_collection(
     if not integration:
         raise NotFoundError(f"Integration {integration_id} not found")
 
-    # Create collection job
     job = CollectionJob(
         org_id=org_id,
         integration_id=integration_id,
         evidence_template_id=data.evidence_template_id,
         control_id=data.control_id,
         collector_type=data.collector_type,
-        status="running",
+        status="pending",
     )
     db.add(job)
     await db.flush()
 
-    # Run collector
-    collector = COLLECTOR_REGISTRY.get(data.collector_type)
-    if not collector:
-        job.status = "failed"
-        job.error_message = f"Unknown collector type: {data.collector_type}"
-        await db.commit()
-        await db.refresh(job)
-        return job
+    await execute_job(db, job, integration, get_runner())
+    await db.refresh(job)
+    return job
 
-    # Build credentials dict from the integration's stored reference
-    credentials = None
-    if integration.credentials_ref:
-        # credentials_ref can be a JSON string or a vault reference
-        import json
-        try:
-            credentials = json.loads(integration.credentials_ref)
-        except (json.JSONDecodeError, TypeError):
-            credentials = {"ref": integration.credentials_ref}
 
-    try:
-        result_data = await collector.collect(
-            config=integration.config or {},
-            credentials=credentials,
+async def trigger_collections(
+    db: AsyncSession, org_id: UUID, items: list[CollectionBatchItem]
+) -> list[CollectionJob]:
+    """Queue a batch of collection jobs and return them immediately as ``pending``.
+
+    Poll ``get_collection_job`` (or the per-integration job list) for results.
+    """
+    integration_ids = {item.integration_id for item in items}
+    found = set((await db.execute(
+        select(Integration.id).where(
+            Integration.org_id == org_id, Integration.id.in_(integration_ids)
         )
-        job.result_data = result_data
-        job.status = "completed"
+    )).scalars().all())
+    missing = integration_ids - found
+    if missing:
+        raise NotFoundError(f"Integration {sorted(missing, key=str)[0]} not found")
 
-        # Create evidence record
-        evidence = Evidence(
+    jobs = [
+        CollectionJob(
             org_id=org_id,
-            control_id=data.control_id,
-            template_id=data.evidence_template_id,
-            title=f"Auto-collected: {result_data.get('summary', data.collector_type)}",
-            status="collected",
-            collected_at=datetime.now(timezone.utc),
-            data=result_data.get("data", {}),
-            collection_method="automated",
-            collector=data.collector_type,
+            integration_id=item.integration_id,
+            evidence_template_id=item.evidence_template_id,
+            control_id=item.control_id,
+            collector_type=item.collector_type,
+            status="pending",
         )
-        db.add(evidence)
-        await db.flush()
-        job.evidence_id = evidence.id
-
-        # Update integration last_sync
-        integration.last_sync_at = datetime.now(timezone.utc)
+        for item in items
+    ]
+    db.add_all(jobs)
+    await db.commit()
+    get_runner().submit([job.id for job in jobs])
+    return jobs
 
-    except Exception as e:
-        job.status = "failed"
-        job.error_message = str(e)
 
+async def cancel_job(db: AsyncSession, job: CollectionJob) -> CollectionJob:
+    """Mark an unfinished *job* ``cancelled`` and stop its collector if it runs here."""
+    if job.status not in ("pending", "running"):
+        raise ConflictError(f"Collection job {job.id} is already {job.status}")
+    job.status = "cancelled"
+    job.error_message = "Cancelled by user"
     await db.commit()
-    await db.refresh(job)
+    get_runner().cancel(job.id)
+    return job
+
+
+async def get_collection_job(
+    db: AsyncSession, org_id: UUID, integration_id: UUID, job_id: UUID
+) -> CollectionJob:
+    result = await db.execute(
+        select(CollectionJob).where(
+            CollectionJob.id == job_id,
+            CollectionJob.org_id == org_id,
+            CollectionJob.integration_id == integration_id,
+        )
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise NotFoundError(f"Collection job {job_id} not found")
     return job
 
 
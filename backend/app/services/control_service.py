@@ -1,9 +1,11 @@
 from uuid import UUID
 
-from sqlalchemy import select, func, case
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundError
+from app.core.pagination import CountMode, Page, paginate
+from app.core.stats import StatsQuery
 from app.models.control import Control
 from app.schemas.control import ControlCreate, ControlUpdate, ControlStatsResponse
 
@@ -15,28 +17,25 @@ async def list_controls(
     framework_id: UUID | None = None,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[Control], int]:
+    cursor: str | None = None,
+    count: CountMode | None = None,
+) -> Page:
     base_q = select(Control).where(Control.org_id == org_id)
-    count_base = select(func.count()).select_from(Control).where(Control.org_id == org_id)
 
     if status:
         base_q = base_q.where(Control.status == status)
-        count_base = count_base.where(Control.status == status)
 
-    total = (await db.execute(count_base)).scalar() or 0
-    q = base_q.offset((page - 1) * page_size).limit(page_size).order_by(Control.created_at.desc())
-    result = await db.execute(q)
-    return list(result.scalars().all()), total
+    return await paginate(
+        db, base_q, sort_column=Control.created_at, id_column=Control.id,
+        page=page, page_size=page_size, cursor=cursor, count=count,
+    )
 
 
 async def create_control(db: AsyncSession, org_id: UUID, data: ControlCreate) -> Control:
-    from app.core.cache import cache_delete
-
     control = Control(org_id=org_id, **data.model_dump())
     db.add(control)
     await db.commit()
     await db.refresh(control)
-    await cache_delete(f"org:{org_id}:control_stats")
     return control
 
 
@@ -53,25 +52,19 @@ async def get_control(db: AsyncSession, org_id: UUID, control_id: UUID) -> Contr
 async def update_control(
     db: AsyncSession, org_id: UUID, control_id: UUID, data: ControlUpdate
 ) -> Control:
-    from app.core.cache import cache_delete
-
     control = await get_control(db, org_id, control_id)
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(control, field, value)
     await db.commit()
     await db.refresh(control)
-    await cache_delete(f"org:{org_id}:control_stats")
     return control
 
 
 async def delete_control(db: AsyncSession, org_id: UUID, control_id: UUID) -> None:
-    from app.core.cache import cache_delete
-
     control = await get_control(db, org_id, control_id)
     await db.delete(control)
     await db.commit()
-    await cache_delete(f"org:{org_id}:control_stats")
 
 
 async def bulk_approve_controls(
@@ -90,34 +83,10 @@ async def bulk_approve_controls(
     return count
 
 
-async def get_control_stats(db: AsyncSession, org_id: UUID) -> ControlStatsResponse:
-    from app.core.cache import cache_get, cache_set
+_STATS = StatsQuery(Control, "control_stats")
+for _status in ("draft", "implemented", "partially_implemented", "not_implemented", "not_applicable"):
+    _STATS.count(_status, Control.status == _status)
 
-    cache_key = f"org:{org_id}:control_stats"
-    cached = await cache_get(cache_key)
-    if cached:
-        return ControlStatsResponse(**cached)
 
-    result = await db.execute(
-        select(
-            func.count().label("total"),
-            func.count().filter(Control.status == "draft").label("draft"),
-            func.count().filter(Control.status == "implemented").label("implemented"),
-            func.count().filter(Control.status == "partially_implemented").label("partially_implemented"),
-            func.count().filter(Control.status == "not_implemented").label("not_implemented"),
-            func.count().filter(Control.status == "not_applicable").label("not_applicable"),
-        )
-        .select_from(Control)
-        .where(Control.org_id == org_id)
-    )
-    row = result.one()
-    stats = ControlStatsResponse(
-        total=row.total,
-        draft=row.draft,
-        implemented=row.implemented,
-        partially_implemented=row.partially_implemented,
-        not_implemented=row.not_implemented,
-        not_applicable=row.not_applicable,
-    )
-    await cache_set(cache_key, stats.model_dump(), ttl=120)
-    return stats
+async def get_control_stats(db: AsyncSession, org_id: UUID) -> ControlStatsResponse:
+    return ControlStatsResponse(**await _STATS.run(db, org_id))
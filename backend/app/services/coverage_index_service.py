@@ -0,0 +1,232 @@
+"""Per-org framework coverage index behind gap analysis and the cross-framework matrix.
+
+For each org the index keeps:
+
+- ``control_coverage``: the frameworks each control maps to;
+- ``requirement_coverage``: the controls mapped to each requirement and how
+  many of them are implemented;
+- ``framework_coverage``: mapped and implemented controls, covered and
+  partially covered requirements per framework.
+
+An org's index is built the first time it is read. After that, session
+events keep it current. A transaction may add or delete controls, change a
+control's status, or touch a ``ControlFrameworkMapping``. Just before it
+commits, the affected controls are re-indexed. The counters of every
+framework they mapped to, before or after, are recomputed too. The index
+therefore commits atomically with the change, whichever service, agent or
+job made it. Re-indexing locks the org's ``coverage_index_state`` row, so
+concurrent commits for one org apply one after the other.
+
+Bulk ``update()``/``delete()`` statements on controls bypass the session
+and are not seen. Call ``rebuild_coverage_index`` after such changes.
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, event, inspect, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.control import Control
+from app.models.control_framework_mapping import ControlFrameworkMapping
+from app.models.coverage_index import (
+    ControlCoverage, CoverageIndexState, FrameworkCoverage, RequirementCoverage,
+)
+
+logger = logging.getLogger(__name__)
+
+_PENDING = "pending_coverage_controls"
+
+
+def _recount_frameworks(session: Session, org_id: UUID, framework_ids: set[UUID]) -> None:
+    """Recompute requirement and framework rows for *framework_ids* in *org_id*."""
+    rows = session.execute(
+        select(
+            ControlFrameworkMapping.framework_id,
+            ControlFrameworkMapping.requirement_id,
+            Control.id,
+            Control.status,
+        )
+        .join(Control, ControlFrameworkMapping.control_id == Control.id)
+        .where(Control.org_id == org_id, ControlFrameworkMapping.framework_id.in_(framework_ids))
+    ).all()
+
+    controls: dict[UUID, set] = defaultdict(set)
+    implemented: dict[UUID, set] = defaultdict(set)
+    req_controls: dict[tuple, set] = defaultdict(set)
+    req_implemented: dict[tuple, set] = defaultdict(set)
+    for framework_id, requirement_id, control_id, status in rows:
+        controls[framework_id].add(control_id)
+        if status == "implemented":
+            implemented[framework_id].add(control_id)
+        if requirement_id:
+            req_controls[(framework_id, requirement_id)].add(control_id)
+            if status == "implemented":
+                req_implemented[(framework_id, requirement_id)].add(control_id)
+
+    for model in (RequirementCoverage, FrameworkCoverage):
+        session.execute(
+            delete(model).where(model.org_id == org_id, model.framework_id.in_(framework_ids))
+        )
+
+    covered: dict[UUID, int] = defaultdict(int)
+    partial: dict[UUID, int] = defaultdict(int)
+    req_rows = []
+    for (framework_id, requirement_id), ids in req_controls.items():
+        n_implemented = len(req_implemented[(framework_id, requirement_id)])
+        if n_implemented == len(ids):
+            covered[framework_id] += 1
+        else:
+            partial[framework_id] += 1
+        req_rows.append({
+            "org_id": org_id,
+            "requirement_id": requirement_id,
+            "framework_id": framework_id,
+            "control_ids": sorted(str(i) for i in ids),
+            "control_count": len(ids),
+            "implemented_count": n_implemented,
+        })
+    if req_rows:
+        session.execute(insert(RequirementCoverage), req_rows)
+    session.execute(insert(FrameworkCoverage), [
+        {
+            "org_id": org_id,
+            "framework_id": framework_id,
+            "mapped_controls": len(controls[framework_id]),
+            "implemented_controls": len(implemented[framework_id]),
+            "covered_requirements": covered[framework_id],
+            "partial_requirements": partial[framework_id],
+        }
+        for framework_id in framework_ids
+    ])
+
+
+def _reindex_controls(session: Session, org_id: UUID, control_ids: set[UUID] | None) -> None:
+    """Re-index *control_ids* (all of the org's controls if None) and their frameworks."""
+    scope = [] if control_ids is None else [ControlCoverage.control_id.in_(control_ids)]
+    frameworks: set[str] = set()
+    for framework_ids in session.execute(
+        select(ControlCoverage.framework_ids).where(ControlCoverage.org_id == org_id, *scope)
+    ).scalars():
+        frameworks.update(framework_ids or [])
+    session.execute(delete(ControlCoverage).where(ControlCoverage.org_id == org_id, *scope))
+
+    control_scope = [] if control_ids is None else [Control.id.in_(control_ids)]
+    adjacency: dict[UUID, set[str]] = {
+        control_id: set()
+        for control_id in session.execute(
+            select(Control.id).where(Control.org_id == org_id, *control_scope)
+        ).scalars()
+    }
+    for control_id, framework_id in session.execute(
+        select(ControlFrameworkMapping.control_id, ControlFrameworkMapping.framework_id)
+        .join(Control, ControlFrameworkMapping.control_id == Control.id)
+        .where(Control.org_id == org_id, *control_scope)
+    ):
+        adjacency[control_id].add(str(framework_id))
+        frameworks.add(str(framework_id))
+    if adjacency:
+        session.execute(insert(ControlCoverage), [
+            {
+                "control_id": control_id,
+                "org_id": org_id,
+                "framework_ids": sorted(framework_ids),
+                "framework_count": len(framework_ids),
+            }
+            for control_id, framework_ids in adjacency.items()
+        ])
+    if frameworks:
+        _recount_frameworks(session, org_id, {uuid.UUID(f) for f in frameworks})
+
+
+def rebuild_coverage_index(session: Session, org_id: UUID) -> None:
+    """Rebuild *org_id*'s index from scratch (sync; use ``AsyncSession.run_sync``)."""
+    for model in (RequirementCoverage, FrameworkCoverage, CoverageIndexState):
+        session.execute(delete(model).where(model.org_id == org_id))
+    _reindex_controls(session, org_id, None)
+    session.execute(
+        insert(CoverageIndexState),
+        [{"org_id": org_id, "built_at": datetime.now(timezone.utc)}],
+    )
+
+
+async def ensure_coverage_index(db: AsyncSession, org_id: UUID) -> None:
+    """Build *org_id*'s index if it has never been built."""
+    built = (await db.execute(
+        select(CoverageIndexState.built_at).where(CoverageIndexState.org_id == org_id)
+    )).scalar()
+    if built is not None:
+        return
+    try:
+        await db.run_sync(rebuild_coverage_index, org_id)
+        await db.commit()
+    except IntegrityError:
+        # Another request built it concurrently
+        await db.rollback()
+        return
+    logger.info("Built coverage index for org %s", org_id)
+
+
+# --- Incremental maintenance ---
+
+def _collect(session: Session, flush_context) -> None:
+    dirty = session.dirty
+    for obj in (*session.new, *dirty, *session.deleted):
+        if isinstance(obj, Control):
+            if obj in dirty and not inspect(obj).attrs.status.history.has_changes():
+                continue
+            pending = session.info.setdefault(_PENDING, {})
+            pending[obj.id] = obj.org_id
+        elif isinstance(obj, ControlFrameworkMapping):
+            pending = session.info.setdefault(_PENDING, {})
+            history = inspect(obj).attrs.control_id.history
+            for control_id in (obj.control_id, *(history.deleted or ())):
+                if control_id is not None:
+                    pending.setdefault(control_id, None)
+
+
+def _apply(session: Session) -> None:
+    # before_commit runs ahead of commit's own flush; flush now so this
+    # transaction's changes are collected
+    session.flush()
+    pending: dict | None = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    unknown = [control_id for control_id, org_id in pending.items() if org_id is None]
+    if unknown:
+        for control_id, org_id in session.execute(
+            select(Control.id, Control.org_id).where(Control.id.in_(unknown))
+        ):
+            pending[control_id] = org_id
+
+    by_org: dict[UUID, set[UUID]] = defaultdict(set)
+    for control_id, org_id in pending.items():
+        if org_id is not None:
+            by_org[org_id].add(control_id)
+    if not by_org:
+        return
+    # Lock each built org's state row: concurrent commits re-indexing the same
+    # org queue up here instead of racing on the delete-and-insert below, and
+    # (under READ COMMITTED) each recount then reads the other's committed rows
+    built = session.execute(
+        select(CoverageIndexState.org_id)
+        .where(CoverageIndexState.org_id.in_(by_org))
+        .order_by(CoverageIndexState.org_id)
+        .with_for_update()
+    ).scalars().all()
+    for org_id in built:
+        _reindex_controls(session, org_id, by_org[org_id])
+
+
+def _discard(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+event.listen(Session, "after_flush", _collect)
+event.listen(Session, "before_commit", _apply)
+event.listen(Session, "after_rollback", _discard)
@@ -7,19 +7,31 @@ library is not installed.
 
 import hashlib
 import logging
+import time
+from dataclasses import dataclass
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
+from app.core.cache import LRUCache
 from app.core.exceptions import BadRequestError
+from app.core.inference import BatchingExecutor
 from app.models.embedding import Embedding
+from app.services import vector_index
 
 logger = logging.getLogger(__name__)
 
 _model = None
 _model_available: bool | None = None
 
+_settings = get_settings()
+_query_cache = LRUCache(
+    maxsize=_settings.EMBEDDING_QUERY_CACHE_SIZE,
+    ttl=_settings.EMBEDDING_QUERY_CACHE_TTL_SECONDS,
+)
+
 
 def _get_model():
     """Lazily load the sentence-transformers model."""
@@ -45,23 +57,75 @@ def _get_model():
         return None
 
 
-def _compute_embedding(text: str) -> list[float] | None:
-    """Compute embedding vector for given text."""
+def _compute_embeddings(texts: list[str]) -> list[list[float]] | None:
+    """Compute embedding vectors for many texts in batched model calls."""
     model = _get_model()
     if model is None:
         return None
-    vector = model.encode(text).tolist()
+    batch_size = get_settings().EMBEDDING_BATCH_SIZE
+    return model.encode(texts, batch_size=batch_size).tolist()
+
+
+_executor = BatchingExecutor(
+    lambda texts: _compute_embeddings(texts),
+    max_workers=_settings.EMBEDDING_INFERENCE_WORKERS,
+    window_ms=_settings.EMBEDDING_BATCH_WINDOW_MS,
+    max_batch=_settings.EMBEDDING_BATCH_SIZE,
+    name="embedding-inference",
+)
+
+
+async def encode_many(texts: list[str]) -> list[list[float]] | None:
+    """Embed *texts* on the inference thread pool without blocking the event loop.
+
+    Concurrent callers are coalesced into shared micro-batches. Returns
+    ``None`` when the model is not available.
+    """
+    return await _executor.submit(texts)
+
+
+async def encode(text: str) -> list[float] | None:
+    """Embed a single text; see ``encode_many``."""
+    vectors = await encode_many([text])
+    return vectors[0] if vectors else None
+
+
+async def _embed_query(text: str) -> list[float] | None:
+    """Compute a search query's embedding, served from the LRU when possible."""
+    vector = _query_cache.get(text)
+    if vector is not None:
+        return vector
+    vector = await encode(text)
+    if vector is not None:
+        _query_cache.set(text, vector)
     return vector
 
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    """Compute cosine similarity between two vectors."""
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = sum(x * x for x in a) ** 0.5
-    norm_b = sum(x * x for x in b) ** 0.5
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+def get_inference_stats() -> dict:
+    """Batching and busy-time counters of the inference executor, for monitoring."""
+    return _executor.stats()
+
+
+def shutdown() -> None:
+    _executor.shutdown()
+
+
+def get_query_cache_stats() -> dict:
+    """Hit/miss counters of the query-embedding cache, for monitoring."""
+    return _query_cache.stats()
+
+
+def warm_up() -> bool:
+    """Load the model and run one dummy encode so the first request is fast."""
+    started = time.perf_counter()
+    if _compute_embeddings(["warm-up"]) is None:
+        return False
+    logger.info("Embedding model warmed up in %.0f ms", (time.perf_counter() - started) * 1000)
+    return True
+
+
+def _content_hash(text_content: str) -> str:
+    return hashlib.sha256(text_content.encode()).hexdigest()
 
 
 async def upsert_embedding(
@@ -72,7 +136,7 @@ async def upsert_embedding(
     text_content: str,
 ) -> Embedding | None:
     """Create or update an embedding for an entity."""
-    content_hash = hashlib.sha256(text_content.encode()).hexdigest()
+    content_hash = _content_hash(text_content)
 
     # Check if already up to date
     result = await db.execute(
@@ -87,7 +151,7 @@ async def upsert_embedding(
     if existing and existing.content_hash == content_hash:
         return existing  # No change needed
 
-    vector = _compute_embedding(text_content)
+    vector = await encode(text_content)
     if vector is None:
         return None  # Model not available
 
@@ -98,6 +162,7 @@ async def upsert_embedding(
         existing.dimensions = len(vector)
         await db.commit()
         await db.refresh(existing)
+        await vector_index.apply_upsert(db, existing)
         return existing
 
     embedding = Embedding(
@@ -112,6 +177,7 @@ async def upsert_embedding(
     db.add(embedding)
     await db.commit()
     await db.refresh(embedding)
+    await vector_index.apply_upsert(db, embedding)
     return embedding
 
 
@@ -125,42 +191,47 @@ async def search_similar(
 ) -> list[dict]:
     """Search for similar entities using cosine similarity.
 
-    Note: For production with PostgreSQL, use pgvector's <=> operator instead
-    of in-memory comparison. This implementation works for development with SQLite.
+    Uses pgvector's ``<=>`` operator on PostgreSQL and the org's in-process
+    vector index elsewhere (see ``vector_index.search``).
     """
-    query_vector = _compute_embedding(query_text)
+    query_vector = await _embed_query(query_text)
     if query_vector is None:
         return []
 
-    # Load all embeddings for this org (for SQLite dev; use pgvector in prod)
-    base_q = select(Embedding).where(Embedding.org_id == org_id)
-    if entity_type:
-        base_q = base_q.where(Embedding.entity_type == entity_type)
+    return await vector_index.search(
+        db, org_id, query_vector,
+        entity_type=entity_type, top_k=top_k, min_score=min_score,
+    )
 
-    result = await db.execute(base_q)
-    embeddings = list(result.scalars().all())
 
-    scored = []
-    for emb in embeddings:
-        if not emb.vector:
-            continue
-        score = _cosine_similarity(query_vector, emb.vector)
-        if score >= min_score:
-            scored.append({
-                "entity_type": emb.entity_type,
-                "entity_id": str(emb.entity_id),
-                "text_preview": emb.text_content[:200],
-                "similarity_score": round(score, 4),
-            })
+@dataclass
+class IndexStats:
+    """Outcome and throughput of a bulk indexing run."""
 
-    scored.sort(key=lambda x: x["similarity_score"], reverse=True)
-    return scored[:top_k]
+    total: int = 0
+    indexed: int = 0
+    skipped: int = 0
+    written: int = 0
+    encode_ms: float = 0.0
+    write_ms: float = 0.0
+    elapsed_ms: float = 0.0
+
+    @property
+    def entities_per_second(self) -> float:
+        if self.elapsed_ms <= 0:
+            return 0.0
+        return round(self.total / (self.elapsed_ms / 1000), 1)
 
 
 async def index_entities(
     db: AsyncSession, org_id: UUID, entity_type: str
-) -> int:
-    """Bulk-index all entities of a given type for the organization."""
+) -> IndexStats:
+    """Bulk-index all entities of a given type for the organization.
+
+    Existing content hashes are prefetched in one query so unchanged
+    entities are skipped; changed texts are encoded in large batches and
+    written with one bulk INSERT/UPDATE per chunk.
+    """
     from app.models.control import Control
     from app.models.policy import Policy
     from app.models.evidence import Evidence
@@ -176,18 +247,89 @@ async def index_entities(
     if entity_type not in type_map:
         raise BadRequestError(f"Unknown entity type: {entity_type}")
 
+    started = time.perf_counter()
+    stats = IndexStats()
+
     model_cls, text_fn = type_map[entity_type]
     result = await db.execute(
         select(model_cls).where(model_cls.org_id == org_id)
     )
     entities = list(result.scalars().all())
 
-    indexed = 0
+    existing_result = await db.execute(
+        select(Embedding.entity_id, Embedding.id, Embedding.content_hash).where(
+            Embedding.org_id == org_id,
+            Embedding.entity_type == entity_type,
+        )
+    )
+    existing = {row.entity_id: (row.id, row.content_hash) for row in existing_result}
+
+    pending: list[tuple[UUID, str, str]] = []
     for entity in entities:
         text = text_fn(entity)
-        if text.strip():
-            emb = await upsert_embedding(db, org_id, entity_type, entity.id, text)
-            if emb:
-                indexed += 1
-
-    return indexed
+        if not text.strip():
+            continue
+        stats.total += 1
+        content_hash = _content_hash(text)
+        current = existing.get(entity.id)
+        if current and current[1] == content_hash:
+            stats.skipped += 1
+            continue
+        pending.append((entity.id, text, content_hash))
+
+    stats.indexed = stats.skipped
+    chunk_size = get_settings().EMBEDDING_INDEX_CHUNK_SIZE
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+
+        encode_started = time.perf_counter()
+        vectors = await encode_many([text for _, text, _ in chunk])
+        stats.encode_ms += (time.perf_counter() - encode_started) * 1000
+        if vectors is None:
+            break  # Model not available
+
+        write_started = time.perf_counter()
+        inserts: list[dict] = []
+        updates: list[dict] = []
+        for (entity_id, text, content_hash), vector in zip(chunk, vectors):
+            values = {
+                "text_content": text,
+                "content_hash": content_hash,
+                "vector": vector,
+                "dimensions": len(vector),
+            }
+            current = existing.get(entity_id)
+            if current:
+                updates.append({"id": current[0], **values})
+            else:
+                inserts.append({
+                    "org_id": org_id,
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    **values,
+                })
+        if inserts:
+            await db.execute(insert(Embedding), inserts)
+        if updates:
+            await db.execute(update(Embedding), updates)
+        await db.commit()
+        stats.write_ms += (time.perf_counter() - write_started) * 1000
+
+        await vector_index.apply_upserts(
+            db, org_id,
+            [
+                (entity_type, entity_id, text, vector)
+                for (entity_id, text, _), vector in zip(chunk, vectors)
+            ],
+        )
+        stats.written += len(chunk)
+        stats.indexed += len(chunk)
+
+    stats.encode_ms = round(stats.encode_ms, 1)
+    stats.write_ms = round(stats.write_ms, 1)
+    stats.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "Indexed %d/%d %s entities for org %s (%d skipped) in %.1f ms",
+        stats.indexed, stats.total, entity_type, org_id, stats.skipped, stats.elapsed_ms,
+    )
+    return stats
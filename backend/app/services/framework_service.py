@@ -11,9 +11,13 @@ from app.models.framework_requirement import FrameworkRequirement
 from app.schemas.framework import (
     DomainCreate,
     FrameworkCreate,
+    FrameworkDomainResponse,
+    FrameworkRequirementResponse,
+    FrameworkResponse,
     FrameworkUpdate,
     RequirementCreate,
 )
+from app.services import catalog_service
 
 # Preset / seeded framework names that cannot be deleted
 SEEDED_FRAMEWORK_NAMES = {
@@ -26,19 +30,8 @@ SEEDED_FRAMEWORK_NAMES = {
 }
 
 
-async def list_frameworks(db: AsyncSession) -> list[Framework]:
-    from app.core.cache import cache_get, cache_set
-
-    cache_key = "frameworks:active_list"
-    cached = await cache_get(cache_key)
-    if cached:
-        # Cached list is serialized; still need to return ORM objects for validation
-        pass  # Fall through to DB query — cache speeds up stats/JSON endpoints
-
-    result = await db.execute(
-        select(Framework).where(Framework.is_active == True).order_by(Framework.name)
-    )
-    return list(result.scalars().all())
+async def list_frameworks(db: AsyncSession) -> list[FrameworkResponse]:
+    return (await catalog_service.get_catalog(db)).active_frameworks
 
 
 async def get_framework(db: AsyncSession, framework_id: UUID) -> Framework:
@@ -57,14 +50,13 @@ async def get_framework(db: AsyncSession, framework_id: UUID) -> Framework:
     return framework
 
 
-async def get_framework_domains(db: AsyncSession, framework_id: UUID) -> list[FrameworkDomain]:
-    await get_framework(db, framework_id)  # Verify framework exists
-    result = await db.execute(
-        select(FrameworkDomain)
-        .where(FrameworkDomain.framework_id == framework_id)
-        .order_by(FrameworkDomain.sort_order)
-    )
-    return list(result.scalars().all())
+async def get_framework_domains(
+    db: AsyncSession, framework_id: UUID
+) -> list[FrameworkDomainResponse]:
+    catalog = await catalog_service.get_catalog(db)
+    if catalog.framework(framework_id) is None:
+        raise NotFoundError(f"Framework {framework_id} not found")
+    return list(catalog.domains.get(framework_id, ()))
 
 
 async def get_domain(db: AsyncSession, domain_id: UUID) -> FrameworkDomain:
@@ -81,14 +73,9 @@ async def get_domain(db: AsyncSession, domain_id: UUID) -> FrameworkDomain:
 
 async def get_requirements(
     db: AsyncSession, framework_id: UUID
-) -> list[FrameworkRequirement]:
-    result = await db.execute(
-        select(FrameworkRequirement)
-        .join(FrameworkDomain)
-        .where(FrameworkDomain.framework_id == framework_id)
-        .order_by(FrameworkRequirement.sort_order)
-    )
-    return list(result.scalars().all())
+) -> list[FrameworkRequirementResponse]:
+    catalog = await catalog_service.get_catalog(db)
+    return list(catalog.requirements.get(framework_id, ()))
 
 
 async def get_requirement(db: AsyncSession, requirement_id: UUID) -> FrameworkRequirement:
@@ -119,6 +106,7 @@ async def create_framework(db: AsyncSession, data: FrameworkCreate) -> Framework
     )
     db.add(framework)
     await db.commit()
+    await catalog_service.bump()
     await db.refresh(framework)
     return framework
 
@@ -132,6 +120,7 @@ async def update_framework(
     for field, value in update_fields.items():
         setattr(framework, field, value)
     await db.commit()
+    await catalog_service.bump()
     await db.refresh(framework)
     return framework
 
@@ -146,6 +135,7 @@ async def delete_framework(db: AsyncSession, framework_id: UUID) -> None:
         )
     await db.delete(framework)
     await db.commit()
+    await catalog_service.bump()
 
 
 async def add_domain(
@@ -172,6 +162,7 @@ async def add_domain(
     )
     db.add(domain)
     await db.commit()
+    await catalog_service.bump()
     await db.refresh(domain)
     return domain
 
@@ -204,5 +195,6 @@ async def add_requirement(
     )
     db.add(requirement)
     await db.commit()
+    await catalog_service.bump()
     await db.refresh(requirement)
     return requirement
@@ -2,21 +2,25 @@
 
 from uuid import UUID
 
-from sqlalchemy import select, func
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.core.pagination import paginate
 from app.models.control import Control
 from app.models.control_framework_mapping import ControlFrameworkMapping
+from app.models.coverage_index import ControlCoverage, FrameworkCoverage, RequirementCoverage
 from app.models.framework import Framework
 from app.models.framework_domain import FrameworkDomain
 from app.models.framework_requirement import FrameworkRequirement
+from app.services.coverage_index_service import ensure_coverage_index
 
 
 async def get_gap_analysis(
     db: AsyncSession, org_id: UUID, framework_id: UUID
 ) -> dict:
     """Analyze gaps for a single framework: which requirements have no mapped controls."""
+    await ensure_coverage_index(db, org_id)
+
     # Get all requirements for this framework
     requirements = await db.execute(
         select(FrameworkRequirement)
@@ -26,56 +30,50 @@ async def get_gap_analysis(
     )
     all_reqs = list(requirements.scalars().all())
 
-    # Get all mappings for this org and framework
-    mappings = await db.execute(
-        select(ControlFrameworkMapping)
-        .join(Control, ControlFrameworkMapping.control_id == Control.id)
-        .where(
-            Control.org_id == org_id,
-            ControlFrameworkMapping.framework_id == framework_id,
-        )
-    )
-    mapped_req_ids = {m.requirement_id for m in mappings.scalars().all() if m.requirement_id}
+    # Requirement -> controls adjacency from the coverage index
+    coverage = {
+        row.requirement_id: row
+        for row in (await db.execute(
+            select(RequirementCoverage).where(
+                RequirementCoverage.org_id == org_id,
+                RequirementCoverage.framework_id == framework_id,
+            )
+        )).scalars()
+    }
 
-    # Get controls mapped to this framework with their statuses
+    # Titles and statuses of the org's controls mapped to this framework
     controls_result = await db.execute(
-        select(Control, ControlFrameworkMapping.requirement_id)
-        .join(ControlFrameworkMapping, ControlFrameworkMapping.control_id == Control.id)
-        .where(
+        select(Control.id, Control.title, Control.status).where(
             Control.org_id == org_id,
-            ControlFrameworkMapping.framework_id == framework_id,
+            Control.id.in_(
+                select(ControlFrameworkMapping.control_id)
+                .where(ControlFrameworkMapping.framework_id == framework_id)
+            ),
         )
     )
-    control_rows = controls_result.all()
-
-    # Build requirement-to-controls mapping
-    req_controls: dict[str, list[dict]] = {}
-    for ctrl, req_id in control_rows:
-        if req_id:
-            req_id_str = str(req_id)
-            if req_id_str not in req_controls:
-                req_controls[req_id_str] = []
-            req_controls[req_id_str].append({
-                "id": str(ctrl.id),
-                "title": ctrl.title,
-                "status": ctrl.status,
-            })
+    controls_by_id = {
+        str(cid): {"id": str(cid), "title": title, "status": status}
+        for cid, title, status in controls_result.all()
+    }
 
     covered = []
     gaps = []
     partial = []
 
     for req in all_reqs:
-        controls = req_controls.get(str(req.id), [])
+        row = coverage.get(req.id)
+        controls = [
+            controls_by_id[cid] for cid in (row.control_ids if row else []) if cid in controls_by_id
+        ]
         entry = {
             "requirement_id": str(req.id),
             "code": req.code,
             "title": req.title,
             "controls": controls,
         }
-        if not controls:
+        if not row or not row.control_count:
             gaps.append(entry)
-        elif all(c["status"] == "implemented" for c in controls):
+        elif row.implemented_count == row.control_count:
             covered.append(entry)
         else:
             partial.append(entry)
@@ -97,80 +95,91 @@ async def get_gap_analysis(
 
 
 async def get_cross_framework_matrix(
-    db: AsyncSession, org_id: UUID
+    db: AsyncSession,
+    org_id: UUID,
+    page: int = 1,
+    page_size: int = 50,
+    cursor: str | None = None,
 ) -> dict:
     """Build a cross-framework control mapping matrix.
 
     Shows which controls map to multiple frameworks and identifies
-    opportunities for deduplication.
+    opportunities for deduplication. Matrix rows are paginated, most
+    widely mapped controls first.
     """
-    # Get all active frameworks
-    frameworks_result = await db.execute(
-        select(Framework).where(Framework.is_active == True)  # noqa: E712
-    )
-    frameworks = list(frameworks_result.scalars().all())
+    await ensure_coverage_index(db, org_id)
 
-    # Get all controls with their framework mappings
-    controls_result = await db.execute(
-        select(Control)
-        .options(selectinload(Control.framework_mappings))
-        .where(Control.org_id == org_id)
-    )
-    controls = list(controls_result.scalars().all())
-
-    # Build matrix: for each control, list which frameworks it maps to
-    matrix_rows = []
-    multi_framework_count = 0
-
-    for ctrl in controls:
-        fw_ids = set()
-        for mapping in (ctrl.framework_mappings or []):
-            if mapping.framework_id:
-                fw_ids.add(str(mapping.framework_id))
-
-        if len(fw_ids) > 1:
-            multi_framework_count += 1
-
-        matrix_rows.append({
-            "control_id": str(ctrl.id),
-            "control_title": ctrl.title,
-            "status": ctrl.status,
-            "framework_ids": list(fw_ids),
-            "framework_count": len(fw_ids),
-        })
+    total_controls, multi_framework_count = (await db.execute(
+        select(func.count(), func.count().filter(ControlCoverage.framework_count > 1))
+        .where(ControlCoverage.org_id == org_id)
+    )).one()
 
-    # Per-framework summary
-    framework_summaries = []
-    for fw in frameworks:
-        fw_id_str = str(fw.id)
-        mapped_controls = [r for r in matrix_rows if fw_id_str in r["framework_ids"]]
-        implemented = sum(1 for r in mapped_controls if r["status"] == "implemented")
-
-        # Count total requirements
-        req_count = (await db.execute(
-            select(func.count())
-            .select_from(FrameworkRequirement)
-            .join(FrameworkDomain)
-            .where(FrameworkDomain.framework_id == fw.id)
-        )).scalar() or 0
+    # Requirements per framework, in one grouped query
+    req_counts = dict((await db.execute(
+        select(FrameworkDomain.framework_id, func.count(FrameworkRequirement.id))
+        .join(FrameworkRequirement, FrameworkRequirement.domain_id == FrameworkDomain.id)
+        .group_by(FrameworkDomain.framework_id)
+    )).all())
 
+    # Per-framework summary from the index counters
+    frameworks_result = await db.execute(
+        select(Framework.id, Framework.name, FrameworkCoverage)
+        .outerjoin(FrameworkCoverage, and_(
+            FrameworkCoverage.org_id == org_id,
+            FrameworkCoverage.framework_id == Framework.id,
+        ))
+        .where(Framework.is_active == True)  # noqa: E712
+    )
+    framework_summaries = []
+    for fw_id, fw_name, counters in frameworks_result.all():
+        req_count = req_counts.get(fw_id, 0)
+        implemented = counters.implemented_controls if counters else 0
         framework_summaries.append({
-            "framework_id": fw_id_str,
-            "framework_name": fw.name,
+            "framework_id": str(fw_id),
+            "framework_name": fw_name,
             "total_requirements": req_count,
-            "mapped_controls": len(mapped_controls),
+            "mapped_controls": counters.mapped_controls if counters else 0,
             "implemented_controls": implemented,
             "coverage_pct": round(
                 implemented / req_count * 100, 1
             ) if req_count else 0.0,
         })
 
+    matrix_page = await paginate(
+        db,
+        select(ControlCoverage).where(ControlCoverage.org_id == org_id),
+        sort_column=ControlCoverage.framework_count,
+        id_column=ControlCoverage.control_id,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        count="none",
+    )
+    details = {
+        cid: (title, status)
+        for cid, title, status in (await db.execute(
+            select(Control.id, Control.title, Control.status)
+            .where(Control.id.in_([row.control_id for row in matrix_page.items]))
+        )).all()
+    }
+    matrix = []
+    for row in matrix_page.items:
+        title, status = details.get(row.control_id, (None, None))
+        matrix.append({
+            "control_id": str(row.control_id),
+            "control_title": title,
+            "status": status,
+            "framework_ids": row.framework_ids or [],
+            "framework_count": row.framework_count,
+        })
+
     return {
-        "total_controls": len(controls),
+        "total_controls": total_controls,
         "multi_framework_controls": multi_framework_count,
         "deduplication_opportunity": multi_framework_count,
         "frameworks": framework_summaries,
-        "matrix": sorted(
-            matrix_rows, key=lambda r: r["framework_count"], reverse=True
-        ),
+        "matrix": matrix,
+        "page": matrix_page.page,
+        "page_size": page_size,
+        "next_cursor": matrix_page.next_cursor,
     }
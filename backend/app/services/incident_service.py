@@ -5,6 +5,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundError
+from app.core.stats import StatsQuery, hours_between
 from app.models.incident import Incident, IncidentTimelineEvent
 from app.schemas.incident import IncidentCreate, IncidentUpdate, TimelineEventCreate
 
@@ -125,31 +126,16 @@ async def get_timeline(db: AsyncSession, org_id: UUID, incident_id: UUID) -> lis
     return list(result.scalars().all())
 
 
+_STATS = (
+    StatsQuery(Incident, "incident_stats")
+    .group_by(by_status=Incident.status, by_severity=Incident.severity)
+    .count("open_p1_count", Incident.severity == "P1", Incident.status.in_(("open", "investigating")))
+    .avg(
+        "avg_resolution_hours",
+        hours_between(Incident.resolved_at, func.coalesce(Incident.detected_at, Incident.created_at)),
+    )
+)
+
+
 async def get_incident_stats(db: AsyncSession, org_id: UUID) -> dict:
-    result = await db.execute(select(Incident).where(Incident.org_id == org_id))
-    incidents = list(result.scalars().all())
-
-    by_status: dict[str, int] = {}
-    by_severity: dict[str, int] = {}
-    open_p1 = 0
-    resolution_hours: list[float] = []
-
-    for inc in incidents:
-        by_status[inc.status] = by_status.get(inc.status, 0) + 1
-        by_severity[inc.severity] = by_severity.get(inc.severity, 0) + 1
-        if inc.severity == "P1" and inc.status in ("open", "investigating"):
-            open_p1 += 1
-        if inc.resolved_at and inc.detected_at:
-            delta = (inc.resolved_at - inc.detected_at).total_seconds() / 3600
-            resolution_hours.append(delta)
-        elif inc.resolved_at:
-            delta = (inc.resolved_at - inc.created_at).total_seconds() / 3600
-            resolution_hours.append(delta)
-
-    return {
-        "total": len(incidents),
-        "by_status": by_status,
-        "by_severity": by_severity,
-        "open_p1_count": open_p1,
-        "avg_resolution_hours": round(sum(resolution_hours) / len(resolution_hours), 1) if resolution_hours else 0.0,
-    }
+    return await _STATS.run(db, org_id)
@@ -1,15 +1,32 @@
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import select, func
+from sqlalchemy import insert, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import lazyload
 
+from app.core import scheduler
 from app.core.exceptions import NotFoundError
+from app.core.pagination import CountMode, Page, paginate
+from app.core.stats import StatsQuery
 from app.models.monitoring import MonitorRule, MonitorAlert
 from app.models.evidence import Evidence
 from app.models.control import Control
 from app.models.policy import Policy
-from app.schemas.monitoring import MonitorRuleCreate, MonitorRuleUpdate, MonitorAlertUpdate
+from app.schemas.monitoring import (
+    MonitorAlertResponse,
+    MonitorAlertUpdate,
+    MonitorEvaluationReport,
+    MonitorRuleCreate,
+    MonitorRuleEvaluation,
+    MonitorRuleUpdate,
+)
+
+logger = logging.getLogger(__name__)
 
 
 # === Rules ===
@@ -43,6 +60,7 @@ async def create_rule(db: AsyncSession, org_id: UUID, data: MonitorRuleCreate) -
     db.add(rule)
     await db.commit()
     await db.refresh(rule)
+    scheduler.rules_changed(org_id)
     return rule
 
 
@@ -64,6 +82,7 @@ async def update_rule(
         setattr(rule, field, value)
     await db.commit()
     await db.refresh(rule)
+    scheduler.rules_changed(org_id)
     return rule
 
 
@@ -71,163 +90,271 @@ async def delete_rule(db: AsyncSession, org_id: UUID, rule_id: UUID) -> None:
     rule = await get_rule(db, org_id, rule_id)
     await db.delete(rule)
     await db.commit()
+    scheduler.rules_changed(org_id)
+
+
+# === Checks ===
+#
+# Rules are evaluated in batches: an org's rules are grouped by check type and
+# each group is answered by one aggregate query per distinct rule config (a
+# windowed COUNT plus a sample of IDs), instead of loading every matching row
+# once per rule. Alerts for the whole batch are written in one bulk insert.
+
+ALERT_SAMPLE_SIZE = 10
+PROWLER_SEVERITY_ORDER = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+
+
+@dataclass
+class CheckOutcome:
+    result: str  # pass, fail, error
+    alert: dict | None = None  # severity, title, details
+
+
+async def _count_and_sample(db: AsyncSession, id_column, *criteria) -> tuple[int, list[str]]:
+    """Count rows matching *criteria* and return up to ALERT_SAMPLE_SIZE of their IDs."""
+    rows = (await db.execute(
+        select(id_column, func.count().over()).where(*criteria).limit(ALERT_SAMPLE_SIZE)
+    )).all()
+    return (rows[0][1] if rows else 0), [str(row[0]) for row in rows]
+
+
+async def _check_evidence_staleness(
+    db: AsyncSession, org_id: UUID, rules: list[MonitorRule], now
+) -> dict[UUID, CheckOutcome]:
+    outcomes = {}
+    by_days: dict[int, list[MonitorRule]] = defaultdict(list)
+    for rule in rules:
+        by_days[(rule.config or {}).get("staleness_days", 90)].append(rule)
+    for staleness_days, group in by_days.items():
+        stale_count, sample = await _count_and_sample(
+            db, Evidence.id,
+            Evidence.org_id == org_id,
+            Evidence.collected_at < now - timedelta(days=staleness_days),
+        )
+        for rule in group:
+            outcomes[rule.id] = CheckOutcome("fail", {
+                "severity": "high",
+                "title": f"{stale_count} evidence items are stale (>{staleness_days} days)",
+                "details": {"stale_count": stale_count, "evidence_ids": sample},
+            }) if stale_count else CheckOutcome("pass")
+    return outcomes
+
+
+async def _check_control_status(
+    db: AsyncSession, org_id: UUID, rules: list[MonitorRule], now
+) -> dict[UUID, CheckOutcome]:
+    failing_count, sample = await _count_and_sample(
+        db, Control.id,
+        Control.org_id == org_id,
+        Control.status.in_(["not_implemented", "draft"]),
+    )
+    outcome = CheckOutcome("fail", {
+        "severity": "medium",
+        "title": f"{failing_count} controls are not implemented",
+        "details": {"failing_count": failing_count, "control_ids": sample},
+    }) if failing_count else CheckOutcome("pass")
+    return {rule.id: outcome for rule in rules}
+
+
+async def _check_policy_expiry(
+    db: AsyncSession, org_id: UUID, rules: list[MonitorRule], now
+) -> dict[UUID, CheckOutcome]:
+    expired_count, sample = await _count_and_sample(
+        db, Policy.id,
+        Policy.org_id == org_id,
+        Policy.next_review_date < now,
+    )
+    outcome = CheckOutcome("fail", {
+        "severity": "high",
+        "title": f"{expired_count} policies are past their review date",
+        "details": {"expired_count": expired_count, "policy_ids": sample},
+    }) if expired_count else CheckOutcome("pass")
+    return {rule.id: outcome for rule in rules}
+
+
+async def _check_prowler_scan(
+    db: AsyncSession, org_id: UUID, rules: list[MonitorRule], now
+) -> dict[UUID, CheckOutcome]:
+    """Driven by the latest scan's diff against the previous scan.
+
+    Alerts on failing findings that are new at or above each rule's severity
+    threshold (once per scan), and fails the rule while any such finding is
+    still open.
+    """
+    from app.models.prowler_finding import ProwlerFindingChange, ProwlerScanDiff
+
+    # Diffs are written in the same transaction that completes the scan
+    diff = (await db.execute(
+        select(ProwlerScanDiff).where(ProwlerScanDiff.org_id == org_id)
+        .order_by(ProwlerScanDiff.created_at.desc()).limit(1)
+    )).scalar_one_or_none()
+    if not diff:
+        return {rule.id: CheckOutcome("pass") for rule in rules}
+
+    # Latest alert per rule, to avoid alerting twice on the same scan
+    latest = (
+        select(
+            MonitorAlert.rule_id,
+            MonitorAlert.details,
+            func.row_number().over(
+                partition_by=MonitorAlert.rule_id, order_by=MonitorAlert.triggered_at.desc()
+            ).label("rn"),
+        ).where(MonitorAlert.rule_id.in_([rule.id for rule in rules]))
+    ).subquery()
+    alerted_scan = {
+        rule_id: (details or {}).get("scan_job_id")
+        for rule_id, details in (await db.execute(
+            select(latest.c.rule_id, latest.c.details).where(latest.c.rn == 1)
+        )).all()
+    }
+
+    outcomes = {}
+    top_new: dict[str, list] = {}
+    for rule in rules:
+        threshold = (rule.config or {}).get("severity_threshold", "medium")
+        min_rank = PROWLER_SEVERITY_ORDER.get(threshold, 2)
+        severities = [s for s, rank in PROWLER_SEVERITY_ORDER.items() if rank >= min_rank]
+        new_count = sum((diff.new_by_severity or {}).get(s, 0) for s in severities)
+        failing_count = sum((diff.failing_by_severity or {}).get(s, 0) for s in severities)
+        outcome = CheckOutcome("fail" if failing_count else "pass")
+        if new_count and alerted_scan.get(rule.id) != str(diff.job_id):
+            if threshold not in top_new:
+                top_new[threshold] = (await db.execute(
+                    select(ProwlerFindingChange).where(
+                        ProwlerFindingChange.job_id == diff.job_id,
+                        ProwlerFindingChange.change == "new",
+                        ProwlerFindingChange.severity.in_(severities),
+                    ).order_by(ProwlerFindingChange.check_id).limit(5)
+                )).scalars().all()
+            outcome.alert = {
+                "severity": "high",
+                "title": f"Prowler scan: {new_count} new findings at {threshold}+ severity",
+                "details": {
+                    "new_count": new_count,
+                    "finding_count": failing_count,
+                    "resolved_count": diff.resolved_count,
+                    "scan_job_id": str(diff.job_id),
+                    "previous_scan_job_id": str(diff.previous_job_id) if diff.previous_job_id else None,
+                    "top_findings": [
+                        {"check_id": f.check_id, "severity": f.severity, "service": f.service}
+                        for f in top_new[threshold]
+                    ],
+                },
+            }
+        outcomes[rule.id] = outcome
+    return outcomes
+
+
+CHECKS = {
+    "evidence_staleness": _check_evidence_staleness,
+    "control_status": _check_control_status,
+    "policy_expiry": _check_policy_expiry,
+    "prowler_scan": _check_prowler_scan,
+}
+
+
+async def evaluate_rules(
+    db: AsyncSession, org_id: UUID, rules: list[MonitorRule]
+) -> tuple[list[MonitorAlert], list[MonitorRuleEvaluation]]:
+    """Evaluate *rules* of one org in a batch and commit the outcome.
+
+    Each rule's ``elapsed_ms`` is the time taken by the check-type group it
+    was evaluated in; ``batch_size`` is the number of rules in that group. A
+    group whose check raises is recorded as ``error`` for each of its rules.
+    """
+    now = datetime.now(timezone.utc)
+    by_type: dict[str, list[MonitorRule]] = defaultdict(list)
+    for rule in rules:
+        by_type[rule.check_type].append(rule)
+
+    alert_rows: list[dict] = []
+    evaluations: list[MonitorRuleEvaluation] = []
+    for check_type, group in by_type.items():
+        check = CHECKS.get(check_type)
+        started = time.perf_counter()
+        try:
+            # A savepoint per group: a failing check rolls back only its own
+            # work and leaves the session usable for the remaining groups.
+            async with db.begin_nested():
+                outcomes = await check(db, org_id, group, now) if check else {}
+        except Exception as e:
+            logger.exception("Monitoring check %s failed for org %s", check_type, org_id)
+            # Rolling back the savepoint expires rules the check touched
+            for rule in group:
+                await db.refresh(rule)
+            error = CheckOutcome("error", {
+                "severity": "critical",
+                "title": f"Check execution failed: {type(e).__name__}",
+                "details": {"error": str(e)},
+            })
+            outcomes = {rule.id: error for rule in group}
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        for rule in group:
+            outcome = outcomes.get(rule.id) or CheckOutcome("pass")
+            rule.last_result = outcome.result
+            rule.last_checked_at = now
+            alert_id = None
+            if outcome.alert:
+                alert_id = uuid4()
+                alert_rows.append({
+                    "id": alert_id, "org_id": org_id, "rule_id": rule.id,
+                    "triggered_at": now, **outcome.alert,
+                })
+            evaluations.append(MonitorRuleEvaluation(
+                rule_id=rule.id,
+                check_type=check_type,
+                result=outcome.result,
+                alert_id=alert_id,
+                elapsed_ms=elapsed_ms,
+                batch_size=len(group),
+            ))
+
+    if alert_rows:
+        await db.execute(insert(MonitorAlert), alert_rows)
+    await db.commit()
+
+    alerts: list[MonitorAlert] = []
+    if alert_rows:
+        alerts = list((await db.execute(
+            select(MonitorAlert).where(MonitorAlert.id.in_([row["id"] for row in alert_rows]))
+        )).scalars().all())
+        order = {row["id"]: i for i, row in enumerate(alert_rows)}
+        alerts.sort(key=lambda a: order[a.id])
+    return alerts, evaluations
 
 
 async def run_checks(db: AsyncSession, org_id: UUID, rule_id: UUID) -> list[MonitorAlert]:
     """Run checks for a specific rule and create alerts for failures."""
     rule = await get_rule(db, org_id, rule_id)
-    now = datetime.now(timezone.utc)
-    alerts_created: list[MonitorAlert] = []
-
-    try:
-        return await _execute_checks(db, rule, org_id, now, alerts_created)
-    except Exception as e:
-        alert = MonitorAlert(
-            org_id=org_id,
-            rule_id=rule.id,
-            severity="critical",
-            title=f"Check execution failed: {type(e).__name__}",
-            details={"error": str(e)},
-            triggered_at=now,
-        )
-        db.add(alert)
-        rule.last_result = "error"
-        rule.last_checked_at = now
-        await db.commit()
-        await db.refresh(alert)
-        return [alert]
-
-
-async def _execute_checks(
-    db: AsyncSession, rule: MonitorRule, org_id: UUID, now, alerts_created: list[MonitorAlert]
-) -> list[MonitorAlert]:
-    if rule.check_type == "evidence_staleness":
-        staleness_days = (rule.config or {}).get("staleness_days", 90)
-        threshold = now - timedelta(days=staleness_days)
-        result = await db.execute(
-            select(Evidence).where(
-                Evidence.org_id == org_id,
-                Evidence.collected_at < threshold,
-            )
-        )
-        stale = list(result.scalars().all())
-        if stale:
-            alert = MonitorAlert(
-                org_id=org_id,
-                rule_id=rule.id,
-                severity="high",
-                title=f"{len(stale)} evidence items are stale (>{staleness_days} days)",
-                details={"stale_count": len(stale), "evidence_ids": [str(e.id) for e in stale[:10]]},
-                triggered_at=now,
-            )
-            db.add(alert)
-            alerts_created.append(alert)
-            rule.last_result = "fail"
-        else:
-            rule.last_result = "pass"
-
-    elif rule.check_type == "control_status":
-        result = await db.execute(
-            select(Control).where(
-                Control.org_id == org_id,
-                Control.status.in_(["not_implemented", "draft"]),
-            )
-        )
-        failing = list(result.scalars().all())
-        if failing:
-            alert = MonitorAlert(
-                org_id=org_id,
-                rule_id=rule.id,
-                severity="medium",
-                title=f"{len(failing)} controls are not implemented",
-                details={"failing_count": len(failing)},
-                triggered_at=now,
-            )
-            db.add(alert)
-            alerts_created.append(alert)
-            rule.last_result = "fail"
-        else:
-            rule.last_result = "pass"
-
-    elif rule.check_type == "policy_expiry":
-        result = await db.execute(
-            select(Policy).where(
-                Policy.org_id == org_id,
-                Policy.next_review_date < now,
-            )
-        )
-        expired = list(result.scalars().all())
-        if expired:
-            alert = MonitorAlert(
-                org_id=org_id,
-                rule_id=rule.id,
-                severity="high",
-                title=f"{len(expired)} policies are past their review date",
-                details={"expired_count": len(expired)},
-                triggered_at=now,
-            )
-            db.add(alert)
-            alerts_created.append(alert)
-            rule.last_result = "fail"
-        else:
-            rule.last_result = "pass"
-    elif rule.check_type == "prowler_scan":
-        # Check for FAIL findings at or above severity threshold from latest Prowler scan
-        config = rule.config or {}
-        severity_threshold = config.get("severity_threshold", "medium")
-        severity_order = {"critical": 4, "high": 3, "medium": 2, "low": 1}
-        min_severity = severity_order.get(severity_threshold, 2)
-
-        from app.models.collection_job import CollectionJob
-        scan_result = await db.execute(
-            select(CollectionJob).where(
-                CollectionJob.org_id == org_id,
-                CollectionJob.collector_type.like("prowler_%"),
-                CollectionJob.status == "completed",
-            ).order_by(CollectionJob.created_at.desc()).limit(1)
-        )
-        latest_scan = scan_result.scalar_one_or_none()
-
-        if latest_scan and latest_scan.result_data:
-            data = latest_scan.result_data.get("data", {})
-            findings = data.get("findings", [])
-            critical_findings = [
-                f for f in findings
-                if f.get("status", "").upper() == "FAIL"
-                and severity_order.get(f.get("severity", "").lower(), 0) >= min_severity
-            ]
-            if critical_findings:
-                alert = MonitorAlert(
-                    org_id=org_id,
-                    rule_id=rule.id,
-                    severity="high",
-                    title=f"Prowler scan: {len(critical_findings)} findings at {severity_threshold}+ severity",
-                    details={
-                        "finding_count": len(critical_findings),
-                        "scan_job_id": str(latest_scan.id),
-                        "top_findings": [
-                            {"check_id": f.get("check_id"), "severity": f.get("severity"), "service": f.get("service")}
-                            for f in critical_findings[:5]
-                        ],
-                    },
-                    triggered_at=now,
-                )
-                db.add(alert)
-                alerts_created.append(alert)
-                rule.last_result = "fail"
-            else:
-                rule.last_result = "pass"
-        else:
-            rule.last_result = "pass"
-
-    else:
-        rule.last_result = "pass"
-
-    rule.last_checked_at = now
-    await db.commit()
-    for a in alerts_created:
-        await db.refresh(a)
-    return alerts_created
+    alerts, _ = await evaluate_rules(db, org_id, [rule])
+    return alerts
+
+
+async def run_org_checks(
+    db: AsyncSession, org_id: UUID, schedule: str | None = None
+) -> MonitorEvaluationReport:
+    """Evaluate all of an org's active rules (optionally one schedule) in one batch."""
+    started = time.perf_counter()
+    q = select(MonitorRule).options(lazyload(MonitorRule.alerts)).where(
+        MonitorRule.org_id == org_id, MonitorRule.is_active.is_(True)
+    )
+    if schedule:
+        q = q.where(MonitorRule.schedule == schedule)
+    rules = list((await db.execute(q)).scalars().all())
+    alerts, evaluations = await evaluate_rules(db, org_id, rules)
+    report = MonitorEvaluationReport(
+        rules_evaluated=len(rules),
+        alerts_created=len(alerts),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        evaluations=evaluations,
+        alerts=[MonitorAlertResponse.model_validate(a) for a in alerts],
+    )
+    logger.info(
+        "Evaluated %d monitoring rules for org %s in %.1fms (%d alerts)",
+        report.rules_evaluated, org_id, report.elapsed_ms, report.alerts_created,
+    )
+    return report
 
 
 # === Alerts ===
@@ -240,24 +367,22 @@ async def list_alerts(
     rule_id: UUID | None = None,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[MonitorAlert], int]:
+    cursor: str | None = None,
+    count: CountMode | None = None,
+) -> Page:
     base_q = select(MonitorAlert).where(MonitorAlert.org_id == org_id)
-    count_q = select(func.count()).select_from(MonitorAlert).where(MonitorAlert.org_id == org_id)
 
     if status:
         base_q = base_q.where(MonitorAlert.status == status)
-        count_q = count_q.where(MonitorAlert.status == status)
     if severity:
         base_q = base_q.where(MonitorAlert.severity == severity)
-        count_q = count_q.where(MonitorAlert.severity == severity)
     if rule_id:
         base_q = base_q.where(MonitorAlert.rule_id == rule_id)
-        count_q = count_q.where(MonitorAlert.rule_id == rule_id)
 
-    total = (await db.execute(count_q)).scalar() or 0
-    q = base_q.offset((page - 1) * page_size).limit(page_size).order_by(MonitorAlert.created_at.desc())
-    result = await db.execute(q)
-    return list(result.scalars().all()), total
+    return await paginate(
+        db, base_q, sort_column=MonitorAlert.created_at, id_column=MonitorAlert.id,
+        page=page, page_size=page_size, cursor=cursor, count=count,
+    )
 
 
 async def update_alert(
@@ -288,22 +413,20 @@ async def update_alert(
 
 # === Stats ===
 
-async def get_monitoring_stats(db: AsyncSession, org_id: UUID) -> dict:
-    rules_result = await db.execute(select(MonitorRule).where(MonitorRule.org_id == org_id))
-    rules = list(rules_result.scalars().all())
-
-    alerts_result = await db.execute(
-        select(MonitorAlert).where(MonitorAlert.org_id == org_id, MonitorAlert.status == "open")
-    )
-    open_alerts = list(alerts_result.scalars().all())
+_RULE_STATS = StatsQuery(MonitorRule, "monitor_rule_stats").count(
+    "active_rules", MonitorRule.is_active.is_(True)
+)
+_OPEN_ALERT_STATS = StatsQuery(
+    MonitorAlert, "open_alert_stats", where=(MonitorAlert.status == "open",)
+).group_by(by_severity=MonitorAlert.severity)
 
-    by_severity: dict[str, int] = {}
-    for a in open_alerts:
-        by_severity[a.severity] = by_severity.get(a.severity, 0) + 1
 
+async def get_monitoring_stats(db: AsyncSession, org_id: UUID) -> dict:
+    rules = await _RULE_STATS.run(db, org_id)
+    alerts = await _OPEN_ALERT_STATS.run(db, org_id)
     return {
-        "total_rules": len(rules),
-        "active_rules": sum(1 for r in rules if r.is_active),
-        "open_alerts": len(open_alerts),
-        "by_severity": by_severity,
+        "total_rules": rules["total"],
+        "active_rules": rules["active_rules"],
+        "open_alerts": alerts["total"],
+        "by_severity": alerts["by_severity"],
     }
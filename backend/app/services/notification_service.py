@@ -12,6 +12,7 @@ from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundError
+from app.core.stats import StatsQuery
 from app.models.notification import Notification, SlackWebhookConfig
 from app.schemas.notification import NotificationCreate
 
@@ -146,32 +147,21 @@ async def mark_all_read(db: AsyncSession, org_id: UUID, user_id: UUID | None = N
     return result.rowcount
 
 
+_STATS = (
+    StatsQuery(Notification, "notification_stats")
+    .group_by(by_category=Notification.category, by_severity=Notification.severity)
+    .count("unread", Notification.is_read.is_not(True))
+)
+
+
 async def get_notification_stats(
     db: AsyncSession, org_id: UUID, user_id: UUID | None = None
 ) -> dict:
-    base = select(Notification).where(Notification.org_id == org_id)
-    if user_id:
-        base = base.where(
-            (Notification.user_id == user_id) | (Notification.user_id.is_(None))
-        )
-    result = await db.execute(base)
-    notifications = list(result.scalars().all())
-
-    by_category: dict[str, int] = {}
-    by_severity: dict[str, int] = {}
-    unread = 0
-    for n in notifications:
-        by_category[n.category] = by_category.get(n.category, 0) + 1
-        by_severity[n.severity] = by_severity.get(n.severity, 0) + 1
-        if not n.is_read:
-            unread += 1
-
-    return {
-        "total": len(notifications),
-        "unread": unread,
-        "by_category": by_category,
-        "by_severity": by_severity,
-    }
+    if not user_id:
+        return await _STATS.run(db, org_id)
+    return await _STATS.run(
+        db, org_id, (Notification.user_id == user_id) | (Notification.user_id.is_(None))
+    )
 
 
 # --- Slack webhook ---
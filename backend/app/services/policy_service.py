@@ -4,8 +4,8 @@ from uuid import UUID
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import cache_get, cache_set, cache_delete
 from app.core.exceptions import BadRequestError, NotFoundError
+from app.core.stats import StatsQuery
 from app.models.policy import Policy
 from app.models.policy_template import PolicyTemplate
 from app.schemas.policy import PolicyCreate, PolicyUpdate, PolicyStatsResponse
@@ -36,7 +36,6 @@ async def create_policy(db: AsyncSession, org_id: UUID, data: PolicyCreate) -> P
     db.add(policy)
     await db.commit()
     await db.refresh(policy)
-    await cache_delete(f"org:{org_id}:policy_stats")
     return policy
 
 
@@ -66,38 +65,15 @@ async def delete_policy(db: AsyncSession, org_id: UUID, policy_id: UUID) -> None
     policy = await get_policy(db, org_id, policy_id)
     await db.delete(policy)
     await db.commit()
-    await cache_delete(f"org:{org_id}:policy_stats")
 
 
-async def get_policy_stats(db: AsyncSession, org_id: UUID) -> PolicyStatsResponse:
-    cache_key = f"org:{org_id}:policy_stats"
-    cached = await cache_get(cache_key)
-    if cached:
-        return PolicyStatsResponse(**cached)
+_STATS = StatsQuery(Policy, "policy_stats")
+for _status in ("draft", "in_review", "approved", "published", "archived"):
+    _STATS.count(_status, Policy.status == _status)
 
-    result = await db.execute(
-        select(
-            func.count().label("total"),
-            func.count().filter(Policy.status == "draft").label("draft"),
-            func.count().filter(Policy.status == "in_review").label("in_review"),
-            func.count().filter(Policy.status == "approved").label("approved"),
-            func.count().filter(Policy.status == "published").label("published"),
-            func.count().filter(Policy.status == "archived").label("archived"),
-        )
-        .select_from(Policy)
-        .where(Policy.org_id == org_id)
-    )
-    row = result.one()
-    stats = PolicyStatsResponse(
-        total=row.total,
-        draft=row.draft,
-        in_review=row.in_review,
-        approved=row.approved,
-        published=row.published,
-        archived=row.archived,
-    )
-    await cache_set(cache_key, stats.model_dump(), ttl=120)
-    return stats
+
+async def get_policy_stats(db: AsyncSession, org_id: UUID) -> PolicyStatsResponse:
+    return PolicyStatsResponse(**await _STATS.run(db, org_id))
 
 
 async def list_policy_templates(
@@ -145,7 +121,6 @@ async def submit_for_review(
     policy.status = "in_review"
     await db.commit()
     await db.refresh(policy)
-    await cache_delete(f"org:{org_id}:policy_stats")
     return policy
 
 
@@ -163,7 +138,6 @@ async def approve_policy(
     policy.approved_at = datetime.now(timezone.utc)
     await db.commit()
     await db.refresh(policy)
-    await cache_delete(f"org:{org_id}:policy_stats")
     return policy
 
 
@@ -180,7 +154,6 @@ async def publish_policy(
     policy.published_at = datetime.now(timezone.utc)
     await db.commit()
     await db.refresh(policy)
-    await cache_delete(f"org:{org_id}:policy_stats")
     return policy
 
 
@@ -192,5 +165,4 @@ async def archive_policy(
     policy.status = "archived"
     await db.commit()
     await db.refresh(policy)
-    await cache_delete(f"org:{org_id}:policy_stats")
     return policy
@@ -1,15 +1,27 @@
 """Business logic for Prowler security scanner operations."""
+import asyncio
+import itertools
+from datetime import datetime, timezone
+from collections.abc import Iterable, Iterator
 from uuid import UUID
 
-from sqlalchemy import select, func
+from sqlalchemy import insert, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
+from app.core.exceptions import NotFoundError
 from app.models.collection_job import CollectionJob
 from app.models.integration import Integration
+from app.models.prowler_finding import ProwlerFindingChange, ProwlerFindingRecord, ProwlerScanDiff
 from app.schemas.integration import CollectionTrigger
 from app.schemas.prowler import (
     ProwlerScanTrigger,
     ProwlerFinding,
+    ProwlerFindingCount,
+    ProwlerFindingCounts,
+    ProwlerFindingChangeItem,
+    ProwlerFindingPage,
+    ProwlerScanDiffResponse,
     ProwlerScanResultResponse,
     ProwlerCompliancePosture,
     ProwlerFindingSummary,
@@ -25,6 +37,202 @@ SCAN_TYPE_TO_COLLECTOR = {
     "compliance": "prowler_aws_compliance_scan",
 }
 
+FINDING_FIELDS = tuple(ProwlerFinding.model_fields)
+CHANGE_FIELDS = (
+    "fingerprint", "check_id", "check_title", "severity", "service", "region", "resource_id", "resource_arn",
+)
+
+
+class ScanDiff:
+    """Classify a scan's failing findings against the previous scan's in one pass.
+
+    Built from the previous scan's failing findings (fingerprint -> change
+    fields); ``add`` is fed every finding of the new scan as it is ingested.
+    Whatever is left unmatched at the end has been resolved.
+    """
+
+    def __init__(self, previous_job_id: UUID | None, previous: dict[str, dict]):
+        self.previous_job_id = previous_job_id
+        self._unmatched = previous
+        self._matched: set[str] = set()
+        self.new: list[dict] = []
+        self.persisting = 0
+        self.failing_by_severity: dict[str, int] = {}
+
+    def add(self, finding: dict) -> None:
+        if finding["status"] != "FAIL":
+            return
+        severity = finding["severity"] or "unknown"
+        self.failing_by_severity[severity] = self.failing_by_severity.get(severity, 0) + 1
+        fp = finding["fingerprint"]
+        if self._unmatched.pop(fp, None) is not None or fp in self._matched:
+            self._matched.add(fp)
+            self.persisting += 1
+        else:
+            self.new.append({field: finding[field] for field in CHANGE_FIELDS})
+
+    @property
+    def resolved(self) -> list[dict]:
+        return list(self._unmatched.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "previous_job_id": str(self.previous_job_id) if self.previous_job_id else None,
+            "new": len(self.new),
+            "resolved": len(self._unmatched),
+            "persisting": self.persisting,
+        }
+
+
+def _by_severity(changes: list[dict]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for change in changes:
+        severity = change["severity"] or "unknown"
+        counts[severity] = counts.get(severity, 0) + 1
+    return counts
+
+
+async def start_diff(db: AsyncSession, job: CollectionJob) -> ScanDiff:
+    """Load the failing findings of the scan *job* will be compared against."""
+    previous_id = (await db.execute(
+        select(CollectionJob.id).where(
+            CollectionJob.org_id == job.org_id,
+            CollectionJob.integration_id == job.integration_id,
+            CollectionJob.collector_type == job.collector_type,
+            CollectionJob.status == "completed",
+            CollectionJob.id != job.id,
+        ).order_by(CollectionJob.created_at.desc()).limit(1)
+    )).scalar_one_or_none()
+    previous: dict[str, dict] = {}
+    if previous_id is not None:
+        columns = [getattr(ProwlerFindingRecord, field) for field in CHANGE_FIELDS]
+        rows = await db.execute(
+            select(*columns).where(
+                ProwlerFindingRecord.job_id == previous_id, ProwlerFindingRecord.status == "FAIL"
+            )
+        )
+        previous = {row.fingerprint: dict(row._mapping) for row in rows}
+    return ScanDiff(previous_id, previous)
+
+
+async def record_diff(db: AsyncSession, job: CollectionJob, diff: ScanDiff) -> dict:
+    """Store *diff*'s counts and its new/resolved findings; return the counts."""
+    resolved = diff.resolved
+    db.add(ProwlerScanDiff(
+        org_id=job.org_id,
+        job_id=job.id,
+        previous_job_id=diff.previous_job_id,
+        integration_id=job.integration_id,
+        collector_type=job.collector_type,
+        new_count=len(diff.new),
+        resolved_count=len(resolved),
+        persisting_count=diff.persisting,
+        new_by_severity=_by_severity(diff.new),
+        resolved_by_severity=_by_severity(resolved),
+        failing_by_severity=diff.failing_by_severity,
+        # Set here rather than by the server default: trends and the monitor
+        # order by it, and scans can finish within the same second
+        created_at=datetime.now(timezone.utc),
+    ))
+    batch_size = get_settings().PROWLER_INGEST_BATCH_SIZE
+    changes = itertools.chain(
+        ({"change": "new", **c} for c in diff.new),
+        ({"change": "resolved", **c} for c in resolved),
+    )
+    while batch := list(itertools.islice(changes, batch_size)):
+        await db.execute(
+            insert(ProwlerFindingChange),
+            [{"org_id": job.org_id, "job_id": job.id, **c} for c in batch],
+        )
+    return diff.as_dict()
+
+
+async def ingest_findings(
+    db: AsyncSession, job: CollectionJob, findings: Iterable[dict], diff: ScanDiff | None = None
+) -> dict:
+    """Bulk-insert normalized *findings* for *job* and return their summary stats.
+
+    Findings are pulled from the iterable in batches of
+    ``PROWLER_INGEST_BATCH_SIZE`` in a worker thread (parsing a large output
+    file is CPU-bound), so only one batch is held in memory at a time. Each
+    finding is fingerprinted and, when *diff* is given, classified against
+    the previous scan on the way through.
+    """
+    from app.collectors.prowler_collectors import SummaryStats, finding_fingerprint
+
+    batch_size = get_settings().PROWLER_INGEST_BATCH_SIZE
+    stats = SummaryStats()
+    iterator: Iterator[dict] = iter(findings)
+    seq = 0
+    while True:
+        batch = await asyncio.to_thread(list, itertools.islice(iterator, batch_size))
+        if not batch:
+            break
+        rows = []
+        for f in batch:
+            f["fingerprint"] = finding_fingerprint(f)
+            stats.add(f)
+            if diff is not None:
+                diff.add(f)
+            rows.append({
+                "org_id": job.org_id,
+                "job_id": job.id,
+                "seq": seq,
+                "fingerprint": f["fingerprint"],
+                **{field: f[field] for field in FINDING_FIELDS},
+            })
+            seq += 1
+        await db.execute(insert(ProwlerFindingRecord), rows)
+    return stats.as_dict()
+
+
+GROUP_BY_COLUMNS = {
+    "severity": ProwlerFindingRecord.severity,
+    "status": ProwlerFindingRecord.status,
+    "service": ProwlerFindingRecord.service,
+    "region": ProwlerFindingRecord.region,
+}
+
+
+def _filter_findings(
+    q,
+    severity: str | None = None,
+    status: str | None = None,
+    service: str | None = None,
+    region: str | None = None,
+):
+    # status/severity are normalized at ingest; service casing varies by Prowler version
+    if severity:
+        q = q.where(ProwlerFindingRecord.severity == severity.lower())
+    if status:
+        q = q.where(ProwlerFindingRecord.status == status.upper())
+    if service:
+        q = q.where(func.lower(ProwlerFindingRecord.service) == service.lower())
+    if region:
+        q = q.where(ProwlerFindingRecord.region == region)
+    return q
+
+
+def _to_finding(row: ProwlerFindingRecord) -> ProwlerFinding:
+    return ProwlerFinding(**{field: getattr(row, field) for field in FINDING_FIELDS})
+
+
+def _to_response(job: CollectionJob, findings: list[ProwlerFinding]) -> ProwlerScanResultResponse:
+    inner = (job.result_data or {}).get("data", {})
+    stats = inner.get("summary_stats", {})
+    return ProwlerScanResultResponse(
+        job_id=str(job.id),
+        status=job.status,
+        scan_type=inner.get("scan_type"),
+        cloud_provider=inner.get("cloud_provider"),
+        total_findings=stats.get("total", 0),
+        passed=stats.get("passed", 0),
+        failed=stats.get("failed", 0),
+        pass_rate=stats.get("pass_rate", 0.0),
+        created_at=job.created_at.isoformat() if job.created_at else None,
+        findings=findings,
+    )
+
 
 async def trigger_scan(
     db: AsyncSession, org_id: UUID, data: ProwlerScanTrigger
@@ -48,6 +256,8 @@ async def trigger_scan(
             config["services"] = data.services
         if data.compliance_framework:
             config["compliance_framework"] = data.compliance_framework
+        if data.regions:
+            config["regions"] = data.regions
         integration.config = config
         await db.flush()
 
@@ -63,8 +273,14 @@ async def list_scan_results(
     service: str | None = None,
     page: int = 1,
     page_size: int = 50,
+    include_findings: bool = False,
 ) -> tuple[list[ProwlerScanResultResponse], int]:
-    """List Prowler scan results (collection jobs with prowler_ collector types)."""
+    """List Prowler scan results (collection jobs with prowler_ collector types).
+
+    Scans are returned as summaries. With *include_findings*, each scan's
+    findings matching the filters are attached; use ``list_findings`` to
+    page through large scans instead.
+    """
     base_q = select(CollectionJob).where(
         CollectionJob.org_id == org_id,
         CollectionJob.collector_type.like("prowler_%"),
@@ -81,41 +297,20 @@ async def list_scan_results(
     result = await db.execute(q)
     jobs = list(result.scalars().all())
 
-    responses = []
-    for job in jobs:
-        data = job.result_data or {}
-        inner = data.get("data", {})
-        stats = inner.get("summary_stats", {})
-
-        # Apply filters at the response level
-        findings_list = inner.get("findings", [])
-        if severity:
-            findings_list = [f for f in findings_list if f.get("severity", "").lower() == severity.lower()]
-        if status:
-            findings_list = [f for f in findings_list if f.get("status", "").upper() == status.upper()]
-        if service:
-            findings_list = [f for f in findings_list if f.get("service", "").lower() == service.lower()]
-
-        responses.append(ProwlerScanResultResponse(
-            job_id=str(job.id),
-            status=job.status,
-            scan_type=inner.get("scan_type"),
-            cloud_provider=inner.get("cloud_provider"),
-            total_findings=stats.get("total", 0),
-            passed=stats.get("passed", 0),
-            failed=stats.get("failed", 0),
-            pass_rate=stats.get("pass_rate", 0.0),
-            created_at=job.created_at.isoformat() if job.created_at else None,
-            findings=[ProwlerFinding(**f) for f in findings_list],
-        ))
+    findings_by_job: dict[UUID, list[ProwlerFinding]] = {job.id: [] for job in jobs}
+    if include_findings and jobs:
+        q = _filter_findings(
+            select(ProwlerFindingRecord).where(ProwlerFindingRecord.job_id.in_(list(findings_by_job))),
+            severity=severity, status=status, service=service,
+        ).order_by(ProwlerFindingRecord.job_id, ProwlerFindingRecord.seq)
+        for row in (await db.execute(q)).scalars():
+            findings_by_job[row.job_id].append(_to_finding(row))
 
+    responses = [_to_response(job, findings_by_job[job.id]) for job in jobs]
     return responses, total
 
 
-async def get_scan_detail(
-    db: AsyncSession, org_id: UUID, job_id: UUID
-) -> ProwlerScanResultResponse | None:
-    """Get detailed results for a specific Prowler scan job."""
+async def _get_scan_job(db: AsyncSession, org_id: UUID, job_id: UUID) -> CollectionJob | None:
     result = await db.execute(
         select(CollectionJob).where(
             CollectionJob.id == job_id,
@@ -123,26 +318,157 @@ async def get_scan_detail(
             CollectionJob.collector_type.like("prowler_%"),
         )
     )
-    job = result.scalar_one_or_none()
+    return result.scalar_one_or_none()
+
+
+async def cancel_scan(db: AsyncSession, org_id: UUID, job_id: UUID) -> CollectionJob:
+    """Cancel an unfinished scan; its running shards are killed and their output removed."""
+    job = await _get_scan_job(db, org_id, job_id)
+    if not job:
+        raise NotFoundError(f"Prowler scan {job_id} not found")
+    return await collection_service.cancel_job(db, job)
+
+
+async def _findings_page(
+    db: AsyncSession,
+    job_id: UUID,
+    cursor: int | None,
+    limit: int,
+    **filters,
+) -> tuple[list[ProwlerFinding], int | None]:
+    """Keyset-page findings of one scan by ``seq`` (served by ix_prowler_findings_job_seq)."""
+    q = _filter_findings(
+        select(ProwlerFindingRecord).where(ProwlerFindingRecord.job_id == job_id), **filters
+    )
+    if cursor is not None:
+        q = q.where(ProwlerFindingRecord.seq > cursor)
+    rows = list((await db.execute(
+        q.order_by(ProwlerFindingRecord.seq).limit(limit + 1)
+    )).scalars().all())
+    next_cursor = rows[limit - 1].seq if len(rows) > limit else None
+    return [_to_finding(row) for row in rows[:limit]], next_cursor
+
+
+async def get_scan_detail(
+    db: AsyncSession,
+    org_id: UUID,
+    job_id: UUID,
+    cursor: int | None = None,
+    limit: int = 500,
+    **filters,
+) -> ProwlerScanResultResponse | None:
+    """Get a Prowler scan's summary and one page of its findings."""
+    job = await _get_scan_job(db, org_id, job_id)
     if not job:
         return None
 
-    data = job.result_data or {}
-    inner = data.get("data", {})
-    stats = inner.get("summary_stats", {})
-    findings_list = inner.get("findings", [])
+    findings, next_cursor = await _findings_page(db, job.id, cursor, limit, **filters)
+    response = _to_response(job, findings)
+    response.next_cursor = next_cursor
+    return response
 
-    return ProwlerScanResultResponse(
-        job_id=str(job.id),
-        status=job.status,
-        scan_type=inner.get("scan_type"),
-        cloud_provider=inner.get("cloud_provider"),
-        total_findings=stats.get("total", 0),
-        passed=stats.get("passed", 0),
-        failed=stats.get("failed", 0),
-        pass_rate=stats.get("pass_rate", 0.0),
-        created_at=job.created_at.isoformat() if job.created_at else None,
-        findings=[ProwlerFinding(**f) for f in findings_list],
+
+async def list_findings(
+    db: AsyncSession,
+    org_id: UUID,
+    job_id: UUID,
+    cursor: int | None = None,
+    limit: int = 100,
+    **filters,
+) -> ProwlerFindingPage:
+    """Page through one scan's findings, filtered in the database."""
+    job = await _get_scan_job(db, org_id, job_id)
+    if not job:
+        raise NotFoundError(f"Prowler scan {job_id} not found")
+    items, next_cursor = await _findings_page(db, job.id, cursor, limit, **filters)
+    return ProwlerFindingPage(items=items, next_cursor=next_cursor)
+
+
+async def count_findings(
+    db: AsyncSession,
+    org_id: UUID,
+    job_id: UUID,
+    group_by: str,
+    **filters,
+) -> ProwlerFindingCounts:
+    """Count one scan's findings grouped by severity, status, service or region."""
+    job = await _get_scan_job(db, org_id, job_id)
+    if not job:
+        raise NotFoundError(f"Prowler scan {job_id} not found")
+    column = GROUP_BY_COLUMNS[group_by]
+    q = _filter_findings(
+        select(column, func.count()).where(ProwlerFindingRecord.job_id == job.id), **filters
+    ).group_by(column).order_by(func.count().desc(), column)
+    counts = [
+        ProwlerFindingCount(key=key or "unknown", count=count)
+        for key, count in (await db.execute(q)).all()
+    ]
+    return ProwlerFindingCounts(
+        group_by=group_by, total=sum(c.count for c in counts), counts=counts
+    )
+
+
+async def get_scan_diff(
+    db: AsyncSession,
+    org_id: UUID,
+    job_id: UUID,
+    change: str | None = None,
+    severity: str | None = None,
+    limit: int = 500,
+) -> ProwlerScanDiffResponse:
+    """What changed in a scan's failing findings since the previous scan."""
+    diff = (await db.execute(
+        select(ProwlerScanDiff).where(
+            ProwlerScanDiff.job_id == job_id, ProwlerScanDiff.org_id == org_id
+        )
+    )).scalar_one_or_none()
+    if not diff:
+        raise NotFoundError(f"No diff recorded for Prowler scan {job_id}")
+    q = select(ProwlerFindingChange).where(ProwlerFindingChange.job_id == diff.job_id)
+    if change:
+        q = q.where(ProwlerFindingChange.change == change)
+    if severity:
+        q = q.where(ProwlerFindingChange.severity == severity.lower())
+    rows = (await db.execute(
+        q.order_by(ProwlerFindingChange.change, ProwlerFindingChange.check_id).limit(limit)
+    )).scalars().all()
+    response = _to_diff_response(diff)
+    response.changes = [
+        ProwlerFindingChangeItem(change=row.change, **{f: getattr(row, f) for f in CHANGE_FIELDS})
+        for row in rows
+    ]
+    return response
+
+
+async def list_scan_trends(
+    db: AsyncSession,
+    org_id: UUID,
+    integration_id: UUID | None = None,
+    collector_type: str | None = None,
+    limit: int = 30,
+) -> list[ProwlerScanDiffResponse]:
+    """Per-scan new/resolved/persisting counts, newest first."""
+    q = select(ProwlerScanDiff).where(ProwlerScanDiff.org_id == org_id)
+    if integration_id:
+        q = q.where(ProwlerScanDiff.integration_id == integration_id)
+    if collector_type:
+        q = q.where(ProwlerScanDiff.collector_type == collector_type)
+    rows = (await db.execute(q.order_by(ProwlerScanDiff.created_at.desc()).limit(limit))).scalars().all()
+    return [_to_diff_response(row) for row in rows]
+
+
+def _to_diff_response(diff: ProwlerScanDiff) -> ProwlerScanDiffResponse:
+    return ProwlerScanDiffResponse(
+        job_id=str(diff.job_id),
+        previous_job_id=str(diff.previous_job_id) if diff.previous_job_id else None,
+        collector_type=diff.collector_type,
+        new_count=diff.new_count,
+        resolved_count=diff.resolved_count,
+        persisting_count=diff.persisting_count,
+        new_by_severity=diff.new_by_severity or {},
+        resolved_by_severity=diff.resolved_by_severity or {},
+        failing_by_severity=diff.failing_by_severity or {},
+        created_at=diff.created_at.isoformat() if diff.created_at else None,
     )
 
 
@@ -165,46 +491,23 @@ async def get_compliance_posture(
     if not jobs:
         return ProwlerCompliancePosture()
 
-    # Aggregate from the latest scan
+    # Posture comes from the latest scan's per-framework/per-service counts,
+    # aggregated once at ingest time
     latest = jobs[0]
-    data = (latest.result_data or {}).get("data", {})
-    findings = data.get("findings", [])
-
-    # Build framework posture from compliance field in findings
-    framework_map: dict[str, dict] = {}
-    service_map: dict[str, dict] = {}
-
-    for f in findings:
-        svc = f.get("service", "Unknown")
-        is_pass = f.get("status", "").upper() == "PASS"
-
-        if svc not in service_map:
-            service_map[svc] = {"total": 0, "passed": 0, "failed": 0}
-        service_map[svc]["total"] += 1
-        if is_pass:
-            service_map[svc]["passed"] += 1
-        else:
-            service_map[svc]["failed"] += 1
-
-        compliance = f.get("compliance", {})
-        for fw, _ in compliance.items():
-            if fw not in framework_map:
-                framework_map[fw] = {"total": 0, "passed": 0, "failed": 0}
-            framework_map[fw]["total"] += 1
-            if is_pass:
-                framework_map[fw]["passed"] += 1
-            else:
-                framework_map[fw]["failed"] += 1
+    stats = (latest.result_data or {}).get("data", {}).get("summary_stats", {})
+
+    def rate(v: dict) -> float:
+        return round(v["passed"] / v["total"] * 100, 1) if v["total"] > 0 else 0.0
 
     frameworks = [
         ComplianceFrameworkPosture(
             framework=fw,
             total_checks=v["total"],
             passed=v["passed"],
-            failed=v["failed"],
-            pass_rate=round(v["passed"] / v["total"] * 100, 1) if v["total"] > 0 else 0.0,
+            failed=v["total"] - v["passed"],
+            pass_rate=rate(v),
         )
-        for fw, v in framework_map.items()
+        for fw, v in stats.get("frameworks", {}).items()
     ]
 
     services = [
@@ -212,20 +515,16 @@ async def get_compliance_posture(
             service=svc,
             total_checks=v["total"],
             passed=v["passed"],
-            failed=v["failed"],
-            pass_rate=round(v["passed"] / v["total"] * 100, 1) if v["total"] > 0 else 0.0,
+            failed=v["total"] - v["passed"],
+            pass_rate=rate(v),
         )
-        for svc, v in service_map.items()
+        for svc, v in stats.get("services", {}).items()
     ]
 
-    total_checks = sum(1 for _ in findings)
-    total_passed = sum(1 for f in findings if f.get("status", "").upper() == "PASS")
-    overall = round(total_passed / total_checks * 100, 1) if total_checks > 0 else 0.0
-
     return ProwlerCompliancePosture(
         frameworks=frameworks,
         services=services,
-        overall_pass_rate=overall,
+        overall_pass_rate=stats.get("pass_rate", 0.0),
         total_scans=len(jobs),
         last_scan_at=latest.created_at.isoformat() if latest.created_at else None,
     )
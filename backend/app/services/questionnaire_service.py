@@ -5,6 +5,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundError
+from app.core.stats import StatsQuery
 from app.models.questionnaire import Questionnaire, QuestionnaireResponse
 from app.models.control import Control
 from app.models.policy import Policy
@@ -376,18 +377,10 @@ async def _llm_auto_fill(
 
 # === Stats ===
 
+_STATS = StatsQuery(Questionnaire, "questionnaire_stats")
+for _status in ("draft", "in_progress", "completed", "submitted"):
+    _STATS.count(_status, Questionnaire.status == _status)
+
+
 async def get_questionnaire_stats(db: AsyncSession, org_id: UUID) -> dict:
-    result = await db.execute(select(Questionnaire).where(Questionnaire.org_id == org_id))
-    questionnaires = list(result.scalars().all())
-
-    by_status: dict[str, int] = {}
-    for q in questionnaires:
-        by_status[q.status] = by_status.get(q.status, 0) + 1
-
-    return {
-        "total": len(questionnaires),
-        "draft": by_status.get("draft", 0),
-        "in_progress": by_status.get("in_progress", 0),
-        "completed": by_status.get("completed", 0),
-        "submitted": by_status.get("submitted", 0),
-    }
+    return await _STATS.run(db, org_id)
@@ -5,6 +5,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundError
+from app.core.stats import StatsQuery
 from app.models.report import Report
 from app.schemas.report import ReportCreate
 
@@ -159,18 +160,10 @@ async def generate_report_data(db: AsyncSession, org_id: UUID, report_id: UUID)
         return {"error": str(e)}
 
 
+_STATS = StatsQuery(Report, "report_stats").group_by(
+    by_type=Report.report_type, by_status=Report.status
+)
+
+
 async def get_report_stats(db: AsyncSession, org_id: UUID) -> dict:
-    result = await db.execute(select(Report).where(Report.org_id == org_id))
-    reports = list(result.scalars().all())
-
-    by_type: dict[str, int] = {}
-    by_status: dict[str, int] = {}
-    for r in reports:
-        by_type[r.report_type] = by_type.get(r.report_type, 0) + 1
-        by_status[r.status] = by_status.get(r.status, 0) + 1
-
-    return {
-        "total": len(reports),
-        "by_type": by_type,
-        "by_status": by_status,
-    }
+    return await _STATS.run(db, org_id)
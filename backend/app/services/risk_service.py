@@ -1,10 +1,11 @@
 from uuid import UUID
 
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import cache_get, cache_set, cache_delete
 from app.core.exceptions import NotFoundError
+from app.core.pagination import CountMode, Page, paginate
+from app.core.stats import StatsQuery
 from app.models.risk import Risk
 from app.models.risk_control_mapping import RiskControlMapping
 from app.schemas.risk import RiskCreate, RiskUpdate, RiskControlMappingCreate
@@ -32,24 +33,22 @@ async def list_risks(
     category: str | None = None,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[Risk], int]:
+    cursor: str | None = None,
+    count: CountMode | None = None,
+) -> Page:
     base_q = select(Risk).where(Risk.org_id == org_id)
-    count_q = select(func.count()).select_from(Risk).where(Risk.org_id == org_id)
 
     if status:
         base_q = base_q.where(Risk.status == status)
-        count_q = count_q.where(Risk.status == status)
     if risk_level:
         base_q = base_q.where(Risk.risk_level == risk_level)
-        count_q = count_q.where(Risk.risk_level == risk_level)
     if category:
         base_q = base_q.where(Risk.category == category)
-        count_q = count_q.where(Risk.category == category)
 
-    total = (await db.execute(count_q)).scalar() or 0
-    q = base_q.offset((page - 1) * page_size).limit(page_size).order_by(Risk.created_at.desc())
-    result = await db.execute(q)
-    return list(result.scalars().all()), total
+    return await paginate(
+        db, base_q, sort_column=Risk.created_at, id_column=Risk.id,
+        page=page, page_size=page_size, cursor=cursor, count=count,
+    )
 
 
 async def create_risk(db: AsyncSession, org_id: UUID, data: RiskCreate) -> Risk:
@@ -70,7 +69,6 @@ async def create_risk(db: AsyncSession, org_id: UUID, data: RiskCreate) -> Risk:
     db.add(risk)
     await db.commit()
     await db.refresh(risk)
-    await cache_delete(f"org:{org_id}:risk_stats")
     return risk
 
 
@@ -99,7 +97,6 @@ async def update_risk(db: AsyncSession, org_id: UUID, risk_id: UUID, data: RiskU
 
     await db.commit()
     await db.refresh(risk)
-    await cache_delete(f"org:{org_id}:risk_stats")
     return risk
 
 
@@ -107,35 +104,17 @@ async def delete_risk(db: AsyncSession, org_id: UUID, risk_id: UUID) -> None:
     risk = await get_risk(db, org_id, risk_id)
     await db.delete(risk)
     await db.commit()
-    await cache_delete(f"org:{org_id}:risk_stats")
 
 
-async def get_risk_stats(db: AsyncSession, org_id: UUID) -> dict:
-    cache_key = f"org:{org_id}:risk_stats"
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
+_STATS = (
+    StatsQuery(Risk, "risk_stats")
+    .group_by(by_status=Risk.status, by_risk_level=Risk.risk_level)
+    .avg("average_score", Risk.risk_score)
+)
 
-    risks_result = await db.execute(select(Risk).where(Risk.org_id == org_id))
-    risks = list(risks_result.scalars().all())
 
-    by_status: dict[str, int] = {}
-    by_level: dict[str, int] = {}
-    total_score = 0
-
-    for r in risks:
-        by_status[r.status] = by_status.get(r.status, 0) + 1
-        by_level[r.risk_level] = by_level.get(r.risk_level, 0) + 1
-        total_score += r.risk_score
-
-    stats = {
-        "total": len(risks),
-        "by_status": by_status,
-        "by_risk_level": by_level,
-        "average_score": round(total_score / len(risks), 1) if risks else 0.0,
-    }
-    await cache_set(cache_key, stats, ttl=120)
-    return stats
+async def get_risk_stats(db: AsyncSession, org_id: UUID) -> dict:
+    return await _STATS.run(db, org_id)
 
 
 async def get_risk_matrix(db: AsyncSession, org_id: UUID) -> list[dict]:
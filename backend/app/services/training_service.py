@@ -5,6 +5,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundError
+from app.core.stats import StatsQuery
 from app.models.training import TrainingCourse, TrainingAssignment
 from app.schemas.training import (
     TrainingCourseCreate, TrainingCourseUpdate,
@@ -138,24 +139,22 @@ async def update_assignment(
 
 # === Stats ===
 
-async def get_training_stats(db: AsyncSession, org_id: UUID) -> dict:
-    courses_count = (await db.execute(
-        select(func.count()).select_from(TrainingCourse).where(TrainingCourse.org_id == org_id)
-    )).scalar() or 0
-
-    result = await db.execute(
-        select(TrainingAssignment).where(TrainingAssignment.org_id == org_id)
-    )
-    assignments = list(result.scalars().all())
+_COURSE_STATS = StatsQuery(TrainingCourse, "training_course_stats")
+_ASSIGNMENT_STATS = (
+    StatsQuery(TrainingAssignment, "training_assignment_stats")
+    .count("completed", TrainingAssignment.status == "completed")
+    .count("overdue", TrainingAssignment.status == "overdue")
+)
 
-    assigned = len(assignments)
-    completed = sum(1 for a in assignments if a.status == "completed")
-    overdue = sum(1 for a in assignments if a.status == "overdue")
 
+async def get_training_stats(db: AsyncSession, org_id: UUID) -> dict:
+    courses = await _COURSE_STATS.run(db, org_id)
+    assignments = await _ASSIGNMENT_STATS.run(db, org_id)
+    assigned, completed = assignments["total"], assignments["completed"]
     return {
-        "total_courses": courses_count,
+        "total_courses": courses["total"],
         "assigned": assigned,
         "completed": completed,
-        "overdue": overdue,
+        "overdue": assignments["overdue"],
         "completion_rate_pct": round((completed / assigned * 100), 1) if assigned else 0.0,
     }
@@ -3,6 +3,7 @@ from uuid import UUID
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import principals
 from app.core.exceptions import ConflictError, NotFoundError
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -75,6 +76,7 @@ async def update_user(
     for field, value in update_data.items():
         setattr(user, field, value)
     await db.commit()
+    await principals.invalidate(user.keycloak_id)
     await db.refresh(user)
     return user
 
@@ -83,3 +85,4 @@ async def delete_user(db: AsyncSession, org_id: UUID, user_id: UUID) -> None:
     user = await get_user(db, org_id, user_id)
     user.is_active = False
     await db.commit()
+    await principals.invalidate(user.keycloak_id)
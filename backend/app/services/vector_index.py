@@ -0,0 +1,395 @@
+"""Similarity search backends for embeddings.
+
+On PostgreSQL the query is pushed down to pgvector (``ORDER BY vector <=> :q
+LIMIT k``, served by the HNSW index from migration 0008; before pgvector 0.8,
+with an exact scan when the tenant filter may have truncated the index scan).
+Other dialects use a per-organization in-process index: each org's embeddings
+are held in one contiguous, L2-normalized float32 matrix so a search is a
+single matrix-vector product followed by an ``argpartition`` top-k, instead of
+a Python loop over every row.
+
+Indexes are built lazily from the ``embeddings`` table on first search and
+kept current by ``embedding_service.upsert_embedding``. Because other API
+workers may write embeddings too, every lookup re-applies the rows written
+since the index's ``(count, max(updated_at))`` fingerprint and rebuilds the
+index when rows were deleted. Indexes are evicted least recently used first
+once together they exceed ``EMBEDDING_INDEX_MAX_MB``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Float, String, func, literal, select, text, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.base import VectorType
+from app.models.embedding import Embedding
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_CHARS = 200
+_INITIAL_CAPACITY = 64
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0:
+        return vector
+    return vector / norm
+
+
+class OrgVectorIndex:
+    """Dense, pre-normalized vector matrix for a single organization."""
+
+    def __init__(self, dimensions: int | None = None):
+        self.dimensions = dimensions
+        self._matrix = np.zeros((0, dimensions or 0), dtype=np.float32)
+        self._size = 0
+        self._entity_types: list[str] = []
+        self._entity_ids: list[str] = []
+        self._previews: list[str] = []
+        self._types_array: np.ndarray | None = None
+        self._positions: dict[tuple[str, str], int] = {}
+        self.fingerprint: tuple[int, datetime | str | None] | None = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(_INITIAL_CAPACITY, capacity * 2, needed)
+        grown = np.zeros((new_capacity, self.dimensions), dtype=np.float32)
+        grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+
+    def upsert(
+        self,
+        entity_type: str,
+        entity_id: UUID | str,
+        text_content: str,
+        vector: list[float] | None,
+    ) -> bool:
+        """Insert or replace one entity's vector. Returns ``False`` if skipped."""
+        if not vector:
+            return False
+        arr = np.asarray(vector, dtype=np.float32)
+        if self.dimensions is None:
+            self.dimensions = arr.shape[0]
+            self._matrix = np.zeros((0, self.dimensions), dtype=np.float32)
+        if arr.shape[0] != self.dimensions:
+            logger.warning(
+                "Skipping %s %s: vector has %d dimensions, index has %d",
+                entity_type, entity_id, arr.shape[0], self.dimensions,
+            )
+            return False
+
+        key = (entity_type, str(entity_id))
+        row = self._positions.get(key)
+        if row is None:
+            row = self._size
+            self._ensure_capacity(row + 1)
+            self._entity_types.append(entity_type)
+            self._entity_ids.append(key[1])
+            self._previews.append(text_content[:PREVIEW_CHARS])
+            self._positions[key] = row
+            self._size += 1
+            self._types_array = None
+        else:
+            self._previews[row] = text_content[:PREVIEW_CHARS]
+        self._matrix[row] = _normalize(arr)
+        return True
+
+    def search(
+        self,
+        query_vector: list[float],
+        entity_type: str | None = None,
+        top_k: int = 10,
+        min_score: float = 0.3,
+    ) -> list[dict]:
+        """Return the ``top_k`` most similar entries scoring at least ``min_score``."""
+        if self._size == 0 or top_k <= 0:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.shape[0] != self.dimensions:
+            return []
+        query = _normalize(query)
+
+        scores = self._matrix[: self._size] @ query
+        candidates = scores >= min_score
+        if entity_type:
+            if self._types_array is None:
+                self._types_array = np.asarray(self._entity_types, dtype=object)
+            candidates &= self._types_array == entity_type
+
+        idx = np.flatnonzero(candidates)
+        if idx.size > top_k:
+            part = np.argpartition(-scores[idx], top_k - 1)[:top_k]
+            idx = idx[part]
+        # Stable sort keeps insertion order for equal scores.
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+
+        return [
+            {
+                "entity_type": self._entity_types[i],
+                "entity_id": self._entity_ids[i],
+                "text_preview": self._previews[i],
+                "similarity_score": round(float(scores[i]), 4),
+            }
+            for i in idx
+        ]
+
+
+# Least recently used first; bounded by EMBEDDING_INDEX_MAX_MB
+_indexes: OrderedDict[UUID, OrgVectorIndex] = OrderedDict()
+_locks: dict[UUID, asyncio.Lock] = {}
+
+
+def _updated_at(db: AsyncSession):
+    # SQLite keeps datetimes as text; compare against the stored text so rows
+    # match exactly regardless of how the timestamp was written
+    if db.get_bind().dialect.name == "sqlite":
+        return type_coerce(Embedding.updated_at, String)
+    return Embedding.updated_at
+
+
+async def _fingerprint(db: AsyncSession, org_id: UUID) -> tuple[int, datetime | str | None]:
+    row = (
+        await db.execute(
+            select(func.count(), func.max(_updated_at(db))).where(
+                Embedding.org_id == org_id
+            )
+        )
+    ).one()
+    return int(row[0] or 0), row[1]
+
+
+async def _build(db: AsyncSession, org_id: UUID) -> OrgVectorIndex:
+    index = OrgVectorIndex()
+    result = await db.execute(
+        select(
+            Embedding.entity_type,
+            Embedding.entity_id,
+            Embedding.text_content,
+            Embedding.vector,
+        )
+        .where(Embedding.org_id == org_id)
+        .order_by(Embedding.created_at)
+    )
+    for entity_type, entity_id, text_content, vector in result:
+        index.upsert(entity_type, entity_id, text_content, vector)
+    logger.info("Built vector index for org %s with %d entries", org_id, len(index))
+    return index
+
+
+async def _catch_up(
+    db: AsyncSession, org_id: UUID, index: OrgVectorIndex, size_before: int | None = None
+) -> bool:
+    """Re-apply the org's rows written at or after the index's fingerprint.
+
+    ``updated_at`` has one-second resolution on SQLite, so a write in the same
+    second as the fingerprint is only found with ``>=``; re-applying rows the
+    index already holds is harmless. Returns ``False`` if rows were deleted,
+    which only a rebuild can reflect.
+    """
+    count, since = index.fingerprint
+    if size_before is None:
+        size_before = len(index)
+    fingerprint = await _fingerprint(db, org_id)
+    q = select(
+        Embedding.entity_type, Embedding.entity_id, Embedding.text_content, Embedding.vector
+    ).where(Embedding.org_id == org_id)
+    if since is not None:
+        q = q.where(_updated_at(db) >= since)
+    for entity_type, entity_id, text_content, vector in await db.execute(q):
+        index.upsert(entity_type, entity_id, text_content, vector)
+    if fingerprint[0] != count + (len(index) - size_before):
+        return False
+    index.fingerprint = fingerprint
+    return True
+
+
+def _store(org_id: UUID, index: OrgVectorIndex) -> None:
+    """Keep *index* as the most recently used; evict others beyond the memory cap."""
+    _indexes[org_id] = index
+    _indexes.move_to_end(org_id)
+    limit = get_settings().EMBEDDING_INDEX_MAX_MB * 1024 * 1024
+    total = sum(i.nbytes for i in _indexes.values())
+    while total > limit and len(_indexes) > 1:
+        evicted_org, evicted = _indexes.popitem(last=False)
+        total -= evicted.nbytes
+        logger.info("Evicted vector index for org %s (%d entries)", evicted_org, len(evicted))
+
+
+async def get_index(db: AsyncSession, org_id: UUID) -> OrgVectorIndex:
+    """Return an up-to-date index for *org_id*, building it if needed."""
+    index = _indexes.get(org_id)
+    if index is not None and await _catch_up(db, org_id, index):
+        _store(org_id, index)
+        return index
+
+    lock = _locks.setdefault(org_id, asyncio.Lock())
+    async with lock:
+        current = _indexes.get(org_id)
+        if current is not None and current is not index and await _catch_up(db, org_id, current):
+            return current
+        fingerprint = await _fingerprint(db, org_id)
+        index = await _build(db, org_id)
+        index.fingerprint = fingerprint
+        _store(org_id, index)
+        return index
+
+
+async def apply_upserts(
+    db: AsyncSession,
+    org_id: UUID,
+    entries: list[tuple[str, UUID, str, list[float] | None]],
+) -> None:
+    """Fold freshly committed ``(entity_type, entity_id, text, vector)`` rows
+    into the org's index, if it is loaded."""
+    index = _indexes.get(org_id)
+    if index is None or index.fingerprint is None:
+        return
+    size_before = len(index)
+    for entity_type, entity_id, text_content, vector in entries:
+        index.upsert(entity_type, entity_id, text_content, vector)
+    # Catch up from the table rather than just advancing the fingerprint, so
+    # writes by other workers in the same window are folded in too
+    if not await _catch_up(db, org_id, index, size_before):
+        invalidate(org_id)
+
+
+async def apply_upsert(db: AsyncSession, embedding: Embedding) -> None:
+    """Fold a freshly committed embedding into the org's index, if loaded."""
+    await apply_upserts(
+        db,
+        embedding.org_id,
+        [(embedding.entity_type, embedding.entity_id, embedding.text_content, embedding.vector)],
+    )
+
+
+def invalidate(org_id: UUID | None = None) -> None:
+    """Drop the cached index for one org, or for every org."""
+    if org_id is None:
+        _indexes.clear()
+    else:
+        _indexes.pop(org_id, None)
+
+
+# pgvector >= 0.8 can keep walking the HNSW graph until enough rows pass the
+# org / entity_type filter; older versions stop after ef_search candidates
+_iterative_scan: bool | None = None
+
+
+async def _supports_iterative_scan(db: AsyncSession) -> bool:
+    global _iterative_scan
+    if _iterative_scan is None:
+        version = (await db.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        )).scalar()
+        try:
+            _iterative_scan = tuple(int(p) for p in version.split(".")[:2]) >= (0, 8)
+        except (AttributeError, ValueError):
+            _iterative_scan = False
+    return _iterative_scan
+
+
+async def _search_pgvector(
+    db: AsyncSession,
+    org_id: UUID,
+    query_vector: list[float],
+    entity_type: str | None,
+    top_k: int,
+    min_score: float,
+) -> list[dict]:
+    ef_search = max(get_settings().EMBEDDING_HNSW_EF_SEARCH, top_k)
+    await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+
+    distance = Embedding.vector.op("<=>", return_type=Float)(
+        literal(query_vector, VectorType(len(query_vector)))
+    )
+    columns = (
+        Embedding.entity_type,
+        Embedding.entity_id,
+        func.substr(Embedding.text_content, 1, PREVIEW_CHARS).label("text_preview"),
+        (1 - distance).label("score"),
+    )
+    filters = [Embedding.org_id == org_id, distance <= 1 - min_score]
+    if entity_type:
+        filters.append(Embedding.entity_type == entity_type)
+
+    if await _supports_iterative_scan(db):
+        # The index keeps scanning until top_k rows pass the filters
+        await db.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+        rows = (await db.execute(
+            select(*columns).where(*filters).order_by(distance).limit(top_k)
+        )).all()
+    else:
+        # The index yields at most ef_search candidates across all tenants;
+        # filter them here. Only if all of them were within min_score can the
+        # filters have cut the answer short: then scan the org's rows exactly
+        # (``distance + 0`` cannot be served by the index).
+        candidates = (await db.execute(
+            select(*columns, Embedding.org_id, distance.label("distance"))
+            .order_by(distance)
+            .limit(ef_search)
+        )).all()
+        rows = [
+            c for c in candidates
+            if c.org_id == org_id
+            and (not entity_type or c.entity_type == entity_type)
+            and c.distance <= 1 - min_score
+        ][:top_k]
+        if (
+            len(rows) < top_k
+            and len(candidates) == ef_search
+            and candidates[-1].distance <= 1 - min_score
+        ):
+            rows = (await db.execute(
+                select(*columns).where(*filters).order_by(distance + 0).limit(top_k)
+            )).all()
+
+    # relaxed_order may return neighbours slightly out of order
+    rows.sort(key=lambda row: row.score, reverse=True)
+    return [
+        {
+            "entity_type": row.entity_type,
+            "entity_id": str(row.entity_id),
+            "text_preview": row.text_preview,
+            "similarity_score": round(float(row.score), 4),
+        }
+        for row in rows
+    ]
+
+
+async def search(
+    db: AsyncSession,
+    org_id: UUID,
+    query_vector: list[float],
+    entity_type: str | None = None,
+    top_k: int = 10,
+    min_score: float = 0.3,
+) -> list[dict]:
+    """Return the ``top_k`` entities most similar to *query_vector*.
+
+    Dispatches to pgvector on PostgreSQL and to the in-process index elsewhere;
+    both backends return identical result dicts.
+    """
+    if top_k <= 0:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        return await _search_pgvector(db, org_id, query_vector, entity_type, top_k, min_score)
+    index = await get_index(db, org_id)
+    return index.search(query_vector, entity_type=entity_type, top_k=top_k, min_score=min_score)
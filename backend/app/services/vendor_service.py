@@ -5,6 +5,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundError
+from app.core.stats import StatsQuery
 from app.models.vendor import Vendor, VendorAssessment
 from app.schemas.vendor import VendorCreate, VendorUpdate, VendorAssessmentCreate
 
@@ -105,25 +106,15 @@ async def get_assessments(db: AsyncSession, org_id: UUID, vendor_id: UUID) -> li
     return list(result.scalars().all())
 
 
+_STATS = (
+    StatsQuery(Vendor, "vendor_stats")
+    .group_by(by_risk_tier=Vendor.risk_tier, by_status=Vendor.status)
+    .count(
+        "expiring_contracts_count",
+        lambda: Vendor.contract_end_date <= datetime.now(timezone.utc) + timedelta(days=90),
+    )
+)
+
+
 async def get_vendor_stats(db: AsyncSession, org_id: UUID) -> dict:
-    result = await db.execute(select(Vendor).where(Vendor.org_id == org_id))
-    vendors = list(result.scalars().all())
-
-    by_risk_tier: dict[str, int] = {}
-    by_status: dict[str, int] = {}
-    expiring = 0
-    now = datetime.now(timezone.utc)
-    threshold = now + timedelta(days=90)
-
-    for v in vendors:
-        by_risk_tier[v.risk_tier] = by_risk_tier.get(v.risk_tier, 0) + 1
-        by_status[v.status] = by_status.get(v.status, 0) + 1
-        if v.contract_end_date and v.contract_end_date <= threshold:
-            expiring += 1
-
-    return {
-        "total": len(vendors),
-        "by_risk_tier": by_risk_tier,
-        "by_status": by_status,
-        "expiring_contracts_count": expiring,
-    }
+    return await _STATS.run(db, org_id)
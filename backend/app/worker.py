@@ -0,0 +1,35 @@
+"""Standalone agent worker process.
+
+Run with ``python -m app.worker`` alongside API processes started with
+``AGENT_QUEUE_MODE=external``. Any number of workers can run concurrently;
+they coordinate through leases on the ``agent_runs`` table.
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.config import get_settings
+from app.core.database import engine
+from app.services.agent_queue import AgentWorker
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    worker = AgentWorker()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await worker.start()
+    await stop.wait()
+    logger.info("Shutting down agent worker %s", worker.worker_id)
+    await worker.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=get_settings().LOG_LEVEL)
+    asyncio.run(main())
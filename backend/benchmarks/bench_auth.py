@@ -0,0 +1,121 @@
+"""Measure per-request bearer-token verification overhead.
+
+Signs tokens with a throwaway RSA key, serves the matching JWKS from an
+in-process stub (no Keycloak) and times ``decode_token`` for:
+
+- ``verify``: a fresh token every call, i.e. a full RS256 verification;
+- ``cached``: the same token repeatedly, served from the verified-claims cache;
+- ``legacy``: the previous path — linear JWKS scan and key parsing on every call.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_auth --requests 2000 --users 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core import security
+
+
+class _StubResponse:
+    def __init__(self, jwks: dict):
+        self._jwks = jwks
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return self._jwks
+
+
+class _StubClient:
+    def __init__(self, jwks: dict):
+        self._jwks = jwks
+
+    async def get(self, url: str) -> _StubResponse:
+        return _StubResponse(self._jwks)
+
+
+def _keys(n_keys: int) -> tuple[bytes, dict]:
+    """Return the signing key (the last kid) and a JWKS with *n_keys* entries."""
+    entries, private_pem = [], b""
+    for i in range(n_keys):
+        private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_pem = private.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        public_pem = private.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        entries.append({**jwk.construct(public_pem, "RS256").to_dict(), "kid": f"k{i}", "use": "sig"})
+    return private_pem, {"keys": entries}
+
+
+def legacy_decode(token: str, jwks: dict, issuer: str) -> dict:
+    """The previous implementation, minus the network fetch."""
+    kid = jwt.get_unverified_header(token).get("kid")
+    rsa_key = None
+    for key in jwks.get("keys", []):
+        if key.get("kid") == kid:
+            rsa_key = key
+            break
+    return jwt.decode(
+        token, rsa_key, algorithms=["RS256"], audience="account", issuer=issuer,
+        options={"verify_aud": False},
+    )
+
+
+async def main(n_requests: int, n_users: int, n_keys: int) -> None:
+    private_pem, jwks = _keys(n_keys)
+    security._get_client = lambda: _StubClient(jwks)
+    security.clear_jwks_cache()
+    issuer = f"{security.settings.KEYCLOAK_URL}/realms/{security.settings.KEYCLOAK_REALM}"
+    kid = jwks["keys"][-1]["kid"]
+
+    def make_token(i: int) -> str:
+        claims = {"sub": f"user-{i}", "iss": issuer, "exp": int(time.time()) + 3600, "jti": str(i)}
+        return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+    fresh = [make_token(i) for i in range(n_requests)]
+    # A realistic mix: a handful of users each sending many requests
+    user_tokens = [make_token(n_requests + i) for i in range(n_users)]
+    reused = [user_tokens[i % n_users] for i in range(n_requests)]
+
+    await security.decode_token(fresh[0])  # warm the JWKS
+
+    start = time.perf_counter()
+    for token in fresh:
+        legacy_decode(token, jwks, issuer)
+    legacy = time.perf_counter() - start
+
+    security._claims.clear()
+    start = time.perf_counter()
+    for token in fresh:
+        await security.decode_token(token)
+    verify = time.perf_counter() - start
+
+    security._claims.clear()
+    start = time.perf_counter()
+    for token in reused:
+        await security.decode_token(token)
+    cached = time.perf_counter() - start
+
+    print(f"requests={n_requests} users={n_users} jwks_keys={n_keys}")
+    for label, elapsed in (("legacy", legacy), ("verify", verify), ("cached", cached)):
+        print(f"{label:>8}: {elapsed / n_requests * 1e6:9.1f} us/request")
+    print(f"token cache: {security.get_stats()['token_cache']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--keys", type=int, default=3, help="keys in the JWKS (the signing key is last)")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.users, args.keys))
@@ -0,0 +1,95 @@
+"""Compare embedding load time with JSON-encoded vs packed float32 storage.
+
+Loads N rows the way ``vector_index`` does when building an org's index for
+``search_similar`` and reports load time and on-disk size for each format.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_embedding_storage --rows 50000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, Text, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models.base import GUID, JSONType, VectorType
+from app.services.vector_index import OrgVectorIndex
+
+
+def _make_table(metadata: MetaData, name: str, vector_type) -> Table:
+    return Table(
+        name,
+        metadata,
+        Column("id", GUID(), primary_key=True),
+        Column("org_id", GUID(), nullable=False, index=True),
+        Column("entity_type", String(100), nullable=False),
+        Column("entity_id", GUID(), nullable=False),
+        Column("text_content", Text, nullable=False),
+        Column("vector", vector_type),
+        Column("dimensions", Integer),
+    )
+
+
+async def _load(engine, table: Table, org_id: uuid.UUID) -> tuple[float, int]:
+    started = time.perf_counter()
+    index = OrgVectorIndex()
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(table.c.entity_type, table.c.entity_id, table.c.text_content, table.c.vector)
+            .where(table.c.org_id == org_id)
+        )
+        for entity_type, entity_id, text_content, vector in result:
+            index.upsert(entity_type, entity_id, text_content, vector)
+    return (time.perf_counter() - started) * 1000, len(index)
+
+
+async def main(rows: int, dimensions: int, repeat: int) -> None:
+    tmpdir = tempfile.mkdtemp(prefix="qt-bench-")
+    org_id = uuid.uuid4()
+    payload = [
+        {
+            "id": uuid.uuid4(),
+            "org_id": org_id,
+            "entity_type": "control",
+            "entity_id": uuid.uuid4(),
+            "text_content": f"Control {i}. Benchmark description text.",
+            "vector": [random.uniform(-1, 1) for _ in range(dimensions)],
+            "dimensions": dimensions,
+        }
+        for i in range(rows)
+    ]
+
+    print(f"rows={rows} dimensions={dimensions} repeat={repeat}")
+    for label, vector_type in (("json", JSONType()), ("float32", VectorType(dimensions))):
+        path = os.path.join(tmpdir, f"{label}.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        metadata = MetaData()
+        table = _make_table(metadata, "embeddings", vector_type)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            for start in range(0, rows, 5000):
+                await conn.execute(insert(table), payload[start:start + 5000])
+
+        timings = [(await _load(engine, table, org_id))[0] for _ in range(repeat)]
+        await engine.dispose()
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(
+            f"{label:>8}: load min={min(timings):8.1f} ms  "
+            f"avg={sum(timings) / len(timings):8.1f} ms  db={size_mb:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.dimensions, args.repeat))
@@ -0,0 +1,117 @@
+"""Compare the per-figure COUNT readiness score with the single aggregate query.
+
+Seeds an org with N controls (plus one evidence row per control, policies
+and risks) in a temporary SQLite database and times both versions with the
+Redis cache disabled.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_readiness_score --controls 5000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import cache
+from app.core.database import Base
+from app.models import *  # noqa: F403 — register all tables on Base.metadata
+from app.models.control import Control
+from app.models.evidence import Evidence
+from app.models.organization import Organization
+from app.models.policy import Policy
+from app.models.risk import Risk
+from app.services.audit_service import compute_readiness_score
+
+
+async def legacy_readiness_counts(db: AsyncSession, org_id: uuid.UUID) -> dict:
+    """The previous implementation: one COUNT(*) round trip per figure."""
+
+    async def count(model, *filters) -> int:
+        q = select(func.count()).select_from(model).where(model.org_id == org_id, *filters)
+        return (await db.execute(q)).scalar() or 0
+
+    return {
+        "controls_total": await count(Control),
+        "controls_implemented": await count(Control, Control.status == "implemented"),
+        "evidence_collected": await count(Evidence, Evidence.status == "collected"),
+        "policies_total": await count(Policy),
+        "policies_published": await count(Policy, Policy.status == "published"),
+        "risks_total": await count(Risk),
+        "risks_treated": await count(Risk, Risk.status.in_(["accepted", "closed"])),
+    }
+
+
+async def _timed(fn, session_factory, org_id, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            await fn(db, org_id)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main(n_controls: int, repeat: int) -> None:
+    cache._available = False  # measure the database path, not Redis
+
+    path = os.path.join(tempfile.mkdtemp(prefix="qt-bench-"), "readiness.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    statuses = ["implemented", "draft", "partially_implemented", "not_implemented"]
+    async with session_factory() as db:
+        # A second org keeps the org_id filter honest.
+        org_ids = []
+        for slug in ("bench-org", "other-org"):
+            org = Organization(name=slug, slug=slug)
+            db.add(org)
+            await db.flush()
+            org_ids.append(org.id)
+        for org_id in org_ids:
+            control_ids = [uuid.uuid4() for _ in range(n_controls)]
+            await db.execute(insert(Control), [
+                {"id": cid, "org_id": org_id, "title": f"Control {i}", "status": statuses[i % 4]}
+                for i, cid in enumerate(control_ids)
+            ])
+            await db.execute(insert(Evidence), [
+                {
+                    "org_id": org_id, "control_id": cid, "title": f"Evidence {i}",
+                    "status": "collected" if i % 3 else "pending",
+                }
+                for i, cid in enumerate(control_ids)
+            ])
+            await db.execute(insert(Policy), [
+                {"org_id": org_id, "title": f"Policy {i}", "status": "published" if i % 2 else "draft"}
+                for i in range(n_controls // 25)
+            ])
+            await db.execute(insert(Risk), [
+                {"org_id": org_id, "title": f"Risk {i}", "status": ["identified", "accepted", "closed"][i % 3]}
+                for i in range(n_controls // 10)
+            ])
+        await db.commit()
+
+    org_id = org_ids[0]
+    legacy = await _timed(legacy_readiness_counts, session_factory, org_id, repeat)
+    single = await _timed(compute_readiness_score, session_factory, org_id, repeat)
+    await engine.dispose()
+
+    print(f"controls={n_controls} repeat={repeat}")
+    for label, timings in (("legacy", legacy), ("1 query", single)):
+        print(f"{label:>10}: min={min(timings):7.2f} ms  avg={sum(timings) / len(timings):7.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--controls", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.controls, args.repeat))
@@ -0,0 +1,211 @@
+"""Compare the row-loading *_stats endpoints with the grouped aggregate queries.
+
+Seeds an org with N incidents, vendors, risks and notifications in a
+temporary SQLite database and times, per entity, the previous
+implementation (load every row, count in Python), one ``StatsQuery`` run
+against the database and one served from cache.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_stats --rows 100000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import cache
+from app.core.database import Base
+from app.models import *  # noqa: F403 — register all tables on Base.metadata
+from app.models.incident import Incident
+from app.models.notification import Notification
+from app.models.organization import Organization
+from app.models.risk import Risk
+from app.models.vendor import Vendor
+from app.services.incident_service import get_incident_stats
+from app.services.notification_service import get_notification_stats
+from app.services.risk_service import get_risk_stats
+from app.services.vendor_service import get_vendor_stats
+
+
+def _tally(rows, attr) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for row in rows:
+        key = getattr(row, attr)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+async def _load(db: AsyncSession, model, org_id) -> list:
+    return list((await db.execute(select(model).where(model.org_id == org_id))).scalars().all())
+
+
+async def legacy_incident_stats(db: AsyncSession, org_id: uuid.UUID) -> dict:
+    incidents = await _load(db, Incident, org_id)
+    hours = [
+        (i.resolved_at - (i.detected_at or i.created_at)).total_seconds() / 3600
+        for i in incidents if i.resolved_at
+    ]
+    return {
+        "total": len(incidents),
+        "by_status": _tally(incidents, "status"),
+        "by_severity": _tally(incidents, "severity"),
+        "open_p1_count": sum(
+            1 for i in incidents if i.severity == "P1" and i.status in ("open", "investigating")
+        ),
+        "avg_resolution_hours": round(sum(hours) / len(hours), 1) if hours else 0.0,
+    }
+
+
+async def legacy_vendor_stats(db: AsyncSession, org_id: uuid.UUID) -> dict:
+    vendors = await _load(db, Vendor, org_id)
+    threshold = datetime.now(timezone.utc) + timedelta(days=90)
+    return {
+        "total": len(vendors),
+        "by_risk_tier": _tally(vendors, "risk_tier"),
+        "by_status": _tally(vendors, "status"),
+        "expiring_contracts_count": sum(
+            1 for v in vendors
+            if v.contract_end_date and v.contract_end_date.replace(tzinfo=timezone.utc) <= threshold
+        ),
+    }
+
+
+async def legacy_risk_stats(db: AsyncSession, org_id: uuid.UUID) -> dict:
+    risks = await _load(db, Risk, org_id)
+    return {
+        "total": len(risks),
+        "by_status": _tally(risks, "status"),
+        "by_risk_level": _tally(risks, "risk_level"),
+        "average_score": round(sum(r.risk_score for r in risks) / len(risks), 1) if risks else 0.0,
+    }
+
+
+async def legacy_notification_stats(db: AsyncSession, org_id: uuid.UUID) -> dict:
+    notifications = await _load(db, Notification, org_id)
+    return {
+        "total": len(notifications),
+        "unread": sum(1 for n in notifications if not n.is_read),
+        "by_category": _tally(notifications, "category"),
+        "by_severity": _tally(notifications, "severity"),
+    }
+
+
+async def _timed(fn, session_factory, org_id, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            await fn(db, org_id)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def _seed(db: AsyncSession, org_id: uuid.UUID, n: int) -> None:
+    now = datetime.now(timezone.utc)
+    await db.execute(insert(Incident), [
+        {
+            "org_id": org_id, "title": f"Incident {i}",
+            "severity": f"P{i % 4 + 1}", "status": ["open", "investigating", "resolved", "closed"][i % 4],
+            "detected_at": now - timedelta(hours=i % 200 + 10),
+            "resolved_at": now - timedelta(hours=i % 7) if i % 4 >= 2 else None,
+        }
+        for i in range(n)
+    ])
+    await db.execute(insert(Vendor), [
+        {
+            "org_id": org_id, "name": f"Vendor {i}",
+            "risk_tier": ["critical", "high", "medium", "low"][i % 4],
+            "status": ["active", "under_review", "terminated"][i % 3],
+            "contract_end_date": now + timedelta(days=i % 365),
+        }
+        for i in range(n)
+    ])
+    await db.execute(insert(Risk), [
+        {
+            "org_id": org_id, "title": f"Risk {i}", "risk_score": i % 25 + 1,
+            "risk_level": ["low", "medium", "high", "critical"][i % 4],
+            "status": ["identified", "accepted", "closed"][i % 3],
+        }
+        for i in range(n)
+    ])
+    await db.execute(insert(Notification), [
+        {
+            "org_id": org_id, "title": f"Notification {i}", "message": "bench",
+            "category": ["general", "evidence", "policy", "risk"][i % 4],
+            "severity": ["info", "warning", "critical"][i % 3], "is_read": bool(i % 2),
+        }
+        for i in range(n)
+    ])
+
+
+async def main(n_rows: int, repeat: int) -> None:
+    cache._available = False  # measure the database path, not Redis
+
+    path = os.path.join(tempfile.mkdtemp(prefix="qt-bench-"), "stats.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as db:
+        # A second, smaller org keeps the org_id filter honest.
+        org_ids = []
+        for slug in ("bench-org", "other-org"):
+            org = Organization(name=slug, slug=slug)
+            db.add(org)
+            await db.flush()
+            org_ids.append(org.id)
+        await _seed(db, org_ids[0], n_rows)
+        await _seed(db, org_ids[1], n_rows // 10)
+        await db.commit()
+
+    org_id = org_ids[0]
+    cases = (
+        ("incidents", legacy_incident_stats, get_incident_stats),
+        ("vendors", legacy_vendor_stats, get_vendor_stats),
+        ("risks", legacy_risk_stats, get_risk_stats),
+        ("notifications", legacy_notification_stats, get_notification_stats),
+    )
+
+    store: dict = {}
+
+    async def dict_get(key):
+        return store.get(key)
+
+    async def dict_set(key, value, ttl=300):
+        store[key] = value
+
+    print(f"rows={n_rows} per table, repeat={repeat}")
+    for label, legacy_fn, stats_fn in cases:
+        legacy = await _timed(legacy_fn, session_factory, org_id, max(1, repeat // 5))
+        grouped = await _timed(stats_fn, session_factory, org_id, repeat)
+        async with session_factory() as db:
+            assert await legacy_fn(db, org_id) == await stats_fn(db, org_id), label
+
+        cache_get, cache_set = cache.cache_get, cache.cache_set
+        cache.cache_get, cache.cache_set = dict_get, dict_set
+        try:
+            cached = await _timed(stats_fn, session_factory, org_id, repeat)
+        finally:
+            cache.cache_get, cache.cache_set = cache_get, cache_set
+
+        print(label)
+        for name, timings in (("legacy", legacy), ("1 query", grouped), ("cached", cached)):
+            print(f"{name:>10}: min={min(timings):9.2f} ms  avg={sum(timings) / len(timings):9.2f} ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
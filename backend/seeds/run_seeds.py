@@ -121,6 +121,10 @@ async def main():
         from seeds.seed_cmmc import seed_cmmc_framework
         await seed_cmmc_framework(db)
 
+        # Running API processes reload the catalog on their next version check
+        from app.services import catalog_service
+        await catalog_service.bump()
+
         print("\n" + "=" * 50)
         print("Seeding complete!")
         print("=" * 50)
@@ -11,6 +11,7 @@ from app.core.database import Base
 from app.core.dependencies import get_db, get_current_user
 from app.main import app
 from app.models.user import User
+from app.services import catalog_service
 
 # Use a separate test database or SQLite for tests
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
@@ -33,6 +34,8 @@ async def setup_db():
     yield
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    # The catalog snapshot is process-wide; the next test starts from fresh tables
+    await catalog_service.bump()
 
 
 async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
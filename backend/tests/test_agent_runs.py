@@ -74,3 +74,132 @@ async def test_get_agent_run(client: AsyncClient):
     assert data["id"] == run_id
     assert data["agent_type"] == "controls_generation"
     assert data["org_id"] == TEST_ORG_ID
+
+
+@pytest.mark.asyncio
+async def test_queue_metrics(client: AsyncClient):
+    await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/agents/remediation/run", json={}
+    )
+    resp = await client.get(f"/api/v1/organizations/{TEST_ORG_ID}/agents/queue")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["org"]["pending"] == 1
+    assert data["org"]["running"] == 0
+    assert data["global"]["pending"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_worker_respects_limits_and_completes_runs(client: AsyncClient, monkeypatch):
+    import asyncio
+
+    from app.services import agent_queue
+    from tests.conftest import test_session
+
+    other_org = (await client.post(
+        "/api/v1/organizations", json={"name": "Queue Org 2", "slug": "queue-org-2"}
+    )).json()["id"]
+
+    release = asyncio.Event()
+
+    async def fake_agent(db, run):
+        await release.wait()
+        return {"agent": run.agent_type}
+
+    monkeypatch.setitem(agent_queue.RUNNERS, "remediation", fake_agent)
+
+    for org in (TEST_ORG_ID, TEST_ORG_ID, TEST_ORG_ID, other_org):
+        await client.post(f"/api/v1/organizations/{org}/agents/remediation/run", json={})
+
+    worker = agent_queue.AgentWorker(
+        test_session, concurrency=10, global_limit=10, per_org_limit=2, poll_seconds=0.05
+    )
+    claimed = await worker.run_once()
+    assert len(claimed) == 3  # two for the first org, one for the other
+
+    metrics = (await client.get(f"/api/v1/organizations/{TEST_ORG_ID}/agents/queue")).json()
+    assert metrics["org"] == {**metrics["org"], "pending": 1, "running": 2}
+
+    release.set()
+    for _ in range(50):
+        if not worker._tasks:
+            break
+        await asyncio.sleep(0.02)
+    assert await worker.run_once()  # the remaining run is now within the limit
+    for _ in range(50):
+        if not worker._tasks:
+            break
+        await asyncio.sleep(0.02)
+
+    runs = (await client.get(f"/api/v1/organizations/{TEST_ORG_ID}/agents/runs")).json()["items"]
+    assert {r["status"] for r in runs} == {"completed"}
+    assert runs[0]["output_data"] == {"agent": "remediation"}
+    assert worker.stats()["completed"] == 4
+
+
+@pytest.mark.asyncio
+async def test_worker_recovers_orphaned_runs(client: AsyncClient):
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import update
+
+    from app.models.agent_run import AgentRun
+    from app.services import agent_queue
+    from tests.conftest import test_session
+
+    run_id = (await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/agents/remediation/run", json={}
+    )).json()["id"]
+    async with test_session() as db:
+        await db.execute(
+            update(AgentRun).where(AgentRun.id == uuid.UUID(run_id)).values(
+                status="running",
+                worker_id="dead-worker",
+                attempts=1,
+                lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=5),
+            )
+        )
+        await db.commit()
+
+        worker = agent_queue.AgentWorker(test_session, max_attempts=3)
+        assert await worker.recover_orphans(db) == 1
+
+    run = (await client.get(f"/api/v1/organizations/{TEST_ORG_ID}/agents/runs/{run_id}")).json()
+    assert run["status"] == "pending"
+
+
+@pytest.mark.asyncio
+async def test_worker_leaves_inline_runs_alone(client: AsyncClient):
+    from datetime import datetime, timedelta, timezone
+
+    from app.models.agent_run import AgentRun
+    from app.services import agent_queue
+    from tests.conftest import test_session
+
+    # Onboarding runs agents inline: running, no worker, no lease
+    async with test_session() as db:
+        run = AgentRun(
+            org_id=uuid.UUID(TEST_ORG_ID),
+            agent_type="controls_generation",
+            trigger="onboarding",
+            status="running",
+            started_at=datetime.now(timezone.utc) - timedelta(seconds=600),
+            input_data={},
+        )
+        db.add(run)
+        await db.commit()
+        run_id = str(run.id)
+
+        worker = agent_queue.AgentWorker(test_session, lease_seconds=120, per_org_limit=1)
+        assert await worker.recover_orphans(db) == 0
+
+    run = (await client.get(f"/api/v1/organizations/{TEST_ORG_ID}/agents/runs/{run_id}")).json()
+    assert run["status"] == "running"
+
+    # ...and does not take up one of the org's worker slots
+    queued = (await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/agents/remediation/run", json={}
+    )).json()["id"]
+    async with test_session() as db:
+        assert await worker.claim(db) == [uuid.UUID(queued)]
+    await worker.stop()
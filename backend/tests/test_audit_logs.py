@@ -47,3 +47,145 @@ async def test_filter_audit_logs_by_action(client: AsyncClient, org_id: str, aut
         headers=auth_headers,
     )
     assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_buffered_writes_stats_and_archiving(client: AsyncClient, monkeypatch):
+    import uuid
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import update
+
+    from app.models.audit_log import AuditLog
+    from app.services import audit_log_service
+    from tests.conftest import test_session
+
+    monkeypatch.setattr(audit_log_service.settings, "AUDIT_LOG_MODE", "buffered")
+    resp = await client.post(
+        "/api/v1/organizations", json={"name": "Audit Org", "slug": f"audit-{uuid.uuid4().hex[:8]}"}
+    )
+    org_id = resp.json()["id"]
+    for i in range(3):
+        resp = await client.post(
+            f"/api/v1/organizations/{org_id}/risks",
+            json={"title": f"Risk {i}", "category": "operational"},
+        )
+        assert resp.status_code == 201
+
+    # Buffered entries land in one bulk write and are visible to the next read
+    before = audit_log_service.get_buffer_stats()["batches"]
+    data = (await client.get(f"/api/v1/organizations/{org_id}/audit-logs")).json()
+    assert data["total"] == 3
+    assert audit_log_service.get_buffer_stats()["batches"] == before + 1
+
+    # Transactional mode commits with the caller's session
+    monkeypatch.setattr(audit_log_service.settings, "AUDIT_LOG_MODE", "transactional")
+    async with test_session() as db:
+        await audit_log_service.log_action(
+            db, uuid.UUID(org_id), "system", "system", "update", "risk", "r1"
+        )
+        await db.rollback()
+        await audit_log_service.log_action(
+            db, uuid.UUID(org_id), "system", "system", "update", "risk", "r2"
+        )
+        await db.commit()
+
+    stats = (await client.get(f"/api/v1/organizations/{org_id}/audit-logs/stats")).json()
+    assert stats == {"total": 4, "by_action": {"create": 3, "update": 1}, "by_entity_type": {"risk": 4}}
+
+    # Cold entries move to the archive; stats still count them
+    async with test_session() as db:
+        await db.execute(
+            update(AuditLog).where(AuditLog.org_id == uuid.UUID(org_id), AuditLog.action == "create")
+            .values(timestamp=datetime.now(timezone.utc) - timedelta(days=400))
+        )
+        await db.commit()
+        assert await audit_log_service.archive_audit_logs(db, older_than_days=90, batch_size=2) == 3
+
+    hot = (await client.get(f"/api/v1/organizations/{org_id}/audit-logs")).json()
+    cold = (await client.get(
+        f"/api/v1/organizations/{org_id}/audit-logs", params={"archived": True}
+    )).json()
+    assert (hot["total"], cold["total"]) == (1, 3)
+    stats = (await client.get(f"/api/v1/organizations/{org_id}/audit-logs/stats")).json()
+    assert stats["total"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failing_entry_does_not_block_its_batch(monkeypatch):
+    import uuid
+    from datetime import datetime, timezone
+
+    from sqlalchemy import func, select
+
+    from app.models.audit_log import AuditLog
+    from app.services import audit_log_service
+    from tests.conftest import test_engine, test_session
+
+    write_rows = audit_log_service._write_rows
+
+    async def fail_poisoned(engine, rows):
+        if any(row["action"] == "poison" for row in rows):
+            raise ValueError("value too long for type character varying")
+        await write_rows(engine, rows)
+
+    monkeypatch.setattr(audit_log_service, "_write_rows", fail_poisoned)
+    buffer = audit_log_service.AuditLogBuffer(
+        batch_size=100, interval_ms=60_000, max_pending=100, max_attempts=2
+    )
+    org_id = uuid.uuid4()
+    for action in ("create", "poison", "update", "delete"):
+        await buffer.add(test_engine, {
+            "id": uuid.uuid4(), "org_id": org_id, "actor_id": "system", "actor_type": "system",
+            "action": action, "entity_type": "risk", "entity_id": "r1", "changes": None,
+            "ip_address": None, "timestamp": datetime.now(timezone.utc),
+        })
+
+    await buffer.flush()
+    async with test_session() as db:
+        written = (await db.execute(
+            select(func.count()).select_from(AuditLog).where(AuditLog.org_id == org_id)
+        )).scalar()
+    assert written == 3
+    assert buffer.stats()["pending"] == 1
+
+    await buffer.add(test_engine, {
+        "id": uuid.uuid4(), "org_id": org_id, "actor_id": "system", "actor_type": "system",
+        "action": "update", "entity_type": "risk", "entity_id": "r2", "changes": None,
+        "ip_address": None, "timestamp": datetime.now(timezone.utc),
+    })
+    # The poisoned entry goes last once it fails first; after max_attempts
+    # failures next to entries that went through, it is dead-lettered
+    await buffer.flush()
+    await buffer.flush()
+    stats = buffer.stats()
+    assert (stats["written"], stats["pending"], stats["dead_lettered"]) == (4, 0, 1)
+
+
+@pytest.mark.asyncio
+async def test_lone_failing_entry_is_dead_lettered(monkeypatch):
+    import uuid
+    from datetime import datetime, timezone
+
+    from app.services import audit_log_service
+    from tests.conftest import test_engine
+
+    async def always_fail(engine, rows):
+        raise ValueError("invalid input syntax for type uuid")
+
+    monkeypatch.setattr(audit_log_service, "_write_rows", always_fail)
+    buffer = audit_log_service.AuditLogBuffer(
+        batch_size=100, interval_ms=60_000, max_pending=100, max_attempts=2
+    )
+    await buffer.add(test_engine, {
+        "id": uuid.uuid4(), "org_id": uuid.uuid4(), "actor_id": "system", "actor_type": "system",
+        "action": "create", "entity_type": "risk", "entity_id": "r1", "changes": None,
+        "ip_address": None, "timestamp": datetime.now(timezone.utc),
+    })
+
+    await buffer.flush()
+    assert buffer.stats()["pending"] == 1
+    await buffer.flush()
+    stats = buffer.stats()
+    assert (stats["pending"], stats["dead_lettered"]) == (0, 1)
+    assert buffer._backoff == 2  # retries were spaced out meanwhile
@@ -148,3 +148,75 @@ async def test_readiness_score(client: AsyncClient):
     assert "risks_score" in data
     assert "controls_implemented" in data
     assert "controls_total" in data
+
+
+@pytest.mark.asyncio
+async def test_readiness_score_counts(client: AsyncClient):
+    base = f"/api/v1/organizations/{TEST_ORG_ID}"
+    await client.post(f"{base}/controls", json={"title": "MFA", "status": "implemented"})
+    await client.post(f"{base}/controls", json={"title": "Backups"})
+    await client.post(f"{base}/policies", json={"title": "Security Policy", "status": "published"})
+    await client.post(f"{base}/risks", json={"title": "Vendor outage", "status": "accepted"})
+    await client.post(f"{base}/risks", json={"title": "Phishing"})
+
+    data = (await client.get(f"{base}/audits/readiness")).json()
+    assert data["controls_total"] == 2
+    assert data["controls_implemented"] == 1
+    assert data["controls_score"] == 50.0
+    assert data["policies_published"] == data["policies_total"] == 1
+    assert data["risks_treated"] == 1
+    assert data["risks_total"] == 2
+    assert data["overall_score"] == 45.0
+
+
+@pytest.mark.asyncio
+async def test_readiness_cache_invalidated_on_change(client: AsyncClient, monkeypatch):
+    from app.core import cache_events
+
+    deleted = []
+
+    async def fake_cache_delete(key: str) -> None:
+        deleted.append(key)
+
+    monkeypatch.setattr(cache_events, "cache_delete", fake_cache_delete)
+    await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/controls", json={"title": "Encryption"}
+    )
+    assert f"org:{TEST_ORG_ID}:readiness_score" in deleted
+
+
+@pytest.mark.asyncio
+async def test_evidence_package_streaming_formats(client: AsyncClient):
+    import json
+
+    base = f"/api/v1/organizations/{TEST_ORG_ID}"
+    audit_id = (await client.post(
+        f"{base}/audits", json={"title": "Package Audit", "audit_type": "external"}
+    )).json()["id"]
+    control_ids = []
+    for title in ("B Control", "A Control", "C Control"):
+        control_ids.append((await client.post(f"{base}/controls", json={"title": title})).json()["id"])
+    for i in range(2):
+        await client.post(
+            f"{base}/evidence",
+            json={"control_id": control_ids[0], "title": f"Evidence {i}", "collection_method": "manual"},
+        )
+
+    url = f"{base}/audits/{audit_id}/evidence-package"
+    package = (await client.get(url)).json()
+    assert package["controls_count"] == 3
+    entries = package["evidence_package"]
+    assert [e["control_title"] for e in entries] == ["A Control", "B Control", "C Control"]
+    assert [len(e["evidence"]) for e in entries] == [0, 2, 0]
+
+    resp = await client.get(url, params={"format": "ndjson"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert lines[:-1] == entries
+    assert lines[-1] == {"controls_count": 3}
+
+    resp = await client.get(url, params={"format": "json-stream"})
+    assert resp.json() == package
+
+    resp = await client.get(url, params={"format": "xml"})
+    assert resp.status_code == 422
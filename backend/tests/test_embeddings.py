@@ -1,7 +1,18 @@
 """Tests for the Embeddings / Semantic Search API."""
 
+import math
+import os
+import random
+import uuid
+
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Set to a pgvector-enabled database URL to run the parity suite against PostgreSQL too.
+PGVECTOR_URL = os.environ.get("TEST_PGVECTOR_URL")
 
 
 @pytest.mark.asyncio
@@ -34,3 +45,322 @@ async def test_index_invalid_entity_type(client: AsyncClient, org_id: str, auth_
         headers=auth_headers,
     )
     assert response.status_code == 400
+
+
+def _fake_embedding(text: str) -> list[float]:
+    """Deterministic bag-of-letters vector so tests don't need the real model."""
+    vector = [0.0] * 26
+    for ch in text.lower():
+        if "a" <= ch <= "z":
+            vector[ord(ch) - ord("a")] += 1.0
+    return vector
+
+
+@pytest.mark.asyncio
+async def test_search_uses_vector_index(client: AsyncClient, test_org: str, monkeypatch):
+    from app.services import embedding_service
+
+    monkeypatch.setattr(
+        embedding_service, "_compute_embeddings", lambda texts: [_fake_embedding(t) for t in texts]
+    )
+
+    for title in ("Multi-factor authentication", "Encryption at rest", "Access reviews"):
+        resp = await client.post(
+            f"/api/v1/organizations/{test_org}/controls",
+            json={"title": title, "description": title},
+        )
+        assert resp.status_code == 201
+
+    resp = await client.post(f"/api/v1/organizations/{test_org}/embeddings/index/control")
+    assert resp.status_code == 200
+
+    resp = await client.post(
+        f"/api/v1/organizations/{test_org}/embeddings/search",
+        json={"query": "Encryption at rest", "entity_type": "control", "top_k": 2, "min_score": 0.0},
+    )
+    assert resp.status_code == 200
+    results = resp.json()
+    assert len(results) == 2
+    assert results[0]["text_preview"].startswith("Encryption at rest")
+    assert results[0]["similarity_score"] == 1.0
+    assert results[0]["similarity_score"] >= results[1]["similarity_score"]
+    assert set(results[0]) == {"entity_type", "entity_id", "text_preview", "similarity_score"}
+
+    resp = await client.post(
+        f"/api/v1/organizations/{test_org}/embeddings/search",
+        json={"query": "Encryption at rest", "entity_type": "policy", "min_score": 0.0},
+    )
+    assert resp.json() == []
+
+
+@pytest.mark.asyncio
+async def test_reindex_skips_unchanged(client: AsyncClient, test_org: str, monkeypatch):
+    from app.services import embedding_service
+
+    monkeypatch.setattr(
+        embedding_service, "_compute_embeddings", lambda texts: [_fake_embedding(t) for t in texts]
+    )
+
+    control_ids = []
+    for title in ("Password policy", "Logging and monitoring"):
+        resp = await client.post(
+            f"/api/v1/organizations/{test_org}/controls", json={"title": title}
+        )
+        control_ids.append(resp.json()["id"])
+
+    url = f"/api/v1/organizations/{test_org}/embeddings/index/control"
+    first = (await client.post(url)).json()
+    assert first["total"] == 2
+    assert first["written"] == 2
+    assert first["skipped"] == 0
+    assert "entities_per_second" in first and "encode_ms" in first and "write_ms" in first
+
+    await client.patch(
+        f"/api/v1/organizations/{test_org}/controls/{control_ids[0]}",
+        json={"description": "Rotate every 90 days"},
+    )
+    second = (await client.post(url)).json()
+    assert second["indexed"] == 2
+    assert second["written"] == 1
+    assert second["skipped"] == 1
+
+
+@pytest_asyncio.fixture(params=["sqlite", "postgresql"])
+async def search_db(request, db: AsyncSession):
+    if request.param == "sqlite":
+        yield db
+        return
+    if not PGVECTOR_URL:
+        pytest.skip("TEST_PGVECTOR_URL not set")
+
+    from app.core.database import Base
+
+    engine = create_async_engine(PGVECTOR_URL)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+def _reference_search(rows, query, entity_type, top_k, min_score):
+    def cosine(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    scored = [
+        (cosine(query, vector), str(entity_id))
+        for etype, entity_id, vector in rows
+        if not entity_type or etype == entity_type
+    ]
+    scored = [item for item in scored if item[0] >= min_score]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored[:top_k]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "entity_type,top_k,min_score",
+    [(None, 5, 0.0), ("control", 3, 0.1), ("risk", 10, 0.3), (None, 50, -1.0), (None, 0, 0.0)],
+)
+async def test_search_backend_parity(search_db: AsyncSession, entity_type, top_k, min_score):
+    from app.models.embedding import Embedding
+    from app.models.organization import Organization
+    from app.services import vector_index
+
+    rng = random.Random(42)
+    org = Organization(name="Parity Org", slug=f"parity-{uuid.uuid4().hex[:8]}")
+    search_db.add(org)
+    await search_db.flush()
+
+    rows = []
+    for i in range(40):
+        etype = "control" if i % 2 else "risk"
+        vector = [rng.uniform(-1, 1) for _ in range(384)]
+        entity_id = uuid.uuid4()
+        rows.append((etype, entity_id, vector))
+        search_db.add(Embedding(
+            org_id=org.id, entity_type=etype, entity_id=entity_id,
+            content_hash=str(i), text_content=f"Entity {i}", vector=vector, dimensions=384,
+        ))
+    await search_db.commit()
+
+    query = [rng.uniform(-1, 1) for _ in range(384)]
+    results = await vector_index.search(
+        search_db, org.id, query, entity_type=entity_type, top_k=top_k, min_score=min_score
+    )
+    expected = _reference_search(rows, query, entity_type, top_k, min_score)
+
+    assert [r["entity_id"] for r in results] == [entity_id for _, entity_id in expected]
+    for result, (score, _) in zip(results, expected):
+        assert result["similarity_score"] == pytest.approx(score, abs=1e-3)
+        assert result["text_preview"].startswith("Entity ")
+        if entity_type:
+            assert result["entity_type"] == entity_type
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("entity_type,top_k", [(None, 10), ("risk", 5)])
+async def test_search_backend_parity_multi_org(search_db: AsyncSession, entity_type, top_k):
+    from app.models.embedding import Embedding
+    from app.models.organization import Organization
+    from app.services import vector_index
+
+    rng = random.Random(7)
+    query = [rng.uniform(-1, 1) for _ in range(384)]
+    small = Organization(name="Small Org", slug=f"small-{uuid.uuid4().hex[:8]}")
+    large = Organization(name="Large Org", slug=f"large-{uuid.uuid4().hex[:8]}")
+    search_db.add_all([small, large])
+    await search_db.flush()
+
+    # A large tenant whose vectors all sit closer to the query than the small one's
+    for i in range(400):
+        search_db.add(Embedding(
+            org_id=large.id, entity_type="control", entity_id=uuid.uuid4(),
+            content_hash=str(i), text_content=f"Large {i}",
+            vector=[q + rng.uniform(-0.1, 0.1) for q in query], dimensions=384,
+        ))
+    rows = []
+    for i in range(12):
+        etype = "risk" if i % 4 == 0 else "control"
+        vector = [rng.uniform(-1, 1) for _ in range(384)]
+        entity_id = uuid.uuid4()
+        rows.append((etype, entity_id, vector))
+        search_db.add(Embedding(
+            org_id=small.id, entity_type=etype, entity_id=entity_id,
+            content_hash=f"s{i}", text_content=f"Entity {i}", vector=vector, dimensions=384,
+        ))
+    await search_db.commit()
+
+    results = await vector_index.search(
+        search_db, small.id, query, entity_type=entity_type, top_k=top_k, min_score=-1.0
+    )
+    expected = _reference_search(rows, query, entity_type, top_k, -1.0)
+
+    assert [r["entity_id"] for r in results] == [entity_id for _, entity_id in expected]
+    assert all(r["text_preview"].startswith("Entity ") for r in results)
+
+
+@pytest.mark.asyncio
+async def test_query_embedding_cache(client: AsyncClient, test_org: str, monkeypatch):
+    from app.services import embedding_service
+
+    calls = []
+
+    def counting_embeddings(texts: list[str]) -> list[list[float]]:
+        calls.extend(texts)
+        return [_fake_embedding(t) for t in texts]
+
+    monkeypatch.setattr(embedding_service, "_compute_embeddings", counting_embeddings)
+    query = f"cache probe {uuid.uuid4().hex}"
+    before = embedding_service.get_query_cache_stats()
+
+    for _ in range(3):
+        resp = await client.post(
+            f"/api/v1/organizations/{test_org}/embeddings/search", json={"query": query}
+        )
+        assert resp.status_code == 200
+
+    assert calls == [query]
+    after = embedding_service.get_query_cache_stats()
+    assert after["hits"] - before["hits"] == 2
+    assert after["misses"] - before["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_encode_many_coalesces_concurrent_requests(monkeypatch):
+    import asyncio
+
+    from app.services import embedding_service
+
+    batches = []
+
+    def recording_embeddings(texts: list[str]) -> list[list[float]]:
+        batches.append(list(texts))
+        return [_fake_embedding(t) for t in texts]
+
+    monkeypatch.setattr(embedding_service, "_compute_embeddings", recording_embeddings)
+
+    results = await asyncio.gather(
+        embedding_service.encode("alpha"),
+        embedding_service.encode_many(["beta", "gamma"]),
+        embedding_service.encode("delta"),
+    )
+
+    assert len(batches) == 1
+    assert sorted(batches[0]) == ["alpha", "beta", "delta", "gamma"]
+    assert results[0] == _fake_embedding("alpha")
+    assert results[1] == [_fake_embedding("beta"), _fake_embedding("gamma")]
+    assert results[2] == _fake_embedding("delta")
+
+
+@pytest.mark.asyncio
+async def test_apply_upserts_does_not_absorb_foreign_writes(db: AsyncSession):
+    from sqlalchemy import update
+
+    from app.models.embedding import Embedding
+    from app.models.organization import Organization
+    from app.services import vector_index
+
+    org = Organization(name="Fingerprint Org", slug=f"fp-{uuid.uuid4().hex[:8]}")
+    db.add(org)
+    await db.flush()
+    a = Embedding(
+        org_id=org.id, entity_type="control", entity_id=uuid.uuid4(), content_hash="a",
+        text_content="Original A", vector=[1.0, 0.0, 0.0], dimensions=3,
+    )
+    db.add(a)
+    await db.commit()
+    await vector_index.search(db, org.id, [1.0, 0.0, 0.0], min_score=0.0)
+
+    # Another worker rewrites A (within the same second on SQLite); this
+    # process then writes and applies B
+    await db.execute(
+        update(Embedding).where(Embedding.id == a.id).values(
+            text_content="Rewritten A", vector=[0.0, 1.0, 0.0],
+        )
+    )
+    b_id = uuid.uuid4()
+    db.add(Embedding(
+        org_id=org.id, entity_type="control", entity_id=b_id, content_hash="b",
+        text_content="B", vector=[0.0, 0.0, 1.0], dimensions=3,
+    ))
+    await db.commit()
+    await vector_index.apply_upserts(db, org.id, [("control", b_id, "B", [0.0, 0.0, 1.0])])
+
+    results = await vector_index.search(db, org.id, [0.0, 1.0, 0.0], top_k=1, min_score=0.5)
+    assert [r["text_preview"] for r in results] == ["Rewritten A"]
+
+
+@pytest.mark.asyncio
+async def test_vector_indexes_evicted_least_recently_used(db: AsyncSession, monkeypatch):
+    from app.config import get_settings
+    from app.models.embedding import Embedding
+    from app.models.organization import Organization
+    from app.services import vector_index
+
+    vector_index.invalidate()
+    orgs = []
+    for i in range(3):
+        org = Organization(name=f"LRU Org {i}", slug=f"lru-{uuid.uuid4().hex[:8]}")
+        db.add(org)
+        await db.flush()
+        for j in range(40):
+            db.add(Embedding(
+                org_id=org.id, entity_type="control", entity_id=uuid.uuid4(),
+                content_hash=str(j), text_content=f"Entity {j}",
+                vector=[float(j + 1)] * 384, dimensions=384,
+            ))
+        orgs.append(org.id)
+    await db.commit()
+
+    # 64 rows x 384 float32 = 96 KiB per index; room for two
+    monkeypatch.setattr(get_settings(), "EMBEDDING_INDEX_MAX_MB", 0.2)
+    for org_id in (orgs[0], orgs[1], orgs[0], orgs[2]):
+        await vector_index.search(db, org_id, [1.0] * 384, min_score=0.0)
+
+    assert list(vector_index._indexes) == [orgs[0], orgs[2]]
@@ -13,3 +13,84 @@ async def test_list_frameworks_empty(client: AsyncClient):
 async def test_get_framework_not_found(client: AsyncClient):
     resp = await client.get("/api/v1/frameworks/00000000-0000-0000-0000-000000000001")
     assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_framework_list_etag_follows_catalog_version(client: AsyncClient):
+    resp = await client.post(
+        "/api/v1/frameworks", json={"name": "Catalog FW", "version": "1.0"}
+    )
+    assert resp.status_code == 201
+    framework_id = resp.json()["id"]
+
+    resp = await client.get("/api/v1/frameworks")
+    assert resp.status_code == 200
+    assert [f["id"] for f in resp.json()] == [framework_id]
+    etag = resp.headers["etag"]
+
+    resp = await client.get("/api/v1/frameworks", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    resp = await client.patch(
+        f"/api/v1/frameworks/{framework_id}", json={"description": "Updated"}
+    )
+    assert resp.status_code == 200
+
+    resp = await client.get("/api/v1/frameworks", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert resp.json()[0]["description"] == "Updated"
+
+
+@pytest.mark.asyncio
+async def test_framework_list_sees_changes_from_other_processes(client: AsyncClient, monkeypatch):
+    from app.config import get_settings
+    from app.models.framework import Framework
+    from tests.conftest import test_session
+
+    monkeypatch.setattr(get_settings(), "CATALOG_VERSION_CHECK_SECONDS", 0.0)
+    resp = await client.get("/api/v1/frameworks")
+    etag = resp.headers["etag"]
+
+    # Written by another worker: no local bump and no shared cache to carry one
+    async with test_session() as db:
+        db.add(Framework(name="Elsewhere FW", version="1.0"))
+        await db.commit()
+
+    resp = await client.get("/api/v1/frameworks", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert [f["name"] for f in resp.json()] == ["Elsewhere FW"]
+
+
+@pytest.mark.asyncio
+async def test_catalog_sees_same_second_and_mapping_updates(client: AsyncClient, monkeypatch):
+    from app.config import get_settings
+    from app.models.control_template import ControlTemplate
+    from app.models.control_template_framework_mapping import ControlTemplateFrameworkMapping
+    from app.models.framework import Framework
+    from app.services import catalog_service
+    from tests.conftest import test_session
+
+    monkeypatch.setattr(get_settings(), "CATALOG_VERSION_CHECK_SECONDS", 0.0)
+    async with test_session() as db:
+        framework = Framework(name="Mapped FW", version="1.0")
+        template = ControlTemplate(template_code="CT-1", title="Backups", domain="ops")
+        db.add_all([framework, template])
+        await db.flush()
+        mapping = ControlTemplateFrameworkMapping(
+            control_template_id=template.id, framework_id=framework.id, requirement_code="A.1"
+        )
+        db.add(mapping)
+        await db.commit()
+
+        catalog = await catalog_service.get_catalog(db)
+        assert catalog.template_requirement_codes[framework.id][template.id] == {"A.1"}
+
+        # Written elsewhere within the same second: no bump, no new rows
+        framework.description = "Edited"
+        mapping.requirement_code = "A.2"
+        await db.commit()
+
+        catalog = await catalog_service.get_catalog(db)
+        assert catalog.framework(framework.id).description == "Edited"
+        assert catalog.template_requirement_codes[framework.id][template.id] == {"A.2"}
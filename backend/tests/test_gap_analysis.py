@@ -30,3 +30,76 @@ async def test_gap_analysis_requires_framework(client: AsyncClient, org_id: str,
     assert response.status_code == 200
     data = response.json()
     assert data["total_requirements"] == 0
+
+
+@pytest.mark.asyncio
+async def test_coverage_index_follows_control_changes(client: AsyncClient):
+    from app.models.control_framework_mapping import ControlFrameworkMapping
+    from app.models.framework import Framework
+    from app.models.framework_domain import FrameworkDomain
+    from app.models.framework_requirement import FrameworkRequirement
+    from tests.conftest import test_session
+
+    org = await client.post(
+        "/api/v1/organizations", json={"name": "Gap Org", "slug": "gap-org"}
+    )
+    org_id = org.json()["id"]
+    base = f"/api/v1/organizations/{org_id}"
+    controls = [
+        (await client.post(f"{base}/controls", json={"title": f"Control {i}"})).json()["id"]
+        for i in range(3)
+    ]
+
+    async with test_session() as db:
+        frameworks = [Framework(name=name, version="1") for name in ("SOC 2", "ISO 27001")]
+        db.add_all(frameworks)
+        await db.flush()
+        domain = FrameworkDomain(framework_id=frameworks[0].id, code="CC", name="Common")
+        db.add(domain)
+        await db.flush()
+        reqs = [
+            FrameworkRequirement(domain_id=domain.id, code=f"CC{i}", title=f"Req {i}", sort_order=i)
+            for i in range(3)
+        ]
+        db.add_all(reqs)
+        await db.flush()
+        soc2, iso = str(frameworks[0].id), str(frameworks[1].id)
+        req_ids = [r.id for r in reqs]
+        # Control 0 covers CC0, control 1 covers CC1 in both frameworks
+        db.add_all([
+            ControlFrameworkMapping(control_id=controls[0], framework_id=frameworks[0].id, requirement_id=req_ids[0]),
+            ControlFrameworkMapping(control_id=controls[1], framework_id=frameworks[0].id, requirement_id=req_ids[1]),
+            ControlFrameworkMapping(control_id=controls[1], framework_id=frameworks[1].id),
+        ])
+        await db.commit()
+
+    gap = (await client.get(f"{base}/gap-analysis/framework/{soc2}")).json()
+    assert (gap["total_requirements"], gap["covered_count"], gap["partial_count"], gap["gap_count"]) == (3, 0, 2, 1)
+
+    # The index is built now; later changes update it incrementally
+    await client.patch(f"{base}/controls/{controls[0]}", json={"status": "implemented"})
+    gap = (await client.get(f"{base}/gap-analysis/framework/{soc2}")).json()
+    assert gap["covered_count"] == 1
+    assert gap["covered"][0]["controls"][0]["status"] == "implemented"
+
+    async with test_session() as db:
+        db.add(ControlFrameworkMapping(control_id=controls[2], framework_id=frameworks[1].id))
+        await db.commit()
+
+    matrix = (await client.get(f"{base}/gap-analysis/cross-framework", params={"page_size": 2})).json()
+    assert matrix["total_controls"] == 3
+    assert matrix["multi_framework_controls"] == 1
+    summaries = {f["framework_id"]: f for f in matrix["frameworks"]}
+    assert summaries[soc2]["mapped_controls"] == 2
+    assert summaries[soc2]["implemented_controls"] == 1
+    assert summaries[iso]["mapped_controls"] == 2
+    assert [r["control_id"] for r in matrix["matrix"]][0] == controls[1]
+    assert matrix["matrix"][0]["framework_count"] == 2
+
+    rest = (await client.get(
+        f"{base}/gap-analysis/cross-framework", params={"cursor": matrix["next_cursor"]}
+    )).json()
+    assert len(rest["matrix"]) == 1
+    assert rest["next_cursor"] is None
+    seen = {r["control_id"] for r in matrix["matrix"] + rest["matrix"]}
+    assert seen == set(controls)
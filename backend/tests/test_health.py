@@ -1,5 +1,5 @@
 import pytest
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 
 
 @pytest.mark.asyncio
@@ -16,3 +16,29 @@ async def test_health_ready(client: AsyncClient):
     assert resp.status_code == 200
     data = resp.json()
     assert "status" in data
+
+
+@pytest.mark.asyncio
+async def test_health_metrics(client: AsyncClient):
+    resp = await client.get("/health/metrics")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert {"hits", "misses", "hit_rate"} <= set(data["embedding_query_cache"])
+
+
+@pytest.mark.asyncio
+async def test_health_metrics_requires_super_admin():
+    from app.core.dependencies import get_current_user
+    from app.main import app
+    from tests.conftest import make_test_user_with_role, override_get_current_user
+
+    async def admin():
+        return make_test_user_with_role("admin")
+
+    app.dependency_overrides[get_current_user] = admin
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            resp = await c.get("/health/metrics")
+    finally:
+        app.dependency_overrides[get_current_user] = override_get_current_user
+    assert resp.status_code == 403
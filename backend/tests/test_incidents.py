@@ -99,3 +99,52 @@ async def test_add_timeline_event(client: AsyncClient):
     assert timeline_resp.status_code == 200
     assert isinstance(timeline_resp.json(), list)
     assert len(timeline_resp.json()) >= 1
+
+
+@pytest.mark.asyncio
+async def test_incident_stats_aggregate_and_invalidate(client: AsyncClient, monkeypatch):
+    from app.core import cache, cache_events
+
+    store: dict = {}
+
+    async def fake_get(key):
+        return store.get(key)
+
+    async def fake_set(key, value, ttl=300):
+        store[key] = value
+
+    async def fake_delete(key):
+        store.pop(key, None)
+
+    monkeypatch.setattr(cache, "cache_get", fake_get)
+    monkeypatch.setattr(cache, "cache_set", fake_set)
+    monkeypatch.setattr(cache_events, "cache_delete", fake_delete)
+
+    base = f"/api/v1/organizations/{TEST_ORG_ID}/incidents"
+    p1 = await client.post(base, json={"title": "Breach", "severity": "P1", "status": "open"})
+    p2 = await client.post(
+        base,
+        json={
+            "title": "Outage", "severity": "P2", "status": "open",
+            "detected_at": "2026-01-01T00:00:00Z",
+        },
+    )
+    await client.patch(
+        f"{base}/{p2.json()['id']}",
+        json={"status": "resolved", "resolved_at": "2026-01-01T06:00:00Z"},
+    )
+
+    data = (await client.get(f"{base}/stats")).json()
+    assert data["total"] == 2
+    assert data["by_severity"] == {"P1": 1, "P2": 1}
+    assert data["by_status"] == {"open": 1, "resolved": 1}
+    assert data["open_p1_count"] == 1
+    assert data["avg_resolution_hours"] == 6.0
+    assert f"org:{TEST_ORG_ID}:incident_stats" in store
+
+    # Any committed write to the org's incidents drops the cached stats
+    await client.patch(f"{base}/{p1.json()['id']}", json={"status": "closed"})
+    assert f"org:{TEST_ORG_ID}:incident_stats" not in store
+    data = (await client.get(f"{base}/stats")).json()
+    assert data["open_p1_count"] == 0
+    assert data["by_status"] == {"closed": 1, "resolved": 1}
@@ -71,3 +71,216 @@ async def test_list_providers(client: AsyncClient):
         assert "name" in provider
         assert "description" in provider
         assert "collector_types" in provider
+
+
+@pytest.mark.asyncio
+async def test_batch_collection_runs_in_background(client: AsyncClient, monkeypatch):
+    import asyncio
+
+    from app.collectors.base import COLLECTOR_REGISTRY, BaseCollector
+    from app.services import collection_service
+    from tests.conftest import test_session
+
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    class FakeCollector(BaseCollector):
+        async def collect(self, config, credentials=None):
+            provider = config["provider"]
+            active[provider] = active.get(provider, 0) + 1
+            peak[provider] = max(peak.get(provider, 0), active[provider])
+            await asyncio.sleep(0.01)
+            active[provider] -= 1
+            return {"status": "success", "data": {"provider": provider}, "summary": "fake"}
+
+    monkeypatch.setitem(COLLECTOR_REGISTRY, "fake_collector", FakeCollector())
+    runner = collection_service.CollectionRunner(
+        test_session, concurrency=8, provider_limits={"github": 1}, provider_min_interval={}
+    )
+    monkeypatch.setattr(collection_service, "_runner", runner)
+
+    control_id = (await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/controls", json={"title": "Collected Control"}
+    )).json()["id"]
+    base = f"/api/v1/organizations/{TEST_ORG_ID}/integrations"
+    integrations = {}
+    for provider in ("github", "aws"):
+        integrations[provider] = (await client.post(
+            base, json={"provider": provider, "name": provider, "config": {"provider": provider}}
+        )).json()["id"]
+
+    items = [
+        {"integration_id": integrations["github"], "collector_type": "fake_collector", "control_id": control_id},
+        {"integration_id": integrations["github"], "collector_type": "fake_collector", "control_id": control_id},
+        {"integration_id": integrations["aws"], "collector_type": "fake_collector", "control_id": control_id},
+        {"integration_id": integrations["aws"], "collector_type": "no_such_collector", "control_id": control_id},
+    ]
+    resp = await client.post(f"{base}/collect", json={"items": items})
+    assert resp.status_code == 202
+    jobs = resp.json()
+    assert [j["status"] for j in jobs] == ["pending"] * 4
+
+    await runner.drain()
+    statuses = []
+    for job in jobs:
+        polled = (await client.get(f"{base}/{job['integration_id']}/jobs/{job['id']}")).json()
+        statuses.append(polled["status"])
+    assert statuses == ["completed", "completed", "completed", "failed"]
+    assert peak["github"] == 1
+    assert runner.stats()["completed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_collection_jobs_failed_on_startup(client: AsyncClient, monkeypatch):
+    import uuid
+    from datetime import datetime, timedelta, timezone
+
+    from app.config import get_settings
+    from app.models.collection_job import CollectionJob
+    from app.services import collection_service
+    from tests.conftest import test_session
+
+    monkeypatch.setattr(get_settings(), "COLLECTION_STALE_JOB_SECONDS", 3600)
+    integration_id = (await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/integrations",
+        json={"provider": "github", "name": "github", "config": {}},
+    )).json()["id"]
+    old = datetime.now(timezone.utc) - timedelta(hours=2)
+    jobs = {
+        "orphaned": ("running", old),
+        "never_started": ("pending", old),
+        "in_flight": ("running", datetime.now(timezone.utc)),
+        "finished": ("completed", old),
+    }
+    ids = {}
+    async with test_session() as db:
+        for name, (status, updated_at) in jobs.items():
+            job = CollectionJob(
+                org_id=uuid.UUID(TEST_ORG_ID), integration_id=uuid.UUID(integration_id),
+                collector_type="github_branch_protection", status=status, updated_at=updated_at,
+            )
+            db.add(job)
+            await db.flush()
+            ids[name] = job.id
+        await db.commit()
+
+    runner = collection_service.CollectionRunner(test_session)
+    assert await runner.recover_stale_jobs() == 2
+    assert runner.stats()["recovered"] == 2
+    async with test_session() as db:
+        statuses = {name: (await db.get(CollectionJob, job_id)).status for name, job_id in ids.items()}
+    assert statuses == {
+        "orphaned": "failed", "never_started": "failed", "in_flight": "running", "finished": "completed",
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_collection_unknown_integration(client: AsyncClient):
+    import uuid
+
+    resp = await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/integrations/collect",
+        json={"items": [{"integration_id": str(uuid.uuid4()), "collector_type": "github_branch_protection"}]},
+    )
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_aws_collector_uses_cached_client_and_fans_out(monkeypatch):
+    import threading
+    import time
+
+    from app.collectors import aws_client
+    from app.collectors.base import COLLECTOR_REGISTRY
+
+    built = []
+    in_flight = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class FakeCloudTrail:
+        def describe_trails(self):
+            return {"trailList": [
+                {"Name": f"trail-{i}", "TrailARN": f"arn:trail-{i}", "IsMultiRegionTrail": i == 0}
+                for i in range(4)
+            ]}
+
+        def get_trail_status(self, Name):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            time.sleep(0.05)
+            with lock:
+                in_flight["now"] -= 1
+            return {"IsLogging": True}
+
+    def fake_build(service, credentials, region):
+        built.append((service, region))
+        return FakeCloudTrail()
+
+    monkeypatch.setattr(aws_client, "_build_client", fake_build)
+    aws_client._clients.clear()
+
+    credentials = {"aws_access_key_id": "AKIA", "aws_secret_access_key": "secret"}
+    collector = COLLECTOR_REGISTRY["aws_cloudtrail_status"]
+    for _ in range(2):
+        result = await collector.collect(config={}, credentials=credentials)
+        assert result["data"]["compliant"] is True
+        assert len(result["data"]["trails"]) == 4
+
+    assert built == [("cloudtrail", "us-east-1")]
+    assert in_flight["peak"] > 1
+    stats = aws_client.get_stats()["calls"]["cloudtrail.get_trail_status"]
+    assert stats["calls"] == 8
+    assert stats["errors"] == 0
+    aws_client._clients.clear()
+
+
+@pytest.mark.asyncio
+async def test_github_dependabot_paginates_and_revalidates(monkeypatch):
+    import httpx
+
+    from app.collectors import http_client
+    from app.collectors.base import COLLECTOR_REGISTRY
+
+    requests = []
+
+    def alert(severity):
+        return {"security_vulnerability": {"severity": severity, "package": {"name": "pkg"}}}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == f'"{request.url.path}{request.url.query}"':
+            return httpx.Response(304)
+        etag = {"ETag": f'"{request.url.path}{request.url.query}"'}
+        if request.url.params.get("page") == "2":
+            return httpx.Response(200, json=[alert("low")], headers=etag)
+        link = f'<{request.url.copy_merge_params({"page": "2"})}>; rel="next"'
+        return httpx.Response(200, json=[alert("high"), alert("critical")], headers={**etag, "Link": link})
+
+    monkeypatch.setitem(
+        http_client._clients, "github", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    http_client._etags.clear()
+
+    collector = COLLECTOR_REGISTRY["github_dependabot_alerts"]
+    config = {"repositories": [{"owner": "acme", "repo": "api"}, {"owner": "acme", "repo": "web"}]}
+    credentials = {"github_token": "ghp_test"}
+
+    first = await collector.collect(config=config, credentials=credentials)
+    assert first["data"]["total_alerts"] == 6  # 3 alerts on two pages, per repo
+    assert first["data"]["critical"] == 2
+    assert len(requests) == 4
+
+    not_modified_before = http_client.get_stats()["not_modified"]
+    second = await collector.collect(config=config, credentials=credentials)
+    assert second["data"]["total_alerts"] == 6
+    assert http_client.get_stats()["not_modified"] - not_modified_before == 4
+    assert all("If-None-Match" in r.headers for r in requests[4:])
+    assert second["data"]["truncated_repositories"] == []
+
+    # Hitting the page guard is reported in the evidence, not silently dropped
+    monkeypatch.setattr(http_client.settings, "COLLECTOR_MAX_PAGES", 1)
+    third = await collector.collect(config=config, credentials=credentials)
+    assert third["data"]["total_alerts"] == 4
+    assert third["data"]["truncated_repositories"] == ["acme/api", "acme/web"]
+    http_client._etags.clear()
@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 from httpx import AsyncClient
 
@@ -87,3 +89,178 @@ async def test_monitoring_stats(client: AsyncClient):
     assert "active_rules" in data
     assert "open_alerts" in data
     assert "by_severity" in data
+
+
+@pytest.mark.asyncio
+async def test_run_all_rules_in_one_batch(client: AsyncClient):
+    base = f"/api/v1/organizations/{TEST_ORG_ID}/monitoring"
+    for title in ("Unimplemented controls", "Unimplemented controls (weekly)"):
+        await client.post(f"{base}/rules", json={"title": title, "check_type": "control_status"})
+    await client.post(f"{base}/rules", json={"title": "Stale evidence", "check_type": "evidence_staleness"})
+    await client.post(f"{base}/rules", json={"title": "Inactive", "check_type": "control_status", "is_active": False})
+    await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/controls", json={"title": "Backups", "status": "draft"}
+    )
+
+    resp = await client.post(f"{base}/run")
+    assert resp.status_code == 200
+    report = resp.json()
+    by_type = {}
+    for ev in report["evaluations"]:
+        by_type.setdefault(ev["check_type"], []).append(ev)
+        assert ev["elapsed_ms"] >= 0
+    assert len(by_type["control_status"]) == 2
+    assert all(ev["batch_size"] == 2 for ev in by_type["control_status"])
+    assert len(by_type["evidence_staleness"]) == 1
+    assert all(ev["result"] == "fail" for ev in by_type["control_status"])
+    control_alerts = [a for a in report["alerts"] if a["title"].endswith("controls are not implemented")]
+    assert len(control_alerts) == 2
+    assert control_alerts[0]["details"]["failing_count"] >= 1
+    assert len(control_alerts[0]["details"]["control_ids"]) == min(control_alerts[0]["details"]["failing_count"], 10)
+    assert report["alerts_created"] == len(report["alerts"])
+    assert {a["id"] for a in report["alerts"]} == {
+        ev["alert_id"] for ev in report["evaluations"] if ev["alert_id"]
+    }
+
+    rules = (await client.get(f"{base}/rules")).json()["items"]
+    checked = [r for r in rules if r["is_active"] and r["check_type"] in by_type]
+    assert checked and all(r["last_checked_at"] for r in checked)
+    assert all(r["last_checked_at"] is None for r in rules if not r["is_active"])
+
+
+@pytest.mark.asyncio
+async def test_failing_check_group_rolls_back_only_its_own_work(client: AsyncClient, monkeypatch):
+    from sqlalchemy import update
+
+    from app.models.monitoring import MonitorRule
+    from app.services import monitoring_service
+
+    async def broken_check(db, org_id, rules, now):
+        await db.execute(update(MonitorRule).where(MonitorRule.id == rules[0].id).values(title="Half-written"))
+        raise RuntimeError("upstream unavailable")
+
+    monkeypatch.setitem(monitoring_service.CHECKS, "policy_expiry", broken_check)
+    base = f"/api/v1/organizations/{TEST_ORG_ID}/monitoring"
+    await client.post(f"{base}/rules", json={"title": "Expiring policies", "check_type": "policy_expiry"})
+    await client.post(f"{base}/rules", json={"title": "Controls", "check_type": "control_status"})
+
+    resp = await client.post(f"{base}/run")
+    assert resp.status_code == 200
+    results = {ev["check_type"]: ev["result"] for ev in resp.json()["evaluations"]}
+    assert results["policy_expiry"] == "error"
+    assert results["control_status"] in ("pass", "fail")
+
+    rules = {r["check_type"]: r for r in (await client.get(f"{base}/rules")).json()["items"]}
+    assert rules["policy_expiry"]["title"] == "Expiring policies"
+    assert rules["policy_expiry"]["last_checked_at"] and rules["control_status"]["last_checked_at"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_leader_lock_and_incremental_sync(client: AsyncClient, monkeypatch, tmp_path):
+    from app.config import get_settings
+    from app.core import scheduler
+    from app.core.leader import FileLock
+    from tests.conftest import test_session
+
+    first, second = FileLock(str(tmp_path / "sched.lock")), FileLock(str(tmp_path / "sched.lock"))
+    assert await first.acquire()
+    assert not await second.acquire()
+    await first.release()
+    assert await second.acquire()
+    await second.release()
+
+    monkeypatch.setattr(get_settings(), "SCHEDULER_JOBSTORE_URL", "memory")
+    monkeypatch.setattr(scheduler, "scheduler", None)
+    base = f"/api/v1/organizations/{TEST_ORG_ID}/monitoring"
+    hourly = (await client.post(f"{base}/rules", json={
+        "title": "Hourly controls", "check_type": "control_status", "schedule": "hourly",
+    })).json()
+    await client.post(f"{base}/rules", json={"title": "Hourly policies", "check_type": "policy_expiry", "schedule": "hourly"})
+
+    async with test_session() as db:
+        await scheduler.sync_monitoring_rules(db, [uuid.UUID(TEST_ORG_ID)])
+    jobs = {job.id: job for job in scheduler.get_scheduler().get_jobs()}
+    hourly_job = f"monitor_org_{TEST_ORG_ID}_hourly"
+    assert hourly_job in jobs
+    assert jobs[hourly_job].args == (TEST_ORG_ID, "hourly")
+    assert jobs[hourly_job].trigger.interval.total_seconds() == 3600
+    # Other orgs' jobs are not touched by an incremental sync
+    scheduler.get_scheduler().add_job(
+        "app.core.scheduler:_run_monitoring_checks", "interval", hours=1,
+        id="monitor_org_other_hourly", args=["other", "hourly"],
+    )
+
+    await client.patch(f"{base}/rules/{hourly['id']}", json={"schedule": "weekly"})
+    async with test_session() as db:
+        await scheduler.sync_monitoring_rules(db, [uuid.UUID(TEST_ORG_ID)])
+    job_ids = {job.id for job in scheduler.get_scheduler().get_jobs()}
+    assert {hourly_job, f"monitor_org_{TEST_ORG_ID}_weekly", "monitor_org_other_hourly"} <= job_ids
+
+    await client.patch(f"{base}/rules/{hourly['id']}", json={"is_active": False})
+    async with test_session() as db:
+        await scheduler.sync_monitoring_rules(db, [uuid.UUID(TEST_ORG_ID)])
+    job_ids = {job.id for job in scheduler.get_scheduler().get_jobs()}
+    assert f"monitor_org_{TEST_ORG_ID}_weekly" not in job_ids
+    assert {hourly_job, "monitor_org_other_hourly"} <= job_ids
+
+
+def test_scheduler_jobstore_url_uses_sync_driver(monkeypatch):
+    from app.config import get_settings
+    from app.core import scheduler
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "SCHEDULER_JOBSTORE_URL", "")
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql+asyncpg://qt:s3cret@db:5432/quicktrust")
+    assert scheduler._jobstore_url() == "postgresql+psycopg://qt:s3cret@db:5432/quicktrust"
+    monkeypatch.setattr(settings, "DATABASE_URL", "sqlite+aiosqlite:///./quicktrust.db")
+    assert scheduler._jobstore_url() == "sqlite:///./quicktrust.db"
+
+    # An explicitly configured store that cannot be opened is not downgraded
+    monkeypatch.setattr(settings, "SCHEDULER_JOBSTORE_URL", "nosuchdialect://host/db")
+    with pytest.raises(Exception):
+        scheduler._jobstore()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_steps_down_when_renew_fails(monkeypatch):
+    import asyncio
+
+    from app.config import get_settings
+    from app.core import scheduler
+
+    class FlakyLock:
+        backend = "test"
+
+        async def acquire(self):
+            return True
+
+        async def renew(self):
+            raise ConnectionError("redis timeout")
+
+        async def release(self):
+            pass
+
+    async def become_leader():
+        monkeypatch.setattr(scheduler, "is_leader", True)
+
+    monkeypatch.setattr(get_settings(), "SCHEDULER_LOCK_RENEW_SECONDS", 0.01)
+    monkeypatch.setattr(scheduler, "_lock", FlakyLock())
+    monkeypatch.setattr(scheduler, "_become_leader", become_leader)
+    monkeypatch.setattr(scheduler, "is_leader", False)
+    stepped_down = []
+
+    async def step_down(release=True):
+        stepped_down.append(release)
+        monkeypatch.setattr(scheduler, "is_leader", False)
+
+    monkeypatch.setattr(scheduler, "_step_down", step_down)
+
+    task = asyncio.create_task(scheduler._leader_loop())
+    for _ in range(50):
+        if stepped_down:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert stepped_down and stepped_down[0] is False
@@ -1,3 +1,7 @@
+import asyncio
+import os
+import uuid
+
 import pytest
 from httpx import AsyncClient
 
@@ -271,3 +275,329 @@ async def test_scan_detail_not_found(client: AsyncClient):
         f"/api/v1/organizations/{TEST_ORG_ID}/prowler/results/{fake_id}"
     )
     assert resp.status_code == 404
+
+
+def test_iter_json_objects_streams_arrays_and_ndjson(tmp_path):
+    """The incremental parser handles JSON arrays and NDJSON across chunk boundaries."""
+    import json
+
+    from app.collectors.prowler_collectors import _normalize_finding, iter_json_objects
+
+    findings = [{"CheckID": f"check_{i}", "Status": "FAIL", "Severity": "high", "Note": "x" * i}
+                for i in range(25)]
+    array_file = tmp_path / "prowler-output.json"
+    array_file.write_text(json.dumps(findings, indent=2))
+    ndjson_file = tmp_path / "prowler-output.ndjson"
+    ndjson_file.write_text("\n".join(json.dumps(f) for f in findings))
+
+    for path in (array_file, ndjson_file):
+        parsed = list(iter_json_objects(str(path), chunk_size=16))
+        assert [f["CheckID"] for f in parsed] == [f["CheckID"] for f in findings]
+
+    ocsf = {
+        "metadata": {"event_code": "iam_root_mfa_enabled"},
+        "finding_info": {"title": "Root MFA"},
+        "status_code": "FAIL",
+        "severity": "Critical",
+        "cloud": {"region": "eu-west-1"},
+        "resources": [{"uid": "arn:aws:iam::1:root", "name": "root", "group": {"name": "iam"}}],
+        "unmapped": {"compliance": {"CIS-1.5": ["1.5"]}},
+    }
+    normalized = _normalize_finding(ocsf)
+    assert normalized["check_id"] == "iam_root_mfa_enabled"
+    assert normalized["status"] == "FAIL"
+    assert normalized["severity"] == "critical"
+    assert normalized["region"] == "eu-west-1"
+    assert normalized["resource_arn"] == "arn:aws:iam::1:root"
+    assert normalized["service"] == "iam"
+    assert normalized["compliance"] == {"CIS-1.5": ["1.5"]}
+
+
+def test_fingerprint_separates_accounts():
+    """Account-level findings without an ARN stay distinct across accounts."""
+    from app.collectors.prowler_collectors import _normalize_finding, finding_fingerprint
+
+    def fingerprint(**raw):
+        return finding_fingerprint(_normalize_finding({"CheckID": "iam_password_policy", "Region": "us-east-1", **raw}))
+
+    assert fingerprint(AccountId="111", ResourceId="password_policy") != fingerprint(
+        AccountId="222", ResourceId="password_policy"
+    )
+    # Without an account ID, the ARN's account is used
+    assert fingerprint(ResourceArn="arn:aws:iam::111:root") == fingerprint(
+        AccountId="111", ResourceArn="arn:aws:iam::111:root"
+    )
+
+
+@pytest.mark.asyncio
+async def test_live_scan_output_is_streamed_into_findings_table(client: AsyncClient, monkeypatch, tmp_path):
+    """A live scan's output file is ingested in batches; the job keeps only summary stats."""
+    import json
+
+    from app.collectors import prowler_orchestrator
+    from app.config import get_settings
+
+    findings = [
+        {"CheckID": f"check_{i}", "Status": "PASS" if i % 3 else "FAIL", "Severity": "High",
+         "ServiceName": "s3", "Region": "us-east-1", "ResourceArn": f"arn:aws:s3:::bucket-{i}",
+         "Compliance": {"CIS": ["2.1"]}}
+        for i in range(7)
+    ]
+    output_file = tmp_path / "prowler-output.json"
+    output_file.write_text(json.dumps(findings))
+
+    async def fake_scan(*args, **kwargs):
+        return str(output_file)
+
+    monkeypatch.setattr(prowler_orchestrator, "_run_prowler_scan", fake_scan)
+    monkeypatch.setattr(get_settings(), "PROWLER_INGEST_BATCH_SIZE", 3)
+
+    resp = await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/integrations/{TEST_INTEGRATION_ID}/collect",
+        json={"collector_type": "prowler_aws_full_scan"},
+    )
+    job = resp.json()
+    assert job["status"] == "completed"
+    data = job["result_data"]["data"]
+    assert "findings" not in data and "findings_path" not in data
+    assert data["summary_stats"]["total"] == 7
+    assert data["summary_stats"]["failed"] == 3
+    assert job["result_data"]["summary"] == "Prowler full AWS scan: 7 checks, 57.1% pass rate"
+
+    detail = (await client.get(
+        f"/api/v1/organizations/{TEST_ORG_ID}/prowler/results/{job['id']}"
+    )).json()
+    assert [f["check_id"] for f in detail["findings"]] == [f"check_{i}" for i in range(7)]
+    assert detail["findings"][0]["severity"] == "high"
+
+    posture = (await client.get(
+        f"/api/v1/organizations/{TEST_ORG_ID}/prowler/compliance-posture"
+    )).json()
+    assert posture["frameworks"] == [
+        {"framework": "CIS", "total_checks": 7, "passed": 4, "failed": 3, "pass_rate": 57.1}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_findings_filtering_paging_and_counts(client: AsyncClient):
+    """Findings are filtered, cursor-paged and grouped in the database."""
+    base = f"/api/v1/organizations/{TEST_ORG_ID}/prowler"
+    job_id = (await client.post(
+        f"{base}/scan", json={"integration_id": TEST_INTEGRATION_ID, "scan_type": "full"}
+    )).json()["job_id"]
+
+    listing = (await client.get(f"{base}/results")).json()
+    assert listing["items"][0]["findings"] == []
+    listing = (await client.get(
+        f"{base}/results", params={"include_findings": True, "status": "fail"}
+    )).json()
+    assert len(listing["items"][0]["findings"]) == 6
+
+    first = (await client.get(
+        f"{base}/results/{job_id}/findings", params={"status": "FAIL", "limit": 4}
+    )).json()
+    assert len(first["items"]) == 4
+    assert first["next_cursor"] is not None
+    second = (await client.get(
+        f"{base}/results/{job_id}/findings",
+        params={"status": "FAIL", "limit": 4, "cursor": first["next_cursor"]},
+    )).json()
+    assert len(second["items"]) == 2
+    assert second["next_cursor"] is None
+    check_ids = [f["check_id"] for f in first["items"] + second["items"]]
+    assert len(set(check_ids)) == 6
+
+    counts = (await client.get(
+        f"{base}/results/{job_id}/counts", params={"group_by": "severity", "status": "FAIL"}
+    )).json()
+    assert counts["total"] == 6
+    assert {c["key"]: c["count"] for c in counts["counts"]} == {"critical": 2, "high": 3, "medium": 1}
+
+    by_service = (await client.get(f"{base}/results/{job_id}/counts", params={"group_by": "service"})).json()
+    assert by_service["total"] == 15
+    bad = await client.get(f"{base}/results/{job_id}/counts", params={"group_by": "check_title"})
+    assert bad.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_sharded_scan_merges_accounts_and_regions(client: AsyncClient, monkeypatch, tmp_path):
+    """Each shard writes to its own dir; outputs are merged, a failed shard is reported."""
+    import json
+
+    from app.collectors import prowler_orchestrator
+    from app.config import get_settings
+    from app.models.integration import Integration
+    from tests.conftest import test_session
+
+    monkeypatch.setattr(get_settings(), "PROWLER_OUTPUT_DIR", str(tmp_path))
+    async with test_session() as db:
+        integration = await db.get(Integration, uuid.UUID(TEST_INTEGRATION_ID))
+        integration.config = {
+            "accounts": [{"account_id": "111"}, {"account_id": "222", "role_arn": "arn:aws:iam::222:role/scan"}],
+            "regions": ["us-east-1", "eu-west-1"],
+        }
+        await db.commit()
+
+    calls = []
+
+    async def fake_scan(cloud_provider, credentials, scan_scope=None, output_dir=None, timeout=None):
+        calls.append((scan_scope["region"], scan_scope["role_arn"], output_dir))
+        if scan_scope["role_arn"] and scan_scope["region"] == "eu-west-1":
+            raise asyncio.TimeoutError
+        account = "222" if scan_scope["role_arn"] else "111"
+        region = scan_scope["region"]
+        findings = [
+            # Global IAM finding, reported by every regional shard of the account
+            {"CheckID": "iam_root_mfa_enabled", "Status": "FAIL", "Severity": "critical", "ServiceName": "iam",
+             "Region": "us-east-1", "ResourceArn": f"arn:aws:iam::{account}:root"},
+            {"CheckID": "ec2_imdsv2", "Status": "PASS", "Severity": "medium", "ServiceName": "ec2",
+             "Region": region, "ResourceArn": f"arn:aws:ec2:{region}:{account}:instance/i-1"},
+        ]
+        path = os.path.join(output_dir, "prowler-output.json")
+        with open(path, "w") as f:
+            json.dump(findings, f)
+        return path
+
+    monkeypatch.setattr(prowler_orchestrator, "_run_prowler_scan", fake_scan)
+
+    resp = await client.post(
+        f"/api/v1/organizations/{TEST_ORG_ID}/integrations/{TEST_INTEGRATION_ID}/collect",
+        json={"collector_type": "prowler_aws_full_scan"},
+    )
+    job = resp.json()
+    assert job["status"] == "completed"
+    assert len(calls) == 4
+    assert len({output_dir for _, _, output_dir in calls}) == 4
+    data = job["result_data"]["data"]
+    assert "shard_outputs" not in data
+    assert [s["status"] for s in data["shards"]] == ["completed", "completed", "completed", "timeout"]
+    # 111: root + 2 instances; 222 (us-east-1 only): root + 1 instance
+    assert data["summary_stats"]["total"] == 5
+    assert data["summary_stats"]["failed"] == 2
+    assert job["result_data"]["summary"].endswith("(1 of 4 shards failed)")
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_cancelled_scan_kills_shards_and_removes_output(monkeypatch, tmp_path):
+    from app.collectors import prowler_orchestrator
+    from app.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "PROWLER_OUTPUT_DIR", str(tmp_path))
+    started = asyncio.Event()
+
+    async def slow_scan(*args, **kwargs):
+        started.set()
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(prowler_orchestrator, "_run_prowler_scan", slow_scan)
+    shards = prowler_orchestrator.plan_shards({"regions": ["us-east-1", "eu-west-1"]}, None)
+    task = asyncio.create_task(prowler_orchestrator.run_shards("aws", shards))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_scan(client: AsyncClient, monkeypatch, tmp_path):
+    from app.collectors import prowler_orchestrator
+    from app.config import get_settings
+    from app.models.integration import Integration
+    from tests.conftest import test_session
+
+    monkeypatch.setattr(get_settings(), "PROWLER_OUTPUT_DIR", str(tmp_path))
+    async with test_session() as db:
+        integration = await db.get(Integration, uuid.UUID(TEST_INTEGRATION_ID))
+        integration.config = {"regions": ["us-east-1", "eu-west-1"]}
+        await db.commit()
+    started = asyncio.Event()
+
+    async def slow_scan(*args, **kwargs):
+        started.set()
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(prowler_orchestrator, "_run_prowler_scan", slow_scan)
+    base = f"/api/v1/organizations/{TEST_ORG_ID}/prowler"
+    scan = asyncio.create_task(client.post(
+        f"{base}/scan", json={"integration_id": TEST_INTEGRATION_ID, "scan_type": "full"}
+    ))
+    await asyncio.wait_for(started.wait(), 5)
+    job_id = (await client.get(f"{base}/results")).json()["items"][0]["job_id"]
+
+    resp = await client.post(f"{base}/scan/{job_id}/cancel")
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "cancelled"
+    assert (await asyncio.wait_for(scan, 5)).json()["status"] == "cancelled"
+    assert os.listdir(tmp_path) == []
+
+    again = await client.post(f"{base}/scan/{job_id}/cancel")
+    assert again.status_code == 409
+    missing = await client.post(f"{base}/scan/{uuid.uuid4()}/cancel")
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_scan_diff_drives_monitoring_alerts(client: AsyncClient, monkeypatch, tmp_path):
+    """Consecutive scans are diffed by fingerprint; the monitor alerts only on new findings."""
+    import json
+
+    from app.collectors import prowler_orchestrator
+    from app.config import get_settings
+
+    base = f"/api/v1/organizations/{TEST_ORG_ID}"
+    rule_id = (await client.post(f"{base}/monitoring/rules", json={
+        "title": "Prowler high findings", "check_type": "prowler_scan",
+        "config": {"severity_threshold": "high"},
+    })).json()["id"]
+
+    first = (await client.post(
+        f"{base}/prowler/scan", json={"integration_id": TEST_INTEGRATION_ID, "scan_type": "full"}
+    )).json()["job_id"]
+    diff = (await client.get(f"{base}/prowler/results/{first}/diff")).json()
+    assert diff["previous_job_id"] is None
+    assert (diff["new_count"], diff["resolved_count"], diff["persisting_count"]) == (6, 0, 0)
+
+    alerts = (await client.post(f"{base}/monitoring/rules/{rule_id}/run")).json()
+    assert len(alerts) == 1
+    assert alerts[0]["details"]["new_count"] == 5  # critical 2 + high 3
+    # Same scan again: nothing new, so no new alert, but the rule still fails
+    assert (await client.post(f"{base}/monitoring/rules/{rule_id}/run")).json() == []
+    assert (await client.get(f"{base}/monitoring/rules/{rule_id}")).json()["last_result"] == "fail"
+
+    findings = [
+        {"CheckID": "iam_root_mfa_enabled", "Status": "FAIL", "Severity": "critical", "ServiceName": "IAM",
+         "Region": "us-east-1", "ResourceArn": "arn:aws:iam::123456789012:root"},
+        {"CheckID": "kms_key_rotation", "Status": "FAIL", "Severity": "high", "ServiceName": "KMS",
+         "Region": "us-east-1", "ResourceArn": "arn:aws:kms:us-east-1:123456789012:key/1"},
+        {"CheckID": "s3_bucket_public_access", "Status": "PASS", "Severity": "high", "ServiceName": "S3",
+         "Region": "us-east-1", "ResourceArn": "arn:aws:s3:::my-public-bucket"},
+    ]
+    output_file = tmp_path / "prowler-output.json"
+    output_file.write_text(json.dumps(findings))
+
+    async def fake_scan(*args, **kwargs):
+        return str(output_file)
+
+    monkeypatch.setattr(prowler_orchestrator, "_run_prowler_scan", fake_scan)
+    monkeypatch.setattr(get_settings(), "PROWLER_OUTPUT_DIR", str(tmp_path / "shards"))
+    second = (await client.post(
+        f"{base}/prowler/scan", json={"integration_id": TEST_INTEGRATION_ID, "scan_type": "full"}
+    )).json()["job_id"]
+
+    diff = (await client.get(f"{base}/prowler/results/{second}/diff")).json()
+    assert diff["previous_job_id"] == first
+    assert (diff["new_count"], diff["resolved_count"], diff["persisting_count"]) == (1, 5, 1)
+    assert diff["new_by_severity"] == {"high": 1}
+    new = (await client.get(f"{base}/prowler/results/{second}/diff", params={"change": "new"})).json()
+    assert [c["check_id"] for c in new["changes"]] == ["kms_key_rotation"]
+
+    alerts = (await client.post(f"{base}/monitoring/rules/{rule_id}/run")).json()
+    assert len(alerts) == 1
+    assert alerts[0]["details"]["new_count"] == 1
+    assert alerts[0]["details"]["previous_scan_job_id"] == first
+    assert alerts[0]["details"]["top_findings"][0]["check_id"] == "kms_key_rotation"
+
+    trends = (await client.get(f"{base}/prowler/trends")).json()
+    assert [t["job_id"] for t in trends] == [second, first]
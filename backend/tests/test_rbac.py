@@ -133,3 +133,132 @@ async def test_auditor_external_read_only(auditor_external_client: AsyncClient):
         f"/api/v1/organizations/{TEST_ORG_ID}/controls"
     )
     assert list_resp.status_code == 403
+
+
+def _signing_setup():
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jose import jwk
+
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_jwk = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": "k1", "use": "sig"}
+    return private_pem, {"keys": [public_jwk]}
+
+
+@pytest.mark.asyncio
+async def test_token_cache_and_single_flight_jwks(monkeypatch):
+    """Concurrent kid lookups share one JWKS fetch; repeat tokens skip verification."""
+    import asyncio
+    import time
+
+    from jose import jwt
+
+    from app.core import security
+    from app.core.exceptions import UnauthorizedError
+
+    private_pem, jwks = _signing_setup()
+    fetches = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return jwks
+
+    class FakeClient:
+        async def get(self, url):
+            fetches.append(url)
+            await asyncio.sleep(0.05)
+            return FakeResponse()
+
+    monkeypatch.setattr(security, "_get_client", lambda: FakeClient())
+    security.clear_jwks_cache()
+    issuer = f"{security.settings.KEYCLOAK_URL}/realms/{security.settings.KEYCLOAK_REALM}"
+
+    def token(sub: str, kid: str = "k1", exp: float | None = None) -> str:
+        claims = {"sub": sub, "iss": issuer, "exp": int(exp or time.time() + 600)}
+        return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+    tokens = [token(f"user-{i}") for i in range(10)]
+    payloads = await asyncio.gather(*(security.decode_token(t) for t in tokens))
+    assert [p["sub"] for p in payloads] == [f"user-{i}" for i in range(10)]
+    assert len(fetches) == 1
+
+    verified = security.get_stats()["verifications"]
+    assert (await security.decode_token(tokens[0]))["sub"] == "user-0"
+    assert security.get_stats()["verifications"] == verified
+
+    # Expired tokens are rejected, not served from the cache
+    with pytest.raises(UnauthorizedError):
+        await security.decode_token(token("late", exp=time.time() - 5))
+
+    # Unknown kids only trigger a refetch once the min refresh interval has passed
+    with pytest.raises(UnauthorizedError):
+        await security.decode_token(token("rotated", kid="k2"))
+    assert len(fetches) == 1
+    monkeypatch.setattr(security, "_fetched_at", time.monotonic() - 3600 + 1)
+    await asyncio.gather(
+        *(security.decode_token(token(f"rotated-{i}", kid="k2")) for i in range(5)),
+        return_exceptions=True,
+    )
+    assert len(fetches) == 2
+
+    security.clear_jwks_cache()
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_skips_db_and_follows_user_updates(monkeypatch):
+    """Cached principals need no DB lookup and are invalidated by user_service."""
+    from app.core import dependencies, principals
+    from app.core.exceptions import ForbiddenError
+    from app.schemas.user import UserUpdate
+    from app.services import user_service
+    from tests.conftest import test_session
+
+    keycloak_id = f"kc-{uuid.uuid4()}"
+    async with test_session() as db:
+        user = User(
+            org_id=uuid.UUID(TEST_ORG_ID), keycloak_id=keycloak_id,
+            email=f"{keycloak_id}@example.com", full_name="Cached User", role="employee",
+        )
+        db.add(user)
+        await db.commit()
+        user_id = user.id
+
+    async def fake_decode(token):
+        return {"sub": keycloak_id}
+
+    monkeypatch.setattr(dependencies, "decode_token", fake_decode)
+    principals.clear()
+    auth = "Bearer test-token"
+
+    async with test_session() as db:
+        first = await dependencies.get_current_user(authorization=auth, db=db)
+    assert first.id == user_id and first.role == "employee"
+
+    # A hit never touches the session
+    cached = await dependencies.get_current_user(authorization=auth, db=None)
+    assert (cached.id, cached.org_id, cached.email) == (user_id, first.org_id, first.email)
+    assert principals.get_stats()["local"]["hits"] >= 1
+
+    async with test_session() as db:
+        await user_service.update_user(
+            db, uuid.UUID(TEST_ORG_ID), user_id, UserUpdate(role="compliance_manager")
+        )
+    async with test_session() as db:
+        promoted = await dependencies.get_current_user(authorization=auth, db=db)
+    assert promoted.role == "compliance_manager"
+
+    async with test_session() as db:
+        await user_service.delete_user(db, uuid.UUID(TEST_ORG_ID), user_id)
+    async with test_session() as db:
+        with pytest.raises(ForbiddenError):
+            await dependencies.get_current_user(authorization=auth, db=db)
+    principals.clear()